@@ -188,18 +188,15 @@ import difflib
 import logging
 import numpy as np
 import cv2
-from text_corrector import TextCorrector
 import translated_ui
 from text_corrector import DialogueType
 from control_ui import Control_UI
-from translator import Translator
-from translator_claude import TranslatorClaude
-from translator_gemini import TranslatorGemini
 from settings import Settings, SettingsUI
 from advance_ui import AdvanceUI
 from mini_ui import MiniUI
 from loggings import LoggingManager
 from translator_factory import TranslatorFactory
+from translator_registry import get_provider_type, get_shared_context
 import keyboard
 import re
 from appearance import appearance_manager
@@ -212,7 +209,17 @@ from hover_translation import HoverTranslator
 from FeatureManager import FeatureManager  # เพิ่ม import FeatureManager จากไฟล์ใหม่
 from version_manager import get_mbb_version
 from npc_manager_card import create_npc_manager_card
-from npc_file_utils import get_game_info_from_npc_file
+from npc_file_utils import get_game_info_from_npc_file, get_npc_file_path
+from startup_orchestrator import StartupOrchestrator, FAILED
+from ocr_profiles import describe_languages, get_ocr_languages, get_reader_cache
+from ocr_engines import EasyOCREngine, TesseractEngine, resolve_engine_name
+from area_geometry import AreaGeometry
+from visual_classifier import VisualPreClassifier
+from text_presence import TextPresenceDetector
+from text_stabilizer import REASON_RELEASED, TextStabilizer
+from segment_fanout import get_segment_fanout, split_independent_segments
+from translation_memory import get_translation_memory
+from dialogue_classifier import classify_areas, classify_choice, parse_choice
 
 
 def resource_path(relative_path):
@@ -321,6 +328,29 @@ class TranslationMetrics:
         self.context_guesses = 0
         self.emergency_detections = 0
         self.unknown_speakers_count = 0  # ชื่อที่ไม่มีในฐานข้อมูลแต่ยอมรับได้
+        # เวลาต่อขั้นของ pipeline: stage -> {outcome: [count, total_ms]}
+        self.stages = {}
+
+    def record_stage(self, stage, elapsed_ms, outcome="ok"):
+        """บันทึกเวลาและผลของขั้นหนึ่งใน pipeline (เช่น text_gate, ocr)"""
+        entry = self.stages.setdefault(stage, {}).setdefault(outcome, [0, 0.0])
+        entry[0] += 1
+        entry[1] += elapsed_ms
+
+    def get_stage_report(self):
+        """สรุปจำนวนครั้ง/เวลาเฉลี่ยต่อขั้นและผลลัพธ์"""
+        if not self.stages:
+            return ""
+        lines = ["Pipeline Stages:"]
+        for stage, outcomes in self.stages.items():
+            calls = sum(count for count, _ in outcomes.values())
+            total_ms = sum(ms for _, ms in outcomes.values())
+            lines.append(f"- {stage}: {calls} calls, avg {total_ms / calls:.1f} ms")
+            for outcome, (count, ms) in sorted(outcomes.items()):
+                lines.append(
+                    f"    {outcome}: {count} ({count / calls * 100:.1f}%), avg {ms / count:.1f} ms"
+                )
+        return "\n".join(lines)
 
     def record_translation(self, combined_text, method):
         """บันทึกข้อมูลการแปล"""
@@ -349,6 +379,9 @@ class TranslationMetrics:
     def get_report(self):
         """สร้างรายงานสถิติ"""
         if self.total_translations == 0:
+            stage_report = self.get_stage_report()
+            if stage_report:
+                return f"No translations recorded yet\n\n{stage_report}\n"
             return "No translations recorded yet"
 
         placeholder_rate = (self.placeholder_count / self.total_translations) * 100
@@ -376,6 +409,8 @@ Fallback Success:
 
 Overall Quality Score: {100 - placeholder_rate:.1f}%
 Target: > 95% (< 5% placeholder rate)
+
+{self.get_stage_report()}
 """
         return report
 
@@ -398,10 +433,6 @@ class MagicBabelApp:
         self.last_signatures = {}
 
         # Screen Capture Optimization - Cache variables
-        self.cached_scale_x = None
-        self.cached_scale_y = None
-        self.scale_cache_timestamp = 0
-        self.scale_cache_timeout = 10.0  # Cache scaling for 10 seconds
         self.full_screen_capture_cache = None
         self.full_screen_capture_timestamp = 0
         self.full_screen_cache_timeout = 0.05  # Cache full screen capture for 50ms (ลดจาก 100ms สำหรับ rapid detection)
@@ -426,17 +457,22 @@ class MagicBabelApp:
 
         # สร้าง Settings ก่อนเพื่อใช้ในการตรวจสอบ splash screen
         self.settings = Settings()
+        # พิกัดพื้นที่/preset ในพิกเซลจริง ใช้ร่วมกันระหว่าง capture, hover และการแสดงกรอบพื้นที่
+        self.area_geometry = AreaGeometry(
+            self.settings,
+            lambda: (self.root.winfo_screenwidth(), self.root.winfo_screenheight()),
+        )
+        # ตรวจหน้าตาของพื้นที่ก่อน OCR สำหรับ auto area switching
+        self.visual_classifier = VisualPreClassifier(self.area_geometry, self.settings)
+        # ข้าม OCR ของพื้นที่ที่ไม่มีตัวอักษร (กล่องข้อความปิด/ฉากเกม)
+        self.text_presence = TextPresenceDetector()
+        # รอข้อความที่เกมกำลังพิมพ์ทีละตัวอักษรให้ครบก่อนส่งแปล
+        self.text_stabilizer = TextStabilizer()
+        self._last_auto_switch_type = None
 
         def show_splash():
-            # อ่านค่าจาก settings.json โดยตรง
-            try:
-                import json
-
-                with open("settings.json", "r", encoding="utf-8") as f:
-                    settings_data = json.load(f)
-                splash_type = settings_data.get("splash_screen_type", "video")
-            except Exception as e:
-                splash_type = "video"  # ใช้ค่าเริ่มต้นถ้าอ่านไม่ได้
+            # Settings โหลด settings.json ไว้แล้ว ไม่ต้องอ่านไฟล์ซ้ำ
+            splash_type = self.settings.get("splash_screen_type", "video")
 
             if splash_type == "off":
                 return None, None
@@ -683,8 +719,8 @@ class MagicBabelApp:
                 self.splash_start_time = time.time()
                 print("✅ Splash screen started after delay")
 
-        # รอ 3 วินาทีก่อนแสดง splash
-        self.root.after(3000, delayed_splash)
+        # รอ 3 วินาทีก่อนแสดง splash (ถ้า critical path เสร็จก่อนจะยกเลิกและแสดง main UI ทันที)
+        self._splash_after_id = self.root.after(3000, delayed_splash)
 
         # ตัวแปรเริ่มต้น
         self.splash = None
@@ -733,7 +769,13 @@ class MagicBabelApp:
                 "psutil not available - CPU monitoring disabled"
             )
 
-        self.font_manager = initialize_font_manager(None, self.settings)
+        # งานเริ่มต้นที่ไม่แตะ Tk (ฟอนต์, NPC, translator, OCR model) เริ่มบน worker thread ตั้งแต่ตอนนี้
+        # ขณะที่ Tk thread สร้าง UI ต่อ - main UI จะแสดงเมื่อ critical path เสร็จ (_complete_startup)
+        self.reader = None
+        self.ocr_engine = None
+        self.translator = None
+        self.startup = self._declare_startup_tasks()
+        self.startup.start(on_critical_done=self._complete_startup)
         appearance_manager.settings = self.settings
 
         # โหลดธีมจาก settings ก่อนสร้าง UI เพื่อให้ version_label ใช้สีถูกต้อง
@@ -765,7 +807,8 @@ class MagicBabelApp:
                 f"ใช้ธีมเริ่มต้น {default_theme_name_val_init_final}"
             )
 
-        self.text_corrector = TextCorrector()
+        # ใช้ TextCorrector ตัวเดียวกับ translator เพื่อให้ผล parse_line ที่ memoize ไว้ใช้ร่วมกัน
+        self.text_corrector = get_shared_context().text_corrector
         try:
             self.text_corrector.reload_data()
             self.logging_manager.log_info(
@@ -812,6 +855,13 @@ class MagicBabelApp:
                 "MagicBabelApp.blink_interval was not set by init_variables, using default 500ms in __init__."
             )
 
+        # UI ต้องใช้ฟอนต์ที่ลงทะเบียนแล้ว - รอเฉพาะงาน fonts งานอื่นยังทำงานต่อเบื้องหลัง
+        try:
+            self.font_manager = self.startup.wait("fonts")
+        except Exception as e:
+            self.logging_manager.log_error(f"Background font scan failed, retrying: {e}")
+            self.font_manager = initialize_font_manager(None, self.settings)
+
         self.create_main_ui()
         self.create_translated_ui()
         self.create_translated_logs()
@@ -883,11 +933,12 @@ class MagicBabelApp:
 
         self.sync_initial_areas()
 
-        self.init_ocr_and_translation()
+        # OCR reader และ translator ถูกสร้างโดย startup orchestrator
+        self._load_translate_area()
         self.bind_events()
         self.apply_saved_settings()
 
-        self.root.after(5000, self._complete_startup)  # รอ 5 วินาทีเสมอ
+        self.startup.complete("main_ui")
 
         if self.has_psutil:
             self._cpu_monitor_thread_instance = threading.Thread(
@@ -922,17 +973,75 @@ class MagicBabelApp:
         except Exception as e:
             self.logging_manager.log_error(f"เกิดข้อผิดพลาดในการแสดงข้อความแจ้งเตือน: {e}")
 
+    def _declare_startup_tasks(self):
+        """ประกาศงานเริ่มต้นโปรแกรมพร้อม dependency (งานที่มี * ใน startup timeline คือ critical path)"""
+        startup = StartupOrchestrator(self.root)
+        startup.add("fonts", lambda: initialize_font_manager(None, self.settings))
+        startup.add("npc_index", self._prewarm_npc_index)
+        startup.add("translator", self._create_translator, deps=("npc_index",))
+        startup.add("ocr_reader", self._load_ocr_reader_in_background, critical=False)
+        startup.add("before_start_checks", self._run_before_start_checks, critical=False)
+        # งานที่แตะ widget ต้องรอให้ __init__ สร้าง UI ครบก่อน
+        startup.add_milestone("main_ui", deps=("fonts",))
+        startup.add("ui_positions", self.load_ui_positions, deps=("main_ui",), main_thread=True)
+        startup.add(
+            "hover_translator",
+            self.init_hover_translator,
+            deps=("ui_positions",),
+            main_thread=True,
+            critical=False,
+        )
+        return startup
+
+    def _prewarm_npc_index(self):
+        """parse NPC.json ล่วงหน้าใน shared context ให้ translator ที่กำลังจะสร้างใช้ต่อโดยไม่ต้องอ่านไฟล์ซ้ำ"""
+        from translator_registry import get_shared_context
+
+        context = get_shared_context()
+        entries = 0
+        # Gemini ใช้ path เต็มจาก get_npc_file_path ส่วน provider อื่นเปิด "NPC.json" ตรงๆ
+        for file_path in dict.fromkeys((get_npc_file_path(), "NPC.json")):
+            if os.path.exists(file_path):
+                entries = len(context.get_npc_data(file_path))
+        return entries
+
+    def _load_ocr_reader_in_background(self):
+        """โหลด OCR model บน worker thread - ถ้า import EasyOCR ไม่ได้ ให้ Tk thread แสดงคำแนะนำการติดตั้งตามเดิม"""
+        if resolve_engine_name(self.settings.get("ocr_engine", "auto")) == EasyOCREngine.name:
+            try:
+                importlib.import_module("easyocr")
+            except Exception as e:
+                self.logging_manager.log_warning(f"EasyOCR import failed in background: {e}")
+                self.root.after(0, self._load_ocr_reader)
+                return None
+        self._load_ocr_reader()
+        return self.ocr_engine
+
+    def _run_before_start_checks(self):
+        """ตรวจไฟล์ข้อมูล (NPC, settings, OCR models) ด้วย checker ของ before_start แล้ว log ปัญหาที่พบ"""
+        try:
+            from before_start.checkers.data_checker import DataChecker
+        except ImportError:
+            return None
+        result = DataChecker().check_all()
+        for name, detail in result["details"].items():
+            if detail.get("valid") is False or detail.get("error"):
+                self.logging_manager.log_warning(
+                    f"Before-start check '{name}': {detail.get('error', detail)}"
+                )
+        return result["status"]
+
     def _complete_startup(self):
-        """แยกฟังก์ชันสำหรับจัดการส่วนสุดท้ายของการเริ่มต้นโปรแกรม"""
+        """แยกฟังก์ชันสำหรับจัดการส่วนสุดท้ายของการเริ่มต้นโปรแกรม
+        (ถูกเรียกโดย startup orchestrator เมื่องาน critical ทั้งหมดเสร็จ)"""
         try:
-            # ตรวจสอบว่าผ่านมา 5 วินาทีหรือยัง
-            if hasattr(self, "splash_start_time"):
-                elapsed = time.time() - self.splash_start_time
-                if elapsed < 5.0:
-                    # ถ้ายังไม่ครบ 5 วินาที ให้รอต่อ
-                    remaining = int((5.0 - elapsed) * 1000)
-                    self.root.after(remaining, self._complete_startup)
-                    return
+            # critical path เสร็จก่อนถึงเวลาแสดง splash - ไม่ต้องแสดงแล้ว
+            if getattr(self, "_splash_after_id", None):
+                try:
+                    self.root.after_cancel(self._splash_after_id)
+                except tk.TclError:
+                    pass
+                self._splash_after_id = None
 
             # ปิด splash screen (ถ้ายังเปิดอยู่)
             if hasattr(self, "splash") and self.splash and self.splash.winfo_exists():
@@ -980,22 +1089,19 @@ class MagicBabelApp:
                 self.root.after(100, lambda: self._update_pin_border(True))
 
             self.logging_manager.log_info("MagicBabel application started and ready")
-
-            # Splash screen จะถูกแสดงหลัง delay แล้ว
             print("Application fully started and ready")
 
-            # เพิ่มการโหลดข้อมูล NPC
-            self.reload_npc_data()
-            self.logging_manager.log_info("Reloaded NPC data during startup")
-
-            # โหลดตำแหน่ง UI ที่บันทึกไว้จากการใช้งานครั้งก่อน
-            self.logging_manager.log_info(
-                "กำลังโหลดตำแหน่งหน้าต่าง UI จากการใช้งานครั้งก่อน..."
-            )
-            self.load_ui_positions()
-
-            # เริ่มต้นระบบ Hover Translation
-            self.init_hover_translator()
+            # งาน critical ที่ล้มเหลว (เช่น สร้าง translator ไม่ได้) - แจ้งผู้ใช้แต่ยังเปิดโปรแกรมได้
+            failed_tasks = [
+                task
+                for task in self.startup.tasks.values()
+                if task.critical and task.status == FAILED
+            ]
+            if failed_tasks:
+                messagebox.showwarning(
+                    "Startup Warning",
+                    "\n".join(f"{task.name}: {task.error}" for task in failed_tasks),
+                )
 
             # เริ่มต้นระบบตรวจสอบความสอดคล้องของ TUI state
             self.root.after(2000, self.ensure_tui_state_consistency)
@@ -1042,6 +1148,7 @@ class MagicBabelApp:
             logging.info("Attempting to initialize Hover Translator...")  # เพิ่ม Log
             hover_callbacks = {
                 "get_screen_scale": self.get_screen_scale,
+                "get_area_geometry": lambda: self.area_geometry,
                 "is_manual_show_area_active": self.is_show_area_active,
                 # แก้ไขตรงนี้: ใช้ lambda เพื่อส่งค่า is_translating โดยตรง
                 "is_translation_active": lambda: self.is_translating,
@@ -1529,27 +1636,18 @@ class MagicBabelApp:
 
             for area in areas_to_display:
                 logging.debug(f"Processing area: {area}")
-                translate_area = self.settings.get_translate_area(area)
+                area_rect = self.area_geometry.area_rect(area)
 
                 # *** เพิ่ม Log ตรวจสอบข้อมูลพิกัด ***
-                if not translate_area:
+                if area_rect is None:
                     logging.warning(
                         f"No coordinates found for area '{area}' in settings."
                     )
                     continue
-                logging.debug(f"Coordinates for area '{area}': {translate_area}")
-
-                # คำนวณพิกัดและขนาด
-                scale_x, scale_y = self.get_screen_scale()
-                start_x_coord = translate_area.get("start_x", 0)
-                start_y_coord = translate_area.get("start_y", 0)
-                end_x_coord = translate_area.get("end_x", 0)
-                end_y_coord = translate_area.get("end_y", 0)
 
-                x = int(start_x_coord * scale_x)
-                y = int(start_y_coord * scale_y)
-                width = int((end_x_coord - start_x_coord) * scale_x)
-                height = int((end_y_coord - start_y_coord) * scale_y)
+                # พิกัดและขนาดในพิกเซลจริง (คำนวณไว้แล้วใน area_geometry)
+                x, y = area_rect.x1, area_rect.y1
+                width, height = area_rect.width, area_rect.height
 
                 # *** เพิ่ม Log ตรวจสอบขนาด ***
                 logging.debug(
@@ -1752,26 +1850,17 @@ class MagicBabelApp:
 
             for area in areas_to_display:
                 logging.debug(f"Processing quick area: {area}")
-                translate_area = self.settings.get_translate_area(area)
+                area_rect = self.area_geometry.area_rect(area)
 
-                if not translate_area:
+                if area_rect is None:
                     logging.warning(
                         f"No coordinates found for area '{area}' in settings (quick)."
                     )
                     continue
-                logging.debug(f"Coordinates for quick area '{area}': {translate_area}")
 
-                # คำนวณพิกัดและขนาด
-                scale_x, scale_y = self.get_screen_scale()
-                start_x_coord = translate_area.get("start_x", 0)
-                start_y_coord = translate_area.get("start_y", 0)
-                end_x_coord = translate_area.get("end_x", 0)
-                end_y_coord = translate_area.get("end_y", 0)
-
-                x = int(start_x_coord * scale_x)
-                y = int(start_y_coord * scale_y)
-                width = int((end_x_coord - start_x_coord) * scale_x)
-                height = int((end_y_coord - start_y_coord) * scale_y)
+                # พิกัดและขนาดในพิกเซลจริง (คำนวณไว้แล้วใน area_geometry)
+                x, y = area_rect.x1, area_rect.y1
+                width, height = area_rect.width, area_rect.height
 
                 logging.debug(
                     f"Calculated quick geometry for area '{area}': w={width}, h={height}, x={x}, y={y}"
@@ -4474,6 +4563,10 @@ class MagicBabelApp:
                         "last_manual_preset_selection_time",
                         self.last_manual_preset_selection_time,
                     )
+                    # ผู้ใช้ยืนยันว่าหน้าจอตอนนี้ตรงกับ preset นี้ - เรียนรู้หน้าตาของพื้นที่ไว้
+                    self.root.after(
+                        1500, lambda num=preset_num: self._learn_visual_template(num)
+                    )
                     logging.debug(
                         "sync_last_used_preset: Updated last_manual_preset_selection_time."
                     )
@@ -5184,6 +5277,11 @@ class MagicBabelApp:
         """Reload NPC data and update related components"""
         self.logging_manager.log_info("Reloading NPC data...")
 
+        # ชื่อ/คำศัพท์/เกมอาจเปลี่ยน (รวมถึง swap_data) - คำแปลที่จำไว้อาจไม่ตรงกับข้อมูลใหม่
+        get_translation_memory().clear()
+        # NPC data ที่ parse แล้วและ TextCorrector ที่ใช้ร่วมกันทุก translator ต้องอ่านไฟล์ใหม่ด้วย
+        get_shared_context().reload()
+
         if hasattr(self, "translator") and self.translator:
             self.translator.reload_data()
             self.logging_manager.log_info("Translator data reloaded")
@@ -5208,6 +5306,13 @@ class MagicBabelApp:
                     f"Updated Translated_UI with {len(character_names)} character names"
                 )
 
+        # ไฟล์ NPC อาจถูกสลับเป็นเกมอื่น (swap_data) - เปลี่ยน OCR reader ถ้า language profile ต่างไป
+        self.current_game_info = get_game_info_from_npc_file()
+        if getattr(self, "ocr_engine", None) is not None and get_ocr_languages(
+            self.current_game_info
+        ) != getattr(self, "ocr_languages", None):
+            self.reinitialize_ocr()
+
         self.logging_manager.log_info("NPC data reload completed")
 
     def trigger_restart_after_swap(self):
@@ -5311,45 +5416,12 @@ class MagicBabelApp:
     def init_ocr_and_translation(self):
         """Initialize OCR และ translator"""
         try:
-            # ส่วน OCR initialization ยังคงเหมือนเดิม
-            translate_area = self.settings.get_translate_area("A")
-            self.start_x = translate_area["start_x"]
-            self.start_y = translate_area["start_y"]
-            self.end_x = translate_area["end_x"]
-            self.end_y = translate_area["end_y"]
-
-            # เก็บประเภท OCR สำหรับแสดงข้อมูลในภายหลัง
-            use_gpu = self.settings.get("use_gpu_for_ocr", False)
-            ocr_type = "GPU" if use_gpu else "CPU"
-
-            # บันทึกข้อมูล OCR
-            self.logging_manager.log_info(f"Initializing OCR with GPU: {use_gpu}")
-
-            # สร้าง OCR reader
-            try:
-                easyocr_module = get_easyocr()
-                if easyocr_module is None:
-                    self.reader = None
-                    self.logging_manager.log_warning(
-                        "EasyOCR not available - OCR functionality disabled"
-                    )
-                    return
-
-                self.reader = easyocr_module.Reader(["en", "ch_tra"], gpu=use_gpu)
-                self.logging_manager.log_info(
-                    f"Initialized OCR with languages: English, Korean"
-                )
-                self.logging_manager.log_info(f"OCR type: {ocr_type}")
-            except Exception as e:
-                self.logging_manager.log_error(f"Error initializing OCR reader: {e}")
-                self.reader = None
-                self.logging_manager.log_warning(
-                    "OCR functionality disabled due to initialization error"
-                )
+            self._load_translate_area()
+            self._load_ocr_reader()
 
             # สร้าง text_corrector
             try:
-                self.text_corrector = TextCorrector()
+                self.text_corrector = get_shared_context().text_corrector
                 # เพิ่มบรรทัดนี้เพื่อให้แน่ใจว่ามีการโหลดข้อมูล
                 self.text_corrector.reload_data()
                 self.logging_manager.log_info("TextCorrector initialized successfully")
@@ -5357,79 +5429,154 @@ class MagicBabelApp:
                 self.logging_manager.log_error(f"Error initializing TextCorrector: {e}")
                 raise ValueError(f"Failed to initialize TextCorrector: {e}")
 
-            # ดึงข้อมูลการตั้งค่า model
-            api_params = self.settings.get_api_parameters()
-            if not api_params or "model" not in api_params:
-                self.logging_manager.log_error("No model specified in API parameters")
-                raise ValueError("No model specified in API parameters")
+            self._create_translator()
+            return True
+
+        except Exception as e:
+            self.logging_manager.log_error(
+                f"Error initializing OCR and translation: {e}"
+            )
+            raise
+
+    def _load_translate_area(self):
+        """โหลดพิกัดพื้นที่แปล A จาก settings"""
+        translate_area = self.settings.get_translate_area("A")
+        self.start_x = translate_area["start_x"]
+        self.start_y = translate_area["start_y"]
+        self.end_x = translate_area["end_x"]
+        self.end_y = translate_area["end_y"]
+
+    def _load_ocr_reader(self):
+        """สร้าง OCR engine ตามการตั้งค่า (self.ocr_engine = None ถ้าใช้ไม่ได้)"""
+        # เก็บประเภท OCR สำหรับแสดงข้อมูลในภายหลัง
+        use_gpu = self.settings.get("use_gpu_for_ocr", False)
+        ocr_type = "GPU" if use_gpu else "CPU"
+
+        # บันทึกข้อมูล OCR
+        self.logging_manager.log_info(f"Initializing OCR with GPU: {use_gpu}")
+
+        # สร้าง OCR engine
+        try:
+            if self._build_ocr_engine(use_gpu) is None:
+                self.logging_manager.log_warning(
+                    "EasyOCR not available - OCR functionality disabled"
+                )
+                return
 
-            model_name = api_params["model"]
             self.logging_manager.log_info(
-                f"Creating translator for model: {model_name}"
+                f"Initialized OCR ({self.ocr_engine.name}) with languages: "
+                f"{describe_languages(self.ocr_languages)}"
+            )
+            self.logging_manager.log_info(f"OCR type: {ocr_type}")
+        except Exception as e:
+            self.logging_manager.log_error(f"Error initializing OCR reader: {e}")
+            self.reader = None
+            self.ocr_engine = None
+            self.logging_manager.log_warning(
+                "OCR functionality disabled due to initialization error"
             )
 
-            # เก็บข้อมูล translator เดิมถ้ามี
-            translator_before = None
-            old_class = "None"
-            if hasattr(self, "translator") and self.translator is not None:
-                translator_before = self.translator
-                old_class = translator_before.__class__.__name__
-                self.logging_manager.log_info(f"Previous translator: {old_class}")
+    def _build_ocr_engine(self, use_gpu):
+        """
+        สร้าง OCR engine ตาม settings "ocr_engine" (auto = engine ที่ benchmark เลือกไว้สำหรับเครื่องนี้)
+        self.reader จะเป็น EasyOCR reader เมื่อใช้ EasyOCR เท่านั้น
 
-            # รีเซ็ต translator เป็น None ก่อนสร้างใหม่
-            self.translator = None
+        Returns:
+            OCREngine หรือ None ถ้าไม่มี engine ที่ใช้ได้
+        """
+        engine_name = resolve_engine_name(self.settings.get("ocr_engine", "auto"))
+        self.ocr_languages = get_ocr_languages(getattr(self, "current_game_info", None))
+        if engine_name == TesseractEngine.name:
+            if TesseractEngine.is_available():
+                self.reader = None
+                self.ocr_engine = TesseractEngine(self.ocr_languages)
+                return self.ocr_engine
+            self.logging_manager.log_warning("Tesseract not available - using EasyOCR")
 
-            try:
-                self.translator = TranslatorFactory.create_translator(self.settings)
-                if not self.translator:
-                    self.logging_manager.log_error(
-                        f"TranslatorFactory returned None for model: {model_name}"
-                    )
-                    raise ValueError(
-                        f"Failed to create translator for model: {model_name}"
-                    )
+        easyocr_module = get_easyocr()
+        if easyocr_module is None:
+            self.reader = None
+            self.ocr_engine = None
+            return None
+        self.reader = self._get_profile_reader(easyocr_module, use_gpu)
+        self.ocr_engine = EasyOCREngine(self.reader)
+        return self.ocr_engine
+
+    def _get_profile_reader(self, easyocr_module, use_gpu):
+        """reader ของ OCR language profile ของเกมปัจจุบัน (ใช้ตัวที่ cache ไว้ถ้าเคยโหลดแล้ว)"""
+        self.ocr_languages = get_ocr_languages(getattr(self, "current_game_info", None))
+        self.ocr_fast_cpu = self.settings.get("ocr_fast_cpu_mode", False)
+        return get_reader_cache().get(
+            easyocr_module, self.ocr_languages, use_gpu, fast_cpu=self.ocr_fast_cpu
+        )
 
-                # ตรวจสอบประเภทของ translator ที่ได้
-                translator_class = self.translator.__class__.__name__
-                self.logging_manager.log_info(
-                    f"Successfully created {translator_class} instance: {translator_class}"
-                )
+    def _create_translator(self):
+        """สร้าง translator ใหม่ตามโมเดลใน settings"""
+        # ดึงข้อมูลการตั้งค่า model
+        api_params = self.settings.get_api_parameters()
+        if not api_params or "model" not in api_params:
+            self.logging_manager.log_error("No model specified in API parameters")
+            raise ValueError("No model specified in API parameters")
 
-                # Log current parameters
-                params = self.translator.get_current_parameters()
-                self.logging_manager.log_info(f"\nCurrent translator parameters:")
-                self.logging_manager.log_info(f"Model: {params.get('model')}")
-                self.logging_manager.log_info(f"Max tokens: {params.get('max_tokens')}")
-                self.logging_manager.log_info(
-                    f"Temperature: {params.get('temperature')}"
+        model_name = api_params["model"]
+        self.logging_manager.log_info(
+            f"Creating translator for model: {model_name}"
+        )
+
+        # เก็บข้อมูล translator เดิมถ้ามี
+        translator_before = None
+        old_class = "None"
+        if hasattr(self, "translator") and self.translator is not None:
+            translator_before = self.translator
+            old_class = translator_before.__class__.__name__
+            self.logging_manager.log_info(f"Previous translator: {old_class}")
+
+        # รีเซ็ต translator เป็น None ก่อนสร้างใหม่
+        self.translator = None
+
+        try:
+            self.translator = TranslatorFactory.create_translator(self.settings)
+            if not self.translator:
+                self.logging_manager.log_error(
+                    f"TranslatorFactory returned None for model: {model_name}"
+                )
+                raise ValueError(
+                    f"Failed to create translator for model: {model_name}"
                 )
-                self.logging_manager.log_info(f"Top P: {params.get('top_p', 'N/A')}")
 
-                # บันทึกเพิ่มเติมว่าเป็นการเปลี่ยนแปลงประเภทหรือไม่
-                if translator_before:
-                    new_class = self.translator.__class__.__name__
-                    if old_class != new_class:
-                        self.logging_manager.log_info(
-                            f"Translator type changed: {old_class} -> {new_class}"
-                        )
-                    else:
-                        self.logging_manager.log_info(
-                            f"Translator type unchanged: {new_class}"
-                        )
+            # ตรวจสอบประเภทของ translator ที่ได้
+            translator_class = self.translator.__class__.__name__
+            self.logging_manager.log_info(
+                f"Successfully created {translator_class} instance: {translator_class}"
+            )
 
-                del translator_before  # คืนหน่วยความจำ
+            # Log current parameters
+            params = self.translator.get_current_parameters()
+            self.logging_manager.log_info(f"\nCurrent translator parameters:")
+            self.logging_manager.log_info(f"Model: {params.get('model')}")
+            self.logging_manager.log_info(f"Max tokens: {params.get('max_tokens')}")
+            self.logging_manager.log_info(
+                f"Temperature: {params.get('temperature')}"
+            )
+            self.logging_manager.log_info(f"Top P: {params.get('top_p', 'N/A')}")
 
-            except Exception as e:
-                self.logging_manager.log_error(f"Error creating translator: {e}")
-                raise ValueError(f"Failed to create translator: {e}")
+            # บันทึกเพิ่มเติมว่าเป็นการเปลี่ยนแปลงประเภทหรือไม่
+            if translator_before:
+                new_class = self.translator.__class__.__name__
+                if old_class != new_class:
+                    self.logging_manager.log_info(
+                        f"Translator type changed: {old_class} -> {new_class}"
+                    )
+                else:
+                    self.logging_manager.log_info(
+                        f"Translator type unchanged: {new_class}"
+                    )
 
-            return True
+            del translator_before  # คืนหน่วยความจำ
 
         except Exception as e:
-            self.logging_manager.log_error(
-                f"Error initializing OCR and translation: {e}"
-            )
-            raise
+            self.logging_manager.log_error(f"Error creating translator: {e}")
+            raise ValueError(f"Failed to create translator: {e}")
 
     def get_cached_ocr_result(self, area, image_hash):
         """ดึงผลลัพธ์ OCR จาก cache ด้วยระบบหมดอายุแบบปรับตามเนื้อหา"""
@@ -5461,15 +5608,12 @@ class MagicBabelApp:
         self.settings.set_gpu_for_ocr(new_use_gpu)
         use_gpu = self.settings.get("use_gpu_for_ocr")
 
-        easyocr_module = get_easyocr()
-        if easyocr_module is None:
-            self.reader = None
+        if self._build_ocr_engine(use_gpu) is None:
             self.logging_manager.log_warning(
                 "Cannot toggle OCR GPU - EasyOCR not available"
             )
             return
 
-        self.reader = easyocr_module.Reader(["en"], gpu=use_gpu)
         self.logging_manager.log_info(f"Switched OCR to {'GPU' if use_gpu else 'CPU'}")
 
     def ocr_toggle_callback(self):
@@ -5674,6 +5818,13 @@ class MagicBabelApp:
                     self.settings.set_gpu_for_ocr(new_gpu_setting)
                     self.reinitialize_ocr()  # สั่งให้ OCR เริ่มต้นใหม่ด้วยค่า GPU/CPU ใหม่
 
+            # โหมด Fast CPU (int8 recognizer) - เทียบกับ reader ที่ใช้อยู่ เพราะ Advance UI บันทึกค่าไปก่อนแล้ว
+            if "ocr_fast_cpu_mode" in settings_dict:
+                fast_cpu = bool(settings_dict["ocr_fast_cpu_mode"])
+                self.settings.set("ocr_fast_cpu_mode", fast_cpu)
+                if fast_cpu != getattr(self, "ocr_fast_cpu", False):
+                    self.reinitialize_ocr()
+
             # ตรวจสอบและอัพเดทค่าอื่นๆ จาก Advance UI
             if "screen_size" in settings_dict:
                 self.settings.set("screen_size", settings_dict["screen_size"])
@@ -5776,17 +5927,15 @@ class MagicBabelApp:
     def reinitialize_ocr(self):
         use_gpu = self.settings.get("use_gpu_for_ocr", False)
 
-        easyocr_module = get_easyocr()
-        if easyocr_module is None:
-            self.reader = None
+        if self._build_ocr_engine(use_gpu) is None:
             self.logging_manager.log_warning(
                 "Cannot reinitialize OCR - EasyOCR not available"
             )
             return
 
-        self.reader = easyocr_module.Reader(["en"], gpu=use_gpu)
         self.logging_manager.log_info(
-            f"OCR reinitialized with [{'GPU' if use_gpu else 'CPU'}]"
+            f"OCR reinitialized ({self.ocr_engine.name}) with [{'GPU' if use_gpu else 'CPU'}] "
+            f"languages: {describe_languages(self.ocr_languages)}"
         )
 
     def update_api_settings(self):
@@ -5804,22 +5953,10 @@ class MagicBabelApp:
                 return False
 
             # ตรวจสอบประเภทของ translator ปัจจุบัน (ป้องกัน AttributeError)
-            is_claude = (
-                hasattr(self, "translator")
-                and self.translator
-                and isinstance(self.translator, TranslatorClaude)
-            )
-            is_gemini = (
-                hasattr(self, "translator")
-                and self.translator
-                and isinstance(self.translator, TranslatorGemini)
-            )
-            is_openai = (
-                hasattr(self, "translator")
-                and self.translator
-                and isinstance(self.translator, Translator)
-                and not (is_claude or is_gemini)
-            )
+            current_provider = get_provider_type(getattr(self, "translator", None))
+            is_claude = current_provider == "claude"
+            is_gemini = current_provider == "gemini"
+            is_openai = current_provider == "gpt"
 
             current_translator_type = "unknown"
             if is_claude:
@@ -5965,7 +6102,7 @@ class MagicBabelApp:
 
                 # ล้างข้อมูลใน text_corrector
                 if hasattr(self, "text_corrector"):
-                    self.text_corrector = TextCorrector()
+                    self.text_corrector.reload_data()
 
                 # อัพเดทความคืบหน้า
                 progress["value"] = 30
@@ -6007,28 +6144,20 @@ class MagicBabelApp:
                         return False
 
                     # ตรวจสอบว่าเป็นประเภทที่ถูกต้องหรือไม่
-                    if current_model_type == "claude" and not isinstance(
-                        self.translator, TranslatorClaude
-                    ):
+                    created_provider = get_provider_type(self.translator)
+                    if current_model_type == "claude" and created_provider != "claude":
                         error_message = f"Expected TranslatorClaude but got {self.translator.__class__.__name__}"
                         self.logging_manager.log_error(error_message)
                         messagebox.showerror("รีสตาร์ทล้มเหลว", error_message)
                         loading_window.destroy()
                         return False
-                    elif current_model_type == "gemini" and not isinstance(
-                        self.translator, TranslatorGemini
-                    ):
+                    elif current_model_type == "gemini" and created_provider != "gemini":
                         error_message = f"Expected TranslatorGemini but got {self.translator.__class__.__name__}"
                         self.logging_manager.log_error(error_message)
                         messagebox.showerror("รีสตาร์ทล้มเหลว", error_message)
                         loading_window.destroy()
                         return False
-                    elif current_model_type == "openai" and not (
-                        isinstance(self.translator, Translator)
-                        and not isinstance(
-                            self.translator, (TranslatorClaude, TranslatorGemini)
-                        )
-                    ):
+                    elif current_model_type == "openai" and created_provider != "gpt":
                         error_message = f"Expected Translator (OpenAI) but got {self.translator.__class__.__name__}"
                         self.logging_manager.log_error(error_message)
                         messagebox.showerror("รีสตาร์ทล้มเหลว", error_message)
@@ -6298,29 +6427,8 @@ class MagicBabelApp:
             )
 
     def get_screen_scale(self):
-        """คำนวณ scale factor สำหรับหน้าจอ - ใช้ cache เพื่อประสิทธิภาพ"""
-        current_time = time.time()
-
-        # ตรวจสอบ cache
-        if (
-            self.cached_scale_x is not None
-            and self.cached_scale_y is not None
-            and current_time - self.scale_cache_timestamp < self.scale_cache_timeout
-        ):
-            return self.cached_scale_x, self.cached_scale_y
-
-        # คำนวณใหม่ถ้า cache หมดอายุ
-        screen_size = self.settings.get("screen_size", "2560x1440")
-        screen_width, screen_height = map(int, screen_size.split("x"))
-        scale_x = self.root.winfo_screenwidth() / screen_width
-        scale_y = self.root.winfo_screenheight() / screen_height
-
-        # บันทึกใน cache
-        self.cached_scale_x = scale_x
-        self.cached_scale_y = scale_y
-        self.scale_cache_timestamp = current_time
-
-        return scale_x, scale_y
+        """scale factor จากหน้าจออ้างอิง (screen_size) ไปยังหน้าจอจริง - คำนวณไว้แล้วใน area_geometry"""
+        return self.area_geometry.scale()
 
     def scale_coordinates(self, x, y):
         """ปรับค่าพิกัดตาม scale ของหน้าจอ"""
@@ -6558,42 +6666,23 @@ class MagicBabelApp:
             self.logging_manager.log_error(f"Error capturing full screen: {e}")
             return None
 
-    def crop_area_from_full_screen(self, full_screen_image, area_config):
+    def crop_area_from_full_screen(self, full_screen_image, area):
         """
         ตัดพื้นที่ที่ต้องการจากภาพหน้าจอทั้งหมด
 
         Args:
             full_screen_image: PIL.Image ของหน้าจอทั้งหมด
-            area_config: dict ที่มี start_x, start_y, end_x, end_y
+            area: ชื่อพื้นที่ (A, B, C)
 
         Returns:
             PIL.Image: ภาพพื้นที่ที่ถูกตัด หรือ None ถ้าเกิดข้อผิดพลาด
         """
         try:
-            scale_x, scale_y = self.get_screen_scale()
-
-            # คำนวณพิกัดที่ scale แล้ว
-            x1 = int(min(area_config["start_x"], area_config["end_x"]) * scale_x)
-            y1 = int(min(area_config["start_y"], area_config["end_y"]) * scale_y)
-            x2 = int(max(area_config["start_x"], area_config["end_x"]) * scale_x)
-            y2 = int(max(area_config["start_y"], area_config["end_y"]) * scale_y)
-
-            # ตรวจสอบความถูกต้องของพิกัด
-            if x1 >= x2 or y1 >= y2:
+            cropped = self.area_geometry.crop(full_screen_image, area)
+            if cropped is None:
                 self.logging_manager.log_warning(
-                    f"Invalid crop area: ({x1},{y1},{x2},{y2})"
+                    f"Invalid crop area {area}: {self.area_geometry.area_rect(area)}"
                 )
-                return None
-
-            # ตรวจสอบว่าพิกัดไม่เกินขอบเขตของภาพ
-            img_width, img_height = full_screen_image.size
-            x1 = max(0, min(x1, img_width))
-            y1 = max(0, min(y1, img_height))
-            x2 = max(0, min(x2, img_width))
-            y2 = max(0, min(y2, img_height))
-
-            # ตัดภาพ
-            cropped = full_screen_image.crop((x1, y1, x2, y2))
             return cropped
 
         except Exception as e:
@@ -6610,33 +6699,18 @@ class MagicBabelApp:
         Returns:
             PIL.Image: ภาพพื้นที่ที่ถูกตัด หรือ None ถ้าเกิดข้อผิดพลาด
         """
-        translate_area = self.settings.get_translate_area(area_name)
-        if not translate_area:
-            return None
-
+        area_rect = self.area_geometry.area_rect(area_name)
         # ตรวจสอบพื้นที่ว่าง
-        if (
-            translate_area["start_x"] == translate_area["end_x"]
-            or translate_area["start_y"] == translate_area["end_y"]
-        ):
+        if area_rect is None or area_rect.is_empty:
             return None
 
         # ใช้ optimized full-screen capture
         full_screen = self.get_full_screen_capture()
         if full_screen is not None:
-            return self.crop_area_from_full_screen(full_screen, translate_area)
+            return self.crop_area_from_full_screen(full_screen, area_name)
         else:
             # Fallback to individual capture
-            scale_x, scale_y = self.get_screen_scale()
-            x1 = int(min(translate_area["start_x"], translate_area["end_x"]) * scale_x)
-            y1 = int(min(translate_area["start_y"], translate_area["end_y"]) * scale_y)
-            x2 = int(max(translate_area["start_x"], translate_area["end_x"]) * scale_x)
-            y2 = int(max(translate_area["start_y"], translate_area["end_y"]) * scale_y)
-
-            if x1 >= x2 or y1 >= y2:
-                return None
-
-            return ImageGrab.grab(bbox=(x1, y1, x2, y2))
+            return ImageGrab.grab(bbox=area_rect)
 
     def get_enhanced_image_signature(self, image):
         """
@@ -6729,9 +6803,7 @@ class MagicBabelApp:
         """
         Invalidate all capture caches - call when screen resolution changes or settings update
         """
-        self.cached_scale_x = None
-        self.cached_scale_y = None
-        self.scale_cache_timestamp = 0
+        self.area_geometry.notify_screen_changed()
         self.full_screen_capture_cache = None
         self.full_screen_capture_timestamp = 0
         self.logging_manager.log_info("Screen capture cache invalidated")
@@ -6763,12 +6835,9 @@ class MagicBabelApp:
             successful_crops = 0
 
             for area in test_areas:
-                translate_area = self.settings.get_translate_area(area)
-                if translate_area:
+                if self.area_geometry.area_rect(area):
                     start_time = time.time()
-                    cropped = self.crop_area_from_full_screen(
-                        full_screen, translate_area
-                    )
+                    cropped = self.crop_area_from_full_screen(full_screen, area)
                     crop_time = time.time() - start_time
                     total_crop_time += crop_time
 
@@ -6963,11 +7032,11 @@ class MagicBabelApp:
 
     def smart_ocr_config(self, is_potential_choice=False):
         """
-        กำหนดค่าคอนฟิกสำหรับ EasyOCR แบบไดนามิกตามประเภทของข้อความที่คาดการณ์
+        กำหนดค่าคอนฟิกสำหรับ OCR engine แบบไดนามิกตามประเภทของข้อความที่คาดการณ์
         Args:
             is_potential_choice (bool): True ถ้าคาดว่าพื้นที่นั้นอาจเป็นตัวเลือก (choice)
         Returns:
-            dict: Configuration dictionary สำหรับ EasyOCR
+            dict: kwargs สำหรับ OCREngine.read (ตัวเลือกเฉพาะ EasyOCR จะถูกข้ามโดย engine อื่น)
         """
         if is_potential_choice:
             # คอนฟิกสำหรับการตรวจจับตัวเลือก (choice detection) ต้องการข้อมูลตำแหน่ง (detail=1)
@@ -6975,7 +7044,6 @@ class MagicBabelApp:
             # text_threshold อาจจะต้องปรับค่าเพื่อให้จับข้อความตัวเลือกได้ดีที่สุด
             self.logging_manager.log_info("Using OCR config for potential choice area.")
             return {
-                "detail": 1,
                 "paragraph": False,
                 "width_ths": 0.7,  # จากแผน OCR_refactor_plan.md
                 "height_ths": 0.5,  # จากแผน OCR_refactor_plan.md
@@ -6990,7 +7058,6 @@ class MagicBabelApp:
                 f"Using general OCR config with confidence: {confidence}"
             )
             return {
-                "detail": 0,
                 "paragraph": True,
                 "min_size": 3,  # ค่าเดิมจาก MBB.py
                 "text_threshold": confidence,
@@ -7016,8 +7083,8 @@ class MagicBabelApp:
 
     def _group_into_lines_easyocr(self, ocr_results):
         """
-        จัดกลุ่มผลลัพธ์ EasyOCR ให้เป็นบรรทัดของข้อความ
-        Input: ocr_results = List of (bbox, text, confidence) จาก EasyOCR
+        จัดกลุ่มผลลัพธ์ OCR ให้เป็นบรรทัดของข้อความ
+        Input: ocr_results = List of OCRBox (bbox, text, confidence) จาก OCR engine ใดก็ได้
         Output: List of strings, โดยแต่ละ string คือข้อความที่รวมกันในหนึ่งบรรทัด
         """
         if not ocr_results:
@@ -7258,142 +7325,15 @@ class MagicBabelApp:
         Output: Tuple (is_choice (bool), header (str or None), choices (List[str] or empty list))
         """
         if not lines:
-            self.logging_manager.log_info("_detect_choice_format: No lines provided.")
             return False, None, []
 
-        # Patterns for choice headers - made slightly more flexible
-        # Allowing for potential OCR errors or variations.
-        choice_headers_patterns = [
-            r"^\s*what\s+will\s+you\s+say\s*\??\s*$",  # "What will you say?" with flexible spacing and optional ?
-            r"^\s*what\s+will\s+you\s+do\s*\??\s*$",  # "What will you do?"
-            r"^\s*select\s+an\s+option\s*:?\s*$",  # "Select an option"
-            r"^\s*choose\s+your\s+response\s*:?\s*$",  # "Choose your response"
-            # Thai patterns - if your OCR can detect Thai headers directly
-            r"^\s*คุณจะพูดว่าอย่างไร\s*\??\s*$",
-            r"^\s*คุณจะพูดอะไร\s*\??\s*$",
-        ]
-
-        header_line_index = -1
-        detected_header_text = None
-        max_header_lines_to_check = min(
-            2, len(lines)
-        )  # Check only the first 1 or 2 lines for a header
-
-        for i in range(max_header_lines_to_check):
-            line_text = lines[
-                i
-            ].strip()  # Ensure leading/trailing spaces are removed for matching
-            for pattern_idx, pattern in enumerate(choice_headers_patterns):
-                if re.match(pattern, line_text, re.IGNORECASE):
-                    detected_header_text = lines[
-                        i
-                    ]  # Use the original line text, not stripped, for header
-                    header_line_index = i
-                    self.logging_manager.log_info(
-                        f"_detect_choice_format: Found potential header '{detected_header_text.strip()}' at line {i} using pattern index {pattern_idx}."
-                    )
-                    break
-            if detected_header_text:
-                break
-
-        if detected_header_text is not None:
-            # Choices start from the line after the header
-            potential_choices_lines = lines[header_line_index + 1 :]
-            actual_choices = []
-
-            # Filter and clean choices
-            # A choice should not be another header, should have content,
-            # and should not be excessively long if it's just a short option.
-            for choice_line in potential_choices_lines:
-                stripped_choice = choice_line.strip()
-                if not stripped_choice:  # Skip empty lines
-                    continue
-
-                is_another_header = False
-                for (
-                    pattern
-                ) in (
-                    choice_headers_patterns
-                ):  # Check if this "choice" is actually another header
-                    if re.match(pattern, stripped_choice, re.IGNORECASE):
-                        is_another_header = True
-                        break
-                if is_another_header:
-                    logging.debug(
-                        f"_detect_choice_format: Line '{stripped_choice}' looks like another header, stopping choice collection here."
-                    )
-                    break  # Stop if we encounter another header
-
-                # Add more conditions if needed (e.g., length constraints, specific markers)
-                # For FFXIV, choices are usually distinct lines of text.
-                if len(stripped_choice) > 1:  # Must have some content
-                    # ตรวจสอบว่าบรรทัดนี้เป็นตัวเลือกที่ติดกันหลายตัวหรือไม่
-                    # เช่น "I suppose I ought to thank you both as well. You were never one to forsake a friend, Alphinaud. I'll be counting on you."
-
-                    # หากข้อความยาวมากและมีจุดคั่นหลายจุด อาจเป็นตัวเลือกที่ติดกัน
-                    if len(stripped_choice) > 80 and stripped_choice.count(".") >= 2:
-                        # ลองแยกตามจุด (.) ที่ตามด้วยช่องว่างและตัวอักษรใหญ่
-                        potential_splits = re.split(r"\.(\s+[A-Z])", stripped_choice)
-                        if len(potential_splits) >= 3:  # หากแยกได้อย่างน้อย 2 ส่วน
-                            # รวมกันใหม่เป็นประโยคแยก
-                            split_choices = []
-                            current_sentence = potential_splits[0].strip()
-
-                            for i in range(1, len(potential_splits), 2):
-                                if i + 1 < len(potential_splits):
-                                    if (
-                                        current_sentence
-                                        and not current_sentence.endswith(".")
-                                    ):
-                                        current_sentence += "."
-                                    split_choices.append(current_sentence)
-                                    current_sentence = potential_splits[i + 1].strip()
-
-                            # เพิ่มประโยคสุดท้าย
-                            if current_sentence:
-                                if current_sentence and not current_sentence.endswith(
-                                    "."
-                                ):
-                                    current_sentence += "."
-                                split_choices.append(current_sentence)
-
-                            # ตรวจสอบว่าผลลัพธ์สมเหตุสมผลหรือไม่
-                            if len(split_choices) >= 2 and len(split_choices) <= 4:
-                                self.logging_manager.log_info(
-                                    f"_detect_choice_format: Split long choice into {len(split_choices)} parts: {split_choices}"
-                                )
-                                actual_choices.extend(split_choices)
-                                continue
-
-                    # หากไม่ได้แยก ให้เพิ่มเป็นตัวเลือกเดียว
-                    actual_choices.append(
-                        stripped_choice
-                    )  # Keep original spacing within the choice line
-
-            if actual_choices:
-                # Heuristic: If we have a header and at least one plausible choice line.
-                # For FFXIV, usually 2-4 choices. If many more, it might be misinterpretation.
-                if (
-                    len(actual_choices) > 0 and len(actual_choices) <= 5
-                ):  # Accept 1 to 5 choices
-                    self.logging_manager.log_info(
-                        f"_detect_choice_format: Detected choice format. Header: '{detected_header_text.strip()}', Choices: {actual_choices}"
-                    )
-                    return True, detected_header_text.strip(), actual_choices
-                else:
-                    self.logging_manager.log_info(
-                        f"_detect_choice_format: Header found ('{detected_header_text.strip()}'), but number of choices ({len(actual_choices)}) is unusual. Treating as non-choice."
-                    )
-                    return False, None, []  # Treat as non-choice if choice count is off
-            else:
-                self.logging_manager.log_info(
-                    f"_detect_choice_format: Header-like string found ('{detected_header_text.strip()}'), but no valid choice lines followed."
-                )
-                return False, None, []  # No valid choices found after header
-
-        self.logging_manager.log_info(
-            "_detect_choice_format: No choice format detected based on headers."
-        )
+        result = parse_choice("\n".join(lines))
+        # For FFXIV, usually 2-4 choices. If many more, it might be misinterpretation.
+        if result.is_choice and 1 <= len(result.choices) <= 5:
+            self.logging_manager.log_info(
+                f"_detect_choice_format: Header: '{result.header}', Choices: {list(result.choices)}"
+            )
+            return True, result.header, list(result.choices)
         return False, None, []
 
     # detect_choice_with_layout() method ถูกลบออกแล้ว (ไม่ใช้ PaddleOCR)
@@ -7442,19 +7382,14 @@ class MagicBabelApp:
                 )
                 continue
 
-            translate_area = self.settings.get_translate_area(area)
-            if not translate_area:
+            area_rect = self.area_geometry.area_rect(area)
+            if area_rect is None:
                 self.logging_manager.log_warning(
                     f"No translate_area defined for area: {area}"
                 )
                 continue
 
-            start_x = translate_area["start_x"]
-            start_y = translate_area["start_y"]
-            end_x = translate_area["end_x"]
-            end_y = translate_area["end_y"]
-
-            if start_x == end_x or start_y == end_y:
+            if area_rect.is_empty:
                 self.logging_manager.log_warning(
                     f"Area {area} has zero size, skipping."
                 )
@@ -7471,7 +7406,7 @@ class MagicBabelApp:
             try:
                 # OPTIMIZATION: Use optimized full-screen capture and cropping
                 if full_screen is not None:
-                    img = self.crop_area_from_full_screen(full_screen, translate_area)
+                    img = self.crop_area_from_full_screen(full_screen, area)
                     if img is None:
                         self.logging_manager.log_warning(
                             f"Failed to crop area {area}, skipping."
@@ -7479,19 +7414,7 @@ class MagicBabelApp:
                         continue
                 else:
                     # Fallback to individual capture if full-screen failed
-                    scale_x, scale_y = self.get_screen_scale()
-                    x1 = int(min(start_x, end_x) * scale_x)
-                    y1 = int(min(start_y, end_y) * scale_y)
-                    x2 = int(max(start_x, end_x) * scale_x)
-                    y2 = int(max(start_y, end_y) * scale_y)
-
-                    if x1 >= x2 or y1 >= y2:
-                        self.logging_manager.log_warning(
-                            f"Invalid bbox for area {area}: ({x1},{y1},{x2},{y2}), skipping."
-                        )
-                        continue
-
-                    img = ImageGrab.grab(bbox=(x1, y1, x2, y2))
+                    img = ImageGrab.grab(bbox=area_rect)
 
                 signature = self.get_image_signature(img)
 
@@ -7525,6 +7448,22 @@ class MagicBabelApp:
                         )
 
                 if area_screen_changed:
+                    # ตรวจว่ามีตัวอักษรหรือไม่ก่อนเสียเวลา preprocess + OCR
+                    presence = self.text_presence.detect(img, key=area)
+                    self.translation_metrics.record_stage(
+                        "text_gate",
+                        presence.elapsed_ms,
+                        presence.reason if presence.has_text else "skipped",
+                    )
+                    if not presence.has_text:
+                        self.logging_manager.log_info(
+                            f"Area '{area}': no text detected by gate "
+                            f"({presence.elapsed_ms:.1f} ms), skipping OCR."
+                        )
+                        self.cache_ocr_result(area, str(signature), "")
+                        results.append((area, ""))
+                        continue
+
                     img_processed = self.preprocess_image(img)
 
                     timestamp_ms = int(time.time() * 1000)
@@ -7543,39 +7482,38 @@ class MagicBabelApp:
                             f"Area '{area}': OCRing with params: {ocr_params}"
                         )
 
-                        if self.reader is None:
+                        if self.ocr_engine is None:
                             self.logging_manager.log_warning(
                                 f"Area '{area}': OCR not available - skipping"
                             )
                             return ""
 
-                        ocr_output_list = self.reader.readtext(temp_path, **ocr_params)
+                        ocr_start = time.perf_counter()
+                        ocr_boxes = self.ocr_engine.read(temp_path, **ocr_params)
+                        ocr_ms = (time.perf_counter() - ocr_start) * 1000
 
                         text = ""
-                        if ocr_params["detail"] == 1:
+                        if is_potential_choice_area:
                             # สำหรับ choice areas ใช้ _group_into_lines_easyocr() เพื่อรักษาการแยกบรรทัด
-                            if is_potential_choice_area:
-                                # ใช้ _group_into_lines_easyocr() เพื่อจัดกลุ่มเป็นบรรทัด (รองรับ EasyOCR format)
-                                lines = self._group_into_lines_easyocr(ocr_output_list)
-                                text = "\n".join(lines) if lines else ""
-                                self.logging_manager.log_info(
-                                    f"Area '{area}' (choice area) grouped into {len(lines)} lines: {lines}"
-                                )
-                            else:
-                                # สำหรับ normal areas ใช้วิธีเดิม
-                                text = " ".join(
-                                    [item[1] for item in ocr_output_list if item[1]]
-                                )
-                                self.logging_manager.log_info(
-                                    f"Area '{area}' (normal area) OCR raw texts: {[item[1] for item in ocr_output_list]}"
-                                )
+                            lines = self._group_into_lines_easyocr(ocr_boxes)
+                            text = "\n".join(lines) if lines else ""
+                            self.logging_manager.log_info(
+                                f"Area '{area}' (choice area) grouped into {len(lines)} lines: {lines}"
+                            )
                         else:
-                            text = " ".join(ocr_output_list).strip()
+                            raw_texts = [box.text for box in ocr_boxes if box.text]
+                            text = " ".join(raw_texts).strip()
                             # แก้ไข log_debug เป็น log_info
                             self.logging_manager.log_info(
-                                f"Area '{area}' (detail=0) OCR raw texts: {ocr_output_list}"
+                                f"Area '{area}' (paragraph) OCR raw texts: {raw_texts}"
                             )
 
+                        self.translation_metrics.record_stage(
+                            "ocr", ocr_ms, "text" if text else "empty"
+                        )
+                        # ผล OCR จริงคือ label สำหรับเรียนรู้ gate จากเฟรมของเกมนี้
+                        self.text_presence.learn(presence.features, bool(text))
+
                         if text:
                             self.cache_ocr_result(area, str(signature), text)
                             results.append((area, text))
@@ -7694,33 +7632,20 @@ class MagicBabelApp:
 
         # ลูปทำ OCR ทั้ง 3 พื้นที่
         for area in ["A", "B", "C"]:
-            translate_area = self.settings.get_translate_area(area)
-            if not translate_area:
-                continue
-
-            start_x = translate_area["start_x"]
-            start_y = translate_area["start_y"]
-            end_x = translate_area["end_x"]
-            end_y = translate_area["end_y"]
-
+            area_rect = self.area_geometry.area_rect(area)
             # ตรวจสอบพื้นที่ว่าง
-            if start_x == end_x or start_y == end_y:
+            if area_rect is None or area_rect.is_empty:
                 continue
 
             try:
                 # OPTIMIZATION: Use optimized full-screen capture and cropping
                 if full_screen is not None:
-                    img = self.crop_area_from_full_screen(full_screen, translate_area)
+                    img = self.crop_area_from_full_screen(full_screen, area)
                     if img is None:
                         continue
                 else:
                     # Fallback to individual capture if full-screen failed
-                    scale_x, scale_y = self.get_screen_scale()
-                    x1 = int(min(start_x, end_x) * scale_x)
-                    y1 = int(min(start_y, end_y) * scale_y)
-                    x2 = int(max(start_x, end_x) * scale_x)
-                    y2 = int(max(start_y, end_y) * scale_y)
-                    img = ImageGrab.grab(bbox=(x1, y1, x2, y2))
+                    img = ImageGrab.grab(bbox=area_rect)
 
                 # สร้าง hash ของภาพอย่างง่าย
                 img_array = np.array(img)
@@ -7732,6 +7657,15 @@ class MagicBabelApp:
                     results[area] = cached_result
                     continue
 
+                presence = self.text_presence.detect(img, key=area)
+                self.translation_metrics.record_stage(
+                    "text_gate",
+                    presence.elapsed_ms,
+                    presence.reason if presence.has_text else "skipped",
+                )
+                if not presence.has_text:
+                    continue
+
                 # ทำ OCR
                 img = self.preprocess_image(img)
 
@@ -7743,22 +7677,19 @@ class MagicBabelApp:
 
                     # ปรับระดับความมั่นใจ OCR ตามความเร็ว
                     confidence = 0.6 if self.ocr_speed == "high" else 0.7
-                    if self.reader is None:
+                    if self.ocr_engine is None:
                         self.logging_manager.log_warning(
                             "OCR not available for text detection"
                         )
                         return ""
 
-                    result = self.reader.readtext(
+                    text = self.ocr_engine.read_text(
                         temp_path,
-                        detail=0,
                         paragraph=True,
                         min_size=3,
                         text_threshold=confidence,
                     )
 
-                    text = " ".join(result)
-
                     # เพิ่มผลลัพธ์ถ้ามีข้อความ
                     if text:
                         self.cache_ocr_result(area, img_hash, text)
@@ -7809,6 +7740,19 @@ class MagicBabelApp:
                 "Failed to capture full screen in check_for_background_dialogue, fallback to individual captures"
             )
 
+        # ตรวจหน้าตาของพื้นที่ก่อน: ตรง template ของ dialog/choice ก็ไม่ต้อง OCR
+        # และถ้า A/B ไม่เปลี่ยนตั้งแต่รอบก่อน ผลก็ยังเป็น "ไม่พบ" เหมือนเดิม
+        visual = self.visual_classifier.observe(
+            full_screen, "background", areas=("A", "B")
+        )
+        if visual.label in ("normal", "choice"):
+            self.logging_manager.log_info(
+                f"Visual pre-classifier found {visual.label} in background (score {visual.score:.2f})"
+            )
+            return visual.label
+        if not visual.changed:
+            return None
+
         # ทำ OCR พื้นที่ A และ B เพื่อตรวจสอบว่ามีข้อความสนทนาปกติหรือไม่
         background_texts = {}
 
@@ -7817,33 +7761,20 @@ class MagicBabelApp:
         priority_areas = ["B", "A"]
 
         for area in priority_areas:
-            translate_area = self.settings.get_translate_area(area)
-            if not translate_area:
-                continue
-
-            start_x = translate_area["start_x"]
-            start_y = translate_area["start_y"]
-            end_x = translate_area["end_x"]
-            end_y = translate_area["end_y"]
-
+            area_rect = self.area_geometry.area_rect(area)
             # ตรวจสอบพื้นที่ว่าง
-            if start_x == end_x or start_y == end_y:
+            if area_rect is None or area_rect.is_empty:
                 continue
 
             try:
                 # OPTIMIZATION: Use optimized full-screen capture and cropping
                 if full_screen is not None:
-                    img = self.crop_area_from_full_screen(full_screen, translate_area)
+                    img = self.crop_area_from_full_screen(full_screen, area)
                     if img is None:
                         continue
                 else:
                     # Fallback to individual capture if full-screen failed
-                    scale_x, scale_y = self.get_screen_scale()
-                    x1 = int(min(start_x, end_x) * scale_x)
-                    y1 = int(min(start_y, end_y) * scale_y)
-                    x2 = int(max(start_x, end_x) * scale_x)
-                    y2 = int(max(start_y, end_y) * scale_y)
-                    img = ImageGrab.grab(bbox=(x1, y1, x2, y2))
+                    img = ImageGrab.grab(bbox=area_rect)
 
                 # ทำ OCR แบบรวดเร็ว (ใช้ความเร็วสูง)
                 img = self.preprocess_image(img)
@@ -7853,21 +7784,18 @@ class MagicBabelApp:
                 try:
                     img.save(temp_path)
                     # ใช้ค่าความเชื่อมั่นต่ำลงและความเร็วสูงสำหรับการตรวจสอบเบื้องหลัง
-                    if self.reader is None:
+                    if self.ocr_engine is None:
                         self.logging_manager.log_warning(
                             "OCR not available for text detection"
                         )
                         return ""
 
-                    result = self.reader.readtext(
+                    text = self.ocr_engine.read_text(
                         temp_path,
-                        detail=0,
                         paragraph=True,
                         min_size=3,
                         text_threshold=0.5,  # ค่าต่ำกว่าปกติเพื่อให้ตรวจจับได้มากขึ้น
                     )
-
-                    text = " ".join(result)
                     if text:
                         background_texts[area] = text
 
@@ -7932,7 +7860,7 @@ class MagicBabelApp:
         return None  # ไม่พบรูปแบบข้อความที่ต้องการในพื้นหลัง
 
     def _is_choice_dialogue_quick_check(self, text):
-        """ตรวจสอบอย่างรวดเร็วว่าเป็น choice dialogue หรือไม่
+        """ตรวจสอบอย่างรวดเร็วว่าเป็น choice dialogue หรือไม่ (เฉพาะหน้าที่มี header)
         ใช้เฉพาะกับการตรวจสอบพื้นหลังเพื่อความรวดเร็ว
 
         Args:
@@ -7940,28 +7868,10 @@ class MagicBabelApp:
         Returns:
             bool: True ถ้าเป็น choice dialogue
         """
-        # ทำความสะอาดข้อความก่อนตรวจสอบ
-        cleaned_text = text.strip().lower()
-
-        # รูปแบบที่พบบ่อยในข้อความตัวเลือก - เน้นรูปแบบที่มักพบในเกม
-        choice_patterns = [
-            "what will you say?",
-            "what will you say",
-            "whatwill you say",
-            "what willyou say",
-            "what will yousay",
-            "whatwillyou say",
-        ]
-
-        # ตรวจสอบอย่างรวดเร็วเฉพาะรูปแบบหลักๆ
-        for pattern in choice_patterns:
-            if pattern in cleaned_text:
-                self._update_status_line(
-                    f"Quick check: Choice dialogue detected: {pattern}"
-                )
-                return True
-
-            return False
+        result = parse_choice(text or "")
+        if result.is_choice:
+            self._update_status_line(f"Quick check: Choice dialogue detected: {result.header}")
+        return result.is_choice
 
     def detect_dialogue_type_improved(self, texts):
         """วิเคราะห์ประเภทของข้อความจากผลลัพธ์ OCR ด้วยความแม่นยำสูงขึ้น
@@ -7972,116 +7882,12 @@ class MagicBabelApp:
         Returns:
             str: ประเภทข้อความ ("normal", "narrator", "choice" ฯลฯ)
         """
-        # ถ้าไม่มีข้อความ
-        if not texts:
-            return "unknown"
-
-        # 1. ตรวจสอบบทสนทนาปกติ (normal dialogue) - มีทั้งชื่อและข้อความ (ให้ priority สูงสุด)
-        if "A" in texts and "B" in texts and texts["A"] and texts["B"]:
-            name_text = texts["A"].strip()
-            dialogue_text = texts["B"].strip()
-
-            # ชื่อตัวละครมักสั้น (ไม่เกิน 25 ตัวอักษร) และไม่ใช่ตัวเลขหรือเครื่องหมาย
-            if (
-                name_text
-                and len(name_text) < 25
-                and any(c.isalpha() for c in name_text)
-            ):
-                # ตรวจสอบว่าชื่อมีความยาวมากกว่า 1 ตัวอักษร
-                if len(name_text) > 1:
-                    # ตรวจสอบเพิ่มเติมว่าข้อความใน B มีลักษณะของบทสนทนา
-                    if len(dialogue_text) > 3:  # ข้อความต้องมีความยาวพอสมควร
-                        self.logging_manager.log_info(
-                            f"Detected normal dialogue (A+B): '{name_text}: {dialogue_text[:30]}...'"
-                        )
-                        return "normal"
-
-        # 2. ตรวจสอบ choice dialogue (ตัวเลือก) - ต้องตรวจสอบหลังจากบทสนทนาปกติ
-        if "B" in texts and texts["B"]:
-            if self.is_choice_dialogue(texts["B"]):
-                self.logging_manager.log_info("Detected choice dialogue in area B")
-                return "choice"
-
-        # 3. ตรวจสอบกรณีพิเศษ - มีเฉพาะข้อความในพื้นที่ B
-        if "B" in texts and texts["B"] and (not "A" in texts or not texts["A"]):
-            b_text = texts["B"]
-
-            # ตรวจสอบว่ามีชื่อคนพูดในข้อความหรือไม่
-            speaker, content, _ = self.text_corrector.split_speaker_and_content(b_text)
-            if speaker:
-                self.logging_manager.log_info(
-                    f"Detected dialogue with speaker in text: '{speaker}'"
-                )
-                return "speaker_in_text"
-            else:
-                # กรณีพิเศษ - อาจเป็นบทสนทนาต่อเนื่องจากคนเดิม
-                # ตรวจสอบว่าข้อความมีลักษณะของบทสนทนาหรือไม่
-                if ('"' in b_text or "'" in b_text) and len(b_text) > 5:
-                    self.logging_manager.log_info(
-                        f"Detected dialogue without name: '{b_text[:30]}...'"
-                    )
-                    return "dialog_without_name"
-
-        # 4. ตรวจสอบบทบรรยาย (narrator text) ในพื้นที่ C
-        # ต้องตรวจสอบเป็นอันดับสุดท้าย เพื่อลดความผิดพลาดในการตรวจจับ
-        if "C" in texts and texts["C"]:
-            narrator_text = texts["C"]
-            # ถ้าข้อความไม่มีชื่อคน และมีความยาวพอสมควร น่าจะเป็นบทบรรยาย
-            speaker, content, _ = self.text_corrector.split_speaker_and_content(
-                narrator_text
-            )
-
-            # ต้องเป็นข้อความที่ยาวพอสมควร และไม่มีชื่อนำหน้า
-            if not speaker and len(narrator_text) > 20:  # เพิ่มความยาวขั้นต่ำจาก 15 เป็น 20
-                # เพิ่มการตรวจสอบลักษณะของบทบรรยาย
-                # บทบรรยายมักไม่มีเครื่องหมายคำพูดในช่วงต้น และมักมีคำบรรยาย
-                if '"' not in narrator_text[:15] and "'" not in narrator_text[:15]:
-                    # ตรวจสอบคำที่พบบ่อยในบทบรรยาย
-                    narrator_words = [
-                        "the",
-                        "a",
-                        "an",
-                        "there",
-                        "it",
-                        "they",
-                        "you",
-                        "your",
-                        "this",
-                        "that",
-                        "he",
-                        "she",
-                        "his",
-                        "her",
-                        "their",
-                        "its",
-                        "our",
-                        "we",
-                        "I",
-                        "my",
-                        "me",
-                        "when",
-                        "as",
-                        "if",
-                        "then",
-                        "while",
-                        "after",
-                        "before",
-                    ]
-                    word_count = sum(
-                        1
-                        for word in narrator_words
-                        if f" {word} " in f" {narrator_text.lower()} "
-                    )
-
-                    # ต้องมีคำบรรยายอย่างน้อย 2 คำ (เพิ่มความเข้มงวด)
-                    if word_count >= 2:
-                        self.logging_manager.log_info(
-                            f"Detected narrator text in area C: '{narrator_text[:30]}...'"
-                        )
-                        return "narrator"
-
-        # 5. กรณีที่ไม่สามารถระบุได้
-        return "unknown"
+        dialogue_type = classify_areas(
+            texts, lambda text: self.text_corrector.parse_line(text).speaker
+        )
+        if dialogue_type != "unknown":
+            self.logging_manager.log_info(f"Detected dialogue type: {dialogue_type}")
+        return dialogue_type
 
     def smart_switch_area(self):
         """
@@ -8168,19 +7974,37 @@ class MagicBabelApp:
                 if switched:
                     self._last_auto_switch_time = time.time()  # บันทึกเวลา auto switch
                     self.force_next_translation = True  # บังคับแปลหลังสลับ
+                    self.visual_classifier.reset()
                     return True
                 else:
                     return False  # ถ้า switch_area ไม่ทำงาน
 
-        # 6. ทำ OCR ทุกพื้นที่เพื่อวิเคราะห์ประเภท
-        all_texts = self.capture_and_ocr_all_areas()
-        if not all_texts:
-            logging.debug("Smart Switch: No text detected.")
-            return False
-
-        # 7. วิเคราะห์ประเภทข้อความ
-        dialogue_type = self.detect_dialogue_type_improved(all_texts)
-        logging.info(f"Detected dialogue type: {dialogue_type}")
+        # 6. ตรวจหน้าตาของพื้นที่ก่อน - OCR เฉพาะเมื่อภาพเปลี่ยนและ template ไม่ชัดเจน
+        visual = self.visual_classifier.observe(
+            self.get_full_screen_capture(), "switch"
+        )
+        if not visual.changed and self._last_auto_switch_type is not None:
+            dialogue_type = self._last_auto_switch_type
+            logging.debug(
+                f"Smart Switch: screen unchanged ({visual.elapsed_ms:.1f}ms), reusing '{dialogue_type}'"
+            )
+            if dialogue_type == "unknown":
+                return False
+        elif visual.label is not None:
+            dialogue_type = visual.label
+            logging.info(
+                f"Visual pre-classifier: {dialogue_type} (P{visual.preset}, score {visual.score:.2f}, {visual.elapsed_ms:.1f}ms)"
+            )
+        else:
+            # 7. ทำ OCR ทุกพื้นที่แล้ววิเคราะห์ประเภทข้อความ
+            all_texts = self.capture_and_ocr_all_areas()
+            if not all_texts:
+                self._last_auto_switch_type = "unknown"
+                logging.debug("Smart Switch: No text detected.")
+                return False
+            dialogue_type = self.detect_dialogue_type_improved(all_texts)
+            logging.info(f"Detected dialogue type: {dialogue_type}")
+        self._last_auto_switch_type = dialogue_type
 
         # 8. ตรวจสอบความเสถียร
         self.update_detection_history(dialogue_type)
@@ -8237,170 +8061,49 @@ class MagicBabelApp:
             )
             if switched:
                 self._last_auto_switch_time = time.time()  # บันทึกเวลา auto switch
+                self.visual_classifier.reset()
                 return True
             else:
                 return False  # ถ้า switch_area ไม่ทำงาน
 
         return False  # ถ้าไม่เข้าเงื่อนไขใดๆ
 
-    def is_choice_dialogue(self, text):
-        """ตรวจสอบว่าเป็น choice dialogue หรือไม่ - Enhanced version for FFXIV"""
-        # ทำความสะอาดข้อความก่อนตรวจสอบ
-        cleaned_text = text.strip().lower()
-
-        # เพิ่มการตรวจสอบแบบ fuzzy matching
-        cleaned_text_no_space = cleaned_text.replace(" ", "")
-
-        # Log ข้อความที่กำลังตรวจสอบ
-        self.logging_manager.log_info(f"Checking for choice dialogue: '{text[:50]}...'")
-        self.logging_manager.log_info(f"Cleaned text: '{cleaned_text[:50]}...'")
-
-        # Enhanced patterns for FFXIV choice dialogues
-        choice_patterns = [
-            # Standard FFXIV patterns
-            "what will you say?",
-            "what will you say",
-            "whatwill you say?",
-            "what willyou say?",
-            "what will yousay?",
-            "whatwillyou say?",
-            "whatwillyousay?",
-            # Additional common choice headers
-            "choose your response",
-            "select an option",
-            "pick your answer",
-            "what do you say",
-            "how will you respond",
-            "your response:",
-            "your answer:",
-        ]
-
-        # ตรวจสอบแบบ exact match ก่อน
-        for pattern in choice_patterns:
-            # ตรวจสอบคำขึ้นต้น
-            if cleaned_text.startswith(pattern):
-                self._update_status_line(
-                    f"Choice dialogue detected (exact match): {pattern}"
-                )
-                self.logging_manager.log_info(
-                    f"Choice detected - exact match: {pattern}"
-                )
-                return True
-
-            # ตรวจสอบในส่วนต้นของข้อความ (ภายใน 50 ตัวอักษรแรก - เพิ่มจาก 30)
-            if pattern in cleaned_text[:50]:
-                self._update_status_line(
-                    f"Choice dialogue detected near beginning: {pattern}"
-                )
-                self.logging_manager.log_info(
-                    f"Choice detected - near beginning: {pattern}"
-                )
-                return True
-
-        # ตรวจสอบแบบ fuzzy matching สำหรับกรณี OCR อาจผิดพลาด
-        if "whatwillyousay" in cleaned_text_no_space[:50]:
-            self._update_status_line(
-                "Choice dialogue detected (fuzzy match without spaces)"
-            )
-            self.logging_manager.log_info(
-                "Choice detected - fuzzy match without spaces"
-            )
-            return True
-
-        # เพิ่มการตรวจสอบแบบมีช่องว่างผิดที่
-
-        # ตรวจจับ OCR errors ที่พบบ่อย
-        ocr_error_patterns = [
-            r"what\s*wil+\s*you\s*say",  # "what will you say" พร้อม OCR errors
-            r"contestisn'?t\s*over\s*yet",  # "contest isn't over yet" รวมกัน
-            r"won'?tlet",  # "won't let" รวมกัน
-            r"take\s*back\s*what\s*was\s*stolen",  # รูปแบบ choice ที่พบใน logs
-        ]
-
-        for pattern in ocr_error_patterns:
-            if re.search(pattern, cleaned_text, re.IGNORECASE):
-                self._update_status_line(
-                    f"Choice dialogue detected (OCR error pattern): {pattern}"
-                )
-                self.logging_manager.log_info(
-                    f"Choice detected - OCR error pattern: {pattern}"
-                )
-                return True
+    def find_appropriate_preset(self, dialogue_type):
+        """preset แรกที่ role ตรงกับประเภทข้อความ - None ถ้าไม่มี"""
+        role = {
+            "normal": "dialog",
+            "speaker_in_text": "dialog",
+            "dialog_without_name": "dialog",
+            "choice": "choice",
+            "narrator": "lore",
+        }.get(dialogue_type)
+        if role is None:
+            return None
+        for preset_num in range(1, len(self.settings.get("area_presets", [])) + 1):
+            if self.settings.get_preset_role(preset_num) == role:
+                return preset_num
+        return None
 
-        # ตรวจสอบการมีอยู่ของคำสำคัญที่บ่งบอกถึง choice dialogue หลายคำในประโยคเดียว
-        choice_keywords = ["contest", "take back", "stolen", "won't let", "get away"]
-        keyword_count = sum(1 for keyword in choice_keywords if keyword in cleaned_text)
+    def _learn_visual_template(self, preset_num):
+        """เรียนรู้ template ของ preset ที่ผู้ใช้เลือกเอง (ถ้ายังใช้ preset นั้นอยู่)"""
+        if not self.settings.get("enable_auto_area_switch", False):
+            return
+        if self.settings.get("current_preset") != preset_num:
+            return
+        try:
+            self.visual_classifier.learn(self.get_full_screen_capture(), preset_num)
+        except Exception as e:
+            self.logging_manager.log_warning(f"Could not learn visual template: {e}")
 
-        if keyword_count >= 3:  # ถ้าพบคำสำคัญ 3 คำขึ้นไป น่าจะเป็น choice
-            self._update_status_line(
-                f"Choice dialogue detected (multiple keywords): {keyword_count} matches"
-            )
+    def is_choice_dialogue(self, text):
+        """ตรวจสอบว่าเป็น choice dialogue หรือไม่ (กฎทั้งหมดอยู่ใน dialogue_classifier)"""
+        result = classify_choice(text or "")
+        if result.is_choice:
+            self._update_status_line(f"Choice dialogue detected ({result.reason})")
             self.logging_manager.log_info(
-                f"Choice detected - multiple keywords: {keyword_count} matches"
+                f"Choice detected - {result.reason}: '{text[:50]}...'"
             )
-            return True
-        # ลบช่องว่างที่ซ้ำกันและทำให้เป็นช่องว่างเดียว
-        normalized_text = re.sub(r"\s+", " ", cleaned_text)
-        if "what will you say" in normalized_text[:50]:
-            self._update_status_line("Choice dialogue detected (normalized spaces)")
-            self.logging_manager.log_info("Choice detected - normalized spaces")
-            return True
-
-        # ตรวจสอบแบบมีตัวอักษรแทรกระหว่างคำ (OCR error)
-        fuzzy_pattern = re.sub(r"\s+", r".{0,2}", "what will you say")
-        if re.search(fuzzy_pattern, cleaned_text[:50]):
-            self._update_status_line("Choice dialogue detected (fuzzy regex)")
-            self.logging_manager.log_info("Choice detected - fuzzy regex")
-            return True
-
-        # Enhanced detection for numbered/bulleted choices without headers
-        lines = text.strip().split('\n')
-        if 2 <= len(lines) <= 5:  # Typical choice count
-            numbered_pattern = r'^[1-9][.)]\s*'
-            bulleted_pattern = r'^[►▶•◆▪▫⚫⚪→]\s*'
-            
-            numbered_count = 0
-            bulleted_count = 0
-            
-            for line in lines:
-                line_stripped = line.strip()
-                if re.match(numbered_pattern, line_stripped):
-                    numbered_count += 1
-                elif re.match(bulleted_pattern, line_stripped):
-                    bulleted_count += 1
-            
-            # If most lines are numbered or bulleted, it's likely a choice
-            if numbered_count >= 2 or bulleted_count >= 2:
-                self._update_status_line(
-                    f"Choice dialogue detected (numbered/bulleted format): {numbered_count} numbered, {bulleted_count} bulleted"
-                )
-                self.logging_manager.log_info(
-                    f"Choice detected - numbered/bulleted format: {numbered_count} numbered, {bulleted_count} bulleted lines"
-                )
-                return True
-            
-            # Additional heuristic: if all lines are short and similar length
-            if all(10 <= len(line.strip()) <= 60 for line in lines):
-                line_lengths = [len(line.strip()) for line in lines]
-                avg_length = sum(line_lengths) / len(line_lengths)
-                length_variance = sum((l - avg_length) ** 2 for l in line_lengths) / len(line_lengths)
-                
-                # Low variance in line lengths often indicates choices
-                if length_variance < 200:  # Threshold for similarity
-                    self._update_status_line(
-                        f"Choice dialogue detected (uniform short lines): {len(lines)} lines, avg length {avg_length:.1f}"
-                    )
-                    self.logging_manager.log_info(
-                        f"Choice detected - uniform short lines: {len(lines)} lines, avg length {avg_length:.1f}, variance {length_variance:.1f}"
-                    )
-                    return True
-
-        # Log เมื่อไม่พบ choice
-        self.logging_manager.log_info(
-            f"No choice pattern found in: '{cleaned_text[:50]}...'"
-        )
-
-        return False
+        return result.is_choice
 
     def toggle_translation(self):
         try:
@@ -9044,16 +8747,17 @@ class MagicBabelApp:
                         f"Speaker frequency update: '{clean_name}' = {self.speaker_frequency[clean_name]} times"
                     )
 
-    def _guess_speaker_from_context(self, message_part):
+    def _guess_speaker_from_context(self, parsed_message):
         """
         พยายามเดาผู้พูดจาก context และ cache อย่างฉลาด
 
         Args:
-            message_part: ข้อความบทสนทนา
+            parsed_message: ParsedLine ของข้อความบทสนทนา (จาก text_corrector.parse_line)
 
         Returns:
             str หรือ None: ชื่อที่เดาได้หรือ None
         """
+        message_part = parsed_message.content
 
         # 1. ถ้ามีผู้พูดล่าสุดเพียงคนเดียว น่าจะเป็นคนเดิม
         if len(self.recent_speakers_cache) == 1:
@@ -9245,6 +8949,7 @@ class MagicBabelApp:
 
         self._logged_skipping_translation = False
         self._logged_waiting_for_click = False
+        self.text_stabilizer.reset()
 
         dialogue_type_enum_available = "DialogueType" in globals() and isinstance(
             DialogueType, type(Enum)
@@ -9737,6 +9442,31 @@ class MagicBabelApp:
                     f"Normalized last OCR text for similarity: '{normalized_last[:100]}...'"
                 )
 
+                # ข้อความที่กำลังพิมพ์ (typing animation) ยังไม่ส่งแปลจนกว่าจะครบหรือหยุดพิมพ์
+                if (
+                    choice_text_override is None
+                    and not was_structurally_detected_as_choice
+                    and not self.force_next_translation
+                ):
+                    stabilizer_decision = self.text_stabilizer.observe(
+                        normalized_current,
+                        ink=self.text_presence.ink(
+                            [area_ocr for area_ocr, _ in results_from_capture_ocr]
+                        ),
+                    )
+                    if stabilizer_decision.reason != REASON_RELEASED:
+                        self.translation_metrics.record_stage(
+                            "stabilizer",
+                            stabilizer_decision.held_ms,
+                            stabilizer_decision.reason,
+                        )
+                    if not stabilizer_decision.release:
+                        self.logging_manager.log_info(
+                            f"Text still being revealed, waiting: '{normalized_current[:50]}...'"
+                        )
+                        is_processing = False
+                        continue
+
                 if (
                     normalized_current == normalized_last
                     and not self.force_next_translation
@@ -10055,10 +9785,12 @@ class MagicBabelApp:
                                 f"'dialog' preset (A/B pairing): found_A={found_name_dialog} (Name: '{name_part_dialog}'), found_B={found_message_dialog} (Msg: '{message_part_dialog[:50]}...')"
                             )
                             if found_name_dialog and found_message_dialog:
-                                speaker_in_B, content_in_B, _ = (
-                                    self.text_corrector.split_speaker_and_content(
-                                        message_part_dialog
-                                    )
+                                parsed_line = self.text_corrector.parse_line(
+                                    message_part_dialog
+                                )
+                                speaker_in_B, content_in_B = (
+                                    parsed_line.speaker,
+                                    parsed_line.content,
                                 )
                                 if speaker_in_B:
                                     combined_text = f"{speaker_in_B}: {content_in_B}"
@@ -10136,10 +9868,12 @@ class MagicBabelApp:
                                     )
                                 else:
                                     # Process normally
-                                    speaker_in_B, content_in_B, _ = (
-                                        self.text_corrector.split_speaker_and_content(
-                                            message_part_dialog
-                                        )
+                                    parsed_line = self.text_corrector.parse_line(
+                                        message_part_dialog
+                                    )
+                                    speaker_in_B, content_in_B = (
+                                        parsed_line.speaker,
+                                        parsed_line.content,
                                     )
                                     if speaker_in_B:
                                         combined_text = f"{speaker_in_B}: {content_in_B}"
@@ -10228,10 +9962,12 @@ class MagicBabelApp:
                             combined_text = f"{name_part_custom}: {message_part_custom}"
                             final_dialogue_type = dt_normal
                         elif message_part_custom:
-                            speaker, content, _ = (
-                                self.text_corrector.split_speaker_and_content(
-                                    message_part_custom
-                                )
+                            parsed_line = self.text_corrector.parse_line(
+                                message_part_custom
+                            )
+                            speaker, content = (
+                                parsed_line.speaker,
+                                parsed_line.content,
                             )
                             if speaker:
                                 combined_text = f"{speaker}: {content}"
@@ -10355,6 +10091,8 @@ class MagicBabelApp:
                                 f"Translating: {combined_text[:30]}..."
                             )
                             translated_text_raw = ""
+                            source_line = None
+                            fanout_timed_out = 0
                             try:
                                 self.logging_manager.log_info(
                                     f"Sending to translator (Role: {current_preset_role}, Type: {final_dialogue_type}): '{combined_text[:70]}...'"
@@ -10372,6 +10110,13 @@ class MagicBabelApp:
                                     current_preset_role_for_check == "lore"
                                 )
 
+                                # force translate ต้องได้คำแปลใหม่จาก API ไม่ใช่จาก translation memory
+                                translation_memory = getattr(
+                                    self.translator, "translation_memory", None
+                                )
+                                if self.force_next_translation and translation_memory:
+                                    translation_memory.discard(combined_text)
+
                                 # ใช้ translate_choice() เมื่อตรวจจับเป็น choice dialogue
                                 if effective_was_detected_as_choice:
                                     self.logging_manager.log_info(
@@ -10381,11 +10126,48 @@ class MagicBabelApp:
                                         self.translator.translate_choice(combined_text)
                                     )
                                 else:
-                                    # <<-- แก้ไขบรรทัดนี้
-                                    translated_text_raw = self.translator.translate(
+                                    # parse ชื่อผู้พูดครั้งเดียว - translator ได้ผลเดียวกันจาก memo
+                                    # และ UI ใช้ตัดสินว่ามีชื่อผู้พูดหรือไม่
+                                    if not is_lore_preset_active:
+                                        source_line = self.text_corrector.parse_line(
+                                            combined_text
+                                        )
+                                    # หลายส่วนที่ไม่ขึ้นต่อกัน (หลายย่อหน้า / หลายผู้พูด) แปลพร้อมกัน
+                                    segments = split_independent_segments(
                                         combined_text,
                                         is_lore_text=is_lore_preset_active,
+                                        speaker_of=lambda line: self.text_corrector.parse_line(
+                                            line
+                                        ).speaker,
                                     )
+                                    if len(segments) > 1:
+                                        if self.force_next_translation and translation_memory:
+                                            # แต่ละส่วนถูกเก็บใน memory แยกกัน - ลบทุกส่วนด้วย
+                                            for segment, _ in segments:
+                                                translation_memory.discard(segment)
+                                        fanout_result = get_segment_fanout().translate(
+                                            segments,
+                                            lambda segment: self.translator.translate(
+                                                segment,
+                                                is_lore_text=is_lore_preset_active,
+                                            ),
+                                        )
+                                        translated_text_raw = fanout_result.text
+                                        # ส่วนที่หมดเวลาหรือแปลไม่สำเร็จแสดงต้นฉบับไว้ - ต้องแปลซ้ำรอบถัดไป
+                                        fanout_timed_out = (
+                                            fanout_result.timed_out + fanout_result.failed
+                                        )
+                                        self.translation_metrics.record_stage(
+                                            "fanout",
+                                            fanout_result.elapsed_ms,
+                                            "partial" if fanout_timed_out else "complete",
+                                        )
+                                    else:
+                                        # <<-- แก้ไขบรรทัดนี้
+                                        translated_text_raw = self.translator.translate(
+                                            combined_text,
+                                            is_lore_text=is_lore_preset_active,
+                                        )
                             except Exception as translate_error:
                                 self.logging_manager.log_error(
                                     f"Error during translation call: {translate_error}"
@@ -10811,8 +10593,10 @@ class MagicBabelApp:
                                     self.root.after(
                                         0,
                                         # <<-- แก้ไข lambda ในบรรทัดนี้
-                                        lambda txt=final_text_for_ui: self.translated_ui.update_text(
-                                            txt, is_lore_text=is_lore_preset_active
+                                        lambda txt=final_text_for_ui, line=source_line: self.translated_ui.update_text(
+                                            txt,
+                                            is_lore_text=is_lore_preset_active,
+                                            source_line=line,
                                         ),
                                     )
                                     if (
@@ -10832,6 +10616,10 @@ class MagicBabelApp:
                                     self.logging_manager.log_info(
                                         f"UI Updated. last_text set to: '{self.last_text[:70]}...'"
                                     )
+                                    if fanout_timed_out:
+                                        # บางส่วนยังแปลไม่เสร็จตอน deadline หรือล้มเหลว - รอบถัดไปแปลซ้ำ
+                                        # (ส่วนที่เสร็จแล้วมาจาก memory, ส่วนที่ค้างรอ request เดิม)
+                                        self.last_text = ""
                                     if self.force_next_translation:
                                         self.logging_manager.log_info(
                                             "Resetting force_next_translation after successful forced translation."
@@ -10922,9 +10710,7 @@ class MagicBabelApp:
                 return False
 
             # วิธีที่ 1: ใช้ text_corrector (สำหรับชื่อที่รู้จัก)
-            speaker, content, dialogue_type = (
-                self.text_corrector.split_speaker_and_content(text)
-            )
+            speaker = self.text_corrector.parse_line(text).speaker
             if speaker is not None and len(speaker.strip()) > 0:
                 self.logging_manager.log_info(
                     f"Speaker detected by text_corrector: '{speaker}'"
@@ -11082,10 +10868,9 @@ class MagicBabelApp:
                     )
                 )
 
-            # ตรวจสอบว่าข้อความมีชื่อนำหน้าอยู่แล้วหรือไม่
-            speaker, content, dialogue_type = (
-                self.text_corrector.split_speaker_and_content(message_part)
-            )
+            # ตรวจสอบว่าข้อความมีชื่อนำหน้าอยู่แล้วหรือไม่ (parse ครั้งเดียว ใช้ต่อถึง translator และ UI)
+            parsed_message = self.text_corrector.parse_line(message_part)
+            speaker, content = parsed_message.speaker, parsed_message.content
 
             # กำหนดค่า threshold ใหม่ที่ต่ำลง
             QUALITY_THRESHOLD = 0.2  # ลดจาก 0.3 เป็น 0.2
@@ -11160,7 +10945,7 @@ class MagicBabelApp:
 
                 # 5.3 ลองเดาจาก context
                 elif not combined_text:
-                    guessed_speaker = self._guess_speaker_from_context(message_part)
+                    guessed_speaker = self._guess_speaker_from_context(parsed_message)
                     if guessed_speaker:
                         combined_text = f"{guessed_speaker}: {message_part}"
                         self.logging_manager.log_info(
@@ -11181,13 +10966,17 @@ class MagicBabelApp:
             self.translation_metrics.record_translation(combined_text, method_used)
 
             # แปลข้อความ
+            source_line = self.text_corrector.parse_line(combined_text)
             self._update_status_line(f"กำลังแปล (A+B): {combined_text[:50]}...")
             translated_text = self.translator.translate(combined_text)
 
             # แสดงผลการแปล
             if translated_text and translated_text != self.last_translation:
                 self.root.after(
-                    0, lambda: self.translated_ui.update_text(translated_text)
+                    0,
+                    lambda: self.translated_ui.update_text(
+                        translated_text, source_line=source_line
+                    ),
                 )
                 self.last_translation = translated_text
                 self.last_text = combined_text
@@ -11424,10 +11213,8 @@ class MagicBabelApp:
         # ถ้ามีความแตกต่างระหว่างข้อความก่อนและหลัง force translate
         if pre_text != post_text and pre_text and post_text:
             # สกัดชื่อจากข้อความก่อนและหลัง force translate
-            pre_speaker, _, _ = self.text_corrector.split_speaker_and_content(pre_text)
-            post_speaker, _, _ = self.text_corrector.split_speaker_and_content(
-                post_text
-            )
+            pre_speaker = self.text_corrector.parse_line(pre_text).speaker
+            post_speaker = self.text_corrector.parse_line(post_text).speaker
 
             # ถ้ามีการเปลี่ยนแปลงชื่อ
             if pre_speaker != post_speaker and pre_speaker and post_speaker:
@@ -12128,6 +11915,7 @@ class MagicBabelApp:
                 self.settings, "save_settings"
             ):  # settings.json หลัก
                 self.settings.save_settings()
+                self.settings.flush()
                 self.logging_manager.log_info("MBB.py: Main settings.json saved.")
 
         except Exception as e:
@@ -576,6 +576,30 @@ class AdvanceUI:
         )
         gpu_check.pack(side="right", padx=5)
 
+        # Fast CPU toggle (int8 recognizer - ดูรายงานความแม่นยำได้จาก ocr_fast_cpu.py)
+        fast_cpu_frame = tk.Frame(section_frame, bg=self.theme.get_color("bg_secondary"))
+        fast_cpu_frame.pack(fill="x", padx=10, pady=(0, 10))
+
+        tk.Label(
+            fast_cpu_frame,
+            text="Fast CPU OCR (int8):",
+            bg=self.theme.get_color("bg_secondary"),
+            fg=self.theme.get_color("text_primary"),
+            font=self.theme.get_font("normal"),
+        ).pack(side="left")
+
+        self.fast_cpu_var = tk.BooleanVar()
+        fast_cpu_check = tk.Checkbutton(
+            fast_cpu_frame,
+            variable=self.fast_cpu_var,
+            bg=self.theme.get_color("bg_secondary"),
+            fg=self.theme.get_color("text_primary"),
+            selectcolor=self.theme.get_color("bg_tertiary"),
+            activebackground=self.theme.get_color("bg_secondary"),
+            command=self.on_change,
+        )
+        fast_cpu_check.pack(side="right", padx=5)
+
     def create_bottom_buttons(self, parent):
         """สร้างปุ่มด้านล่าง"""
         button_frame = tk.Frame(parent, bg=self.theme.get_color("bg_primary"))
@@ -649,6 +673,7 @@ class AdvanceUI:
 
         # GPU setting
         self.gpu_var.set(self.settings.get("use_gpu_for_ocr", False))
+        self.fast_cpu_var.set(self.settings.get("ocr_fast_cpu_mode", False))
 
         # CPU Limit setting
         cpu_limit = self.settings.get("cpu_limit", 100)
@@ -864,6 +889,7 @@ class AdvanceUI:
 
             # Save GPU setting
             self.settings.set_gpu_for_ocr(self.gpu_var.get())
+            self.settings.set("ocr_fast_cpu_mode", self.fast_cpu_var.get())
 
             # Apply settings through callback
             if self.apply_settings_callback:
@@ -871,6 +897,7 @@ class AdvanceUI:
                     "screen_size": screen_size,
                     "display_scale": user_scale,
                     "use_gpu_for_ocr": self.gpu_var.get(),
+                    "ocr_fast_cpu_mode": self.fast_cpu_var.get(),
                     "cpu_limit": cpu_limit_value,
                 }
                 self.apply_settings_callback(advance_settings)
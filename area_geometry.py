@@ -0,0 +1,243 @@
+"""
+Area geometry: แปลงพิกัดพื้นที่แปล (translate_areas) และพิกัดของทุก preset จาก settings
+ซึ่งเก็บเป็นพิกัดของหน้าจออ้างอิง (screen_size) ให้เป็นสี่เหลี่ยมในหน่วยพิกเซลจริงของหน้าจอครั้งเดียว
+
+การ crop ภาพใน capture_and_ocr, hit-test ของ hover และการวาดกรอบพื้นที่ ใช้โครงสร้างเดียวกันนี้
+คำนวณใหม่เฉพาะเมื่อ settings ของพื้นที่/preset/screen_size เปลี่ยน หรือขนาดหน้าจอจริงเปลี่ยน
+(เปลี่ยนความละเอียด, DPI หรือย้ายไปจออื่น)
+"""
+
+import logging
+import threading
+import time
+from collections import namedtuple
+from types import MappingProxyType
+
+DEFAULT_REFERENCE_SIZE = "2560x1440"
+
+# settings key ที่มีผลต่อพิกัด (None = ไม่ทราบว่า key ไหนเปลี่ยน)
+GEOMETRY_KEYS = frozenset(
+    {None, "translate_areas", "area_presets", "screen_size", "display_scale"}
+)
+
+
+class ScreenRect(namedtuple("ScreenRect", ["x1", "y1", "x2", "y2"])):
+    """สี่เหลี่ยมในพิกเซลจริงของหน้าจอ (x1 <= x2, y1 <= y2)"""
+
+    __slots__ = ()
+
+    @property
+    def width(self):
+        return self.x2 - self.x1
+
+    @property
+    def height(self):
+        return self.y2 - self.y1
+
+    @property
+    def is_empty(self):
+        return self.x1 >= self.x2 or self.y1 >= self.y2
+
+    @property
+    def geometry(self):
+        """รูปแบบ geometry ของ Tk: 'WxH+X+Y'"""
+        return f"{self.width}x{self.height}+{self.x1}+{self.y1}"
+
+    def contains(self, x, y):
+        return self.x1 <= x <= self.x2 and self.y1 <= y <= self.y2
+
+    def clamp(self, width, height):
+        """ตัดให้อยู่ในขอบเขตภาพขนาด width x height"""
+        return ScreenRect(
+            max(0, min(self.x1, width)),
+            max(0, min(self.y1, height)),
+            max(0, min(self.x2, width)),
+            max(0, min(self.y2, height)),
+        )
+
+
+_Compiled = namedtuple("_Compiled", ["screen", "scale", "areas", "presets"])
+
+
+def _scale_rect(coords, scale_x, scale_y):
+    """แปลง dict start_x/start_y/end_x/end_y (พิกัดอ้างอิง) เป็น ScreenRect - None ถ้าข้อมูลไม่ครบ"""
+    if not isinstance(coords, dict):
+        return None
+    try:
+        start_x, start_y = coords["start_x"], coords["start_y"]
+        end_x, end_y = coords["end_x"], coords["end_y"]
+    except KeyError:
+        return None
+    return ScreenRect(
+        int(min(start_x, end_x) * scale_x),
+        int(min(start_y, end_y) * scale_y),
+        int(max(start_x, end_x) * scale_x),
+        int(max(start_y, end_y) * scale_y),
+    )
+
+
+class AreaGeometry:
+    """
+    Args:
+        settings: Settings object (ใช้ add_change_listener เพื่อรู้ว่าต้องคำนวณใหม่)
+        screen_size_provider: callable คืน (width, height) ของหน้าจอจริง
+        screen_check_interval: ความถี่ (วินาที) ที่ตรวจว่าขนาดหน้าจอจริงเปลี่ยนหรือไม่
+    """
+
+    def __init__(self, settings, screen_size_provider, screen_check_interval=2.0):
+        self.settings = settings
+        self._screen_size_provider = screen_size_provider
+        self.screen_check_interval = screen_check_interval
+        self._lock = threading.Lock()
+        self._compiled = None
+        self._screen = None
+        self._screen_checked_at = 0.0
+        self.stats = {"compiles": 0}
+        if hasattr(settings, "add_change_listener"):
+            settings.add_change_listener(self._on_settings_changed)
+
+    def _on_settings_changed(self, key):
+        if key in GEOMETRY_KEYS:
+            self.invalidate()
+
+    def invalidate(self):
+        """ทิ้งผลที่คำนวณไว้ - คำนวณใหม่เมื่อมีการเรียกใช้ครั้งถัดไป"""
+        self._compiled = None
+
+    def notify_screen_changed(self):
+        """เรียกเมื่อรู้ว่าหน้าจอเปลี่ยน (เช่น ย้ายจอ) เพื่อไม่ต้องรอรอบตรวจถัดไป"""
+        self._screen_checked_at = 0.0
+        self._compiled = None
+
+    # ---- compile ----
+
+    def _current_screen(self):
+        now = time.monotonic()
+        if self._screen is None or now - self._screen_checked_at >= self.screen_check_interval:
+            self._screen_checked_at = now
+            try:
+                self._screen = tuple(self._screen_size_provider())
+            except Exception as e:
+                logging.error(f"AreaGeometry: cannot read screen size: {e}")
+                if self._screen is None:
+                    self._screen = (0, 0)
+        return self._screen
+
+    def _get(self):
+        compiled = self._compiled
+        screen = self._current_screen()
+        if compiled is not None and compiled.screen == screen:
+            return compiled
+        with self._lock:
+            compiled = self._compiled
+            if compiled is None or compiled.screen != screen:
+                compiled = self._compile(screen)
+                self._compiled = compiled
+            return compiled
+
+    def _compile(self, screen):
+        reference = self.settings.get("screen_size", DEFAULT_REFERENCE_SIZE)
+        try:
+            reference_width, reference_height = map(int, str(reference).split("x"))
+        except ValueError:
+            reference_width, reference_height = map(int, DEFAULT_REFERENCE_SIZE.split("x"))
+        if screen[0] > 0 and screen[1] > 0:
+            scale = (screen[0] / reference_width, screen[1] / reference_height)
+        else:
+            scale = (1.0, 1.0)
+
+        areas = {}
+        for area, coords in (self.settings.get("translate_areas", {}) or {}).items():
+            rect = _scale_rect(coords, *scale)
+            if rect is not None:
+                areas[area] = rect
+
+        presets = {}
+        for index, preset in enumerate(self.settings.get("area_presets", []) or []):
+            coordinates = preset.get("coordinates") if isinstance(preset, dict) else None
+            rects = {}
+            for area, coords in (coordinates or {}).items():
+                rect = _scale_rect(coords, *scale)
+                if rect is not None:
+                    rects[area] = rect
+            presets[index + 1] = MappingProxyType(rects)
+
+        self.stats["compiles"] += 1
+        logging.debug(
+            f"AreaGeometry compiled: screen={screen}, scale={scale}, "
+            f"areas={len(areas)}, presets={len(presets)}"
+        )
+        return _Compiled(screen, scale, MappingProxyType(areas), MappingProxyType(presets))
+
+    # ---- queries ----
+
+    def scale(self):
+        """(scale_x, scale_y) จากหน้าจออ้างอิงไปยังหน้าจอจริง"""
+        return self._get().scale
+
+    def area_rect(self, area):
+        """ScreenRect ของพื้นที่แปลปัจจุบัน (A/B/C) หรือ None ถ้ายังไม่ได้กำหนด"""
+        return self._get().areas.get(area)
+
+    def preset_rects(self, preset_num):
+        """mapping area -> ScreenRect ของ preset (อ่านอย่างเดียว)"""
+        return self._get().presets.get(preset_num, MappingProxyType({}))
+
+    def hit_test(self, x, y, preset_nums):
+        """preset แรกใน preset_nums ที่มีพื้นที่ครอบจุด (x, y) - None ถ้าไม่มี"""
+        presets = self._get().presets
+        for preset_num in preset_nums:
+            for rect in presets.get(preset_num, {}).values():
+                if rect.contains(x, y):
+                    return preset_num
+        return None
+
+    def crop(self, image, area):
+        """ตัดพื้นที่ area จากภาพเต็มจอ (PIL.Image) - None ถ้าพื้นที่ไม่ถูกต้อง"""
+        rect = self.area_rect(area)
+        if rect is None or rect.is_empty:
+            return None
+        rect = rect.clamp(*image.size)
+        if rect.is_empty:
+            return None
+        return image.crop(rect)
+
+
+def benchmark(ticks=10000):
+    """เทียบการคำนวณพิกัดต่อ tick แบบเดิม (copy dict + scale ทุกครั้ง) กับการอ่านจากผลที่ compile ไว้"""
+
+    class _Settings(dict):
+        pass
+
+    coords = {"start_x": 640, "start_y": 1100, "end_x": 1920, "end_y": 1380}
+    settings = _Settings(
+        screen_size="2560x1440",
+        translate_areas={"A": coords, "B": coords, "C": coords},
+        area_presets=[{"coordinates": {"A": coords, "B": coords}} for _ in range(6)],
+    )
+    geometry = AreaGeometry(settings, lambda: (1920, 1080))
+
+    start_time = time.perf_counter()
+    for _ in range(ticks):
+        scale_x, scale_y = 1920 / 2560, 1080 / 1440
+        for preset in settings["area_presets"]:
+            for area_coords in preset["coordinates"].values():
+                copy = dict(area_coords)
+                x1, y1 = int(copy["start_x"] * scale_x), int(copy["start_y"] * scale_y)
+                x2, y2 = int(copy["end_x"] * scale_x), int(copy["end_y"] * scale_y)
+                if x1 <= 0 <= x2 and y1 <= 0 <= y2:
+                    break
+    old_us = (time.perf_counter() - start_time) * 1e6 / ticks
+
+    start_time = time.perf_counter()
+    for _ in range(ticks):
+        geometry.hit_test(0, 0, range(1, 7))
+    new_us = (time.perf_counter() - start_time) * 1e6 / ticks
+
+    print(f"hover hit-test per tick: old {old_us:.2f} us, compiled {new_us:.2f} us")
+    print(f"compiles: {geometry.stats['compiles']}")
+    return old_us, new_us
+
+
+if __name__ == "__main__":
+    benchmark()
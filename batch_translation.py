@@ -0,0 +1,226 @@
+import json
+import logging
+import re
+from typing import List
+
+# โครงสร้างคำตอบที่ขอจากโมเดล: array ของ string เรียงตามลำดับ segment ที่ส่งไป
+# (ใช้เป็น response_schema ของ Gemini ได้โดยตรง)
+BATCH_RESPONSE_SCHEMA = List[str]
+
+
+class BatchResponseError(ValueError):
+    """คำตอบจากโมเดลไม่ตรงกับโครงสร้าง batch ที่ขอ"""
+
+
+def build_batch_prompt(segments, instructions):
+    """
+    สร้าง prompt เดียวสำหรับแปลหลาย segment พร้อมกัน
+
+    Args:
+        segments: list ของ dict {"text": ..., "speaker": ...}
+        instructions: คำสั่งการแปลหลัก (system prompt เดิมของ translator)
+
+    Returns:
+        str: prompt ที่ขอคำตอบเป็น JSON array ยาวเท่ากับจำนวน segment
+    """
+    payload = []
+    for index, segment in enumerate(segments):
+        item = {"id": index, "text": segment["text"]}
+        if segment.get("speaker"):
+            item["speaker"] = segment["speaker"]
+        payload.append(item)
+
+    return (
+        f"{instructions}\n\n"
+        f"You will receive {len(segments)} independent segments as a JSON array. "
+        "Translate each segment's \"text\" on its own, using \"speaker\" (if present) "
+        "only as context for tone - do not include the speaker name in the output.\n"
+        f"Respond with ONLY a JSON array of exactly {len(segments)} strings, "
+        "where element i is the Thai translation of the segment with id i. "
+        "No markdown, no code fences, no explanations.\n\n"
+        f"SEGMENTS:\n{json.dumps(payload, ensure_ascii=False)}"
+    )
+
+
+def parse_batch_response(raw_text, expected_count):
+    """
+    ตรวจสอบและแยกคำตอบ JSON array กลับเป็นรายการคำแปลตาม segment
+
+    Raises:
+        BatchResponseError: ถ้าไม่ใช่ JSON array ของ string หรือจำนวนไม่ตรง
+    """
+    if not raw_text or not raw_text.strip():
+        raise BatchResponseError("Empty batch response")
+
+    text = raw_text.strip()
+    # บางโมเดลครอบคำตอบด้วย ```json ... ``` แม้จะสั่งไม่ให้ทำ
+    fence = re.match(r"^```(?:json)?\s*(.*?)\s*```$", text, re.DOTALL)
+    if fence:
+        text = fence.group(1)
+    if not text.startswith("["):
+        start, end = text.find("["), text.rfind("]")
+        if start == -1 or end <= start:
+            raise BatchResponseError("No JSON array in batch response")
+        text = text[start : end + 1]
+
+    try:
+        data = json.loads(text)
+    except json.JSONDecodeError as e:
+        raise BatchResponseError(f"Invalid JSON in batch response: {e}")
+
+    if not isinstance(data, list):
+        raise BatchResponseError("Batch response is not a JSON array")
+
+    # รองรับกรณีโมเดลตอบเป็น object {"id": .., "text": ..} แทน string
+    results = []
+    for item in data:
+        if isinstance(item, dict):
+            item = item.get("text") or item.get("translation") or ""
+        if not isinstance(item, str):
+            raise BatchResponseError("Batch response items must be strings")
+        results.append(item.strip())
+
+    if len(results) != expected_count:
+        raise BatchResponseError(
+            f"Batch response has {len(results)} items, expected {expected_count}"
+        )
+    if any(not item for item in results):
+        raise BatchResponseError("Batch response contains empty translations")
+    return results
+
+
+class BatchTranslator:
+    """
+    แปลหลาย segment ใน request เดียว และเก็บผลแต่ละ segment ลง DialogueCache แยกกัน
+
+    Args:
+        send_prompt: ฟังก์ชัน (prompt, expected_count) -> raw text จากโมเดล
+        cache: DialogueCache ที่ใช้ร่วมกับ translator (ไม่บังคับ)
+        max_segments: จำนวน segment สูงสุดต่อ request
+    """
+
+    def __init__(self, send_prompt, cache=None, max_segments=20):
+        self.send_prompt = send_prompt
+        self.cache = cache
+        self.max_segments = max_segments
+        self.stats = {"requests": 0, "segments": 0, "cache_hits": 0, "failures": 0}
+
+    def translate_segments(
+        self, segments, instructions, dialogue_type="normal", priority=None, max_segments=None
+    ):
+        """
+        Args:
+            segments: list ของ dict {"text": ..., "speaker": ..., "dialogue_type": ...}
+                หรือ list ของ string
+            instructions: คำสั่งการแปลหลัก
+            dialogue_type: ชนิดเริ่มต้นที่ใช้เป็น key ของ cache (ต้องตรงกับที่ translate() ใช้)
+            priority: ลำดับความสำคัญของ request (None = ค่าเริ่มต้นของ send_prompt คืองานเบื้องหลัง)
+            max_segments: จำนวน segment ต่อ request ของการเรียกครั้งนี้ (None = self.max_segments)
+                ไม่แก้ค่าของ instance เพราะ batch ของ lore/choice อาจทำงานพร้อมกัน
+
+        Returns:
+            list: คำแปลตามลำดับ segment (ไม่มี prefix ชื่อผู้พูด)
+
+        Raises:
+            BatchResponseError: ถ้าโมเดลตอบผิดรูปแบบ - ผู้เรียกควร fallback เป็นแปลทีละบรรทัด
+        """
+        max_segments = max_segments or self.max_segments
+        segments = [
+            {"text": s} if isinstance(s, str) else dict(s) for s in segments
+        ]
+        results = [None] * len(segments)
+        pending = {}  # (text, speaker, dialogue_type) -> [indexes]
+
+        for index, segment in enumerate(segments):
+            text = segment["text"].strip()
+            speaker = segment.get("speaker")
+            segment_type = segment.get("dialogue_type") or dialogue_type
+            if not text:
+                results[index] = ""
+                continue
+            cached = self._get_cached(text, speaker, segment_type)
+            if cached:
+                results[index] = cached
+                self.stats["cache_hits"] += 1
+                continue
+            pending.setdefault((text, speaker, segment_type), []).append(index)
+
+        unique_keys = list(pending.keys())
+        for start in range(0, len(unique_keys), max_segments):
+            chunk = unique_keys[start : start + max_segments]
+            chunk_segments = [
+                {"text": text, "speaker": speaker} for text, speaker, _ in chunk
+            ]
+            prompt = build_batch_prompt(chunk_segments, instructions)
+
+            self.stats["requests"] += 1
+            try:
+                if priority is None:
+                    raw_text = self.send_prompt(prompt, len(chunk_segments))
+                else:
+                    raw_text = self.send_prompt(prompt, len(chunk_segments), priority=priority)
+                translations = parse_batch_response(raw_text, len(chunk_segments))
+            except BatchResponseError:
+                self.stats["failures"] += 1
+                raise
+
+            for key, translation in zip(chunk, translations):
+                text, speaker, segment_type = key
+                self.stats["segments"] += 1
+                self._store(text, translation, speaker, segment_type)
+                for index in pending[key]:
+                    results[index] = translation
+
+        logging.info(
+            f"BatchTranslator: {len(segments)} segments, {len(unique_keys)} sent "
+            f"in {(len(unique_keys) + max_segments - 1) // max_segments} request(s)"
+        )
+        return results
+
+    def _get_cached(self, text, speaker, dialogue_type):
+        if not self.cache:
+            return None
+        return self.cache.get_cached_translation(text, speaker, dialogue_type)
+
+    def _store(self, text, translation, speaker, dialogue_type):
+        if self.cache:
+            self.cache.cache_translation(text, translation, speaker, dialogue_type)
+
+
+class _FakeCache:
+    """DialogueCache ปลอมสำหรับ benchmark (เก็บตาม key เดียวกับของจริง)"""
+
+    def __init__(self):
+        self.entries = {}
+
+    def get_cached_translation(self, text, speaker=None, dialogue_type="normal"):
+        return self.entries.get((text, speaker, dialogue_type))
+
+    def cache_translation(self, text, translation, speaker=None, dialogue_type="normal"):
+        self.entries[(text, speaker, dialogue_type)] = translation
+
+
+def benchmark(lines=40, max_segments=10):
+    """โมเดลปลอมที่ตอบ JSON array - นับจำนวน request แบบทีละบรรทัดเทียบกับแบบ batch และรอบซ้ำที่มาจาก cache"""
+    calls = []
+
+    def fake_send(prompt, expected_count, priority=None):
+        calls.append(expected_count)
+        payload = json.loads(prompt.split("SEGMENTS:\n", 1)[1])
+        return json.dumps([f"<th:{item['text']}>" for item in payload], ensure_ascii=False)
+
+    batch = BatchTranslator(fake_send, _FakeCache(), max_segments=max_segments)
+    segments = [
+        {"text": f"Line {i % (lines // 2)}", "speaker": "Y'shtola" if i % 3 == 0 else None}
+        for i in range(lines)
+    ]
+    batch.translate_segments(segments, "Translate to Thai.")
+    print(f"{lines} lines: {lines} request(s) one by one, {len(calls)} batched {calls}")
+    calls.clear()
+    batch.translate_segments(segments, "Translate to Thai.")
+    print(f"repeat screen: {len(calls)} request(s), {batch.stats['cache_hits']} cache hits")
+    return batch.stats
+
+
+if __name__ == "__main__":
+    benchmark()
@@ -7,6 +7,8 @@ import re
 import logging
 from typing import Optional, Dict, Tuple
 
+import dialogue_classifier
+
 class CutsceneDetector:
     def __init__(self):
         # Patterns สำหรับตรวจจับ cutscene text
@@ -24,14 +26,6 @@ class CutsceneDetector:
             (r'^([A-Z][a-zA-Z\s\']+)\s*[-–—]\s*(.+)', 'dash_format')
         ]
         
-        # Character validation patterns
-        self.name_validation = {
-            'min_length': 2,
-            'max_length': 30,
-            'invalid_chars': r'[0-9!@#$%^&*()+=\[\]{};"|<>?/\\]',
-            'valid_chars': r'^[A-Za-z\s\'\-]+$'
-        }
-        
     def detect_cutscene(self, ocr_text: str) -> Optional[Dict]:
         """
         ตรวจจับว่า text เป็น cutscene format หรือไม่
@@ -45,60 +39,22 @@ class CutsceneDetector:
                 'confidence': 0.95
             }
         """
-        if not ocr_text or not ocr_text.strip():
+        match = dialogue_classifier.detect_cutscene(ocr_text or "")
+        if match is None:
+            # ถ้าไม่ match pattern ใดเลย อาจเป็น narration/lore text
             return None
-            
-        # Clean text
-        text = ocr_text.strip()
-        
-        # Try each pattern
-        for pattern, format_type in self.cutscene_patterns:
-            match = re.match(pattern, text, re.MULTILINE | re.DOTALL)
-            if match:
-                speaker = match.group(1).strip()
-                content = match.group(2).strip()
-                
-                # Validate speaker name
-                if self._is_valid_speaker_name(speaker):
-                    confidence = self._calculate_confidence(speaker, content, format_type)
-                    
-                    return {
-                        'type': 'cutscene',
-                        'format': format_type,
-                        'speaker': speaker,
-                        'content': content,
-                        'confidence': confidence
-                    }
-        
-        # ถ้าไม่ match pattern ใดเลย อาจเป็น narration/lore text
-        return None
+
+        return {
+            'type': 'cutscene',
+            'format': match.format,
+            'speaker': match.speaker,
+            'content': match.content,
+            'confidence': self._calculate_confidence(match.speaker, match.content, match.format)
+        }
     
     def _is_valid_speaker_name(self, name: str) -> bool:
         """ตรวจสอบว่าชื่อน่าเชื่อถือหรือไม่"""
-        # ความยาว
-        if len(name) < self.name_validation['min_length'] or \
-           len(name) > self.name_validation['max_length']:
-            return False
-        
-        # ต้องขึ้นต้นด้วยตัวใหญ่
-        if not name[0].isupper():
-            return False
-        
-        # ไม่มีอักขระแปลกๆ
-        if re.search(self.name_validation['invalid_chars'], name):
-            return False
-        
-        # ตรวจสอบว่ามีแต่ตัวอักษร, space, apostrophe, hyphen
-        if not re.match(self.name_validation['valid_chars'], name):
-            return False
-        
-        # ไม่ใช่คำทั่วไปที่อาจเป็น false positive
-        common_words = ['The', 'This', 'That', 'There', 'These', 'Those', 
-                       'What', 'Where', 'When', 'Who', 'Why', 'How']
-        if name in common_words:
-            return False
-        
-        return True
+        return dialogue_classifier.is_plausible_speaker(name)
     
     def _calculate_confidence(self, speaker: str, content: str, format_type: str) -> float:
         """คำนวณความมั่นใจในการตรวจจับ"""
@@ -8,6 +8,8 @@ import time
 import logging
 from typing import Dict, Optional, Tuple
 
+import dialogue_classifier
+
 
 class CutsceneTextProcessor:
     """
@@ -55,22 +57,16 @@ class CutsceneTextProcessor:
         
         # ทำความสะอาดข้อความ
         cleaned_text = self._clean_text(ocr_text)
-        lines = cleaned_text.split('\n')
         
-        # กรณีมีหลายบรรทัด
-        if len(lines) >= 2:
-            potential_name = lines[0].strip()
-            content_lines = [line.strip() for line in lines[1:] if line.strip()]
-            content = ' '.join(content_lines)
-            
-            # ตรวจสอบว่าบรรทัดแรกน่าจะเป็นชื่อ
-            name_validation = self._validate_speaker_name(potential_name)
-            
+        # ชื่อบรรทัดแรก + บทพูด (ใช้กฎเดียวกับ dialogue_classifier / CutsceneDetector)
+        match = dialogue_classifier.detect_cutscene(cleaned_text)
+        if match is not None and match.format == 'newline_format':
+            name_validation = self._validate_speaker_name(match.speaker)
             if name_validation['is_valid']:
                 return {
                     'type': 'cutscene_with_speaker',
-                    'speaker': potential_name,
-                    'content': content,
+                    'speaker': match.speaker,
+                    'content': ' '.join(match.content.split()),
                     'confidence': name_validation['confidence']
                 }
         
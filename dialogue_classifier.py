@@ -0,0 +1,387 @@
+"""
+Dialogue classifier: ตัดสินว่าข้อความจาก OCR เป็นหน้าตัวเลือก (choice), บทสนทนา, cutscene หรือบทบรรยาย
+ใช้ร่วมกันระหว่าง MBB, translator ทุกตัว และ cutscene modules เพื่อให้ผลตรงกันทุกที่
+
+- pattern ทั้งหมด compile ครั้งเดียวตอน import
+- normalize ข้อความครั้งเดียวต่อข้อความ (lower / รวมช่องว่าง / แยกบรรทัด)
+- ผลลัพธ์ถูก memoize ต่อข้อความ (ข้อความเดิมที่ OCR อ่านซ้ำทุกรอบไม่ต้องคำนวณใหม่)
+
+รัน `python dialogue_classifier.py` เพื่อวัดความแม่นยำและเวลาบน corpus ตัวอย่าง
+"""
+
+import re
+import time
+from collections import namedtuple
+from functools import lru_cache
+
+# ---- labels ----
+CHOICE = "choice"
+DIALOGUE = "dialogue"
+CUTSCENE = "cutscene"
+NARRATION = "narration"
+
+MEMO_SIZE = 2048
+
+# header ต้องเริ่มภายในจำนวนตัวอักษรนี้จากต้นข้อความ
+HEADER_WINDOW = 20
+
+# (header มาตรฐาน, pattern บนข้อความตัวพิมพ์เล็ก) - pattern รองรับ OCR error ที่พบบ่อย
+# เช่น W -> VV/V, l/I/1 สลับกัน และช่องว่างหายระหว่างคำ
+CHOICE_HEADERS = (
+    ("What will you say?", r"(?:w|vv|v)hat\s*w[il1|]{3}\s*you\s*say"),
+    ("What will you do?", r"(?:w|vv|v)hat\s*w[il1|]{3}\s*you\s*do\b"),
+    ("What would you like to ask?", r"what\s+would\s+you\s+like\s+to\s+ask"),
+    ("What do you say?", r"what\s+do\s+you\s+say"),
+    ("How will you respond?", r"how\s+will\s+you\s+respond"),
+    ("How would you like to respond?", r"how\s+would\s+you\s+like\s+to\s+respond"),
+    ("Choose your response.", r"choose\s+your\s+response"),
+    ("Select a dialogue option.", r"select\s+a\s+dialogue\s+option"),
+    ("Select an option.", r"select\s+an\s+option"),
+    ("Pick your answer.", r"pick\s+your\s+answer"),
+    ("Your response:", r"your\s+response\s*:"),
+    ("Your answer:", r"your\s+answer\s*:"),
+    ("คุณจะพูดว่าอย่างไร?", r"คุณจะพูด(?:ว่า)?(?:อย่างไร|อะไร)"),
+    ("เลือกตัวเลือกของคุณ", r"เลือกตัวเลือกของคุณ"),
+)
+
+_HEADER_RE = re.compile(
+    "|".join(f"(?P<h{i}>{pattern})" for i, (_, pattern) in enumerate(CHOICE_HEADERS))
+)
+_HEADER_TAIL_RE = re.compile(r"^[\s?？:：.。]+")
+
+# รูปแบบ choice ที่ไม่มี header ซึ่งพบใน log ของ FFXIV (OCR อ่านตัวเลือกติดกัน)
+_CHOICE_HINT_RE = re.compile(
+    r"contestisn'?t\s*over\s*yet|won'?tlet|take\s*back\s*what\s*was\s*stolen"
+)
+_CHOICE_KEYWORDS = ("contest", "take back", "stolen", "won't let", "get away")
+
+_NUMBERED_RE = re.compile(r"^[1-9][.)]\s*")
+_BULLETED_RE = re.compile(r"^[►▶•◆▪▫⚫⚪→]\s*")
+_NUMBER_STARTERS_RE = re.compile(r"(?:^|\s)([1-4])\.\s*")
+_LETTER_STARTERS_RE = re.compile(r"(?:^|\s)([A-D])\.\s*")
+_SENTENCE_SPLIT_RE = re.compile(r"(?<=[.!?])\s+")
+_WHITESPACE_RE = re.compile(r"\s+")
+
+# ---- cutscene / speaker ----
+_CUTSCENE_PATTERNS = (
+    (re.compile(r"^([A-Z][a-zA-Z\s']{1,30})$\n+(.+)", re.MULTILINE | re.DOTALL), "newline_format"),
+    (re.compile(r"^([A-Z][a-zA-Z\s']+)[:：]\s*(.+)", re.MULTILINE | re.DOTALL), "colon_format"),
+    (re.compile(r"^\[([A-Z][a-zA-Z\s']+)\]\s*(.+)", re.MULTILINE | re.DOTALL), "bracket_format"),
+    (re.compile(r"^([A-Z][a-zA-Z\s']+)\s*[-–—]\s*(.+)", re.MULTILINE | re.DOTALL), "dash_format"),
+)
+_SPEAKER_CHARS_RE = re.compile(r"^[A-Za-z\s'\-]+$")
+_SHORT_CODE_NAME_RE = re.compile(r"^[A-Za-z0-9]{1,3}$")  # เช่น 2B, 9S
+_NOT_SPEAKERS = frozenset(
+    {
+        # คำทั่วไปที่ขึ้นต้นประโยค
+        "the", "this", "that", "there", "these", "those",
+        "what", "where", "when", "who", "why", "how",
+        # ปุ่ม/เมนูของเกม
+        "next", "skip", "menu", "close", "back", "auto", "log", "save", "load",
+        "config", "exit", "cancel", "yes", "no", "ok", "confirm",
+        # หัวข้อที่ไม่ใช่ชื่อ
+        "chapter", "scene", "act", "part", "episode", "location", "time", "date", "day", "night",
+    }
+)
+
+# คำที่พบบ่อยในบทบรรยาย (area C)
+_NARRATOR_WORDS = frozenset(
+    {
+        "the", "a", "an", "there", "it", "they", "you", "your", "this", "that",
+        "he", "she", "his", "her", "their", "its", "our", "we", "i", "my", "me",
+        "when", "as", "if", "then", "while", "after", "before",
+    }
+)
+
+
+Normalized = namedtuple("Normalized", ["stripped", "lower", "collapsed", "squashed", "lines"])
+ChoiceResult = namedtuple("ChoiceResult", ["is_choice", "header", "choices", "reason"])
+CutsceneMatch = namedtuple("CutsceneMatch", ["speaker", "content", "format"])
+Classification = namedtuple("Classification", ["label", "speaker", "content", "choice"])
+
+_NOT_CHOICE = ChoiceResult(False, None, (), None)
+
+
+@lru_cache(maxsize=MEMO_SIZE)
+def normalize(text):
+    """normalize ข้อความครั้งเดียว ใช้ร่วมกันทุกกฎ"""
+    stripped = (text or "").strip()
+    lower = stripped.lower()
+    collapsed = _WHITESPACE_RE.sub(" ", lower)
+    lines = tuple(line.strip() for line in stripped.split("\n") if line.strip())
+    return Normalized(stripped, lower, collapsed, collapsed.replace(" ", ""), lines)
+
+
+def _find_header(norm):
+    """คืน (header มาตรฐาน, ตำแหน่งจบใน norm.lower) หรือ (None, -1)"""
+    match = _HEADER_RE.search(norm.lower, 0, HEADER_WINDOW + 48)
+    if match is None or match.start() > HEADER_WINDOW:
+        return None, -1
+    # ก่อน header ยอมให้มีแค่เศษสัญลักษณ์จาก OCR - ถ้ามีคำนำหน้า (เช่น "Thancred: what do you say...") คือบทพูด
+    if sum(1 for c in norm.lower[: match.start()] if c.isalnum()) > 3:
+        return None, -1
+    header = CHOICE_HEADERS[int(match.lastgroup[1:])][0]
+    return header, match.end()
+
+
+def _split_by_starters(text, starter_re):
+    positions = [match.start(1) for match in starter_re.finditer(text)]
+    if len(positions) < 2:
+        return []
+    bounds = positions + [len(text)]
+    choices = [text[bounds[i] : bounds[i + 1]].strip() for i in range(len(positions))]
+    head = text[: positions[0]].strip()
+    return ([head] if head else []) + [choice for choice in choices if choice]
+
+
+def split_choices(text):
+    """แยกตัวเลือก: ตามบรรทัด -> เลขข้อ (1.) -> ตัวอักษร (A.) -> ประโยค -> ทั้งก้อน"""
+    text = (text or "").strip()
+    if not text:
+        return []
+    lines = [line.strip() for line in text.split("\n") if line.strip()]
+    if len(lines) > 1:
+        return lines
+    for starter_re in (_NUMBER_STARTERS_RE, _LETTER_STARTERS_RE):
+        choices = _split_by_starters(text, starter_re)
+        if choices:
+            return choices
+    sentences = [part.strip() for part in _SENTENCE_SPLIT_RE.split(text) if part.strip()]
+    return sentences if len(sentences) > 1 else [text]
+
+
+@lru_cache(maxsize=MEMO_SIZE)
+def split_choice_header(text):
+    """
+    ตัด header ของหน้าตัวเลือกออก
+
+    Returns:
+        (header มาตรฐาน หรือ None, ข้อความส่วนตัวเลือก) - ถ้าไม่พบ header คืนข้อความเดิม
+    """
+    norm = normalize(text)
+    header, end = _find_header(norm)
+    if header is None:
+        return None, norm.stripped
+    # lower() ไม่เปลี่ยนความยาวของตัวอักษรละติน/ไทย จึงใช้ตำแหน่งเดียวกันกับข้อความต้นฉบับได้
+    rest = norm.stripped[end:] if len(norm.lower) == len(norm.stripped) else norm.lower[end:]
+    return header, _HEADER_TAIL_RE.sub("", rest).strip()
+
+
+@lru_cache(maxsize=MEMO_SIZE)
+def parse_choice(text):
+    """
+    หน้าตัวเลือกที่มี header (ใช้ตอนแปล): ChoiceResult(is_choice, header, choices, reason)
+    """
+    if not text or len(text.strip()) < 5:
+        return _NOT_CHOICE
+    header, rest = split_choice_header(text)
+    if header is None:
+        return _NOT_CHOICE
+    return ChoiceResult(True, header, tuple(split_choices(rest)), "header")
+
+
+@lru_cache(maxsize=MEMO_SIZE)
+def classify_choice(text):
+    """
+    ตรวจว่าเป็นหน้าตัวเลือกหรือไม่ (ใช้ตอนตรวจพื้นที่ B): header ก่อน แล้วจึงรูปแบบที่ไม่มี header
+    (เลขข้อ/สัญลักษณ์นำหน้าหลายบรรทัด หรือหลายบรรทัดสั้นยาวใกล้เคียงกัน)
+    """
+    if not text:
+        return _NOT_CHOICE
+    result = parse_choice(text)
+    if result.is_choice:
+        return result
+
+    norm = normalize(text)
+    if "whatwillyousay" in norm.squashed[:50]:
+        return ChoiceResult(True, "What will you say?", tuple(norm.lines[1:]), "squashed header")
+    if _CHOICE_HINT_RE.search(norm.lower):
+        return ChoiceResult(True, None, norm.lines, "ocr hint")
+    if sum(1 for keyword in _CHOICE_KEYWORDS if keyword in norm.lower) >= 3:
+        return ChoiceResult(True, None, norm.lines, "keywords")
+
+    lines = norm.lines
+    if 2 <= len(lines) <= 5:
+        numbered = sum(1 for line in lines if _NUMBERED_RE.match(line))
+        bulleted = sum(1 for line in lines if _BULLETED_RE.match(line))
+        if numbered >= 2 or bulleted >= 2:
+            return ChoiceResult(True, None, lines, "numbered/bulleted lines")
+        lengths = [len(line) for line in lines]
+        if all(10 <= length <= 60 for length in lengths):
+            average = sum(lengths) / len(lengths)
+            variance = sum((length - average) ** 2 for length in lengths) / len(lengths)
+            if variance < 200:
+                return ChoiceResult(True, None, lines, "uniform short lines")
+    return _NOT_CHOICE
+
+
+def is_plausible_speaker(name):
+    """ชื่อนี้น่าจะเป็นชื่อผู้พูดหรือไม่ (ไม่ใช่คำทั่วไป/ปุ่มเมนู/ประโยค)"""
+    if not name or not 2 <= len(name) <= 30 or not name[0].isupper():
+        return False
+    if name.lower() in _NOT_SPEAKERS:
+        return False
+    if _SPEAKER_CHARS_RE.match(name):
+        return True
+    return bool(_SHORT_CODE_NAME_RE.match(name))
+
+
+@lru_cache(maxsize=MEMO_SIZE)
+def detect_cutscene(text):
+    """CutsceneMatch(speaker, content, format) ถ้าข้อความมีชื่อผู้พูดนำหน้า หรือ None"""
+    stripped = normalize(text).stripped
+    if not stripped:
+        return None
+    for pattern, format_type in _CUTSCENE_PATTERNS:
+        match = pattern.match(stripped)
+        if match:
+            speaker = match.group(1).strip()
+            if is_plausible_speaker(speaker):
+                return CutsceneMatch(speaker, match.group(2).strip(), format_type)
+    return None
+
+
+@lru_cache(maxsize=MEMO_SIZE)
+def looks_like_narration(text):
+    """บทบรรยาย: ยาวกว่า 20 ตัวอักษร ไม่มีเครื่องหมายคำพูดช่วงต้น และมีคำบรรยายทั่วไปอย่างน้อย 2 คำ"""
+    norm = normalize(text)
+    if len(norm.stripped) <= 20:
+        return False
+    if '"' in norm.stripped[:15] or "'" in norm.stripped[:15]:
+        return False
+    return len(_NARRATOR_WORDS.intersection(norm.collapsed.split(" "))) >= 2
+
+
+@lru_cache(maxsize=MEMO_SIZE)
+def classify_text(text):
+    """จัดประเภทข้อความก้อนเดียว: CHOICE / CUTSCENE (ชื่อบรรทัดแรก) / DIALOGUE (ชื่อ: ข้อความ) / NARRATION"""
+    choice = classify_choice(text)
+    if choice.is_choice:
+        return Classification(CHOICE, None, normalize(text).stripped, choice)
+    cutscene = detect_cutscene(text)
+    if cutscene is not None:
+        label = CUTSCENE if cutscene.format == "newline_format" else DIALOGUE
+        return Classification(label, cutscene.speaker, cutscene.content, None)
+    return Classification(NARRATION, None, normalize(text).stripped, None)
+
+
+def classify_areas(texts, speaker_of):
+    """
+    ประเภทของผล OCR ทั้งหน้าจอ (dict area -> ข้อความ) แบบเดียวกับที่ MBB ใช้:
+    "normal", "choice", "speaker_in_text", "dialog_without_name", "narrator" หรือ "unknown"
+
+    Args:
+        speaker_of: callable(text) -> ชื่อผู้พูดหรือ None เช่น lambda t: text_corrector.parse_line(t).speaker
+    """
+    if not texts:
+        return "unknown"
+    name_text = (texts.get("A") or "").strip()
+    dialogue_text = (texts.get("B") or "").strip()
+
+    # 1. ชื่อ (A) + บทพูด (B)
+    if (
+        name_text
+        and dialogue_text
+        and 1 < len(name_text) < 25
+        and any(c.isalpha() for c in name_text)
+        and len(dialogue_text) > 3
+    ):
+        return "normal"
+
+    # 2. หน้าตัวเลือกในพื้นที่ B
+    b_text = texts.get("B")
+    if b_text and classify_choice(b_text).is_choice:
+        return "choice"
+
+    # 3. มีเฉพาะ B
+    if b_text and not texts.get("A"):
+        if speaker_of(b_text):
+            return "speaker_in_text"
+        if ('"' in b_text or "'" in b_text) and len(b_text) > 5:
+            return "dialog_without_name"
+
+    # 4. บทบรรยายในพื้นที่ C
+    c_text = texts.get("C")
+    if c_text and not speaker_of(c_text) and looks_like_narration(c_text):
+        return "narrator"
+    return "unknown"
+
+
+def cache_info():
+    return {
+        name: function.cache_info()
+        for name, function in (
+            ("normalize", normalize),
+            ("classify_choice", classify_choice),
+            ("parse_choice", parse_choice),
+            ("detect_cutscene", detect_cutscene),
+            ("classify_text", classify_text),
+        )
+    }
+
+
+def clear_caches():
+    for function in (
+        normalize, split_choice_header, parse_choice, classify_choice,
+        detect_cutscene, looks_like_narration, classify_text,
+    ):
+        function.cache_clear()
+
+
+# ---- benchmark ----
+
+CORPUS = (
+    ("What will you say?\nI'm ready.\nGive me a moment.", CHOICE),
+    ("What will you say?\nWe must hurry.\nLet us rest first.\nI have a question.", CHOICE),
+    ("Whatwill you say? Yes. No.", CHOICE),
+    ("VVhat wiII you say?\nLead the way.", CHOICE),
+    ("What will you do?\nFight\nFlee", CHOICE),
+    ("Select an option:\n1. Buy\n2. Sell\n3. Leave", CHOICE),
+    ("1. Ask about the crystal\n2. Ask about the city\n3. Say goodbye", CHOICE),
+    ("คุณจะพูดว่าอย่างไร?\nไปกันเถอะ\nรอก่อน", CHOICE),
+    ("Alphinaud\nWe must make haste to the Waking Sands.", CUTSCENE),
+    ("Sciel\nSave it for tomorrow. Let's do something else tonight.", CUTSCENE),
+    ("Verso\nWhat do you have in mind?", CUTSCENE),
+    ("Y'shtola: The aether here is thick with something foul.", DIALOGUE),
+    ("[Alphinaud] We must proceed with caution.", DIALOGUE),
+    ("Thancred: What do you say we take a look around?", DIALOGUE),
+    ("The ancient ruins stretch endlessly beneath the crimson sky.", NARRATION),
+    ("As the sun sets, the city falls silent and the wind grows cold.", NARRATION),
+    ("It has been five years since the Calamity struck Eorzea.", NARRATION),
+    ("Next\nThis should not be detected as a name", NARRATION),
+    ("the aether stirs as they approach the crystal.", NARRATION),
+)
+
+
+def benchmark(repeats=2000):
+    """ความแม่นยำบน CORPUS และเวลาต่อข้อความ แบบ cold (ล้าง memo) และ warm (ข้อความซ้ำ)"""
+    errors = []
+    for text, expected in CORPUS:
+        label = classify_text(text).label
+        if label != expected:
+            errors.append((text, expected, label))
+    accuracy = 1.0 - len(errors) / len(CORPUS)
+
+    rounds = max(1, repeats // len(CORPUS))
+    start_time = time.perf_counter()
+    for _ in range(rounds):
+        clear_caches()
+        for text, _ in CORPUS:
+            classify_text(text)
+    cold_us = (time.perf_counter() - start_time) * 1e6 / (rounds * len(CORPUS))
+
+    start_time = time.perf_counter()
+    for _ in range(rounds):
+        for text, _ in CORPUS:
+            classify_text(text)
+    warm_us = (time.perf_counter() - start_time) * 1e6 / (rounds * len(CORPUS))
+
+    print(f"accuracy: {accuracy * 100:.1f}% ({len(CORPUS) - len(errors)}/{len(CORPUS)})")
+    for text, expected, label in errors:
+        print(f"  expected {expected:<9} got {label:<9} {text[:50]!r}")
+    print(f"cold: {cold_us:.1f} us/text   memoized: {warm_us:.2f} us/text")
+    return {"accuracy": accuracy, "cold_us": cold_us, "warm_us": warm_us, "errors": errors}
+
+
+if __name__ == "__main__":
+    benchmark()
@@ -0,0 +1,377 @@
+"""
+Fast path: แปลบรรทัดสั้นที่มีคำแปลตายตัวโดยไม่เรียก API (ใช้เวลาระดับไมโครวินาที)
+
+- คำอุทาน/วลีติดปาก ("Hm...", "Aye", "Nay", "Thank you.", ...) จาก lexicon ที่คัดไว้
+  และไฟล์ fast_path_lexicon.json ของผู้ใช้ ({"phrase": "คำแปล"}; ทับค่าเริ่มต้นได้)
+- บรรทัดที่เป็นชื่อตัวละครล้วน, "???", และ "Name!" / "Name?" / "Name..."
+  (2/22 ที่ OCR อ่านผิดจาก ??? แปลงเฉพาะในตำแหน่งชื่อผู้พูด - บรรทัด "2" ล้วนคือตัวเลข)
+- บรรทัดที่มีแต่ตัวเลข/สัญลักษณ์ คืนค่าเดิม
+- "Speaker: Hm..." แปลเฉพาะเนื้อหาแล้วคงชื่อผู้พูดไว้
+
+lexicon ถูก compile เป็น trie บนข้อความที่ normalize แล้ว (ตัวพิมพ์, apostrophe, … , ตัวอักษรที่ลากยาว
+"Hmmmm" -> "hmm") และแยกเครื่องหมายท้ายประโยคออกมาต่อท้ายคำแปล (เฉพาะ ! และ ... -
+คำถามต้องมี entry "X?" ของตัวเอง เพราะคำแปลแบบบอกเล่า + "?" ไม่ใช่คำถามในภาษาไทย)
+install_fast_path() ครอบ translate ของ translator ทุก provider (ชั้นนอกสุดใน TranslatorFactory)
+
+รัน `python fast_path.py` เพื่อวัดสัดส่วนบรรทัดที่ไม่ต้องเรียก API และเวลาต่อบรรทัด
+"""
+
+import functools
+import json
+import logging
+import os
+import re
+import threading
+import time
+from collections import namedtuple
+
+LEXICON_FILE = "fast_path_lexicon.json"
+# บรรทัดยาวกว่านี้ไม่ใช่วลีสั้นแน่นอน - ไม่ต้อง normalize
+MAX_FAST_PATH_LENGTH = 48
+
+DEFAULT_LEXICON = {
+    "'Tis": "ช่างเป็น...",
+    "'Twas": "มันเคยเป็น...",
+    "Nay": "หามิได้",
+    "Aye": "นั่นสินะ",
+    "Mayhaps": "บางที...",
+    "Hm": "อืม",
+    "Hmm": "อืม",
+    "Hmph": "ฮึ่ม",
+    "Huh": "หือ",
+    "Huh?": "หือ?",
+    "Huh?!": "หือ!?",
+    "Eh": "เอ๊ะ",
+    "Eh?": "เอ๊ะ?",
+    "Ah": "อา",
+    "Ahh": "อา",
+    "Oh": "โอ้",
+    "Ohh": "โอ้",
+    "Uh": "เอ่อ",
+    "Um": "เอ่อ",
+    "Ugh": "อึก",
+    "Gah": "อั๊ก",
+    "Tsk": "ชิ",
+    "Sigh": "เฮ่อ..",
+    "*sigh*": "*เฮ่อ*",
+    "Haha": "ฮ่าฮ่า",
+    "Hahaha": "ฮ่าฮ่าฮ่า",
+    "Heh": "เฮะ",
+    "Hah": "ฮะ",
+    "Wait": "เดี๋ยวก่อน",
+    "Wait!": "เดี๋ยวก่อน!",
+    "What": "อะไรนะ",
+    "What?": "อะไรนะ?",
+    "What?!": "อะไรนะ!?",
+    "Really?": "จริงเหรอ?",
+    "Yes": "ใช่",
+    "Yes?": "ว่าไง?",
+    "No": "ไม่",
+    "Indeed": "แน่นอน",
+    "Of course": "แน่นอน",
+    "Very well": "ก็ได้",
+    "I see": "เข้าใจแล้ว",
+    "Thank you": "ขอบคุณ",
+    "Thanks": "ขอบใจนะ",
+    "My thanks": "ขอบคุณ",
+    "Farewell": "ลาก่อน",
+    "Goodbye": "ลาก่อน",
+    "Hello": "สวัสดี",
+    "Welcome": "ยินดีต้อนรับ",
+    "My friend...": "สหายข้า...",
+    "Forgive me": "ขอโทษที",
+    "Come on": "มาเถอะ",
+    "Let's go": "ไปกันเถอะ",
+    "Look out": "ระวัง",
+    "Ready": "พร้อมแล้ว",
+    "Hurry": "เร็วเข้า",
+    "Understood": "เข้าใจแล้ว",
+    "Certainly": "ได้เลย",
+    "Right": "ใช่แล้ว",
+    "Well": "ก็...",
+    "Well...": "ก็...",
+    "So": "งั้น",
+    "...": "...",
+}
+
+_APOSTROPHES_RE = re.compile(r"[’‘`´]")
+_ELONGATED_RE = re.compile(r"([a-z])\1{2,}")
+_TAIL_RE = re.compile(r"[\s.!?…~\-—]*$")
+_SYMBOLS_ONLY_RE = re.compile(r"^[\d\W_]+$")
+# ชื่อผู้พูดที่ไม่รู้จัก (รวม 2/22 ที่ OCR อ่านผิด) - ใช้กับตำแหน่งชื่อผู้พูดเท่านั้น
+_UNKNOWN_SPEAKER_RE = re.compile(r"^(?:\?{2,3}|2+)\??$")
+_UNKNOWN_LINE_RE = re.compile(r"^\?{2,3}$")
+# เครื่องหมายท้ายที่ต่อกับคำแปลแบบทั่วไปได้โดยไม่เปลี่ยนความหมาย
+_REATTACH_TAIL_RE = re.compile(r"^(?:!+|\.{3}|\.{3}!+|!+\.{3})$")
+# เครื่องหมายท้ายชื่อ -> รูปแบบคำแปล ("Tataru?" -> "Tataru เหรอ?")
+NAME_TAILS = {"?": " เหรอ?", "!": "!", "...": "...", "?!": " เหรอ!?", "!?": " เหรอ!?", ".": ""}
+
+_END = object()
+
+FastPathResult = namedtuple("FastPathResult", ["translation", "reason"])
+
+
+def normalize(text):
+    """
+    Returns:
+        (core, tail) - core: ตัวพิมพ์เล็ก, apostrophe/ช่องว่างเป็นรูปเดียว, ตัวอักษรที่ลากยาวเหลือ 2 ตัว
+        tail: เครื่องหมายท้ายประโยค ("…" เป็น "...")
+    """
+    text = _APOSTROPHES_RE.sub("'", text.strip()).replace("…", "...")
+    tail_match = _TAIL_RE.search(text)
+    core, tail = text[: tail_match.start()], tail_match.group(0).replace(" ", "")
+    core = _ELONGATED_RE.sub(r"\1\1", " ".join(core.lower().split()))
+    return core, tail
+
+
+class LexiconTrie:
+    """trie ของตัวอักษร - ค้นหาข้อความทั้งบรรทัดในรอบเดียว และหยุดทันทีเมื่อไม่มีกิ่งต่อ"""
+
+    def __init__(self):
+        self._root = {}
+        self.size = 0
+
+    def insert(self, key, value):
+        node = self._root
+        for char in key:
+            node = node.setdefault(char, {})
+        if _END not in node:
+            self.size += 1
+        node[_END] = value
+
+    def get(self, key):
+        node = self._root
+        for char in key:
+            node = node.get(char)
+            if node is None:
+                return None
+        return node.get(_END)
+
+
+class FastPathResolver:
+    """
+    Args:
+        lexicon_file: ไฟล์ lexicon ของผู้ใช้ (โหลดใหม่เมื่อไฟล์เปลี่ยน)
+        names: callable() -> collection ของชื่อตัวละครที่รู้จัก
+    """
+
+    def __init__(self, lexicon_file=LEXICON_FILE, names=None):
+        self.lexicon_file = lexicon_file
+        self._names = names
+        self._lock = threading.Lock()
+        self._lexicon_mtime = None
+        self._trie = LexiconTrie()
+        self.stats = {"lookups": 0, "hits": 0}
+        self.reload()
+
+    def reload(self):
+        """compile lexicon ใหม่ (ค่าเริ่มต้น + ไฟล์ของผู้ใช้)"""
+        lexicon = dict(DEFAULT_LEXICON)
+        mtime = None
+        if self.lexicon_file and os.path.exists(self.lexicon_file):
+            try:
+                mtime = os.path.getmtime(self.lexicon_file)
+                with open(self.lexicon_file, "r", encoding="utf-8") as f:
+                    lexicon.update(
+                        {str(k): str(v) for k, v in json.load(f).items() if k and v}
+                    )
+            except (OSError, ValueError, AttributeError) as e:
+                logging.error(f"FastPath: cannot load {self.lexicon_file}: {e}")
+
+        trie = LexiconTrie()
+        generic = {}
+        for phrase, translation in lexicon.items():
+            core, tail = normalize(phrase)
+            # เก็บทั้งรูปที่มีเครื่องหมายท้าย ("what?") และรูปกลาง ("what") ที่ต่อเครื่องหมายของต้นฉบับภายหลัง
+            trie.insert(core + tail, translation)
+            translation_core = _TAIL_RE.sub("", translation) or translation
+            if core and (core not in generic or not tail):
+                generic[core] = translation_core
+        for core, translation in generic.items():
+            trie.insert(core + "\0", translation)
+
+        with self._lock:
+            self._trie = trie
+            self._lexicon_mtime = mtime
+        logging.info(f"FastPath: compiled {trie.size} lexicon entries")
+
+    def _check_lexicon_file(self):
+        if not self.lexicon_file:
+            return
+        try:
+            mtime = os.path.getmtime(self.lexicon_file)
+        except OSError:
+            mtime = None
+        if mtime != self._lexicon_mtime:
+            self.reload()
+
+    def _known_names(self):
+        if self._names is None:
+            return ()
+        try:
+            return self._names()
+        except Exception:
+            return ()
+
+    def _resolve_content(self, text, names):
+        if _UNKNOWN_LINE_RE.match(text):
+            return FastPathResult("???", "unknown_speaker")
+        if _SYMBOLS_ONLY_RE.match(text):
+            return FastPathResult(text, "symbols")
+        if text in names:
+            return FastPathResult(text, "name")
+
+        core, tail = normalize(text)
+        translation = self._trie.get(core + tail)
+        if translation is not None:
+            return FastPathResult(translation, "lexicon")
+        translation = self._trie.get(core + "\0")
+        if translation is not None:
+            # ภาษาไทยไม่ใช้จุดจบประโยค; คำถามที่ไม่มี entry "X?" ส่งไปแปลตามปกติ
+            if tail in ("", "."):
+                return FastPathResult(translation, "lexicon")
+            if _REATTACH_TAIL_RE.match(tail):
+                return FastPathResult(translation + tail, "lexicon")
+
+        # Name! / Name? / Name...
+        name = text[: len(text) - len(_TAIL_RE.search(text).group(0))]
+        if tail in NAME_TAILS and name in names:
+            return FastPathResult(name + NAME_TAILS[tail], "name")
+        return None
+
+    def resolve(self, text, is_lore_text=False):
+        """
+        Returns:
+            FastPathResult(translation, reason) หรือ None ถ้าต้องส่งไปแปลตามปกติ
+        """
+        text = (text or "").strip()
+        if not text or len(text) > MAX_FAST_PATH_LENGTH:
+            return None
+        self.stats["lookups"] += 1
+        if is_lore_text:
+            result = FastPathResult(text, "symbols") if _SYMBOLS_ONLY_RE.match(text) else None
+        else:
+            names = self._known_names()
+            result = self._resolve_content(text, names)
+            if result is None and ":" in text:
+                speaker, content = (part.strip() for part in text.split(":", 1))
+                if content and (speaker in names or _UNKNOWN_SPEAKER_RE.match(speaker)):
+                    content_result = self._resolve_content(content, names)
+                    if content_result is not None:
+                        if _UNKNOWN_SPEAKER_RE.match(speaker):
+                            speaker = "???"
+                        result = FastPathResult(
+                            f"{speaker}: {content_result.translation}", content_result.reason
+                        )
+        if result is not None:
+            self.stats["hits"] += 1
+        return result
+
+
+_resolver = None
+_resolver_lock = threading.Lock()
+
+
+def get_fast_path_resolver():
+    """resolver ตัวเดียวที่ใช้ร่วมกันทุก translator - ชื่อตัวละครมาจาก TextCorrector ที่ใช้ร่วมกัน"""
+    global _resolver
+    with _resolver_lock:
+        if _resolver is None:
+
+            class _CorrectorNames:
+                # ไม่รวม set ทุกครั้งที่ค้นหา - ตรวจทั้งสองชุดของ TextCorrector ตรงๆ
+                def __init__(self, corrector):
+                    self.corrector = corrector
+
+                def __contains__(self, name):
+                    return name in getattr(self.corrector, "names", ()) or name in getattr(
+                        self.corrector, "confirmed_names", ()
+                    )
+
+            def names():
+                from translator_registry import get_shared_context
+
+                return _CorrectorNames(get_shared_context().text_corrector)
+
+            _resolver = FastPathResolver(names=names)
+        return _resolver
+
+
+def install_fast_path(translator, resolver=None):
+    """
+    ครอบ translate ของ translator ให้ตอบจาก FastPathResolver ก่อนชั้นอื่นทั้งหมด
+
+    Returns:
+        translator ตัวเดิม (มี attribute fast_path)
+    """
+    if getattr(translator, "fast_path", None) is not None:
+        return translator
+
+    resolver = resolver or get_fast_path_resolver()
+    translator.fast_path = resolver
+    original_translate = translator.translate
+
+    @functools.wraps(original_translate)
+    def translate(text, *args, **kwargs):
+        if not args and isinstance(text, str) and not set(kwargs) - {"is_lore_text"}:
+            result = resolver.resolve(text, is_lore_text=bool(kwargs.get("is_lore_text")))
+            if result is not None:
+                logging.debug(f"FastPath: {text!r} -> {result.translation!r} ({result.reason})")
+                return result.translation
+        return original_translate(text, *args, **kwargs)
+
+    translator.translate = translate
+
+    original_reload = getattr(translator, "reload_data", None)
+    if original_reload is not None:
+
+        @functools.wraps(original_reload)
+        def reload_data(*args, **kwargs):
+            resolver._check_lexicon_file()
+            return original_reload(*args, **kwargs)
+
+        translator.reload_data = reload_data
+
+    return translator
+
+
+def benchmark(repeat=2000):
+    """บทสนทนาตัวอย่าง: นับบรรทัดที่ตอบได้โดยไม่เรียก API และเวลาต่อการค้นหา"""
+    names = {"???", "Alphinaud", "Alisaie", "Tataru", "Estinien", "Y'shtola", "Thancred"}
+    resolver = FastPathResolver(lexicon_file=None, names=lambda: names)
+    lines = [
+        "Alphinaud: Hmmm...",
+        "Alisaie: We cannot afford to wait any longer. The Crystarium needs us.",
+        "Tataru?",
+        "Estinien!",
+        "Thancred: Aye.",
+        "???: ...",
+        "22: Wait!",
+        "Y'shtola: Thank you.",
+        "1,200",
+        "Alphinaud: Then it is settled. We make for Eulmore at first light.",
+        "Alisaie: Huh?!",
+        "Tataru: I have prepared everything you asked for, including the new robes!",
+        "Thancred: Very well.",
+        "What?",
+        "Alphinaud: The Exarch awaits us in the Ocular. Let us not keep him waiting.",
+        "Y'shtola: Nay.",
+    ]
+    hits = 0
+    for line in lines:
+        result = resolver.resolve(line)
+        hits += result is not None
+        shown = f"{result.translation!r} ({result.reason})" if result else "-> API"
+        print(f"  {line[:50]:52s}{shown}")
+
+    start_time = time.perf_counter()
+    for _ in range(repeat):
+        for line in lines:
+            resolver.resolve(line)
+    per_line_us = (time.perf_counter() - start_time) / (repeat * len(lines)) * 1e6
+    print(f"fast path: {hits}/{len(lines)} lines without an API call, {per_line_us:.1f} µs/line")
+    return hits / len(lines), per_line_us
+
+
+if __name__ == "__main__":
+    benchmark()
@@ -6,6 +6,7 @@ from pynput import mouse
 import json
 import win32api
 import win32con
+from area_geometry import AreaGeometry
 
 
 class HoverTranslator:
@@ -79,10 +80,13 @@ class HoverTranslator:
         self.continuous_translation_timer = None  # timer สำหรับตรวจจับการแปลต่อเนื่อง
         # ### สิ้นสุดตัวแปรการแปลต่อเนื่อง ###
         
-        # ### [NEW] Cache สำหรับ performance ###
-        self._scale_cache = None
-        self._scale_cache_time = 0
-        # ### สิ้นสุด Cache ###
+        # ### พิกัด preset ในพิกเซลจริง (คำนวณครั้งเดียว ใช้ร่วมกับ MBB) ###
+        self.area_geometry = callbacks.get(
+            "get_area_geometry",
+            lambda: AreaGeometry(
+                settings, lambda: (root.winfo_screenwidth(), root.winfo_screenheight())
+            ),
+        )()
 
         self.immunity_time = 3.0
         self.display_time = 2.0
@@ -177,6 +181,7 @@ class HoverTranslator:
 
                 if areas_str and coordinates:
                     self.allowed_preset_mapping[preset_num] = {
+                        "preset_num": preset_num,
                         "role": preset.get("role", ""),
                         "name": preset.get("name", f"Preset {preset_num}"),
                         "custom_name": preset.get("custom_name", ""),
@@ -295,10 +300,6 @@ class HoverTranslator:
             # รีเซ็ตสถานะทั้งหมด
             self.reset_hover_state()
             
-            # ล้าง cache
-            self._scale_cache = None
-            self._scale_cache_time = 0
-            
             # ปิด settings UI ถ้าเปิดอยู่
             if hasattr(self, 'settings_ui') and self.settings_ui:
                 if hasattr(self.settings_ui, 'close'):
@@ -309,22 +310,6 @@ class HoverTranslator:
         except Exception as e:
             logging.error(f"Error during HoverTranslator cleanup: {e}")
     
-    def get_cached_screen_scale(self):
-        """ดึงค่า screen scale แบบมี cache เพื่อประสิทธิภาพ"""
-        try:
-            current_time = time.time()
-            # Cache เป็นเวลา 1 วินาที
-            if self._scale_cache and current_time - self._scale_cache_time < 1.0:
-                return self._scale_cache
-            
-            # ดึงค่าใหม่และเก็บ cache
-            self._scale_cache = self.callbacks.get("get_screen_scale", lambda: (1, 1))()
-            self._scale_cache_time = current_time
-            return self._scale_cache
-        except Exception as e:
-            logging.error(f"Error getting screen scale: {e}")
-            return (1, 1)
-    
     def create_overlay_window(self):
         """สร้าง transparent overlay window คลุมทั้งหน้าจอ"""
         if self.overlay_window and self.overlay_window.winfo_exists():
@@ -586,21 +571,9 @@ class HoverTranslator:
         # ตรวจหา preset ที่เมาส์ชี้อยู่
         preset_found_this_check = None
         try:
-            scale_x, scale_y = self.get_cached_screen_scale()  # ใช้ cache แทน
-            for preset_num, preset_data in self.allowed_preset_mapping.items():
-                if "coordinates" not in preset_data: continue
-                for area, coords in preset_data["coordinates"].items():
-                    if not all(k in coords for k in ["start_x", "start_y", "end_x", "end_y"]): continue
-                    
-                    start_x_scaled = int(coords["start_x"] * scale_x)
-                    start_y_scaled = int(coords["start_y"] * scale_y)
-                    end_x_scaled = int(coords["end_x"] * scale_x)
-                    end_y_scaled = int(coords["end_y"] * scale_y)
-                    
-                    if (start_x_scaled <= x <= end_x_scaled) and (start_y_scaled <= y <= end_y_scaled):
-                        preset_found_this_check = preset_num
-                        break
-                if preset_found_this_check: break
+            preset_found_this_check = self.area_geometry.hit_test(
+                x, y, self.allowed_preset_mapping
+            )
         except Exception as e:
             logging.error(f"Error during area check in check_mouse_position: {e}")
             return
@@ -734,16 +707,17 @@ class HoverTranslator:
         
         logging.info(f"Using Area '{positioning_area_code}' to position confirmation button for Preset {preset_num}.")
 
-        coords = preset_data["coordinates"][positioning_area_code]
-        scale_x, scale_y = self.get_cached_screen_scale()  # ใช้ cache แทน
+        area_rect = self.area_geometry.preset_rects(preset_num).get(positioning_area_code)
+        if area_rect is None:
+            return
         
         # ### [v1.1] ปรับตำแหน่งปุ่มให้แสดงเหนือกล่อง area เพื่อไม่บังชื่อตัวละคร ###
         btn_width = 90     # ขนาดกะทัดรัด
         btn_height = 32    # ความสูงพอดี
         gap = 8            # ระยะห่างจากขอบบนของ area
         
-        btn_x = int(coords["start_x"] * scale_x)  # X: ซ้ายเหมือนเดิม
-        btn_y = int(coords["start_y"] * scale_y) - btn_height - gap  # Y: เหนือ area
+        btn_x = area_rect.x1  # X: ซ้ายเหมือนเดิม
+        btn_y = area_rect.y1 - btn_height - gap  # Y: เหนือ area
         # ### สิ้นสุดการปรับตำแหน่งปุ่ม ###
 
         # วาดปุ่มบน canvas
@@ -1118,19 +1092,15 @@ class HoverTranslator:
             # ล้างหน้าต่างเก่าก่อน
             self.clear_hover_windows()
 
-            # ดึงค่า scale ของหน้าจอ
-            scale_x, scale_y = self.get_cached_screen_scale()  # ใช้ cache แทน
+            # พิกัดที่ปรับ scale แล้วของ preset นี้
+            area_rects = self.area_geometry.preset_rects(preset_data.get("preset_num"))
 
             # สร้างหน้าต่างสำหรับแต่ละพื้นที่
             for area in preset_data["areas"]:
-                if area in preset_data["coordinates"]:
-                    coords = preset_data["coordinates"][area]
-
-                    # ปรับพิกัดด้วย scale
-                    start_x = int(coords["start_x"] * scale_x)
-                    start_y = int(coords["start_y"] * scale_y)
-                    end_x = int(coords["end_x"] * scale_x)
-                    end_y = int(coords["end_y"] * scale_y)
+                if area in area_rects:
+                    area_rect = area_rects[area]
+                    start_x, start_y = area_rect.x1, area_rect.y1
+                    end_x, end_y = area_rect.x2, area_rect.y2
 
                     # สร้างหน้าต่าง
                     window = tk.Toplevel(self.root)
@@ -0,0 +1,216 @@
+"""
+Line parser: แยกชื่อผู้พูด/เนื้อหาของข้อความจาก OCR ครั้งเดียวต่อข้อความ แล้วส่ง ParsedLine ต่อไปทั้ง pipeline
+(MBB -> translator -> Translated_UI) แทนการให้แต่ละขั้น split ใหม่เอง
+
+- ลำดับการตรวจ: กรณีพิเศษ (???/22/222) -> ตัวคั่น (TextCorrector) -> EnhancedNameDetector (fuzzy)
+- ผลลัพธ์ memoize ต่อข้อความที่ normalize แล้ว (รวมช่องว่าง) - ข้อความเดิมที่ OCR อ่านซ้ำทุกรอบ
+  และ translator ที่ parse ข้อความเดียวกันต่อจาก MBB ได้ผลจาก cache ทันที
+- cache ผูกกับข้อมูล NPC: TextCorrector ล้าง cache เมื่อโหลดข้อมูลใหม่ (clear())
+
+รัน `python line_parser.py` เพื่อวัดเวลาการ parse ซ้ำแบบเดิมเทียบกับแบบ memoize
+"""
+
+import logging
+import re
+import threading
+import time
+from collections import OrderedDict, namedtuple
+
+MAX_ENTRIES = 512
+
+# ข้อความทั้งบรรทัดที่ OCR อ่านชื่อ ??? ผิดเป็นเลข 2
+_MYSTERY_RE = re.compile(r"^(?:\?{2,3}|2{1,3})\??$")
+_WHITESPACE_RE = re.compile(r"\s+")
+
+# วิธีที่ใช้หาชื่อผู้พูด (ParsedLine.method)
+METHOD_SPECIAL = "special"  # ทั้งบรรทัดคือ ??? (ไม่มีเนื้อหา)
+METHOD_KNOWN = "known_name"  # ตัวคั่น + ชื่ออยู่ในฐานข้อมูล NPC
+METHOD_SEPARATOR = "separator"  # ตัวคั่น + ชื่อใหม่ที่ผ่านเกณฑ์
+METHOD_ENHANCED = "enhanced"  # EnhancedNameDetector (fuzzy / ไม่มีตัวคั่น)
+METHOD_NONE = "none"  # ไม่พบชื่อผู้พูด
+
+
+class ParsedLine(
+    namedtuple(
+        "ParsedLine",
+        ["text", "speaker", "content", "dialogue_type", "confidence", "method"],
+    )
+):
+    """
+    ผลการแยกข้อความหนึ่งบรรทัด
+
+    text: ข้อความที่ normalize แล้ว, speaker: ชื่อผู้พูดหรือ None, content: เนื้อหา,
+    dialogue_type: text_corrector.DialogueType, confidence: ความมั่นใจของชื่อ (0-1), method: METHOD_*
+    """
+
+    __slots__ = ()
+
+    @property
+    def has_speaker(self):
+        return bool(self.speaker)
+
+    @property
+    def combined(self):
+        """รูปแบบ 'Speaker: content' ที่ส่งให้ translator"""
+        if self.speaker and self.content:
+            return f"{self.speaker}: {self.content}"
+        return self.speaker or self.content
+
+
+def normalize_line(text):
+    return _WHITESPACE_RE.sub(" ", text or "").strip()
+
+
+class LineParser:
+    """
+    Args:
+        text_corrector: TextCorrector ที่ให้ split_speaker_and_content / names / enhanced_detector
+        max_entries: จำนวนข้อความที่ memoize ไว้ (LRU)
+    """
+
+    def __init__(self, text_corrector, max_entries=MAX_ENTRIES):
+        self.text_corrector = text_corrector
+        self.max_entries = max_entries
+        self._lock = threading.Lock()
+        self._entries = OrderedDict()
+        self.stats = {"hits": 0, "misses": 0}
+
+    def parse(self, text):
+        """
+        memoize ด้วยข้อความที่ normalize แล้ว แต่ parse ข้อความจริง (ไม่ยุบช่องว่าง) เพื่อให้ content
+        คงการขึ้นบรรทัดใหม่ไว้ - ข้อความที่มีการขึ้นบรรทัดต่างจากที่ memoize ไว้จะถูก parse ใหม่
+        """
+        raw = (text or "").strip()
+        key = normalize_line(raw)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and (
+                entry[0] == raw or ("\n" not in raw and "\n" not in entry[0])
+            ):
+                self._entries.move_to_end(key)
+                self.stats["hits"] += 1
+                return entry[1]
+            self.stats["misses"] += 1
+
+        parsed = self._parse(raw)._replace(text=key)
+        with self._lock:
+            self._entries[key] = (raw, parsed)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+        return parsed
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    # ---- parsing ----
+
+    def _parse(self, text):
+        from text_corrector import DialogueType
+
+        if not text:
+            return ParsedLine(text, None, "", DialogueType.NORMAL, 0.0, METHOD_NONE)
+
+        if _MYSTERY_RE.match(text):
+            return ParsedLine(text, "???", "", DialogueType.CHARACTER, 1.0, METHOD_SPECIAL)
+
+        corrector = self.text_corrector
+        detector = getattr(corrector, "enhanced_detector", None)
+
+        try:
+            speaker, content, dialogue_type = corrector.split_speaker_and_content(text)
+        except (TypeError, ValueError, AttributeError) as e:
+            logging.warning(f"LineParser: split failed ({e}), treating as normal text")
+            speaker, content, dialogue_type = None, text, DialogueType.NORMAL
+
+        if speaker:
+            if speaker.startswith("?"):
+                speaker = "???"
+            if speaker == "???" or speaker in getattr(corrector, "names", ()) or speaker in getattr(
+                corrector, "confirmed_names", ()
+            ):
+                return ParsedLine(text, speaker, content, dialogue_type, 1.0, METHOD_KNOWN)
+            confidence = detector.evaluate_name_quality(speaker) if detector else 0.5
+            return ParsedLine(text, speaker, content, dialogue_type, confidence, METHOD_SEPARATOR)
+
+        if detector is not None:
+            try:
+                speaker, content, detected_type = detector.enhanced_split_speaker_and_content(text)
+            except Exception as e:
+                logging.warning(f"LineParser: EnhancedNameDetector failed: {e}")
+                speaker = None
+            if speaker:
+                # EnhancedNameDetector ใช้ enum ของตัวเอง - แปลงเป็น DialogueType กลาง
+                dialogue_type = DialogueType(detected_type.value)
+                if speaker == "???":
+                    # ??? ที่มีเนื้อหาคือบทพูดปกติของผู้พูดนิรนาม - METHOD_SPECIAL ใช้เฉพาะบรรทัดที่ไม่มีเนื้อหา
+                    method = METHOD_KNOWN if content else METHOD_SPECIAL
+                    return ParsedLine(text, speaker, content, dialogue_type, 1.0, method)
+                return ParsedLine(
+                    text,
+                    speaker,
+                    content,
+                    dialogue_type,
+                    detector.evaluate_name_quality(speaker),
+                    METHOD_ENHANCED,
+                )
+
+        return ParsedLine(text, None, content or text, DialogueType.NORMAL, 0.0, METHOD_NONE)
+
+
+def benchmark(repeats=200):
+    """
+    เทียบการ split ซ้ำแบบเดิม (MBB + TextCorrector.correct_text + translator + EnhancedNameDetector
+    = 4 ครั้งต่อบรรทัด) กับการ parse ครั้งเดียวแล้วใช้ผลที่ memoize ไว้
+    """
+    from enhanced_name_detector import EnhancedNameDetector
+
+    class _Corrector:
+        names = {"???", "Y'shtola", "Alphinaud", "Alisaie", "Thancred", "Urianger"}
+        confirmed_names = set()
+
+        def __init__(self):
+            self.enhanced_detector = EnhancedNameDetector(self.names)
+
+        def split_speaker_and_content(self, text):
+            if ": " in text:
+                speaker, content = text.split(": ", 1)
+                from text_corrector import DialogueType
+
+                return speaker.strip(), content.strip(), DialogueType.CHARACTER
+            return None, text, None
+
+    lines = [
+        "Y'shtola: The aether here is thick with something foul.",
+        "Alphinaud: We should make for the Crystarium at once.",
+        "Alisaie Then let us not keep them waiting.",
+        "The wind howls across the empty plains.",
+    ]
+    corrector = _Corrector()
+    detector = corrector.enhanced_detector
+
+    start_time = time.perf_counter()
+    for _ in range(repeats):
+        for line in lines:
+            for _ in range(3):
+                corrector.split_speaker_and_content(line)
+            detector.enhanced_split_speaker_and_content(line)
+    old_us = (time.perf_counter() - start_time) * 1e6 / (repeats * len(lines))
+
+    parser = LineParser(corrector)
+    start_time = time.perf_counter()
+    for _ in range(repeats):
+        for line in lines:
+            for _ in range(4):
+                parser.parse(line)
+    new_us = (time.perf_counter() - start_time) * 1e6 / (repeats * len(lines))
+
+    for line in lines:
+        print(f"  {parser.parse(line)}")
+    print(f"per OCR line: repeated splits {old_us:.1f} us, parsed once {new_us:.1f} us")
+    print(f"memo: {parser.stats}")
+    return old_us, new_us
+
+
+if __name__ == "__main__":
+    benchmark()
@@ -0,0 +1,173 @@
+"""
+Lore segmenter: แปลข้อความ Lore/บรรยายยาวๆ (พื้นที่ C) ทีละประโยคแทนทั้งย่อหน้า
+
+quest log ที่เลื่อน หรือ codex ที่เปลี่ยนหน้า มักเปลี่ยนแค่บางประโยค แต่แบบเดิมทั้งย่อหน้ากลายเป็น key ใหม่
+และถูกแปลใหม่ทั้งหมด - ที่นี่แยกย่อหน้าเป็นประโยค (รู้จักคำย่ออย่าง Mr. / St. / e.g. และตัวย่อชื่อ),
+หาคำแปลของแต่ละประโยคจาก TranslationMemory, ส่งเฉพาะประโยคที่ยังไม่เคยแปลใน batch request เดียว
+แล้วประกอบกลับตามลำดับเดิม คำแปลแต่ละประโยคถูกเก็บแยกกัน (kind "lore_sentence")
+
+ใช้ได้กับ translator ที่มี batch_translator และ _get_batch_instructions() (Gemini, Claude)
+translator อื่นยังได้ประโยชน์เมื่อทุกประโยคเคยแปลแล้ว มิฉะนั้นแปลทั้งย่อหน้าแบบเดิม
+
+รัน `python lore_segmenter.py` เพื่อจำลองการเปิด codex ทีละหน้าและนับข้อความที่ส่งไปยัง API
+"""
+
+import logging
+import re
+
+from request_scheduler import PRIORITY_LORE
+
+MEMORY_KIND = "lore_sentence"
+# ข้อความสั้นกว่านี้แปลทั้งก้อนตามเดิม (แยกแล้วไม่คุ้ม)
+MIN_SEGMENT_LENGTH = 80
+
+ABBREVIATIONS = frozenset(
+    {
+        "mr", "mrs", "ms", "dr", "st", "mt", "jr", "sr", "prof", "capt", "lt", "col",
+        "gen", "sgt", "vs", "etc", "e.g", "i.e", "approx", "no", "vol", "ch", "fig",
+        "lv", "lvl", "ft", "ca", "cf",
+    }
+)
+
+# จุดที่อาจเป็นจบประโยค: เครื่องหมายจบ + วงเล็บ/อัญประกาศปิด ตามด้วยช่องว่าง
+_BOUNDARY_RE = re.compile(r"([.!?…]+[\"'”’)\]]*)(\s+)")
+_NEXT_START_RE = re.compile(r"[\"'“‘(\[]*[A-Z0-9]")
+_LAST_WORD_RE = re.compile(r"([A-Za-z][A-Za-z.]*)\.$")
+
+
+def _is_abbreviation(text_before):
+    match = _LAST_WORD_RE.search(text_before)
+    if not match:
+        return False
+    word = match.group(1)
+    # ตัวย่อชื่อ (J. R.) หรือคำย่อที่รู้จัก
+    return (len(word) == 1 and word.isupper()) or word.lower() in ABBREVIATIONS
+
+
+def split_sentences(text):
+    """
+    แยกข้อความเป็นประโยค
+
+    Returns:
+        list ของ (sentence, separator) - separator คือช่องว่างเดิมหลังประโยค
+        ("".join(s + sep) ได้ข้อความเดิม)
+    """
+    segments = []
+    start = 0
+    for match in _BOUNDARY_RE.finditer(text):
+        end = match.end(1)
+        if not _NEXT_START_RE.match(text, match.end()):
+            continue  # ... ตามด้วยตัวพิมพ์เล็ก = ยังไม่จบประโยค
+        if match.group(1).startswith(".") and len(match.group(1).rstrip("\"'”’)]")) == 1:
+            if _is_abbreviation(text[start:end]):
+                continue
+        sentence = text[start:end]
+        if sentence.strip():
+            segments.append((sentence, match.group(2)))
+        start = match.end()
+    tail = text[start:]
+    if tail.strip():
+        segments.append((tail.rstrip(), tail[len(tail.rstrip()) :]))
+    return segments
+
+
+def translate_lore(translator, text, memory, translate_whole):
+    """
+    แปลข้อความ Lore ทีละประโยค
+
+    Args:
+        translator: translator จริง (ใช้ batch_translator / _get_batch_instructions ถ้ามี)
+        text: ย่อหน้าที่ต้องการแปล
+        memory: TranslationMemory สำหรับคำแปลรายประโยค
+        translate_whole: ฟังก์ชันแปลทั้งย่อหน้าแบบเดิม (fallback)
+
+    Returns:
+        str: คำแปลทั้งย่อหน้า
+    """
+    segments = split_sentences(text) if len(text) >= MIN_SEGMENT_LENGTH else []
+    if len(segments) < 2:
+        return translate_whole(text)
+
+    translations = [memory.lookup(sentence, MEMORY_KIND) for sentence, _ in segments]
+    missing = [index for index, translation in enumerate(translations) if translation is None]
+
+    if missing:
+        batch_translator = getattr(translator, "batch_translator", None)
+        get_instructions = getattr(translator, "_get_batch_instructions", None)
+        if batch_translator is None or get_instructions is None:
+            return translate_whole(text)
+        instructions = (
+            get_instructions()
+            + "\n\nThe segments are consecutive sentences of one lore/narration passage. "
+            "Keep terminology and narrative tone consistent between them."
+        )
+        try:
+            batch_results = batch_translator.translate_segments(
+                [segments[index][0] for index in missing],
+                instructions,
+                dialogue_type="lore",
+                priority=PRIORITY_LORE,
+            )
+        except Exception as e:
+            logging.warning(f"LoreSegmenter: batch failed ({e}), translating whole paragraph")
+            return translate_whole(text)
+        for index, translation in zip(missing, batch_results):
+            translations[index] = translation
+            memory.store(segments[index][0], translation, MEMORY_KIND)
+
+    logging.info(
+        f"LoreSegmenter: {len(segments)} sentences, {len(missing)} translated, "
+        f"{len(segments) - len(missing)} from memory"
+    )
+    return "".join(
+        translation + (" " if separator and "\n" not in separator else separator)
+        for translation, (_, separator) in zip(translations, segments)
+    ).strip()
+
+
+def benchmark():
+    """เปิด codex 3 หน้าที่แต่ละหน้าเลื่อนไปหนึ่งประโยค - นับตัวอักษรที่ส่งไปแปล"""
+    import json
+
+    from batch_translation import BatchTranslator
+    from translation_memory import TranslationMemory
+
+    pages_source = [
+        "The Crystal Tower was raised by the Allagan Empire some five thousand years ago.",
+        "Its architect, Amon, sought to harness the power of the sun itself.",
+        "When the tower fell silent, St. Coinach's Find began to excavate its base.",
+        "Dr. Cid nan Garlond later led an expedition into its depths, e.g. the Labyrinth.",
+        "What they found there would change the fate of Eorzea forever.",
+    ]
+    pages = [" ".join(pages_source[i : i + 3]) for i in range(3)]
+
+    sent = {"whole": 0, "segmented": 0}
+
+    class _Translator:
+        def __init__(self):
+            self.batch_translator = BatchTranslator(self._send)
+
+        def _get_batch_instructions(self):
+            return "Translate to Thai."
+
+        def _send(self, prompt, expected_count, priority=None):
+            segments = prompt.split("SEGMENTS:\n", 1)[1]
+            sent["segmented"] += len(segments)
+            return json.dumps([f"<th:{item['text'][:12]}>" for item in json.loads(segments)])
+
+    translator = _Translator()
+    memory = TranslationMemory()
+    for page in pages:
+        sent["whole"] += len(page)
+        translated = translate_lore(translator, page, memory, lambda text: text)
+        print(f"  {translated[:90]}...")
+    print(f"sentences: {[s for s, _ in split_sentences(pages[1])]}")
+    print(
+        f"characters sent: whole-paragraph {sent['whole']}, "
+        f"sentence-level {sent['segmented']} (incl. JSON framing)"
+    )
+    return sent
+
+
+if __name__ == "__main__":
+    benchmark()
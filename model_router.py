@@ -0,0 +1,471 @@
+"""
+Model router: เลือกโมเดลต่อบรรทัดระหว่างโมเดลเร็ว/ถูก กับโมเดลหลักที่ตั้งค่าไว้ (strong)
+
+- บรรทัดสั้น/ประโยคติดปาก ("Hm...", "Thank you."), choice และผู้พูดที่เพิ่งพูดต่อเนื่อง -> โมเดลเร็ว
+- Lore, บรรทัดยาวหรือหลายประโยค -> โมเดลหลัก
+- เก็บ latency ล่าสุดของแต่ละโมเดล (p95 แบบ rolling): ถ้าโมเดลหลักช้าเกินงบสำหรับบรรทัดขนาดกลาง
+  ส่งไปโมเดลเร็ว และถ้าโมเดลเร็วไม่ได้เร็วกว่าจริงก็ไม่ส่งไป
+- ทุกการเรียกมี timeout (จาก p95) - หมดเวลาหรือ error จะลองโมเดลถัดไป (รวมถึงข้าม provider
+  ถ้าตั้ง fallback_model ไว้)
+
+ตั้งค่าใน settings["model_routing"]: {"enabled": bool, "fast_model": str, "fallback_model": str|None}
+ปิดไว้เป็นค่าเริ่มต้น (โมเดลเร็วอาจไม่มีใน key/แพ็กเกจของผู้ใช้) - route ที่ล้มเหลวติดต่อกันจะถูกปิดเอง
+reload_data / update_parameters ส่งต่อไปทุก route ที่สร้างแล้ว
+attribute / method อื่นทั้งหมดส่งต่อไปยัง translator ของโมเดลหลัก
+
+รัน `python model_router.py` เพื่อจำลองด้วย provider ปลอมที่มี latency ต่างกัน
+"""
+
+import inspect
+import logging
+import re
+import threading
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from concurrent.futures import TimeoutError as FutureTimeoutError
+
+ROUTE_FAST = "fast"
+ROUTE_STRONG = "strong"
+ROUTE_FALLBACK = "fallback"
+
+# โมเดลเร็วเริ่มต้นของแต่ละ provider (ใช้ API key เดียวกับโมเดลหลัก)
+DEFAULT_FAST_MODELS = {
+    "gemini": "gemini-2.0-flash-lite",
+    "claude": "claude-3-5-haiku-latest",
+    "gpt": "gpt-4o-mini",
+}
+
+SHORT_LINE = 40
+MEDIUM_LINE = 110
+LONG_LINE = 180
+# ผู้พูดคนเดียวกันใน N บรรทัดล่าสุด = บทสนทนาต่อเนื่อง (บริบทตัวละครอยู่ใน prompt อยู่แล้ว)
+RECENT_SPEAKERS = 4
+# ถ้า p95 ของโมเดลหลักเกินนี้ (วินาที) บรรทัดขนาดกลางไปโมเดลเร็ว
+STRONG_LATENCY_BUDGET = 3.0
+
+LATENCY_WINDOW = 50
+MIN_LATENCY_SAMPLES = 5
+DEFAULT_TIMEOUT = 12.0
+MIN_TIMEOUT = 4.0
+MAX_TIMEOUT = 20.0
+TIMEOUT_FACTOR = 2.5
+# ล้มเหลว (error / timeout / ผล "[Error") ติดต่อกันเท่านี้ = ปิด route นั้น (ยกเว้นโมเดลหลัก)
+MAX_CONSECUTIVE_FAILURES = 3
+POOL_SIZE = 4
+# การเรียกที่หมดเวลาแต่ยังค้างอยู่ของ route หนึ่งเกินนี้ = ข้าม route นั้นไปก่อน
+MAX_HUNG_PER_ROUTE = 2
+
+_FORMULAIC_RE = re.compile(
+    r"^(?:h+m+|a+h+|o+h+|u+h+|e+h+|huh|what|yes|no|yeah|nay|aye|indeed|very well|"
+    r"thank you|thanks|hello|farewell|good ?bye|i see|ugh|hmph|ha(?:ha)+|\.\.\.)"
+    r"[\s.!?…,~-]*$",
+    re.IGNORECASE,
+)
+_SENTENCE_END_RE = re.compile(r"[.!?…][\"')\]]*\s+[A-Z\"']")
+_FAILED_PREFIXES = ("[Error", "[ERROR", "[Translation Error")
+
+
+class LatencyTracker:
+    """latency ล่าสุดของแต่ละโมเดล (rolling window)"""
+
+    def __init__(self, window=LATENCY_WINDOW):
+        self.window = window
+        self._lock = threading.Lock()
+        self._samples = {}
+
+    def record(self, model, seconds):
+        with self._lock:
+            self._samples.setdefault(model, deque(maxlen=self.window)).append(seconds)
+
+    def p95(self, model):
+        """p95 latency (วินาที) หรือ None ถ้ายังมีตัวอย่างไม่พอ"""
+        with self._lock:
+            samples = sorted(self._samples.get(model, ()))
+        if len(samples) < MIN_LATENCY_SAMPLES:
+            return None
+        return samples[min(len(samples) - 1, int(len(samples) * 0.95))]
+
+    def timeout_for(self, model):
+        p95 = self.p95(model)
+        if p95 is None:
+            return DEFAULT_TIMEOUT
+        return max(MIN_TIMEOUT, min(MAX_TIMEOUT, p95 * TIMEOUT_FACTOR))
+
+
+class _RouteSettings:
+    """Settings ที่เหมือนเดิมทุกอย่าง ยกเว้นชื่อโมเดลใน get_api_parameters()"""
+
+    def __init__(self, settings, model):
+        self._settings = settings
+        self._model = model
+
+    def get_api_parameters(self):
+        params = dict(self._settings.get_api_parameters())
+        params["model"] = self._model
+        return params
+
+    def __getattr__(self, name):
+        return getattr(self._settings, name)
+
+
+def _accepted_kwargs(func, kwargs):
+    """ตัด keyword ที่ translate ของ provider นั้นไม่รู้จักออก (signature ของแต่ละ provider ต่างกัน)"""
+    try:
+        parameters = inspect.signature(func).parameters
+    except (TypeError, ValueError):
+        return kwargs
+    if any(p.kind == inspect.Parameter.VAR_KEYWORD for p in parameters.values()):
+        return kwargs
+    return {key: value for key, value in kwargs.items() if key in parameters}
+
+
+class ModelRouter:
+    """
+    Args:
+        strong: translator ของโมเดลหลัก (สร้างแล้ว)
+        strong_model: ชื่อโมเดลหลัก
+        route_factory: callable(model) -> translator สำหรับสร้างโมเดลอื่นเมื่อใช้ครั้งแรก
+        fast_model / fallback_model: ชื่อโมเดล (None = ไม่ใช้)
+        speaker_of: callable(text) -> ชื่อผู้พูดหรือ None
+    """
+
+    def __init__(
+        self,
+        strong,
+        strong_model,
+        route_factory,
+        fast_model=None,
+        fallback_model=None,
+        speaker_of=None,
+        latency=None,
+    ):
+        object.__setattr__(self, "routed_translator", strong)
+        self.strong_model = strong_model
+        self.models = {ROUTE_STRONG: strong_model}
+        if fast_model and fast_model != strong_model:
+            self.models[ROUTE_FAST] = fast_model
+        if fallback_model and fallback_model not in (strong_model, fast_model):
+            self.models[ROUTE_FALLBACK] = fallback_model
+        self._route_factory = route_factory
+        self._translators = {ROUTE_STRONG: strong}
+        self._failed_routes = set()
+        self._consecutive_failures = {}
+        self._outstanding = {}  # route -> จำนวนการเรียกที่ยังไม่จบ (รวมที่หมดเวลาแล้ว)
+        self._pool_lock = threading.Lock()
+        self._create_lock = threading.Lock()
+        self._speaker_of = speaker_of
+        self._recent_speakers = deque(maxlen=RECENT_SPEAKERS)
+        self.latency = latency or LatencyTracker()
+        self._executor = ThreadPoolExecutor(max_workers=POOL_SIZE, thread_name_prefix="model-router")
+        self.stats = {ROUTE_FAST: 0, ROUTE_STRONG: 0, ROUTE_FALLBACK: 0, "timeouts": 0, "errors": 0}
+
+    # ---- delegation ----
+
+    def __getattr__(self, name):
+        return getattr(self.routed_translator, name)
+
+    def reload_data(self):
+        result = None
+        for route, translator in list(self._translators.items()):
+            if hasattr(translator, "reload_data"):
+                try:
+                    route_result = translator.reload_data()
+                except Exception as e:
+                    if route == ROUTE_STRONG:
+                        raise
+                    logging.error(f"ModelRouter: reload_data failed on {route} route: {e}")
+                    continue
+                if route == ROUTE_STRONG:
+                    result = route_result
+        return result
+
+    def update_parameters(self, *args, **kwargs):
+        """โมเดลหลักได้ค่าตามที่ส่งมา route อื่นได้ค่าเดียวกันยกเว้นชื่อโมเดล (แต่ละ route ใช้โมเดลของตัวเอง)"""
+        result = self.routed_translator.update_parameters(*args, **kwargs)
+        if args:
+            return result
+        route_kwargs = {key: value for key, value in kwargs.items() if key != "model"}
+        for route, translator in list(self._translators.items()):
+            if route == ROUTE_STRONG or not hasattr(translator, "update_parameters"):
+                continue
+            try:
+                translator.update_parameters(**route_kwargs)
+            except Exception as e:
+                logging.error(f"ModelRouter: update_parameters failed on {route} route: {e}")
+        return result
+
+    # ---- routing ----
+
+    def _speaker(self, text):
+        if self._speaker_of is None:
+            return None
+        try:
+            return self._speaker_of(text)
+        except Exception:
+            return None
+
+    def choose(self, text, is_lore_text=False, is_choice=False):
+        """ลำดับ route ที่จะลอง (ตัวแรกคือ route หลักของบรรทัดนี้) และเหตุผล"""
+        text = (text or "").strip()
+        speaker = None if is_lore_text or is_choice else self._speaker(text)
+        repeated = speaker is not None and speaker in self._recent_speakers
+        if speaker:
+            self._recent_speakers.append(speaker)
+
+        if ROUTE_FAST not in self.models or ROUTE_FAST in self._failed_routes:
+            primary, reason = ROUTE_STRONG, "single_model"
+        elif is_lore_text or len(text) > LONG_LINE or len(_SENTENCE_END_RE.findall(text)) >= 2:
+            primary, reason = ROUTE_STRONG, "long_or_lore"
+        elif is_choice:
+            primary, reason = ROUTE_FAST, "choice"
+        elif len(text) <= SHORT_LINE or _FORMULAIC_RE.match(text.split(":", 1)[-1].strip()):
+            primary, reason = ROUTE_FAST, "short"
+        elif repeated and len(text) <= MEDIUM_LINE:
+            primary, reason = ROUTE_FAST, "repeated_speaker"
+        else:
+            strong_p95 = self.latency.p95(self.models[ROUTE_STRONG])
+            if strong_p95 is not None and strong_p95 > STRONG_LATENCY_BUDGET and len(text) <= MEDIUM_LINE:
+                primary, reason = ROUTE_FAST, "strong_slow"
+            else:
+                primary, reason = ROUTE_STRONG, "default"
+
+        if primary == ROUTE_FAST:
+            fast_p95 = self.latency.p95(self.models[ROUTE_FAST])
+            strong_p95 = self.latency.p95(self.models[ROUTE_STRONG])
+            if fast_p95 is not None and strong_p95 is not None and fast_p95 >= strong_p95:
+                primary, reason = ROUTE_STRONG, "fast_not_faster"
+
+        order = [primary] + [
+            route
+            for route in (ROUTE_STRONG, ROUTE_FAST, ROUTE_FALLBACK)
+            if route != primary and route in self.models and route not in self._failed_routes
+        ]
+        return order, reason
+
+    def _translator_for(self, route):
+        translator = self._translators.get(route)
+        if translator is not None:
+            return translator
+        with self._create_lock:
+            translator = self._translators.get(route)
+            if translator is None and route not in self._failed_routes:
+                try:
+                    translator = self._route_factory(self.models[route])
+                    self._translators[route] = translator
+                    logging.info(f"ModelRouter: created {route} route ({self.models[route]})")
+                except Exception as e:
+                    logging.error(f"ModelRouter: cannot create {route} route: {e}")
+                    self._failed_routes.add(route)
+            return translator
+
+    def _record_outcome(self, route, ok):
+        if ok:
+            self._consecutive_failures[route] = 0
+            return
+        failures = self._consecutive_failures.get(route, 0) + 1
+        self._consecutive_failures[route] = failures
+        if route != ROUTE_STRONG and failures >= MAX_CONSECUTIVE_FAILURES:
+            if route not in self._failed_routes:
+                logging.error(
+                    f"ModelRouter: disabling {route} route ({self.models[route]}) "
+                    f"after {failures} consecutive failures"
+                )
+            self._failed_routes.add(route)
+
+    def _submit(self, route, method, text, kwargs):
+        """
+        ส่งงานเข้า pool - คืน None ถ้า route นี้มีการเรียกที่ค้างอยู่มากเกินไป
+        การเรียกที่หมดเวลายังครอง worker อยู่ ถ้า pool เต็มด้วยงานค้างจะสร้าง pool ใหม่แทนการรอคิว
+        """
+        with self._pool_lock:
+            if self._outstanding.get(route, 0) >= MAX_HUNG_PER_ROUTE:
+                return None
+            if sum(self._outstanding.values()) >= POOL_SIZE:
+                logging.warning("ModelRouter: worker pool saturated by hung calls, starting a new pool")
+                self._executor.shutdown(wait=False)
+                self._executor = ThreadPoolExecutor(
+                    max_workers=POOL_SIZE, thread_name_prefix="model-router"
+                )
+                self._outstanding = {key: 0 for key in self._outstanding}
+            self._outstanding[route] = self._outstanding.get(route, 0) + 1
+            executor = self._executor
+
+        def release(_future, pool=executor):
+            with self._pool_lock:
+                # งานของ pool เก่าที่ถูกแทนไปแล้วไม่นับ
+                if pool is self._executor and self._outstanding.get(route, 0) > 0:
+                    self._outstanding[route] -= 1
+
+        future = executor.submit(method, text, **_accepted_kwargs(method, kwargs))
+        future.add_done_callback(release)
+        return future
+
+    def _call(self, method_name, text, kwargs, is_lore_text=False, is_choice=False):
+        order, reason = self.choose(text, is_lore_text=is_lore_text, is_choice=is_choice)
+        last_result, last_error = None, None
+        for attempt, route in enumerate(order):
+            translator = self._translator_for(route)
+            if translator is None:
+                continue
+            method = getattr(translator, method_name)
+            model = self.models[route]
+            timeout = self.latency.timeout_for(model)
+            start_time = time.perf_counter()
+            future = self._submit(route, method, text, kwargs)
+            if future is None:
+                logging.warning(f"ModelRouter: {model} has hung calls outstanding, skipping")
+                continue
+            try:
+                result = future.result(timeout=timeout)
+            except FutureTimeoutError:
+                future.cancel()
+                self.stats["timeouts"] += 1
+                self._record_outcome(route, False)
+                # นับเวลาที่รอเป็น latency ของโมเดลนี้ เพื่อให้ p95 สะท้อนว่าช้า
+                self.latency.record(model, timeout)
+                logging.warning(f"ModelRouter: {model} timed out after {timeout:.1f}s, trying next")
+                continue
+            except Exception as e:
+                self.stats["errors"] += 1
+                self._record_outcome(route, False)
+                last_error = e
+                logging.warning(f"ModelRouter: {model} failed ({e}), trying next")
+                continue
+            self.latency.record(model, time.perf_counter() - start_time)
+            failed = isinstance(result, str) and result.startswith(_FAILED_PREFIXES)
+            self._record_outcome(route, not failed)
+            if failed and attempt + 1 < len(order):
+                last_result = result
+                continue
+            self.stats[route if attempt == 0 else ROUTE_FALLBACK] += 1
+            logging.debug(f"ModelRouter: {route} ({model}) reason={reason}")
+            return result
+        if last_result is not None:
+            return last_result
+        if last_error is not None:
+            raise last_error
+        return "[Error: all models timed out]"
+
+    def translate(self, text, *args, **kwargs):
+        if args:
+            return self.routed_translator.translate(text, *args, **kwargs)
+        return self._call(
+            "translate", text, kwargs, is_lore_text=bool(kwargs.get("is_lore_text"))
+        )
+
+    def translate_choice(self, text, *args, **kwargs):
+        if args:
+            return self.routed_translator.translate_choice(text, *args, **kwargs)
+        return self._call("translate_choice", text, kwargs, is_choice=True)
+
+    def get_routing_report(self):
+        lines = [f"ModelRouter: {self.stats}"]
+        for route, model in self.models.items():
+            p95 = self.latency.p95(model)
+            lines.append(f"  {route}: {model} p95={'n/a' if p95 is None else f'{p95:.2f}s'}")
+        return "\n".join(lines)
+
+
+def create_router(strong, settings, create_for_model, provider):
+    """
+    ครอบ translator ของโมเดลหลักด้วย ModelRouter ตาม settings["model_routing"]
+    (คืน translator เดิมถ้าปิดการใช้งานหรือไม่มีโมเดลอื่นให้เลือก)
+    """
+    config = settings.get("model_routing", {}) or {}
+    if not config.get("enabled", False):
+        return strong
+    strong_model = settings.get_api_parameters().get("model")
+    fast_model = config.get("fast_model") or DEFAULT_FAST_MODELS.get(provider)
+    fallback_model = config.get("fallback_model")
+    if fast_model in (None, strong_model) and not fallback_model:
+        return strong
+
+    def speaker_of(text):
+        from translator_registry import get_shared_context
+
+        return get_shared_context().text_corrector.parse_line(text).speaker
+
+    router = ModelRouter(
+        strong,
+        strong_model,
+        lambda model: create_for_model(_RouteSettings(settings, model)),
+        fast_model=fast_model,
+        fallback_model=fallback_model,
+        speaker_of=speaker_of,
+    )
+    logging.info(f"ModelRouter enabled: strong={strong_model}, fast={fast_model}, fallback={fallback_model}")
+    return router
+
+
+def simulate(lines=200, seed=7):
+    """
+    provider ปลอม: strong (1.2-2.5 วินาที, บางครั้งค้าง 30 วินาที), fast (0.2-0.5 วินาที)
+    เทียบเวลาเฉลี่ยจนได้คำแปล: ส่งทุกบรรทัดไปโมเดลหลัก vs ใช้ ModelRouter (เวลาจำลองแบบย่อส่วน)
+    """
+    import random
+
+    rng = random.Random(seed)
+    scale = 0.001  # 1 วินาทีจำลอง = 1 ms จริง
+
+    class _FakeTranslator:
+        def __init__(self, name, low, high, hang_rate=0.0):
+            self.name, self.low, self.high, self.hang_rate = name, low, high, hang_rate
+
+        def translate(self, text, is_lore_text=False):
+            delay = 30.0 if rng.random() < self.hang_rate else rng.uniform(self.low, self.high)
+            time.sleep(delay * scale)
+            return f"[{self.name}] {text}"
+
+        def translate_choice(self, text):
+            return self.translate(text)
+
+    samples = [
+        ("Hm...", {}),
+        ("Alphinaud: Thank you.", {}),
+        ("Alphinaud: We should make for the Crystarium before nightfall, lest the sin eaters find us.", {}),
+        ("Alphinaud: Agreed. Let us be off.", {}),
+        ("What will you say?\n1. Yes\n2. No", {"choice": True}),
+        (
+            "The Crystal Tower was raised by the Allagan Empire some five thousand years ago. "
+            "Its architect, Amon, sought to harness the power of the sun itself. "
+            "When the tower fell silent, the Students of Baldesion began to study it.",
+            {"is_lore_text": True},
+        ),
+    ]
+    timeline = [samples[rng.randrange(len(samples))] for _ in range(lines)]
+
+    def run(translator):
+        elapsed = 0.0
+        for text, options in timeline:
+            start_time = time.perf_counter()
+            if options.get("choice"):
+                translator.translate_choice(text)
+            else:
+                translator.translate(text, **{k: v for k, v in options.items() if k != "choice"})
+            elapsed += time.perf_counter() - start_time
+        return elapsed / len(timeline) / scale
+
+    strong = _FakeTranslator("strong", 1.2, 2.5, hang_rate=0.02)
+    baseline = run(strong)
+
+    latency = LatencyTracker()
+    router = ModelRouter(
+        _FakeTranslator("strong", 1.2, 2.5, hang_rate=0.02),
+        "strong",
+        lambda model: _FakeTranslator(model, 0.2, 0.5),
+        fast_model="fast",
+        speaker_of=lambda text: text.split(":", 1)[0] if ":" in text else None,
+        latency=latency,
+    )
+    # timeout จริงต้องย่อส่วนตามเวลาจำลอง
+    latency.timeout_for = lambda model: max(MIN_TIMEOUT, (latency.p95(model) or DEFAULT_TIMEOUT / TIMEOUT_FACTOR) * TIMEOUT_FACTOR) * scale
+    routed = run(router)
+    print(f"avg time-to-text: single strong model {baseline:.2f}s, routed {routed:.2f}s")
+    print(router.get_routing_report())
+
+    return baseline, routed
+
+
+if __name__ == "__main__":
+    simulate()
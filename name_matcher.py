@@ -0,0 +1,191 @@
+import logging
+from bisect import bisect_right
+from collections import deque
+
+
+class NameMatcher:
+    """
+    ตัวค้นหาชื่อเฉพาะหลายชื่อพร้อมกันในรอบเดียว (Aho-Corasick automaton)
+    ใช้แทนการวนลูป str.find ทีละชื่อใน Translated_UI.highlight_special_names
+    """
+
+    def __init__(self, names=None, min_length=2):
+        self.min_length = min_length
+        self._goto = [{}]  # transitions ของแต่ละ node
+        self._fail = [0]  # failure link ของแต่ละ node
+        self._terminal = [None]  # ชื่อที่จบที่ node นี้ (ถ้ามี)
+        self._output = [()]  # ชื่อทั้งหมดที่จบที่ node นี้ รวมจาก failure chain
+        self._names = set()
+        self._dirty = False
+        if names:
+            self.update_names(names)
+
+    def update_names(self, names):
+        """
+        อัพเดตรายชื่อแบบ incremental - เพิ่มเฉพาะชื่อใหม่ลง trie และยกเลิกชื่อที่ถูกลบ
+        Returns:
+            bool: True ถ้ามีการเปลี่ยนแปลงรายชื่อ
+        """
+        new_names = {n for n in (names or ()) if n and len(n) >= self.min_length}
+        added = new_names - self._names
+        removed = self._names - new_names
+        if not added and not removed:
+            return False
+
+        for name in added:
+            self._insert(name)
+        for name in removed:
+            node = self._find_node(name)
+            if node is not None:
+                self._terminal[node] = None
+
+        self._names = new_names
+        self._dirty = True
+        logging.debug(
+            f"NameMatcher: +{len(added)} / -{len(removed)} names ({len(new_names)} total)"
+        )
+        return True
+
+    def _insert(self, name):
+        node = 0
+        for char in name:
+            next_node = self._goto[node].get(char)
+            if next_node is None:
+                next_node = len(self._goto)
+                self._goto.append({})
+                self._fail.append(0)
+                self._terminal.append(None)
+                self._output.append(())
+                self._goto[node][char] = next_node
+            node = next_node
+        self._terminal[node] = name
+
+    def _find_node(self, name):
+        node = 0
+        for char in name:
+            node = self._goto[node].get(char)
+            if node is None:
+                return None
+        return node
+
+    def _build_links(self):
+        """คำนวณ failure links และ output ใหม่ด้วย BFS (เฉพาะเมื่อรายชื่อเปลี่ยน)"""
+        queue = deque()
+        self._fail[0] = 0
+        self._output[0] = ()
+        for child in self._goto[0].values():
+            self._fail[child] = 0
+            queue.append(child)
+
+        while queue:
+            node = queue.popleft()
+            fail_output = self._output[self._fail[node]]
+            terminal = self._terminal[node]
+            self._output[node] = (terminal,) + fail_output if terminal else fail_output
+
+            for char, child in self._goto[node].items():
+                fallback = self._fail[node]
+                while fallback and char not in self._goto[fallback]:
+                    fallback = self._fail[fallback]
+                target = self._goto[fallback].get(char, 0)
+                self._fail[child] = target if target != child else 0
+                queue.append(child)
+
+        self._dirty = False
+
+    @staticmethod
+    def _is_word_char(char):
+        # รวม ' เพราะอาจเป็นส่วนของชื่อ เช่น Y'shtola
+        return char.isalnum() or char == "'"
+
+    def find_spans(self, text):
+        """
+        ค้นหาชื่อทั้งหมดที่เป็นคำเต็มๆ ในข้อความแบบไม่ทับซ้อนกัน (leftmost-longest)
+        Returns:
+            list: [(start, end, name), ...] เรียงตามตำแหน่ง
+        """
+        if not text or not self._names:
+            return []
+        if self._dirty:
+            self._build_links()
+
+        goto, fail, output = self._goto, self._fail, self._output
+        text_length = len(text)
+        candidates = []
+        node = 0
+        for index, char in enumerate(text):
+            while node and char not in goto[node]:
+                node = fail[node]
+            node = goto[node].get(char, 0)
+            if not output[node]:
+                continue
+            end = index + 1
+            for name in output[node]:
+                start = end - len(name)
+                if start > 0 and self._is_word_char(text[start - 1]):
+                    continue
+                if end < text_length and self._is_word_char(text[end]):
+                    continue
+                candidates.append((start, end, name))
+
+        candidates.sort(key=lambda span: (span[0], -(span[1] - span[0])))
+        spans = []
+        last_end = 0
+        for span in candidates:
+            if span[0] >= last_end:
+                spans.append(span)
+                last_end = span[1]
+        return spans
+
+    def highlight(self, text, open_mark="『", close_mark="』"):
+        """
+        ครอบชื่อเฉพาะด้วยเครื่องหมาย และคืนตำแหน่งของชื่อในข้อความผลลัพธ์
+        Returns:
+            tuple: (ข้อความที่ไฮไลท์แล้ว, [(start, end, name), ...] ในพิกัดของข้อความใหม่)
+        """
+        spans = self.find_spans(text)
+        if not spans:
+            return text, []
+
+        parts = []
+        highlighted_spans = []
+        cursor = 0
+        offset = 0
+        for start, end, name in spans:
+            parts.append(text[cursor:start])
+            parts.append(f"{open_mark}{name}{close_mark}")
+            new_start = start + offset
+            new_end = new_start + len(open_mark) + len(name) + len(close_mark)
+            highlighted_spans.append((new_start, new_end, name))
+            offset += len(open_mark) + len(close_mark)
+            cursor = end
+        parts.append(text[cursor:])
+        return "".join(parts), highlighted_spans
+
+    def __len__(self):
+        return len(self._names)
+
+
+class NameSpanIndex:
+    """ดัชนีช่วงตำแหน่งของชื่อในข้อความที่แสดงอยู่ ค้นหาด้วย binary search"""
+
+    def __init__(self, spans=None):
+        self.set_spans(spans or [])
+
+    def set_spans(self, spans):
+        self._spans = sorted(spans)
+        self._starts = [span[0] for span in self._spans]
+
+    def clear(self):
+        self.set_spans([])
+
+    def find(self, char_index):
+        """คืนชื่อที่อยู่ตำแหน่งตัวอักษรนี้ หรือ None ถ้าไม่มี"""
+        position = bisect_right(self._starts, char_index) - 1
+        if position < 0:
+            return None
+        start, end, name = self._spans[position]
+        return name if start <= char_index < end else None
+
+    def __len__(self):
+        return len(self._spans)
@@ -0,0 +1,300 @@
+"""
+OCR engine interface: ให้โค้ดส่วนอื่นไม่ผูกกับ EasyOCR โดยตรง
+
+ทุก engine คืนผลเป็น list ของ OCRBox(bbox, text, confidence) โดย bbox เป็นสี่เหลี่ยม 4 จุด
+[[x1, y1], [x2, y1], [x2, y2], [x1, y2]] (รูปแบบเดียวกับ EasyOCR) และ confidence อยู่ในช่วง 0-1
+(None ถ้า engine ไม่ได้ให้มา เช่น EasyOCR แบบ paragraph)
+
+รัน `python ocr_engines.py` เพื่อ benchmark ทุก engine ที่ติดตั้งอยู่และเลือก engine เริ่มต้นของเครื่องนี้
+"""
+
+import glob
+import importlib.util
+import json
+import logging
+import os
+import platform
+import time
+from collections import namedtuple
+
+ENGINE_BENCHMARK_FILE = "ocr_engine_benchmark.json"
+SAMPLE_FRAMES_DIR = os.path.join("ocr_models", "samples")
+
+# engine ที่เร็วกว่าจะถูกเลือกถ้า CER แย่กว่า engine ที่แม่นที่สุดไม่เกินค่านี้
+CER_TOLERANCE = 0.02
+
+# ภาษาของ EasyOCR -> ภาษาของ Tesseract
+TESSERACT_LANGUAGES = {
+    "en": "eng",
+    "ja": "jpn",
+    "ko": "kor",
+    "ch_tra": "chi_tra",
+    "ch_sim": "chi_sim",
+    "th": "tha",
+}
+
+
+class OCRBox(namedtuple("OCRBox", ["bbox", "text", "confidence"])):
+    """ผล OCR หนึ่งกล่อง - unpack เป็น (bbox, text, confidence) ได้เหมือน tuple ของ EasyOCR"""
+
+    __slots__ = ()
+
+    @classmethod
+    def from_rect(cls, left, top, right, bottom, text, confidence=None):
+        bbox = [[left, top], [right, top], [right, bottom], [left, bottom]]
+        return cls(bbox, text, confidence)
+
+    @property
+    def top(self):
+        return min(point[1] for point in self.bbox)
+
+    @property
+    def left(self):
+        return min(point[0] for point in self.bbox)
+
+
+class OCREngine:
+    """ฐานของ OCR engine - subclass ต้อง implement read()"""
+
+    name = "base"
+
+    @classmethod
+    def is_available(cls):
+        return True
+
+    def read(self, image, paragraph=False, text_threshold=0.7, **options):
+        """
+        อ่านข้อความจากภาพ (path หรือ numpy array / PIL image)
+
+        Args:
+            paragraph: รวมข้อความที่อยู่ใกล้กันเป็นย่อหน้า
+            text_threshold: ความมั่นใจขั้นต่ำ (0-1)
+            options: ตัวเลือกเฉพาะ engine (engine อื่นจะข้ามตัวเลือกที่ไม่รู้จัก)
+
+        Returns:
+            list[OCRBox]
+        """
+        raise NotImplementedError
+
+    def read_text(self, image, paragraph=True, text_threshold=0.7, **options):
+        """ข้อความทั้งหมดต่อกันด้วยช่องว่าง"""
+        boxes = self.read(image, paragraph=paragraph, text_threshold=text_threshold, **options)
+        return " ".join(box.text for box in boxes if box.text).strip()
+
+
+class EasyOCREngine(OCREngine):
+    """ห่อ easyocr.Reader ที่สร้างไว้แล้ว (ดู ocr_profiles.get_reader_cache)"""
+
+    name = "easyocr"
+
+    # ตัวเลือกของ readtext ที่ส่งต่อได้
+    _OPTIONS = ("min_size", "width_ths", "height_ths", "y_ths", "x_ths", "low_text", "canvas_size", "mag_ratio")
+
+    def __init__(self, reader):
+        self.reader = reader
+
+    @classmethod
+    def is_available(cls):
+        # ตรวจแค่ว่าติดตั้งอยู่ - import easyocr จริงดึง torch มาด้วย (ช้ามาก) และจะเกิดตอนสร้าง Reader อยู่แล้ว
+        try:
+            return importlib.util.find_spec("easyocr") is not None
+        except (ImportError, ValueError):
+            return False
+
+    def read(self, image, paragraph=False, text_threshold=0.7, **options):
+        params = {key: value for key, value in options.items() if key in self._OPTIONS}
+        results = self.reader.readtext(
+            image, detail=1, paragraph=paragraph, text_threshold=text_threshold, **params
+        )
+        boxes = []
+        for item in results:
+            # paragraph=True คืน (bbox, text) ไม่มี confidence
+            bbox, text = item[0], item[1]
+            confidence = float(item[2]) if len(item) > 2 else None
+            boxes.append(OCRBox([[int(x), int(y)] for x, y in bbox], text, confidence))
+        return boxes
+
+
+class TesseractEngine(OCREngine):
+    """Tesseract ผ่าน pytesseract - เบากว่า EasyOCR มากบน CPU และไม่ต้องโหลด model ขนาดใหญ่"""
+
+    name = "tesseract"
+
+    def __init__(self, languages=("en",), psm=6):
+        self.lang = "+".join(TESSERACT_LANGUAGES.get(lang, lang) for lang in languages)
+        self.config = f"--psm {psm}"
+
+    @classmethod
+    def is_available(cls):
+        try:
+            import pytesseract
+
+            pytesseract.get_tesseract_version()
+        except Exception:
+            return False
+        return True
+
+    def read(self, image, paragraph=False, text_threshold=0.7, **options):
+        import pytesseract
+        from PIL import Image
+
+        if isinstance(image, str):
+            image = Image.open(image)
+        data = pytesseract.image_to_data(
+            image, lang=self.lang, config=self.config, output_type=pytesseract.Output.DICT
+        )
+
+        # รวมคำเป็นบรรทัด (หรือย่อหน้า) ตาม block/paragraph/line ที่ Tesseract ให้มา
+        groups = {}
+        for i, word in enumerate(data["text"]):
+            word = word.strip()
+            confidence = float(data["conf"][i])
+            if not word or confidence < 0:
+                continue
+            key = (data["block_num"][i], data["par_num"][i])
+            if not paragraph:
+                key += (data["line_num"][i],)
+            left, top = data["left"][i], data["top"][i]
+            right, bottom = left + data["width"][i], top + data["height"][i]
+            group = groups.setdefault(key, {"words": [], "confs": [], "rect": [left, top, right, bottom]})
+            group["words"].append(word)
+            group["confs"].append(confidence / 100.0)
+            rect = group["rect"]
+            rect[0], rect[1] = min(rect[0], left), min(rect[1], top)
+            rect[2], rect[3] = max(rect[2], right), max(rect[3], bottom)
+
+        boxes = []
+        for group in groups.values():
+            confidence = sum(group["confs"]) / len(group["confs"])
+            # Tesseract ให้ความมั่นใจต่ำกว่า EasyOCR โดยทั่วไป จึงกรองแบบผ่อนลงครึ่งหนึ่ง
+            if confidence < text_threshold / 2:
+                continue
+            boxes.append(OCRBox.from_rect(*group["rect"], " ".join(group["words"]), confidence))
+        boxes.sort(key=lambda box: (box.top, box.left))
+        return boxes
+
+
+ENGINES = {
+    EasyOCREngine.name: EasyOCREngine,
+    TesseractEngine.name: TesseractEngine,
+}
+
+
+def available_engines():
+    return [name for name, engine_class in ENGINES.items() if engine_class.is_available()]
+
+
+def load_benchmark(file_path=ENGINE_BENCHMARK_FILE):
+    try:
+        with open(file_path, "r", encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, json.JSONDecodeError):
+        return None
+
+
+def resolve_engine_name(preference="auto", file_path=ENGINE_BENCHMARK_FILE):
+    """
+    ชื่อ engine ที่จะใช้: ค่าที่ผู้ใช้เลือก หรือ (auto) engine ที่ benchmark เลือกไว้สำหรับเครื่องนี้
+    ถ้ายังไม่เคย benchmark หรือผลเป็นของเครื่องอื่น จะใช้ EasyOCR ตามเดิม
+    """
+    if preference in ENGINES:
+        return preference
+    benchmark = load_benchmark(file_path)
+    if benchmark and benchmark.get("machine") == platform.node():
+        selected = benchmark.get("selected")
+        if selected in ENGINES:
+            return selected
+    return EasyOCREngine.name
+
+
+def _character_error_rate(text, expected):
+    from translation_memory import bounded_edit_distance
+
+    text = text.strip()
+    distance = bounded_edit_distance(text, expected, max(len(text), len(expected)))
+    return distance / max(1, len(expected))
+
+
+def load_sample_frames(sample_dir=SAMPLE_FRAMES_DIR):
+    """
+    ภาพตัวอย่างสำหรับ benchmark: ไฟล์ .png ใน sample_dir ที่มี .txt (คำตอบ) ชื่อเดียวกัน
+    บวกกับบรรทัดตัวอย่างที่ render ขึ้นเอง (ocr_fast_cpu.SAMPLE_LINES)
+    """
+    import numpy as np
+    from PIL import Image
+
+    from ocr_fast_cpu import SAMPLE_LINES
+    from ocr_profiles import _render_dialogue_line
+
+    frames = []
+    for image_path in sorted(glob.glob(os.path.join(sample_dir, "*.png"))):
+        truth_path = os.path.splitext(image_path)[0] + ".txt"
+        if os.path.exists(truth_path):
+            with open(truth_path, "r", encoding="utf-8") as f:
+                expected = " ".join(f.read().split())
+            frames.append((expected, np.array(Image.open(image_path).convert("RGB"))))
+    frames.extend((line, _render_dialogue_line(line)) for line in SAMPLE_LINES)
+    return frames
+
+
+def _create_engine(name, languages, use_gpu=False):
+    if name == EasyOCREngine.name:
+        import easyocr
+
+        from ocr_profiles import get_reader_cache
+
+        return EasyOCREngine(get_reader_cache().get(easyocr, languages, use_gpu))
+    return ENGINES[name](languages)
+
+
+def benchmark_engines(languages=("en",), repeats=2, file_path=ENGINE_BENCHMARK_FILE):
+    """
+    รันทุก engine ที่ติดตั้งอยู่บนภาพตัวอย่าง วัด latency ต่อภาพและ character error rate
+    แล้วเลือก engine เริ่มต้น: ตัวที่เร็วที่สุดในกลุ่มที่ CER ไม่เกิน (CER ดีที่สุด + CER_TOLERANCE)
+    """
+    frames = load_sample_frames()
+    results = {}
+    for name in available_engines():
+        try:
+            engine = _create_engine(name, languages)
+            engine.read_text(frames[0][1])  # warm-up
+            errors = 0.0
+            start_time = time.perf_counter()
+            for _ in range(repeats):
+                for expected, image in frames:
+                    errors += _character_error_rate(engine.read_text(image), expected)
+            elapsed = time.perf_counter() - start_time
+        except Exception as e:
+            print(f"{name:<10} failed: {e}")
+            continue
+        runs = len(frames) * repeats
+        results[name] = {"frame_ms": elapsed * 1000 / runs, "cer": errors / runs}
+        print(
+            f"{name:<10} {results[name]['frame_ms']:8.1f} ms/frame  CER {results[name]['cer'] * 100:6.2f}%"
+        )
+
+    if not results:
+        print("No OCR engine available")
+        return None
+
+    best_cer = min(result["cer"] for result in results.values())
+    candidates = [name for name, result in results.items() if result["cer"] <= best_cer + CER_TOLERANCE]
+    selected = min(candidates, key=lambda name: results[name]["frame_ms"])
+    benchmark = {
+        "machine": platform.node(),
+        "cpu_count": os.cpu_count(),
+        "languages": list(languages),
+        "frames": len(frames),
+        "results": results,
+        "selected": selected,
+        "measured_at": time.strftime("%Y-%m-%d %H:%M:%S"),
+    }
+    with open(file_path, "w", encoding="utf-8") as f:
+        json.dump(benchmark, f, ensure_ascii=False, indent=2)
+    print(f"Selected default OCR engine for this machine: {selected}")
+    logging.info(f"OCR engine benchmark selected {selected}: {results}")
+    return benchmark
+
+
+if __name__ == "__main__":
+    benchmark_engines()
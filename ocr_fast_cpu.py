@@ -0,0 +1,198 @@
+"""
+โหมด "Fast CPU" ของ EasyOCR สำหรับผู้ใช้ที่รัน OCR บน CPU
+
+- ใช้ recognizer (CRNN) ที่ผ่าน dynamic int8 quantization ของชั้น Linear / LSTM
+  โดยเก็บ model ที่แปลงแล้วไว้บนดิสก์ เปิดโปรแกรมครั้งถัดไปไม่ต้องแปลงใหม่
+- จำกัดจำนวน intra-op thread ของ torch ให้เหลือ core ว่างสำหรับเกม
+
+หมายเหตุ: EasyOCR บน CPU (quantize=True ค่าเริ่มต้น) quantize recognizer ทุกครั้งที่สร้าง Reader อยู่แล้ว
+โหมดนี้สร้าง Reader ด้วย quantize=False แล้วสลับ recognizer เป็นตัวที่ cache ไว้แทน
+"""
+
+import hashlib
+import json
+import logging
+import os
+import threading
+import time
+
+QUANTIZED_CACHE_DIR = os.path.join("ocr_models", "quantized")
+
+# บรรทัดตัวอย่างสำหรับรายงานความแม่นยำเทียบกับความเร็ว (render เป็นภาพในเครื่อง ไม่ต้องมีไฟล์ภาพ)
+SAMPLE_LINES = [
+    "Alphinaud: We must make haste to the Waking Sands.",
+    "Y'shtola: The aether here is thick with something foul.",
+    "Thancred: Stay close, and keep your wits about you.",
+    "G'raha Tia: I have waited a long time for this moment.",
+    "Urianger: Thy path is thine own to walk, my friend.",
+    "Estinien: Hmph. The dragon will not wait for us.",
+    "Tataru: I've prepared 1,500 gil for the journey!",
+    "Krile: Do you hear that? Something is coming...",
+    "Alisaie: Don't you dare give up now!",
+    "Hythlodaeus: Ah, what a curious soul you are.",
+    "1. I'm ready.",
+    "2. Give me a moment.",
+]
+
+_thread_lock = threading.Lock()
+_configured_threads = None
+
+
+def configure_cpu_threads(threads=None):
+    """
+    ตั้งจำนวน intra-op thread ของ torch (ค่าเริ่มต้น: ครึ่งหนึ่งของ core, อย่างน้อย 1)
+
+    Returns:
+        จำนวน thread ที่ตั้ง หรือ None ถ้าไม่มี torch
+    """
+    global _configured_threads
+    try:
+        import torch
+    except ImportError:
+        return None
+    threads = int(threads or 0) or max(1, (os.cpu_count() or 2) // 2)
+    with _thread_lock:
+        if _configured_threads != threads:
+            torch.set_num_threads(threads)
+            _configured_threads = threads
+            logging.info(f"Fast CPU OCR: torch intra-op threads = {threads}")
+    return threads
+
+
+def _cache_path(reader, cache_dir):
+    """ชื่อไฟล์ cache ผูกกับเวอร์ชัน torch / easyocr และชุดภาษาของ recognizer"""
+    import torch
+
+    try:
+        import easyocr
+
+        easyocr_version = getattr(easyocr, "__version__", "unknown")
+    except ImportError:
+        easyocr_version = "unknown"
+    identity = json.dumps(
+        {
+            "torch": torch.__version__,
+            "easyocr": easyocr_version,
+            "model_lang": getattr(reader, "model_lang", None),
+            "lang_list": sorted(getattr(reader, "lang_list", [])),
+        },
+        sort_keys=True,
+    )
+    digest = hashlib.sha256(identity.encode("utf-8")).hexdigest()[:16]
+    return os.path.join(cache_dir, f"recognizer_{digest}.pt")
+
+
+def quantize_recognizer(reader, cache_dir=QUANTIZED_CACHE_DIR):
+    """
+    แทน reader.recognizer ด้วยเวอร์ชัน int8 (โหลดจาก cache บนดิสก์ถ้ามี มิฉะนั้นแปลงแล้วบันทึก)
+
+    Returns:
+        "cache" / "converted" บอกว่าได้ model มาจากไหน
+    """
+    import torch
+
+    path = _cache_path(reader, cache_dir)
+    if os.path.exists(path):
+        try:
+            start_time = time.perf_counter()
+            # cache เป็นไฟล์ที่โปรแกรมสร้างเองในเครื่อง จึงโหลดทั้ง module ได้
+            reader.recognizer = torch.load(path, map_location="cpu", weights_only=False)
+            reader.recognizer.eval()
+            logging.info(
+                f"Fast CPU OCR: loaded quantized recognizer in {time.perf_counter() - start_time:.2f}s"
+            )
+            return "cache"
+        except Exception as e:
+            logging.warning(f"Fast CPU OCR: cache unusable ({e}), converting again")
+
+    start_time = time.perf_counter()
+    quantized = torch.quantization.quantize_dynamic(
+        reader.recognizer, {torch.nn.Linear, torch.nn.LSTM}, dtype=torch.qint8
+    )
+    quantized.eval()
+    reader.recognizer = quantized
+    logging.info(f"Fast CPU OCR: quantized recognizer in {time.perf_counter() - start_time:.2f}s")
+
+    try:
+        os.makedirs(cache_dir, exist_ok=True)
+        temp_path = f"{path}.tmp"
+        torch.save(quantized, temp_path)
+        os.replace(temp_path, path)
+    except Exception as e:
+        logging.warning(f"Fast CPU OCR: could not cache quantized recognizer: {e}")
+    return "converted"
+
+
+def create_fast_cpu_reader(easyocr_module, languages, threads=None, cache_dir=QUANTIZED_CACHE_DIR):
+    """สร้าง easyocr.Reader บน CPU พร้อม recognizer แบบ int8 และจำกัด thread"""
+    configure_cpu_threads(threads)
+    reader = easyocr_module.Reader(list(languages), gpu=False, quantize=False)
+    quantize_recognizer(reader, cache_dir)
+    return reader
+
+
+def _edit_distance(a, b):
+    previous = list(range(len(b) + 1))
+    for i, char_a in enumerate(a, 1):
+        current = [i]
+        for j, char_b in enumerate(b, 1):
+            current.append(
+                min(previous[j] + 1, current[j - 1] + 1, previous[j - 1] + (char_a != char_b))
+            )
+        previous = current
+    return previous[-1]
+
+
+def _measure(reader, images, repeats):
+    reader.readtext(images[0][1], detail=0)  # warm-up
+    errors = characters = 0
+    start_time = time.perf_counter()
+    for _ in range(repeats):
+        for expected, image in images:
+            text = " ".join(reader.readtext(image, detail=0, paragraph=True))
+            errors += _edit_distance(text.strip(), expected)
+            characters += len(expected)
+    elapsed = time.perf_counter() - start_time
+    return {
+        "line_ms": elapsed * 1000 / (len(images) * repeats),
+        "char_accuracy": 1.0 - errors / characters if characters else 0.0,
+    }
+
+
+def accuracy_latency_report(languages=("en",), repeats=2, threads=None, output_path=None):
+    """
+    เทียบ 3 โหมดบน SAMPLE_LINES: fp32, ค่าเริ่มต้นของ EasyOCR (quantize ทุกครั้งที่โหลด) และ Fast CPU
+    แสดงเวลาโหลด เวลาต่อบรรทัด และความแม่นยำระดับตัวอักษร
+    """
+    import easyocr
+
+    from ocr_profiles import _render_dialogue_line
+
+    images = [(line, _render_dialogue_line(line)) for line in SAMPLE_LINES]
+    modes = {
+        "fp32": lambda: easyocr.Reader(list(languages), gpu=False, quantize=False),
+        "easyocr default": lambda: easyocr.Reader(list(languages), gpu=False),
+        "fast cpu": lambda: create_fast_cpu_reader(easyocr, languages, threads),
+    }
+
+    report = {}
+    for name, factory in modes.items():
+        start_time = time.perf_counter()
+        reader = factory()
+        load_s = time.perf_counter() - start_time
+        result = _measure(reader, images, repeats)
+        result["load_s"] = load_s
+        report[name] = result
+        print(
+            f"{name:<16} load {load_s:6.2f}s  per line {result['line_ms']:7.1f} ms  "
+            f"char accuracy {result['char_accuracy'] * 100:6.2f}%"
+        )
+
+    if output_path:
+        with open(output_path, "w", encoding="utf-8") as f:
+            json.dump(report, f, ensure_ascii=False, indent=2)
+    return report
+
+
+if __name__ == "__main__":
+    accuracy_latency_report(output_path="ocr_fast_cpu_report.json")
@@ -0,0 +1,197 @@
+"""
+OCR language profile ต่อเกม: เลือกโหลดเฉพาะ recognizer ของ EasyOCR ที่เกมนั้นต้องใช้
+และ cache reader ไว้ต่อ profile เพื่อให้การสลับเกม (swap_data / reload NPC) ไม่ต้องโหลด model ใหม่
+
+profile เก็บไว้ใน _game_info ของไฟล์ NPC:
+    "_game_info": {"name": "...", "code": "ffxiv", "ocr_profile": "en"}
+หรือระบุภาษาตรงๆ:
+    "_game_info": {..., "ocr_languages": ["en", "ja"]}
+"""
+
+import logging
+import os
+import threading
+import time
+from collections import OrderedDict
+
+# ชื่อ profile -> ภาษาที่ส่งให้ easyocr.Reader (EasyOCR บังคับให้ภาษาเอเชียใช้คู่กับ "en")
+OCR_LANGUAGE_PROFILES = {
+    "en": ("en",),
+    "en_ch_tra": ("en", "ch_tra"),
+    "en_ch_sim": ("en", "ch_sim"),
+    "en_ja": ("en", "ja"),
+    "en_ko": ("en", "ko"),
+    "en_th": ("en", "th"),
+}
+
+DEFAULT_OCR_PROFILE = "en"
+
+# จำนวน reader ที่เก็บไว้พร้อมกัน - แต่ละตัวกิน RAM/VRAM หลายร้อย MB
+MAX_CACHED_READERS = 2
+
+
+def get_ocr_languages(game_info):
+    """
+    คืน tuple ภาษาของ OCR สำหรับเกมนี้จาก _game_info
+    ใช้ "ocr_languages" ก่อน แล้วจึง "ocr_profile" และ DEFAULT_OCR_PROFILE ถ้าไม่ได้ระบุ
+    """
+    game_info = game_info or {}
+    languages = game_info.get("ocr_languages")
+    if isinstance(languages, (list, tuple)) and languages:
+        languages = tuple(dict.fromkeys(str(lang) for lang in languages))
+        # recognizer ภาษาเอเชียของ EasyOCR ต้องมี "en" เสมอ
+        return languages if "en" in languages else ("en",) + languages
+
+    profile = game_info.get("ocr_profile", DEFAULT_OCR_PROFILE)
+    if profile not in OCR_LANGUAGE_PROFILES:
+        logging.warning(f"Unknown OCR profile '{profile}', using '{DEFAULT_OCR_PROFILE}'")
+        profile = DEFAULT_OCR_PROFILE
+    return OCR_LANGUAGE_PROFILES[profile]
+
+
+def describe_languages(languages):
+    """ข้อความสำหรับ log เช่น 'en+ja'"""
+    return "+".join(languages)
+
+
+class OCRReaderCache:
+    """
+    cache ของ easyocr.Reader ต่อ (ภาษา, gpu, fast_cpu) แบบ LRU
+
+    สลับกลับไปเกมที่เคยใช้แล้วจะได้ reader เดิมทันที ตัวที่ไม่ได้ใช้นานที่สุดจะถูกปล่อย
+    เมื่อเกิน max_readers เพื่อไม่ให้ model หลายชุดค้างอยู่ในหน่วยความจำ
+    """
+
+    def __init__(self, max_readers=MAX_CACHED_READERS):
+        self.max_readers = max_readers
+        self._lock = threading.Lock()
+        self._readers = OrderedDict()
+        self.stats = {"hits": 0, "loads": 0, "evictions": 0}
+
+    def get(self, easyocr_module, languages, gpu=False, fast_cpu=False):
+        # fast_cpu มีผลเฉพาะตอนรันบน CPU
+        key = (tuple(languages), bool(gpu), bool(fast_cpu) and not gpu)
+        with self._lock:
+            reader = self._readers.get(key)
+            if reader is not None:
+                self._readers.move_to_end(key)
+                self.stats["hits"] += 1
+                return reader
+
+            # โหลดภายใต้ lock เพื่อไม่ให้สอง thread โหลด model ชุดเดียวกันพร้อมกัน
+            start_time = time.perf_counter()
+            if key[2]:
+                from ocr_fast_cpu import create_fast_cpu_reader
+
+                reader = create_fast_cpu_reader(easyocr_module, key[0])
+            else:
+                reader = easyocr_module.Reader(list(key[0]), gpu=key[1])
+            self.stats["loads"] += 1
+            mode = "GPU" if key[1] else ("Fast CPU" if key[2] else "CPU")
+            logging.info(
+                f"Loaded OCR reader [{describe_languages(key[0])}] "
+                f"({mode}) in {time.perf_counter() - start_time:.2f}s"
+            )
+            self._readers[key] = reader
+            while len(self._readers) > self.max_readers:
+                self._readers.popitem(last=False)
+                self.stats["evictions"] += 1
+            return reader
+
+    def clear(self):
+        with self._lock:
+            self._readers.clear()
+
+
+_reader_cache = OCRReaderCache()
+
+
+def get_reader_cache():
+    return _reader_cache
+
+
+def _rss_mb():
+    try:
+        import psutil
+
+        return psutil.Process(os.getpid()).memory_info().rss / (1024 * 1024)
+    except Exception:
+        return None
+
+
+def _render_dialogue_line(text, width=900, height=48):
+    """สร้างภาพบรรทัดบทสนทนาสังเคราะห์ (ตัวอักษรขาวบนพื้นเข้ม) สำหรับวัดเวลา OCR"""
+    import numpy as np
+    from PIL import Image, ImageDraw, ImageFont
+
+    image = Image.new("RGB", (width, height), (24, 24, 32))
+    draw = ImageDraw.Draw(image)
+    try:
+        font = ImageFont.truetype("arial.ttf", 28)
+    except OSError:
+        font = ImageFont.load_default()
+    draw.text((12, 8), text, fill=(235, 235, 235), font=font)
+    return np.array(image)
+
+
+def benchmark_profiles(profiles=None, gpu=False, repeats=5):
+    """
+    วัดเวลาโหลด reader, RSS ที่เพิ่มขึ้น และเวลา OCR ต่อบรรทัดของแต่ละ profile
+    แต่ละ profile รันใน process ใหม่เพื่อให้ตัวเลขเวลาโหลดและ RSS ไม่ปนกัน
+    """
+    import json
+    import subprocess
+    import sys
+
+    profiles = profiles or list(OCR_LANGUAGE_PROFILES)
+    results = {}
+    for profile in profiles:
+        code = (
+            "import json, ocr_profiles\n"
+            f"print(json.dumps(ocr_profiles._benchmark_one({profile!r}, {bool(gpu)!r}, {int(repeats)})))"
+        )
+        completed = subprocess.run(
+            [sys.executable, "-c", code],
+            cwd=os.path.dirname(os.path.abspath(__file__)),
+            capture_output=True,
+            text=True,
+        )
+        if completed.returncode != 0:
+            last_line = (completed.stderr.strip().splitlines() or ["unknown error"])[-1]
+            print(f"{profile:<10} failed: {last_line}")
+            continue
+        result = json.loads(completed.stdout.strip().splitlines()[-1])
+        results[profile] = result
+        rss = f"{result['rss_mb']:7.0f} MB" if result["rss_mb"] is not None else "      n/a"
+        print(
+            f"{profile:<10} load {result['load_s']:6.2f}s  rss +{rss}  "
+            f"per line {result['line_ms']:7.1f} ms"
+        )
+    return results
+
+
+def _benchmark_one(profile, gpu, repeats):
+    import easyocr
+
+    rss_before = _rss_mb()
+    start_time = time.perf_counter()
+    reader = easyocr.Reader(list(OCR_LANGUAGE_PROFILES[profile]), gpu=gpu, verbose=False)
+    load_s = time.perf_counter() - start_time
+    rss_after = _rss_mb()
+
+    image = _render_dialogue_line("Y'shtola: The aether here is thick with something foul.")
+    reader.readtext(image)  # warm-up
+    start_time = time.perf_counter()
+    for _ in range(repeats):
+        reader.readtext(image)
+    line_ms = (time.perf_counter() - start_time) * 1000 / repeats
+
+    return {
+        "load_s": load_s,
+        "rss_mb": (rss_after - rss_before) if rss_before is not None and rss_after is not None else None,
+        "line_ms": line_ms,
+    }
+
+
+if __name__ == "__main__":
+    benchmark_profiles()
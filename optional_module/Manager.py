@@ -121,21 +121,27 @@ def get_game_info_from_json(filepath):
         return None
 
 
-def add_game_info_to_json(filepath, game_name, game_code, description=None):
+def add_game_info_to_json(filepath, game_name, game_code, description=None, ocr_profile=None):
     """
     เพิ่มข้อมูลเกมลงในไฟล์ JSON
     คืนค่า True ถ้าสำเร็จ, False ถ้าเกิดข้อผิดพลาด
+    (คงค่าอื่นใน _game_info เดิมไว้ เช่น ocr_profile / ocr_languages)
     """
     try:
         data = read_json_file(filepath)
         if not data:
             return False
 
-        game_info = {
-            "name": game_name,
-            "code": game_code,
-            "description": description or f"ข้อมูล NPC จากเกม {game_name}",
-        }
+        game_info = dict(data.get("_game_info") or {})
+        game_info.update(
+            {
+                "name": game_name,
+                "code": game_code,
+                "description": description or f"ข้อมูล NPC จากเกม {game_name}",
+            }
+        )
+        if ocr_profile:
+            game_info["ocr_profile"] = ocr_profile
 
         # อัพเดทข้อมูลเกม
         data["_game_info"] = game_info
@@ -0,0 +1,231 @@
+import hashlib
+import logging
+import threading
+import time
+
+# ค่าเริ่มต้นอายุของ cache ฝั่ง provider (วินาที)
+DEFAULT_CACHE_TTL = 3600
+# รอก่อนลองสร้าง cache ใหม่หลังล้มเหลวชั่วคราว (timeout / 5xx) - เพิ่มเป็นสองเท่าทุกครั้งที่ล้มเหลวซ้ำ
+RETRY_BACKOFF = 30.0
+MAX_RETRY_BACKOFF = 600.0
+# ข้อความของ error ที่ลองซ้ำกับ prefix เดิมก็ไม่มีทางสำเร็จ (เช่น prefix สั้นกว่าขั้นต่ำของ provider)
+_PERMANENT_ERROR_HINTS = ("too small", "minimum", "min_total_token_count", "invalid argument")
+
+
+def prompt_fingerprint(*parts):
+    """hash ของส่วน prompt ที่คงที่ - เปลี่ยนเมื่อ NPC.json หรือชุดตัวอย่างเปลี่ยน"""
+    digest = hashlib.sha256()
+    for part in parts:
+        digest.update(str(part).encode("utf-8"))
+        digest.update(b"\x00")
+    return digest.hexdigest()
+
+
+def is_permanent_failure(error):
+    """error จากการสร้าง cache ที่ลองซ้ำกับ prefix เดิมไม่มีประโยชน์ (400 / invalid argument / prefix สั้นเกิน)"""
+    if isinstance(error, (ValueError, TypeError)):
+        return True
+    if type(error).__name__ in ("InvalidArgument", "BadRequest", "BadRequestError"):
+        return True
+    if getattr(error, "code", None) == 400 or getattr(error, "status_code", None) == 400:
+        return True
+    message = str(error).lower()
+    return any(hint in message for hint in _PERMANENT_ERROR_HINTS)
+
+
+def build_cached_system(prefix, suffix=""):
+    """
+    สร้าง system prompt ของ Claude แบบ content blocks โดยวาง cache breakpoint
+    ไว้ท้ายส่วนที่คงที่ ส่วนที่เปลี่ยนทุกบรรทัด (ข้อมูลตัวละคร) อยู่หลัง breakpoint
+    """
+    blocks = [{"type": "text", "text": prefix, "cache_control": {"type": "ephemeral"}}]
+    if suffix:
+        blocks.append({"type": "text", "text": suffix})
+    return blocks
+
+
+class PromptCacheManager:
+    """
+    จัดการ handle ของ cache ฝั่ง provider (เช่น Gemini CachedContent) สำหรับ prefix ที่คงที่
+
+    - สร้าง handle ใหม่อัตโนมัติเมื่อ prefix เปลี่ยน (NPC.json / ตัวอย่างถูกโหลดใหม่) หรือใกล้หมดอายุ
+    - การสร้าง (network call) ทำนอก lock - ระหว่างที่กำลังสร้าง คำขออื่นของ prefix เดียวกันได้ None
+      (หรือ handle เดิมที่ยังไม่หมดอายุ) และส่ง prompt เต็มไปก่อนแทนการรอ
+    - ถ้าสร้างไม่สำเร็จเพราะ prefix ใช้ไม่ได้ (เช่น สั้นกว่าขั้นต่ำของ provider) จะจำไว้และไม่ลองซ้ำกับ prefix เดิม
+      ส่วนความล้มเหลวชั่วคราว (timeout / 5xx) ลองใหม่หลัง backoff
+      ผู้เรียกต้อง fallback เป็นการส่ง prompt เต็ม
+
+    Args:
+        create_fn: ฟังก์ชัน (prefix, ttl_seconds) -> handle
+        delete_fn: ฟังก์ชัน (handle) -> None สำหรับลบ cache เก่า (ไม่บังคับ)
+        ttl_seconds: อายุของ cache ฝั่ง provider
+    """
+
+    def __init__(self, create_fn, delete_fn=None, ttl_seconds=DEFAULT_CACHE_TTL, clock=time.monotonic):
+        self.create_fn = create_fn
+        self.delete_fn = delete_fn
+        self.ttl_seconds = ttl_seconds
+        self.clock = clock
+        self.enabled = True
+        self._lock = threading.Lock()
+        self._fingerprint = None
+        self._handle = None
+        self._expires_at = 0.0
+        self._failed_fingerprints = set()
+        self._creating = set()
+        self._retry_at = {}  # fingerprint -> (เวลาที่ลองใหม่ได้, จำนวนครั้งที่ล้มเหลวติดกัน)
+        self.stats = {"hits": 0, "creates": 0, "failures": 0}
+
+    def get(self, prefix):
+        """คืน handle สำหรับ prefix นี้ หรือ None ถ้าต้องส่ง prompt เต็ม"""
+        if not self.enabled or not prefix:
+            return None
+        fingerprint = prompt_fingerprint(prefix)
+        with self._lock:
+            now = self.clock()
+            current = self._handle if fingerprint == self._fingerprint else None
+            # ต่ออายุก่อนหมดจริงเล็กน้อย เพื่อไม่ให้คำขอไปชน cache ที่เพิ่งหมดอายุ
+            if current is not None and now < self._expires_at - 60:
+                self.stats["hits"] += 1
+                return current
+            if (
+                fingerprint in self._failed_fingerprints
+                or fingerprint in self._creating
+                or now < self._retry_at.get(fingerprint, (0.0, 0))[0]
+            ):
+                # handle เดิมที่ยังไม่หมดอายุจริงใช้ได้ระหว่างรอต่ออายุ
+                if current is not None and now < self._expires_at:
+                    self.stats["hits"] += 1
+                    return current
+                return None
+            self._creating.add(fingerprint)
+
+        try:
+            handle = self.create_fn(prefix, self.ttl_seconds)
+        except Exception as e:
+            with self._lock:
+                self._creating.discard(fingerprint)
+                self.stats["failures"] += 1
+                if is_permanent_failure(e):
+                    self._failed_fingerprints.add(fingerprint)
+                    logging.info(f"PromptCacheManager: provider cache unavailable, sending full prompt ({e})")
+                else:
+                    failures = self._retry_at.get(fingerprint, (0.0, 0))[1] + 1
+                    delay = min(MAX_RETRY_BACKOFF, RETRY_BACKOFF * 2 ** (failures - 1))
+                    self._retry_at[fingerprint] = (self.clock() + delay, failures)
+                    logging.info(
+                        f"PromptCacheManager: could not create provider cache, retrying in {delay:.0f}s ({e})"
+                    )
+            return None
+
+        with self._lock:
+            self._creating.discard(fingerprint)
+            self._retry_at.pop(fingerprint, None)
+            self.stats["creates"] += 1
+            old_handle = self._handle
+            self._handle = handle
+            self._fingerprint = fingerprint
+            self._expires_at = self.clock() + self.ttl_seconds
+        logging.info(f"PromptCacheManager: created provider cache for prefix {fingerprint[:10]}")
+
+        if old_handle is not None and old_handle is not handle:
+            self._delete(old_handle)
+        return handle
+
+    def invalidate(self):
+        """ล้าง handle ปัจจุบัน (เช่น เมื่อเปลี่ยนโมเดล) และลบ cache ฝั่ง provider"""
+        with self._lock:
+            old_handle = self._handle
+            self._handle = None
+            self._fingerprint = None
+            self._failed_fingerprints.clear()
+            self._retry_at.clear()
+        if old_handle is not None:
+            self._delete(old_handle)
+
+    def _delete(self, handle):
+        if self.delete_fn is None:
+            return
+        try:
+            self.delete_fn(handle)
+        except Exception as e:
+            logging.debug(f"PromptCacheManager: could not delete old cache: {e}")
+
+
+class _MockCachingProvider:
+    """
+    provider จำลองที่ทำงานแบบเดียวกับ prompt caching ของ Anthropic / Gemini:
+    prefix ที่ถูก cache ไว้แล้วจะถูกนับเป็น cached tokens ใน usage ของ response
+    """
+
+    class _Usage:
+        def __init__(self, input_tokens, cache_read, cache_write, output_tokens):
+            self.input_tokens = input_tokens
+            self.cache_read_input_tokens = cache_read
+            self.cache_creation_input_tokens = cache_write
+            self.output_tokens = output_tokens
+
+    class _Message:
+        def __init__(self, usage):
+            self.usage = usage
+            self.content = []
+
+    def __init__(self):
+        self.cached_prefixes = set()
+        self.handles = {}
+
+    def create_message(self, system, messages):
+        prefix_tokens = 0
+        cache_read = cache_write = 0
+        suffix_tokens = sum(len(m["content"]) // 4 for m in messages)
+        for block in system:
+            tokens = len(block["text"]) // 4
+            if block.get("cache_control"):
+                if block["text"] in self.cached_prefixes:
+                    cache_read += tokens
+                else:
+                    cache_write += tokens
+                    self.cached_prefixes.add(block["text"])
+            else:
+                prefix_tokens += tokens
+        return self._Message(
+            self._Usage(prefix_tokens + suffix_tokens, cache_read, cache_write, 20)
+        )
+
+    def create_cache(self, prefix, ttl_seconds):
+        handle = f"cachedContents/{len(self.handles)}"
+        self.handles[handle] = prefix
+        return handle
+
+    def delete_cache(self, handle):
+        self.handles.pop(handle, None)
+
+
+def benchmark():
+    """provider จำลอง: cached tokens ต่อการเรียกของ prefix คงที่ และจำนวนการสร้าง cache เมื่อ prefix เปลี่ยน"""
+    from usage_ledger import extract_usage_details
+
+    provider = _MockCachingProvider()
+    prefix = "RULES " * 2000
+    lines = ["Hello there.", "Where are we going?", "Stay close."]
+
+    cached_counts = []
+    for line in lines:
+        message = provider.create_message(
+            build_cached_system(prefix, "Character: Alphinaud"),
+            [{"role": "user", "content": line}],
+        )
+        cached_counts.append(extract_usage_details(message)["cached_tokens"])
+
+    manager = PromptCacheManager(provider.create_cache, provider.delete_cache)
+    for line in lines:
+        manager.get(prefix)
+    # จำลอง NPC.json เปลี่ยน - สร้าง cache ใหม่และลบของเก่า
+    manager.get(prefix + "NEW TERM")
+    print(f"cached tokens per call: {cached_counts}")
+    print(f"cache manager stats: {manager.stats}, live provider caches: {len(provider.handles)}")
+    return cached_counts
+
+
+if __name__ == "__main__":
+    benchmark()
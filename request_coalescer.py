@@ -0,0 +1,141 @@
+import functools
+import logging
+import re
+import threading
+from concurrent.futures import Future
+
+
+class SingleFlight:
+    """
+    รวมคำขอแปลที่เหมือนกันซึ่งกำลังรอผลอยู่ให้เหลือการเรียก API ครั้งเดียว (single-flight)
+
+    ผู้เรียกคนแรกของ key หนึ่งๆ จะเป็นผู้เรียก API จริง ส่วนผู้เรียกที่ตามมาระหว่างที่ยังไม่เสร็จ
+    จะรอผลจาก Future เดียวกัน (รวมถึง exception ถ้าผู้เรียกคนแรกล้มเหลว)
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._in_flight = {}  # key -> Future
+        self._local = threading.local()
+        self.stats = {"calls": 0, "executed": 0, "coalesced": 0, "bypassed": 0}
+
+    @staticmethod
+    def normalize_text(text):
+        """ทำให้ข้อความที่ต่างกันแค่ช่องว่างได้ key เดียวกัน"""
+        if not isinstance(text, str):
+            return text
+        return re.sub(r"\s+", " ", text).strip()
+
+    def make_key(self, method_name, text, speaker=None, dialogue_type=None):
+        return (
+            method_name,
+            self.normalize_text(text),
+            self.normalize_text(speaker) or None,
+            dialogue_type or None,
+        )
+
+    def do(self, key, func, *args, **kwargs):
+        """เรียก func ครั้งเดียวต่อ key ที่กำลังทำงานอยู่ และคืนผลลัพธ์ร่วมกัน"""
+        # การเรียกซ้อนจากภายในเธรดที่กำลังแปลอยู่ (เช่น retry ภายใน translate)
+        # ต้องเรียกตรง มิฉะนั้นจะรอ Future ของตัวเองจน deadlock
+        if getattr(self._local, "depth", 0):
+            with self._lock:
+                self.stats["bypassed"] += 1
+            return func(*args, **kwargs)
+
+        with self._lock:
+            self.stats["calls"] += 1
+            future = self._in_flight.get(key)
+            if future is not None:
+                self.stats["coalesced"] += 1
+                is_leader = False
+            else:
+                future = Future()
+                self._in_flight[key] = future
+                self.stats["executed"] += 1
+                is_leader = True
+
+        if not is_leader:
+            logging.debug(f"SingleFlight: coalesced duplicate request {key[0]}: {key[1][:40]!r}")
+            return future.result()
+
+        self._local.depth = 1
+        try:
+            result = func(*args, **kwargs)
+            future.set_result(result)
+            return result
+        except BaseException as e:
+            future.set_exception(e)
+            raise
+        finally:
+            self._local.depth = 0
+            with self._lock:
+                self._in_flight.pop(key, None)
+
+    def in_flight_count(self):
+        with self._lock:
+            return len(self._in_flight)
+
+    def get_stats(self):
+        with self._lock:
+            stats = dict(self.stats)
+        stats["saved_ratio"] = (
+            stats["coalesced"] / stats["calls"] if stats["calls"] else 0.0
+        )
+        return stats
+
+    def reset_stats(self):
+        with self._lock:
+            for name in self.stats:
+                self.stats[name] = 0
+
+
+# argument ที่บอกว่าเป็นการเรียกภายใน (retry / quality check) ซึ่งไม่ควรรวมกับคำขอปกติ
+_INTERNAL_KWARGS = ("retry", "quality_required")
+
+
+def install_single_flight(translator, single_flight=None):
+    """
+    ครอบ translate / translate_choice ของ translator instance ด้วย SingleFlight
+
+    Returns:
+        translator ตัวเดิม (มี attribute single_flight สำหรับดูสถิติ)
+    """
+    if getattr(translator, "single_flight", None) is not None:
+        return translator
+
+    single_flight = single_flight or SingleFlight()
+    translator.single_flight = single_flight
+
+    original_translate = translator.translate
+
+    @functools.wraps(original_translate)
+    def translate(text, *args, **kwargs):
+        if args or any(kwargs.get(name) for name in _INTERNAL_KWARGS):
+            return original_translate(text, *args, **kwargs)
+        dialogue_type = kwargs.get("dialogue_type")
+        if kwargs.get("is_lore_text"):
+            dialogue_type = "lore"
+        key = single_flight.make_key(
+            "translate", text, kwargs.get("character_name"), dialogue_type
+        )
+        return single_flight.do(key, original_translate, text, **kwargs)
+
+    translator.translate = translate
+
+    if hasattr(translator, "translate_choice"):
+        original_translate_choice = translator.translate_choice
+
+        @functools.wraps(original_translate_choice)
+        def translate_choice(text, *args, **kwargs):
+            if args:
+                return original_translate_choice(text, *args, **kwargs)
+            key = single_flight.make_key(
+                "translate_choice", text, kwargs.get("character_name"), "choice"
+            )
+            return single_flight.do(key, original_translate_choice, text, **kwargs)
+
+        translator.translate_choice = translate_choice
+
+    logging.info(f"Single-flight coalescing enabled for {type(translator).__name__}")
+    return translator
@@ -0,0 +1,389 @@
+import heapq
+import itertools
+import logging
+import random
+import re
+import threading
+import time
+from contextlib import contextmanager
+
+# ลำดับความสำคัญ (ค่าน้อย = สำคัญกว่า)
+PRIORITY_VISIBLE = 0  # บรรทัดที่กำลังแสดงบนจอ
+PRIORITY_CHOICE = 1
+PRIORITY_LORE = 2
+PRIORITY_BACKGROUND = 5  # batch / งานเบื้องหลัง
+PRIORITY_SPECULATIVE = 9  # แปลล่วงหน้า / ตรวจคุณภาพ
+
+PRIORITY_NAMES = {
+    PRIORITY_VISIBLE: "dialogue",
+    PRIORITY_CHOICE: "choice",
+    PRIORITY_LORE: "lore",
+    PRIORITY_BACKGROUND: "batch",
+    PRIORITY_SPECULATIVE: "quality",
+}
+
+# ขีดจำกัดเริ่มต้นต่อ provider (requests/minute, tokens/minute) - แก้ได้ผ่าน settings["rate_limits"]
+DEFAULT_RATE_LIMITS = {
+    "gemini": {"rpm": 30, "tpm": 1000000},
+    "claude": {"rpm": 50, "tpm": 40000},
+    "gpt": {"rpm": 500, "tpm": 200000},
+}
+
+# ใช้ขีดจำกัดต่ำกว่าของจริงเล็กน้อย เผื่อความคลาดเคลื่อนของการประมาณ token
+SAFETY_FACTOR = 0.9
+
+
+class RateLimitWaitTimeout(RuntimeError):
+    """รอคิวนานเกินกว่าที่ผู้เรียกยอมรับได้"""
+
+
+class TokenBucket:
+    """Token bucket แบบเติมต่อเนื่อง ยอมให้ติดลบได้เมื่อการใช้งานจริงเกินที่ประมาณไว้"""
+
+    def __init__(self, per_minute, clock=time.monotonic):
+        self.clock = clock
+        self.capacity = float(per_minute)
+        self.rate = self.capacity / 60.0
+        self.level = self.capacity
+        self.updated = clock()
+
+    def _refill(self):
+        now = self.clock()
+        self.level = min(self.capacity, self.level + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def time_until(self, amount):
+        """วินาทีที่ต้องรอจนกว่าจะมีพอสำหรับ amount (0 ถ้าพร้อมแล้ว)"""
+        self._refill()
+        amount = min(amount, self.capacity)
+        if self.level >= amount:
+            return 0.0
+        return (amount - self.level) / self.rate if self.rate else float("inf")
+
+    def consume(self, amount):
+        self._refill()
+        self.level -= min(amount, self.capacity)
+
+    def adjust(self, delta):
+        """ปรับยอดตามการใช้งานจริง (delta บวก = ใช้มากกว่าที่จองไว้)"""
+        self._refill()
+        self.level -= delta
+
+    def drain(self, seconds):
+        """ทำให้ bucket ว่างเป็นเวลา seconds (ใช้เมื่อ provider ตอบ 429)"""
+        self._refill()
+        self.level = min(self.level, -seconds * self.rate)
+
+
+class ProviderLimiter:
+    """ขีดจำกัด requests/minute และ tokens/minute ของ provider เดียว"""
+
+    def __init__(self, rpm, tpm, clock=time.monotonic):
+        self.requests = TokenBucket(rpm, clock)
+        self.tokens = TokenBucket(tpm, clock)
+
+    def time_until(self, estimated_tokens):
+        return max(
+            self.requests.time_until(1), self.tokens.time_until(estimated_tokens)
+        )
+
+    def consume(self, estimated_tokens):
+        self.requests.consume(1)
+        self.tokens.consume(estimated_tokens)
+
+
+def estimate_tokens(text, max_output_tokens=0):
+    """ประมาณจำนวน token ก่อนส่ง (ภาษาไทยและอังกฤษเฉลี่ย ~4 ตัวอักษรต่อ token)"""
+    return max(1, len(text or "") // 4) + (max_output_tokens or 0)
+
+
+def extract_usage(response):
+    """ดึงจำนวน token จริงจาก response ของ Gemini / Claude / OpenAI (None ถ้าไม่มี)"""
+    try:
+        usage = getattr(response, "usage_metadata", None)
+        if usage is not None:
+            return int(usage.total_token_count)
+        usage = getattr(response, "usage", None)
+        if usage is not None:
+            if getattr(usage, "total_tokens", None) is not None:
+                return int(usage.total_tokens)
+            return int(usage.input_tokens) + int(usage.output_tokens)
+    except (AttributeError, TypeError, ValueError):
+        pass
+    return None
+
+
+def is_rate_limit_error(error):
+    """ตรวจว่า exception มาจาก 429 / quota ของ provider หรือไม่"""
+    if type(error).__name__ in ("RateLimitError", "ResourceExhausted", "TooManyRequests"):
+        return True
+    if getattr(error, "status_code", None) == 429 or getattr(error, "code", None) == 429:
+        return True
+    message = str(error).lower()
+    return "429" in message or "rate limit" in message or "quota" in message
+
+
+def _retry_after_seconds(error):
+    """อ่าน retry-after จาก exception ถ้ามี"""
+    response = getattr(error, "response", None)
+    headers = getattr(response, "headers", None)
+    if headers:
+        try:
+            return float(headers.get("retry-after"))
+        except (TypeError, ValueError):
+            pass
+    match = re.search(r"retry in ([\d.]+)\s*s", str(error).lower())
+    return float(match.group(1)) if match else None
+
+
+class RequestScheduler:
+    """
+    ตัวจัดคิวคำขอ API ที่ใช้ร่วมกันทุก translator ที่สร้างจาก TranslatorFactory
+
+    - token bucket ต่อ provider ทั้ง requests/minute และ tokens/minute
+      ปรับยอดด้วยจำนวน token จริงจาก response
+    - คิวตามลำดับความสำคัญ: บรรทัดที่กำลังแสดงจะได้ไปก่อนงานเบื้องหลังเสมอ
+    - เมื่อใกล้ชนขีดจำกัดจะรอสั้นๆ แทนที่จะปล่อยให้ provider ตอบ 429
+    """
+
+    def __init__(self, rate_limits=None, clock=time.monotonic, max_wait=20.0, max_retries=3):
+        self.clock = clock
+        self.max_wait = max_wait
+        self.max_retries = max_retries
+        self._condition = threading.Condition()
+        self._limiters = {}
+        self._waiters = {}  # provider -> heap of [priority, seq]
+        self._sequence = itertools.count()
+        self._local = threading.local()
+        self.rate_limits = {}
+        self.stats = {
+            "requests": 0,
+            "waited": 0,
+            "total_wait": 0.0,
+            "rate_limited": 0,
+            "retried": 0,
+            "timeouts": 0,
+        }
+        self.configure(rate_limits)
+
+    def configure(self, rate_limits=None):
+        """ตั้งค่าขีดจำกัดใหม่ (รวมกับค่าเริ่มต้น) - limiter ของ provider ที่เปลี่ยนจะถูกสร้างใหม่"""
+        with self._condition:
+            merged = {name: dict(limits) for name, limits in DEFAULT_RATE_LIMITS.items()}
+            for name, limits in (rate_limits or {}).items():
+                merged.setdefault(name, {}).update(limits)
+            for name, limits in merged.items():
+                if self.rate_limits.get(name) != limits:
+                    self._limiters.pop(name, None)
+            self.rate_limits = merged
+            self._condition.notify_all()
+
+    def _get_limiter(self, provider):
+        limiter = self._limiters.get(provider)
+        if limiter is None:
+            limits = self.rate_limits.get(provider) or DEFAULT_RATE_LIMITS["gpt"]
+            limiter = ProviderLimiter(
+                limits["rpm"] * SAFETY_FACTOR, limits["tpm"] * SAFETY_FACTOR, self.clock
+            )
+            self._limiters[provider] = limiter
+        return limiter
+
+    @contextmanager
+    def priority(self, level):
+        """กำหนดลำดับความสำคัญของคำขอทั้งหมดที่เกิดในบล็อกนี้ (ต่อเธรด)"""
+        previous = getattr(self._local, "priority", None)
+        self._local.priority = level
+        try:
+            yield
+        finally:
+            self._local.priority = previous
+
+    def current_priority(self):
+        level = getattr(self._local, "priority", None)
+        return PRIORITY_VISIBLE if level is None else level
+
+    def priority_name(self, priority=None):
+        """ชื่อชนิดคำขอตามลำดับความสำคัญ (ใช้เป็น dialogue type ใน UsageLedger)"""
+        level = self.current_priority() if priority is None else priority
+        return PRIORITY_NAMES.get(level, str(level))
+
+    def acquire(self, provider, estimated_tokens, priority=None, max_wait=None):
+        """
+        รอจนกว่าจะถึงคิวและ bucket มีพอ แล้วจองโควต้า
+
+        Raises:
+            RateLimitWaitTimeout: ถ้าต้องรอนานกว่า max_wait
+        """
+        priority = self.current_priority() if priority is None else priority
+        max_wait = self.max_wait if max_wait is None else max_wait
+        start = self.clock()
+        deadline = start + max_wait
+
+        with self._condition:
+            waiters = self._waiters.setdefault(provider, [])
+            ticket = [priority, next(self._sequence)]
+            heapq.heappush(waiters, ticket)
+            try:
+                while True:
+                    limiter = self._get_limiter(provider)
+                    if waiters[0] is ticket:
+                        wait = limiter.time_until(estimated_tokens)
+                        if wait <= 0:
+                            limiter.consume(estimated_tokens)
+                            break
+                    else:
+                        wait = None  # รอจนคิวก่อนหน้าได้ไป
+
+                    remaining = deadline - self.clock()
+                    if remaining <= 0 or (wait is not None and wait > remaining):
+                        self.stats["timeouts"] += 1
+                        raise RateLimitWaitTimeout(
+                            f"{provider}: rate limit wait exceeds {max_wait:.1f}s"
+                        )
+                    self._condition.wait(remaining if wait is None else wait)
+            finally:
+                waiters.remove(ticket)
+                heapq.heapify(waiters)
+                self._condition.notify_all()
+
+            waited = self.clock() - start
+            self.stats["requests"] += 1
+            if waited > 0.01:
+                self.stats["waited"] += 1
+                self.stats["total_wait"] += waited
+                logging.debug(f"RequestScheduler: {provider} waited {waited:.2f}s (priority {priority})")
+        return waited
+
+    def record_usage(self, provider, estimated_tokens, actual_tokens):
+        """ปรับ bucket tokens/minute ตามจำนวน token จริง"""
+        if actual_tokens is None:
+            return
+        with self._condition:
+            self._get_limiter(provider).tokens.adjust(actual_tokens - estimated_tokens)
+
+    def report_rate_limited(self, provider, retry_after=None):
+        """provider ตอบ 429 - หยุดส่งคำขอทั้งหมดของ provider นี้ชั่วคราว"""
+        with self._condition:
+            self.stats["rate_limited"] += 1
+            self._get_limiter(provider).requests.drain(retry_after or 2.0)
+            self._condition.notify_all()
+
+    def call(self, provider, request_fn, estimated_tokens=1, priority=None, max_wait=None):
+        """
+        เรียก request_fn() ภายใต้ขีดจำกัดของ provider
+        ถ้าโดน 429 จะรอตาม retry-after แล้วลองใหม่ (ไม่เกิน max_retries) แทนที่จะคืน error ทันที
+        """
+        for attempt in range(self.max_retries + 1):
+            self.acquire(provider, estimated_tokens, priority, max_wait)
+            try:
+                response = request_fn()
+            except Exception as e:
+                # คืนโควต้า token ที่จองไว้ เพราะคำขอไม่ได้ถูกประมวลผล
+                self.record_usage(provider, estimated_tokens, 0)
+                if not is_rate_limit_error(e) or attempt >= self.max_retries:
+                    raise
+                retry_after = _retry_after_seconds(e) or min(2.0 ** attempt, 8.0)
+                logging.warning(
+                    f"RequestScheduler: {provider} rate limited, retrying in {retry_after:.1f}s "
+                    f"({attempt + 1}/{self.max_retries})"
+                )
+                self.report_rate_limited(provider, retry_after)
+                self.stats["retried"] += 1
+                continue
+            self.record_usage(provider, estimated_tokens, extract_usage(response))
+            return response
+
+    def get_stats(self):
+        with self._condition:
+            return dict(self.stats)
+
+
+_scheduler = None
+_scheduler_lock = threading.Lock()
+
+
+def get_request_scheduler(settings=None):
+    """คืน scheduler ตัวเดียวที่ใช้ร่วมกันทั้งแอป (อัพเดตขีดจำกัดจาก settings ถ้าส่งมา)"""
+    global _scheduler
+    with _scheduler_lock:
+        if _scheduler is None:
+            _scheduler = RequestScheduler()
+        if settings is not None:
+            _scheduler.configure(settings.get("rate_limits", None))
+        return _scheduler
+
+
+class _SimulatedProvider:
+    """provider จำลองที่บังคับขีดจำกัดด้วย token bucket ของตัวเองและตอบ 429 เมื่อเกิน"""
+
+    class RateLimitError(Exception):
+        pass
+
+    def __init__(self, rpm, tpm):
+        self.lock = threading.Lock()
+        self.limiter = ProviderLimiter(rpm, tpm)
+        self.served = 0
+        self.rejected = 0
+
+    def generate(self, tokens):
+        with self.lock:
+            if self.limiter.time_until(tokens) > 0:
+                self.rejected += 1
+                raise self.RateLimitError("429 Too Many Requests")
+            self.limiter.consume(tokens)
+            self.served += 1
+        time.sleep(random.uniform(0.005, 0.02))
+        return tokens
+
+
+def simulate(duration=3.0, workers=16, rpm=1200, tpm=120000):
+    """
+    จำลองการส่งบรรทัดด้วยอัตราสูงต่อเนื่องเข้า provider ที่มีขีดจำกัดจริง
+    แล้วรายงานจำนวน 429 และเวลารอแยกตามลำดับความสำคัญ
+    """
+    provider = _SimulatedProvider(rpm, tpm)
+    scheduler = RequestScheduler(
+        {"sim": {"rpm": rpm, "tpm": tpm}}, max_wait=duration, max_retries=0
+    )
+    waits = {PRIORITY_VISIBLE: [], PRIORITY_BACKGROUND: []}
+    errors = []
+    timeouts = []
+    stop_at = time.monotonic() + duration
+
+    def worker(index):
+        level = PRIORITY_VISIBLE if index % 4 == 0 else PRIORITY_BACKGROUND
+        while time.monotonic() < stop_at:
+            tokens = random.randint(50, 150)
+            started = time.monotonic()
+            try:
+                scheduler.call("sim", lambda: provider.generate(tokens), tokens, level)
+            except RateLimitWaitTimeout:
+                timeouts.append(level)
+                continue
+            except Exception as e:
+                errors.append(e)
+                continue
+            waits[level].append(time.monotonic() - started)
+
+    threads = [threading.Thread(target=worker, args=(i,)) for i in range(workers)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    def p95(values):
+        return sorted(values)[int(len(values) * 0.95)] if values else 0.0
+
+    print(
+        f"served={provider.served} rejected(429)={provider.rejected} "
+        f"errors={len(errors)} wait_timeouts={len(timeouts)}"
+    )
+    print(
+        f"p95 latency visible={p95(waits[PRIORITY_VISIBLE]) * 1000:.0f}ms "
+        f"background={p95(waits[PRIORITY_BACKGROUND]) * 1000:.0f}ms"
+    )
+    return provider.rejected
+
+
+if __name__ == "__main__":
+    simulate()
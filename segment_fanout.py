@@ -0,0 +1,193 @@
+"""
+Segment fan-out: แปลข้อความอิสระหลายส่วนของหน้าจอเดียวพร้อมกัน แทนการแปลทีละส่วนหรือรวมเป็น request เดียว
+
+หน้าจอที่มีหลายส่วนที่ไม่ขึ้นต่อกัน:
+- Lore/codex หลายย่อหน้า (คั่นด้วยบรรทัดว่าง) - แต่ละย่อหน้าผ่าน TranslationMemory/LoreSegmenter ของตัวเอง
+- บทพูดหลายคนในกล่องเดียว (แต่ละบรรทัดขึ้นต้นด้วยชื่อผู้พูด เช่น battle chatter)
+
+แต่ละส่วนถูกส่งผ่าน translator.translate ตามปกติ (FastPath, TranslationMemory, SingleFlight ทำงานรายส่วน)
+ใน thread pool ขนาดจำกัด แล้วประกอบผลตามลำดับเดิมเมื่อครบทุกส่วนหรือถึง deadline
+ส่วนที่ยังไม่เสร็จตอน deadline หรือล้มเหลวแสดงต้นฉบับไปก่อน (นับใน timed_out / failed ให้ผู้เรียกแปลซ้ำ)
+- request ที่ยังทำงานต่อเก็บคำแปลใน memory ให้รอบถัดไปใช้ได้ทันที ถ้าไม่มีส่วนใดสำเร็จเลยคืน "[Error ..."
+ เวลารอของหน้าจอหลายส่วนจึงเป็น max(ส่วน) แทน sum(ส่วน)
+
+รัน `python segment_fanout.py` เพื่อเทียบเวลาแบบทีละส่วนกับแบบพร้อมกันด้วย translator ปลอม
+"""
+
+import logging
+import re
+import threading
+import time
+from collections import namedtuple
+from concurrent.futures import ThreadPoolExecutor, wait
+
+MAX_WORKERS = 4
+DEADLINE = 15.0
+# ส่วนสั้นกว่านี้ไม่คุ้มที่จะแยก request
+MIN_SEGMENT_LENGTH = 24
+MAX_SEGMENTS = 6
+
+_PARAGRAPH_RE = re.compile(r"\n\s*\n")
+
+FanoutResult = namedtuple(
+    "FanoutResult", ["text", "translations", "timed_out", "failed", "elapsed_ms"]
+)
+_FAILED_PREFIXES = ("[Error", "[ERROR", "[Translation Error")
+
+
+def split_independent_segments(text, is_lore_text=False, speaker_of=None):
+    """
+    แยกข้อความของหน้าจอเป็นส่วนที่แปลแยกกันได้
+
+    Args:
+        speaker_of: callable(line) -> ชื่อผู้พูดหรือ None (ใช้แยกบทพูดหลายคน)
+
+    Returns:
+        list ของ (segment, separator) - คืนรายการเดียวถ้าไม่ควรแยก
+    """
+    text = (text or "").strip()
+    if is_lore_text:
+        paragraphs = [part.strip() for part in _PARAGRAPH_RE.split(text) if part.strip()]
+        if len(paragraphs) > 1 and all(len(part) >= MIN_SEGMENT_LENGTH for part in paragraphs):
+            return [(part, "\n\n") for part in paragraphs[:-1]] + [(paragraphs[-1], "")]
+        return [(text, "")]
+
+    lines = [line.strip() for line in text.split("\n") if line.strip()]
+    if len(lines) > 1 and speaker_of is not None:
+        speakers = [speaker_of(line) for line in lines]
+        if all(speakers) and len(set(speakers)) > 1:
+            return [(line, "\n") for line in lines[:-1]] + [(lines[-1], "")]
+    return [(text, "")]
+
+
+class SegmentFanout:
+    """
+    Args:
+        max_workers: จำนวน request พร้อมกันสูงสุดของหนึ่งรอบ (RequestScheduler ยังคุมอัตราด้านล่าง)
+        deadline: วินาทีสูงสุดที่รอทุกส่วนก่อนแสดงผลบางส่วน
+    """
+
+    def __init__(self, max_workers=MAX_WORKERS, deadline=DEADLINE):
+        self.max_workers = max_workers
+        self.deadline = deadline
+        self._executor = ThreadPoolExecutor(
+            max_workers=max_workers, thread_name_prefix="segment-fanout"
+        )
+        self.stats = {"screens": 0, "segments": 0, "deadline_hits": 0}
+
+    def translate(self, segments, translate_one, deadline=None):
+        """
+        Args:
+            segments: list ของ (segment, separator) จาก split_independent_segments
+            translate_one: callable(segment) -> คำแปล
+
+        Returns:
+            FanoutResult(text, translations, timed_out, failed, elapsed_ms)
+        """
+        start_time = time.perf_counter()
+        if len(segments) > MAX_SEGMENTS:
+            # ส่วนเกินรวมเป็นส่วนสุดท้ายส่วนเดียว
+            tail = "".join(segment + separator for segment, separator in segments[MAX_SEGMENTS - 1 :])
+            segments = segments[: MAX_SEGMENTS - 1] + [(tail.strip(), "")]
+        if len(segments) == 1:
+            translation = translate_one(segments[0][0])
+            return FanoutResult(
+                translation, [translation], 0, 0, (time.perf_counter() - start_time) * 1000
+            )
+
+        # ส่วนที่ซ้ำกันในหน้าจอเดียวส่งครั้งเดียว
+        futures = {}
+        for segment, _ in segments:
+            if segment not in futures:
+                futures[segment] = self._executor.submit(translate_one, segment)
+        done, pending = wait(futures.values(), timeout=deadline or self.deadline)
+
+        translations, timed_out, failed = [], 0, 0
+        for segment, _ in segments:
+            future = futures[segment]
+            translation = None
+            if future not in done:
+                timed_out += 1
+            else:
+                try:
+                    translation = future.result()
+                except Exception as e:
+                    logging.error(f"SegmentFanout: segment failed: {e}")
+                if not translation or str(translation).startswith(_FAILED_PREFIXES):
+                    failed += 1
+                    translation = None
+            translations.append(translation if translation is not None else segment)
+
+        self.stats["screens"] += 1
+        self.stats["segments"] += len(segments)
+        if pending:
+            self.stats["deadline_hits"] += 1
+            logging.warning(
+                f"SegmentFanout: deadline hit, {len(pending)}/{len(futures)} segments still running"
+            )
+        if timed_out + failed >= len(segments):
+            # ไม่มีส่วนใดแปลสำเร็จ - อย่าแสดงต้นฉบับเหมือนเป็นคำแปล
+            text = f"[Error: {failed} segment(s) failed, {timed_out} timed out]"
+        else:
+            text = "".join(
+                translation + separator
+                for translation, (_, separator) in zip(translations, segments)
+            )
+        return FanoutResult(
+            text, translations, timed_out, failed, (time.perf_counter() - start_time) * 1000
+        )
+
+
+_fanout = None
+_fanout_lock = threading.Lock()
+
+
+def get_segment_fanout():
+    global _fanout
+    with _fanout_lock:
+        if _fanout is None:
+            _fanout = SegmentFanout()
+        return _fanout
+
+
+def benchmark():
+    """translator ปลอมที่ใช้เวลาตามความยาวข้อความ - เทียบทีละส่วนกับแบบพร้อมกัน (และกรณีถึง deadline)"""
+    scale = 0.01  # 1 วินาทีจำลอง = 10 ms จริง
+
+    def fake_translate(segment):
+        time.sleep((0.6 + len(segment) / 120) * scale)
+        return f"<th:{segment[:16]}>"
+
+    codex = "\n\n".join(
+        [
+            "The Crystal Tower was raised by the Allagan Empire some five thousand years ago. "
+            "Its architect, Amon, sought to harness the power of the sun itself.",
+            "When the tower fell silent, the Students of Baldesion began to study it.",
+            "What they found there would change the fate of Eorzea forever, or so the scholars claim.",
+        ]
+    )
+    chatter = "Alphinaud: Stand fast!\nAlisaie: Not while I still draw breath!\nThancred: Watch the flank."
+    screens = {
+        "codex (3 paragraphs)": split_independent_segments(codex, is_lore_text=True),
+        "battle chatter (3 speakers)": split_independent_segments(
+            chatter, speaker_of=lambda line: line.split(":", 1)[0] if ":" in line else None
+        ),
+    }
+    fanout = SegmentFanout()
+    for name, segments in screens.items():
+        start_time = time.perf_counter()
+        for segment, _ in segments:
+            fake_translate(segment)
+        sequential = (time.perf_counter() - start_time) / scale
+        result = fanout.translate(segments, fake_translate)
+        print(
+            f"{name:30s} segments={len(segments)} sequential {sequential:.2f}s, "
+            f"fan-out {result.elapsed_ms / 1000 / scale:.2f}s"
+        )
+    result = fanout.translate(screens["codex (3 paragraphs)"], fake_translate, deadline=1.5 * scale)
+    print(f"deadline 1.5s: {result.timed_out} segment(s) shown untranslated until the next cycle")
+    return fanout.stats
+
+
+if __name__ == "__main__":
+    benchmark()
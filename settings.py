@@ -3,6 +3,7 @@ from tkinter import ttk, messagebox
 import json
 import os
 import logging
+import threading
 from PIL import Image, ImageTk
 from translator_factory import TranslatorFactory
 from appearance import appearance_manager
@@ -11,6 +12,7 @@ from advance_ui import AdvanceUI
 from simplified_hotkey_ui import SimplifiedHotkeyUI  # import จากไฟล์ใหม่
 from font_manager import FontUI, initialize_font_manager, FontUIManager
 from version_manager import get_settings_version  # สำหรับจัดการเวอร์ชั่น
+from settings_writer import DebouncedJsonWriter
 from utils_appearance import (
     SettingsUITheme,
     ModernButton,
@@ -143,6 +145,13 @@ class Settings:
             "last_manual_preset_selection_time": 0,  # *** เพิ่ม field นี้ ***
             "display_scale": None,
             "use_gpu_for_ocr": False,
+            "ocr_fast_cpu_mode": False,  # recognizer แบบ int8 + จำกัด thread (มีผลเฉพาะตอนไม่ใช้ GPU)
+            "ocr_engine": "auto",  # auto = engine ที่ benchmark เลือก (python ocr_engines.py), easyocr, tesseract
+            "model_routing": {  # บรรทัดสั้น/choice ไปโมเดลเร็ว (ดู model_router.py) - ต้องเปิดเอง
+                "enabled": False,
+                "fast_model": None,  # None = โมเดลเร็วของ provider เดียวกัน
+                "fallback_model": None,  # โมเดลสำรองเมื่อหมดเวลา (ข้าม provider ได้ ต้องมี API key)
+            },
             "screen_size": "2560x1440",  # ขนาดหน้าจออ้างอิงเริ่มต้น
             "shortcuts": {  # ค่า default shortcuts
                 "toggle_ui": "alt+l",
@@ -189,6 +198,12 @@ class Settings:
             },
         }
         self.settings = {}  # เริ่มต้น settings เป็น dict ว่าง
+        self._lock = threading.RLock()
+        self._change_listeners = []
+        # เขียนไฟล์แบบ write-behind: set()/save_settings() ไม่ทำ I/O บน thread ที่เรียก
+        self._writer = DebouncedJsonWriter(
+            "settings.json", lambda: self.settings, lock=self._lock
+        )
         self.load_settings()  # โหลดค่าจากไฟล์ (ถ้ามี)
 
         # --- FIX: เพิ่มด่านตรวจและแก้ไขค่าภาษาที่ผิดทันทีหลังโหลด ---
@@ -254,6 +269,9 @@ class Settings:
             logging.info("Saving corrected settings back to settings.json.")
             self.save_settings()
 
+        # ไฟล์ที่สร้าง/แก้ตอนเริ่มโปรแกรมต้องอยู่บนดิสก์ก่อนที่ before_start checkers จะอ่าน
+        self.flush()
+
     def validate_model_parameters(self, params):
         """Validate the given parameters."""
         if not isinstance(params, dict):
@@ -332,8 +350,22 @@ class Settings:
         return self.settings.get(key, default)
 
     def set(self, key, value):
-        self.settings[key] = value
-        self.save_settings()
+        with self._lock:
+            self.settings[key] = value
+        self.save_settings(changed_key=key)
+
+    def add_change_listener(self, callback):
+        """ลงทะเบียน callback(key) ที่ถูกเรียกเมื่อค่าเปลี่ยน (key = None เมื่อไม่ทราบว่า key ไหน)"""
+        if callback not in self._change_listeners:
+            self._change_listeners.append(callback)
+
+    def remove_change_listener(self, callback):
+        if callback in self._change_listeners:
+            self._change_listeners.remove(callback)
+
+    def flush(self):
+        """เขียนการเปลี่ยนแปลงที่ค้างอยู่ลง settings.json ทันที (ใช้ตอนปิดโปรแกรม)"""
+        return self._writer.flush()
 
     def load_settings(self):
         try:
@@ -342,8 +374,13 @@ class Settings:
         except (FileNotFoundError, json.JSONDecodeError):
             self.settings = {}  # ถ้าไฟล์ไม่มีหรือเสีย ให้เริ่มจาก dict ว่าง
 
-    def save_settings(self):
-        """Save all current settings to file."""
+    def save_settings(self, changed_key=None):
+        """
+        Mark settings as changed and schedule a write to settings.json.
+
+        The file is written by a background writer that coalesces rapid changes
+        and replaces the file atomically; call flush() to write immediately.
+        """
         try:
             # จัดการ API parameters
             if "api_parameters" in self.settings:
@@ -371,14 +408,20 @@ class Settings:
                     {"name": "Preset 5", "areas": "A+B+C"},
                 ]
 
-            # บันทึกไฟล์
-            with open("settings.json", "w") as f:
-                json.dump(self.settings, f, indent=4)
-
         except Exception as e:
             logging.error(f"Error saving settings: {e}")
             raise
 
+        self._writer.mark_dirty()
+        self._notify_change(changed_key)
+
+    def _notify_change(self, changed_key):
+        for callback in list(self._change_listeners):
+            try:
+                callback(changed_key)
+            except Exception as e:
+                logging.error(f"Settings change listener failed: {e}")
+
     def ensure_default_values(self):
         """Add default values if missing and ensure preset structure."""
         changes_made = False  # Flag ตรวจสอบว่ามีการเปลี่ยนแปลงค่าหรือไม่
@@ -994,6 +1037,8 @@ class Settings:
         logging.info(
             f"Area {area} coordinates saved: ({start_x},{start_y}) to ({end_x},{end_y})"
         )
+        # ยังไม่เขียนไฟล์ (ผู้เรียกจะ save เอง) แต่แจ้งให้ area_geometry คำนวณพิกัดใหม่
+        self._notify_change("translate_areas")
 
     def get_translate_area(self, area):
         """Return the translation area data with a new copy to prevent reference issues."""
@@ -1226,7 +1271,7 @@ class Settings:
 
     def save_all_ui_positions(self):
         """บันทึกการตั้งค่าลงไฟล์ settings.json เพื่อบันทึกตำแหน่งหน้าต่าง UI"""
-        self.save_settings()
+        self.save_settings("ui_positions")
         logging.info("บันทึกตำแหน่งหน้าต่าง UI ทั้งหมดลงไฟล์ settings.json สำเร็จ")
 
 
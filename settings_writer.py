@@ -0,0 +1,187 @@
+"""
+Write-behind สำหรับไฟล์ JSON (settings.json): ผู้เรียกแค่ทำเครื่องหมายว่ามีการเปลี่ยนแปลง
+แล้ว writer thread จะรวมการเปลี่ยนแปลงที่เกิดติดๆ กันเป็นการเขียนไฟล์ครั้งเดียว
+
+- รอจนไม่มีการเปลี่ยนแปลงใหม่ `delay` วินาที แต่ไม่เกิน `max_delay` นับจากการเปลี่ยนแปลงแรก
+  (ลากหน้าต่างต่อเนื่องก็ยังถูกบันทึกเป็นระยะ)
+- เขียนลงไฟล์ .tmp แล้ว os.replace ทับไฟล์จริง - โปรแกรมล่มระหว่างเขียนจะไม่ทิ้งไฟล์ครึ่งๆ กลางๆ
+- flush() ตอนปิดโปรแกรม (และ atexit) เพื่อไม่ให้การเปลี่ยนแปลงล่าสุดหาย
+"""
+
+import atexit
+import json
+import logging
+import os
+import threading
+import time
+
+DEFAULT_DELAY = 2.0
+DEFAULT_MAX_DELAY = 10.0
+
+
+class DebouncedJsonWriter:
+    """
+    Args:
+        path: ไฟล์ปลายทาง
+        snapshot: callable ที่คืน object ที่จะ dump (เรียกบน writer thread)
+        delay: ช่วงเงียบก่อนเขียน (วินาที)
+        max_delay: เวลารอสูงสุดนับจากการเปลี่ยนแปลงแรกที่ยังไม่ได้เขียน
+        lock: lock ที่ผู้แก้ข้อมูลถืออยู่ (ถ้ามี) - ถือไว้ระหว่าง serialize
+    """
+
+    def __init__(
+        self,
+        path,
+        snapshot,
+        delay=DEFAULT_DELAY,
+        max_delay=DEFAULT_MAX_DELAY,
+        indent=4,
+        lock=None,
+    ):
+        self.path = path
+        self.delay = delay
+        self.max_delay = max_delay
+        self.indent = indent
+        self._snapshot = snapshot
+        self._data_lock = lock
+        self._cond = threading.Condition()
+        self._write_lock = threading.Lock()
+        self._dirty_since = None
+        self._last_change = None
+        self._closed = False
+        self._thread = None
+        self.stats = {"requests": 0, "writes": 0, "errors": 0}
+        atexit.register(self.close)
+
+    @property
+    def pending(self):
+        return self._dirty_since is not None
+
+    def mark_dirty(self):
+        """แจ้งว่าข้อมูลเปลี่ยน - ไม่ทำ I/O บน thread ที่เรียก"""
+        with self._cond:
+            now = time.monotonic()
+            self.stats["requests"] += 1
+            if self._dirty_since is None:
+                self._dirty_since = now
+            self._last_change = now
+            if self._closed:
+                closed = True
+            else:
+                closed = False
+                self._ensure_thread()
+                self._cond.notify()
+        if closed:
+            self.flush()  # หลัง close() ไม่มี writer thread แล้ว เขียนทันที
+
+    def flush(self):
+        """เขียนการเปลี่ยนแปลงที่ค้างอยู่ทันที (รอ writer thread ที่กำลังเขียนอยู่ให้เสร็จก่อน)"""
+        with self._write_lock:
+            return self._write_if_dirty()
+
+    def close(self):
+        """หยุด writer thread แล้ว flush ครั้งสุดท้าย"""
+        with self._cond:
+            self._closed = True
+            self._cond.notify()
+            thread = self._thread
+        if thread is not None and thread is not threading.current_thread():
+            thread.join(timeout=2.0)
+        self.flush()
+
+    def _ensure_thread(self):
+        if self._thread is None or not self._thread.is_alive():
+            self._thread = threading.Thread(
+                target=self._run, name="SettingsWriter", daemon=True
+            )
+            self._thread.start()
+
+    def _run(self):
+        while True:
+            with self._cond:
+                while self._dirty_since is None and not self._closed:
+                    self._cond.wait()
+                if self._closed:
+                    return  # close() จะ flush เอง
+                # รวมการเปลี่ยนแปลงจนกว่าจะเงียบ หรือครบ max_delay
+                while not self._closed and self._dirty_since is not None:
+                    due = min(
+                        self._last_change + self.delay,
+                        self._dirty_since + self.max_delay,
+                    )
+                    remaining = due - time.monotonic()
+                    if remaining <= 0:
+                        break
+                    self._cond.wait(remaining)
+                if self._closed:
+                    return
+            self.flush()
+
+    def _write_if_dirty(self):
+        with self._cond:
+            if self._dirty_since is None:
+                return False
+            # ล้างสถานะก่อน serialize: การเปลี่ยนแปลงระหว่างเขียนจะถูกเขียนในรอบถัดไป
+            self._dirty_since = None
+
+        try:
+            content = self._serialize()
+            self._atomic_write(content)
+            self.stats["writes"] += 1
+            return True
+        except Exception as e:
+            self.stats["errors"] += 1
+            logging.error(f"Error writing {self.path}: {e}")
+            return False
+
+    def _serialize(self):
+        for attempt in range(3):
+            try:
+                if self._data_lock is not None:
+                    with self._data_lock:
+                        return json.dumps(self._snapshot(), indent=self.indent)
+                return json.dumps(self._snapshot(), indent=self.indent)
+            except RuntimeError:
+                # dict ถูกแก้จาก thread อื่นระหว่าง dump - ลองใหม่
+                if attempt == 2:
+                    raise
+                time.sleep(0.01)
+
+    def _atomic_write(self, content):
+        temp_path = f"{self.path}.tmp"
+        with open(temp_path, "w") as f:
+            f.write(content)
+            f.flush()
+            os.fsync(f.fileno())
+        for attempt in range(5):
+            try:
+                os.replace(temp_path, self.path)
+                return
+            except PermissionError:
+                # Windows: ไฟล์ถูกเปิดค้างโดยโปรแกรมอื่น (เช่น antivirus) ชั่วขณะ
+                if attempt == 4:
+                    raise
+                time.sleep(0.05)
+
+
+def simulate(changes=600, duration=3.0, path="settings_writer_demo.json"):
+    """จำลองการลากหน้าต่าง: set ค่าต่อเนื่อง `changes` ครั้งใน `duration` วินาที แล้วนับจำนวนการเขียนไฟล์"""
+    data = {"ui_positions": {}}
+    writer = DebouncedJsonWriter(path, lambda: data, delay=0.5, max_delay=2.0)
+    start_time = time.perf_counter()
+    for i in range(changes):
+        data["ui_positions"]["main_ui"] = f"300x400+{i}+{i}"
+        writer.mark_dirty()
+        time.sleep(duration / changes)
+    call_ms = (time.perf_counter() - start_time - duration) * 1000 / changes
+    writer.close()
+    os.remove(path)
+    print(
+        f"{writer.stats['requests']} changes -> {writer.stats['writes']} writes "
+        f"(old behaviour: {changes}), caller overhead ~{max(0.0, call_ms):.3f} ms/change"
+    )
+    return writer.stats
+
+
+if __name__ == "__main__":
+    simulate()
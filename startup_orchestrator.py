@@ -0,0 +1,332 @@
+"""
+Startup orchestrator: ประกาศงานตอนเริ่มโปรแกรมพร้อม dependency แล้วรันงานที่ไม่ขึ้นต่อกัน
+บน worker thread พร้อมกัน งานที่แตะ Tk จะถูกส่งกลับไปรันบน Tk thread ผ่าน root.after
+เมื่องาน critical ทั้งหมดเสร็จจะเรียก callback (ใช้ปิด splash / แสดง main UI)
+"""
+
+import logging
+import queue
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+# สถานะของงาน
+PENDING = "pending"
+RUNNING = "running"
+DONE = "done"
+FAILED = "failed"
+SKIPPED = "skipped"
+
+_FINISHED = (DONE, FAILED, SKIPPED)
+
+
+class StartupTask:
+    """งานหนึ่งรายการใน startup graph"""
+
+    def __init__(self, name, fn, deps=(), main_thread=False, critical=True):
+        self.name = name
+        self.fn = fn
+        self.deps = tuple(deps)
+        self.main_thread = main_thread
+        self.critical = critical
+        self.status = PENDING
+        self.result = None
+        self.error = None
+        self.started_at = None
+        self.finished_at = None
+        self.thread_name = None
+        self._event = threading.Event()
+
+    @property
+    def duration(self):
+        if self.started_at is None or self.finished_at is None:
+            return None
+        return self.finished_at - self.started_at
+
+
+class StartupOrchestrator:
+    """
+    รันงานเริ่มต้นตามลำดับ dependency
+
+    - งาน main_thread=False รันใน ThreadPoolExecutor ทันทีที่ dependency เสร็จ
+    - งาน main_thread=True (สร้าง/แก้ widget) รันบน Tk thread ผ่าน root.after
+    - งานที่ล้มเหลวจะถูกบันทึก และงานที่พึ่งพามันจะถูกข้าม (ไม่หยุดทั้งระบบ)
+
+    Args:
+        root: Tk root สำหรับส่งงานกลับ Tk thread (None = รันบน thread ที่เรียก pump เอง)
+        max_workers: จำนวน worker thread สูงสุด
+        poll_ms: ความถี่ที่ Tk thread ตรวจคิวงานที่รอรัน
+    """
+
+    def __init__(self, root=None, max_workers=3, poll_ms=20, clock=time.perf_counter):
+        self.root = root
+        self.poll_ms = poll_ms
+        self.clock = clock
+        self.tasks = {}
+        self._order = []
+        self._lock = threading.Lock()
+        self._main_queue = queue.Queue()
+        self._executor = ThreadPoolExecutor(
+            max_workers=max_workers, thread_name_prefix="MBBStartup"
+        )
+        self._started_at = None
+        self._on_critical_done = None
+        self._on_all_done = None
+        self._critical_fired = False
+        self._all_fired = False
+        self._polling = False
+
+    def add(self, name, fn, deps=(), main_thread=False, critical=True):
+        """ประกาศงาน - ต้องเรียกก่อน start() และ dependency ต้องถูกประกาศไว้ก่อนแล้ว"""
+        if name in self.tasks:
+            raise ValueError(f"Startup task already declared: {name}")
+        missing = [dep for dep in deps if dep not in self.tasks]
+        if missing:
+            raise ValueError(f"Startup task {name} depends on unknown tasks: {missing}")
+        task = StartupTask(name, fn, deps, main_thread, critical)
+        self.tasks[name] = task
+        self._order.append(name)
+        return task
+
+    def add_milestone(self, name, deps=(), critical=True):
+        """
+        ประกาศจุดที่ถูกทำเครื่องหมายว่าเสร็จจากภายนอกด้วย complete()
+        เช่น "สร้าง UI ใน __init__ เสร็จแล้ว" เพื่อให้งานที่ต้องใช้ widget รอจนถึงจุดนั้น
+        """
+        return self.add(name, None, deps, main_thread=True, critical=critical)
+
+    def complete(self, name, result=None):
+        """ทำเครื่องหมายว่า milestone เสร็จแล้ว และปล่อยงานที่รออยู่"""
+        task = self.tasks[name]
+        now = self.clock()
+        task.started_at = task.started_at or now
+        task.finished_at = now
+        task.thread_name = threading.current_thread().name
+        task.result = result
+        task.status = DONE
+        task._event.set()
+        self._schedule_ready()
+
+    def start(self, on_critical_done=None, on_all_done=None):
+        """เริ่มรันงานที่ไม่มี dependency - callback ทั้งสองถูกเรียกบน Tk thread"""
+        self._on_critical_done = on_critical_done
+        self._on_all_done = on_all_done
+        self._started_at = self.clock()
+        for task in self.tasks.values():
+            if task.fn is None and task.started_at is None:
+                task.started_at = self._started_at  # milestone นับเวลาตั้งแต่เริ่ม
+        self._schedule_ready()
+        self._ensure_polling()
+
+    def wait(self, name, timeout=None):
+        """
+        รอให้งาน (worker) เสร็จแล้วคืนผลลัพธ์ ใช้เมื่อโค้ดบน Tk thread ต้องการผลของงานนั้นทันที
+
+        Raises:
+            exception เดิมของงาน ถ้างานล้มเหลว / TimeoutError ถ้ารอเกิน timeout
+        """
+        task = self.tasks[name]
+        if not task._event.wait(timeout):
+            raise TimeoutError(f"Startup task {name} did not finish in {timeout}s")
+        if task.status == FAILED:
+            raise task.error
+        return task.result
+
+    def is_done(self, name):
+        task = self.tasks.get(name)
+        return task is not None and task.status == DONE
+
+    # ---- scheduling ----
+
+    def _schedule_ready(self):
+        to_run = []
+        with self._lock:
+            changed = True
+            while changed:  # การข้ามงานหนึ่งอาจทำให้งานที่ขึ้นต่อกันเป็นทอดๆ ต้องถูกข้ามด้วย
+                changed = False
+                for name in self._order:
+                    task = self.tasks[name]
+                    if task.status != PENDING:
+                        continue
+                    dep_states = [self.tasks[dep].status for dep in task.deps]
+                    if any(state in (FAILED, SKIPPED) for state in dep_states):
+                        task.status = SKIPPED
+                        task.started_at = task.finished_at = self.clock()
+                        task._event.set()
+                        changed = True
+                        logging.warning(f"Startup: skipped {name} (dependency failed)")
+                    elif task.fn is None:
+                        continue  # milestone - รอ complete()
+                    elif all(state == DONE for state in dep_states):
+                        task.status = RUNNING
+                        to_run.append(task)
+
+        for task in to_run:
+            if task.main_thread:
+                self._main_queue.put(task)
+            else:
+                self._executor.submit(self._run, task)
+
+    def _run(self, task):
+        task.thread_name = threading.current_thread().name
+        task.started_at = self.clock()
+        try:
+            task.result = task.fn()
+            task.status = DONE
+        except Exception as e:
+            task.error = e
+            task.status = FAILED
+            logging.error(f"Startup task {task.name} failed: {e}")
+        finally:
+            task.finished_at = self.clock()
+            task._event.set()
+        self._schedule_ready()
+        if self.root is None:
+            self._check_milestones()
+
+    def _ensure_polling(self):
+        if self.root is None or self._polling:
+            return
+        self._polling = True
+        self.root.after(0, self._poll)
+
+    def _poll(self):
+        """รันงาน Tk-thread ที่พร้อมแล้ว และตรวจว่าถึง milestone หรือยัง (รันบน Tk thread)"""
+        self.pump()
+        if self._all_fired:
+            self._polling = False
+            return
+        try:
+            self.root.after(self.poll_ms, self._poll)
+        except Exception:
+            self._polling = False  # root ถูกปิดไปแล้ว
+
+    def pump(self):
+        """รันงาน main_thread ที่อยู่ในคิว (เรียกจาก Tk thread หรือจาก thread ที่ทดสอบ)"""
+        while True:
+            try:
+                task = self._main_queue.get_nowait()
+            except queue.Empty:
+                break
+            self._run(task)
+        self._check_milestones()
+
+    def _check_milestones(self):
+        with self._lock:
+            tasks = list(self.tasks.values())
+            fire_critical = not self._critical_fired and all(
+                task.status in _FINISHED for task in tasks if task.critical
+            )
+            fire_all = not self._all_fired and all(task.status in _FINISHED for task in tasks)
+            self._critical_fired = self._critical_fired or fire_critical
+            self._all_fired = self._all_fired or fire_all
+
+        if fire_critical:
+            logging.info(
+                f"Startup: critical path ready in {self.clock() - self._started_at:.2f}s"
+            )
+            self._fire(self._on_critical_done)
+        if fire_all:
+            logging.info(self.format_timeline())
+            self._executor.shutdown(wait=False)
+            self._fire(self._on_all_done)
+
+    @staticmethod
+    def _fire(callback):
+        if callback is None:
+            return
+        try:
+            callback()
+        except Exception as e:
+            logging.error(f"Startup callback failed: {e}")
+
+    # ---- reporting ----
+
+    def timeline(self):
+        """รายการ (name, start, end, status, thread, critical) เรียงตามเวลาเริ่ม - หน่วยวินาทีนับจาก start()"""
+        origin = self._started_at or 0.0
+        rows = []
+        for name in self._order:
+            task = self.tasks[name]
+            start = task.started_at - origin if task.started_at is not None else None
+            end = task.finished_at - origin if task.finished_at is not None else None
+            rows.append(
+                {
+                    "name": name,
+                    "start": start,
+                    "end": end,
+                    "status": task.status,
+                    "thread": task.thread_name or ("tk" if task.main_thread else "-"),
+                    "critical": task.critical,
+                }
+            )
+        rows.sort(key=lambda row: row["start"] if row["start"] is not None else float("inf"))
+        return rows
+
+    def format_timeline(self, width=30):
+        """timeline แบบข้อความ (ใช้ log ตอนเริ่มโปรแกรมเสร็จ)"""
+        rows = self.timeline()
+        finished = [row["end"] for row in rows if row["end"] is not None]
+        total = max(finished) if finished else 0.0
+        scale = width / total if total > 0 else 0
+        lines = [f"=== Startup timeline ({total:.2f}s) ==="]
+        for row in rows:
+            if row["start"] is None:
+                lines.append(f"{row['name']:<22} {row['status']}")
+                continue
+            offset = int(row["start"] * scale)
+            length = max(1, int((row["end"] - row["start"]) * scale))
+            bar = " " * offset + "#" * length
+            marker = "*" if row["critical"] else " "
+            lines.append(
+                f"{marker}{row['name']:<21} {row['start']:6.2f}s -> {row['end']:6.2f}s "
+                f"{row['status']:<7} {row['thread']:<14} |{bar:<{width}}|"
+            )
+        return "\n".join(lines)
+
+
+def simulate():
+    """จำลองการเริ่มโปรแกรม: เทียบลำดับเดิม (serial + splash 5 วินาที) กับ orchestrator"""
+    durations = {
+        "fonts": 0.15,
+        "ocr_reader": 0.8,
+        "translator": 0.3,
+        "npc_index": 0.2,
+        "before_start": 0.1,
+        "ui_positions": 0.05,
+        "hover": 0.05,
+        "main_ui": 0.25,
+    }
+
+    def sleeper(name):
+        return lambda: time.sleep(durations[name]) or name
+
+    serial_time = max(5.0, sum(durations.values()))
+
+    orchestrator = StartupOrchestrator(root=None)
+    orchestrator.add("fonts", sleeper("fonts"))
+    orchestrator.add("ocr_reader", sleeper("ocr_reader"), critical=False)
+    orchestrator.add("translator", sleeper("translator"))
+    orchestrator.add("npc_index", sleeper("npc_index"), deps=("translator",))
+    orchestrator.add("before_start", sleeper("before_start"), critical=False)
+    orchestrator.add_milestone("main_ui")
+    orchestrator.add("ui_positions", sleeper("ui_positions"), deps=("fonts", "main_ui"), main_thread=True)
+    orchestrator.add("hover", sleeper("hover"), deps=("ui_positions",), main_thread=True, critical=False)
+
+    ready = {}
+    start = time.perf_counter()
+    orchestrator.start(on_critical_done=lambda: ready.setdefault("critical", time.perf_counter() - start))
+    time.sleep(durations["main_ui"])  # Tk thread สร้าง widget ระหว่างที่ worker ทำงาน
+    orchestrator.complete("main_ui")
+    while not orchestrator._all_fired:
+        orchestrator.pump()
+        time.sleep(0.005)
+
+    print(orchestrator.format_timeline())
+    print(f"serial startup (old floor):  {serial_time:.2f}s")
+    print(f"main UI usable (orchestrated): {ready['critical']:.2f}s")
+    return ready["critical"], serial_time
+
+
+if __name__ == "__main__":
+    simulate()
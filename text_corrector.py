@@ -5,6 +5,7 @@ import os
 from enum import Enum
 import logging
 from npc_file_utils import get_npc_file_path
+from line_parser import LineParser
 
 
 # DialogueType Enum
@@ -40,7 +41,9 @@ class TextCorrector:
         self.confirmed_names = set()  # ย้ายขึ้นมาก่อน
         self.temp_names_cache = []
         self.max_cached_names = 10
-        
+        # ผลการแยกชื่อ/เนื้อหาที่ memoize ไว้ ใช้ร่วมกันระหว่าง MBB และ translator
+        self.line_parser = LineParser(self)
+
         self.load_npc_data()
 
         # สร้างไฟล์ new_friends.json ถ้ายังไม่มี
@@ -228,9 +231,20 @@ class TextCorrector:
                     data = json.load(f)
                     for npc in data.get("npcs", []):
                         self.confirmed_names.add(npc["name"])
+            self.line_parser.clear()
         except Exception as e:
             logging.error(f"Error loading new_friends.json: {e}")
 
+    def parse_line(self, text):
+        """
+        แยกชื่อผู้พูดและเนื้อหาครั้งเดียวต่อข้อความ (memoize) - ใช้แทนการเรียก
+        split_speaker_and_content ซ้ำในแต่ละขั้นของ pipeline
+
+        Returns:
+            line_parser.ParsedLine
+        """
+        return self.line_parser.parse(text)
+
     def save_new_friend(self, name, role="Unknown", description="Found in dialogue"):
         try:
             # สร้างโครงสร้างข้อมูลเริ่มต้น
@@ -262,6 +276,7 @@ class TextCorrector:
                     json.dump(data, f, indent=4, ensure_ascii=False)
 
                 self.confirmed_names.add(name)
+                self.line_parser.clear()
                 logging.info(f"New friend saved: {name}")
 
         except Exception as e:
@@ -420,6 +435,7 @@ class TextCorrector:
                         self.names.add(npc["name"])
 
                 print(f"Loaded {len(self.names)} character names successfully")
+                self.line_parser.clear()
                 logging.info(
                     f"TextCorrector: Loaded {len(self.names)} character names from {file_path}"
                 )
@@ -453,7 +469,8 @@ class TextCorrector:
         # แทนที่ 22 หรือ 222 ด้วย ??? ถ้าขึ้นต้นด้วย 22 หรือ 222
         text = re.sub(r"^(22|222)\s*", "??? ", text)
 
-        speaker, content, dialogue_type = self.split_speaker_and_content(text)
+        parsed = self.parse_line(text)
+        speaker, content = parsed.speaker, parsed.content
 
         if speaker and speaker != "???":
             # เพิ่มการตรวจสอบ compound words ใน speaker
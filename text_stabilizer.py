@@ -0,0 +1,227 @@
+"""
+Text stabilizer: รอให้ข้อความที่เกมค่อยๆ พิมพ์ทีละตัวอักษร (typing animation) แสดงครบก่อนส่งแปล
+แทนที่จะแปลครึ่งบรรทัดแล้วต้องแปลทั้งบรรทัดซ้ำอีกครั้ง
+
+- มองข้อความเป็น prefix ที่ยาวขึ้นเรื่อยๆ: เทียบ token ของการอ่าน OCR ติดกันด้วย edit distance
+  (ยอมให้ OCR อ่านผิดเล็กน้อยและคำสุดท้ายที่ยังพิมพ์ไม่จบ)
+- ระหว่างที่ข้อความโตขึ้น วัดความเร็วการพิมพ์ (ตัวอักษร/วินาที) และการเพิ่มของ "หมึก" ในพื้นที่
+  (edge density จาก text-presence gate) แล้วทำนายว่าการพิมพ์จบเมื่อการเพิ่มรอบล่าสุดน้อยกว่าที่ความเร็วคาดไว้
+- ปล่อยข้อความทันทีเมื่อ: เกมไม่มี typing animation (ยังไม่เคยเห็นข้อความโตขึ้น) หรือข้อความจบประโยคแล้ว,
+  การพิมพ์หยุด (อ่านได้ข้อความเดิม), ทำนายว่าพิมพ์จบ หรือรอนานเกิน max_hold
+- ข้อความที่ปล่อยไปแล้วและยังเหมือนเดิมจะตอบ release=True เสมอ (ให้ logic ข้อความซ้ำเดิมของ MBB จัดการ)
+
+รัน `python text_stabilizer.py` เพื่อจำลองจำนวนครั้งที่ส่งแปลแบบเดิมเทียบกับแบบใหม่
+"""
+
+import re
+import time
+from collections import namedtuple
+
+MAX_HOLD = 3.0
+# การพิมพ์ถือว่าจบเมื่อรอบล่าสุดโตขึ้นน้อยกว่าที่ความเร็วการพิมพ์คาดไว้เกินค่าเผื่อนี้
+# (ตัวอักษร: เผื่อ OCR อ่านคำสุดท้ายไม่ครบ, หมึก: สัดส่วน)
+FINISH_SLACK_CHARS = 2
+FINISH_INK_RATIO = 0.85
+# ลืมว่าเกมมี typing animation ถ้าไม่เห็นข้อความโตขึ้นนานเท่านี้ (วินาที)
+TYPING_MEMORY = 120.0
+
+_TERMINAL_RE = re.compile(r"[.!?…。！？」』\"')\]]\s*$")
+
+# เหตุผลของการตัดสินใจ (StabilizerDecision.reason)
+REASON_INSTANT = "instant"  # บรรทัดใหม่ที่ไม่ต้องรอ
+REASON_HOLD = "hold"  # กำลังพิมพ์ - รอ
+REASON_COMPLETE = "complete"  # ทำนายว่าพิมพ์จบแล้ว
+REASON_STALLED = "stalled"  # อ่านได้ข้อความเดิม - การพิมพ์หยุด
+REASON_TIMEOUT = "timeout"  # รอนานเกิน max_hold
+REASON_RELEASED = "released"  # ข้อความเดิมที่ปล่อยไปแล้ว
+
+StabilizerDecision = namedtuple("StabilizerDecision", ["release", "reason", "held_ms"])
+
+
+def tokenize(text):
+    return (text or "").split()
+
+
+def token_edit_distance(a, b):
+    """Levenshtein distance ระดับ token (รายการคำ)"""
+    if len(a) < len(b):
+        a, b = b, a
+    previous = list(range(len(b) + 1))
+    for i, token_a in enumerate(a, 1):
+        current = [i]
+        for j, token_b in enumerate(b, 1):
+            current.append(
+                min(
+                    previous[j] + 1,
+                    current[j - 1] + 1,
+                    previous[j - 1] + (token_a != token_b),
+                )
+            )
+        previous = current
+    return previous[-1]
+
+
+def is_extension(previous_tokens, current_tokens):
+    """current เป็นข้อความเดิมที่พิมพ์ต่อจาก previous หรือไม่ (ยอมให้ OCR ผิดเล็กน้อย)"""
+    if not previous_tokens or len(current_tokens) < len(previous_tokens):
+        return False
+    if len(current_tokens) == len(previous_tokens):
+        # คำสุดท้ายยาวขึ้น ("Thi" -> "This")
+        return (
+            current_tokens[:-1] == previous_tokens[:-1]
+            and current_tokens[-1] != previous_tokens[-1]
+            and current_tokens[-1].startswith(previous_tokens[-1])
+        )
+    # คำสุดท้ายของ previous อาจยังพิมพ์ไม่จบ - เทียบเฉพาะคำที่จบแล้ว
+    stable = previous_tokens[:-1]
+    allowed = max(1, len(stable) // 8)
+    return token_edit_distance(stable, current_tokens[: len(stable)]) <= allowed
+
+
+class TextStabilizer:
+    """
+    Args:
+        max_hold: วินาทีสูงสุดที่รอข้อความที่กำลังพิมพ์
+        clock: ฟังก์ชันเวลา (เปลี่ยนได้สำหรับการจำลอง)
+    """
+
+    def __init__(self, max_hold=MAX_HOLD, clock=time.monotonic):
+        self.max_hold = max_hold
+        self._clock = clock
+        self.stats = {
+            REASON_INSTANT: 0,
+            REASON_HOLD: 0,
+            REASON_COMPLETE: 0,
+            REASON_STALLED: 0,
+            REASON_TIMEOUT: 0,
+        }
+        self._typing_seen_at = None
+        self.reset()
+
+    def reset(self):
+        """เริ่มใหม่ (เปลี่ยนพื้นที่/เริ่มแปลใหม่) - จำได้ว่าเกมมี typing animation"""
+        self._tokens = []
+        self._text = ""
+        self._ink = None
+        self._started_at = None
+        self._last_seen_at = None
+        self._rate = None  # (ตัวอักษร/วินาที, หมึก/วินาที)
+        self._released_text = None
+
+    @property
+    def typing_detected(self):
+        return (
+            self._typing_seen_at is not None
+            and self._clock() - self._typing_seen_at < TYPING_MEMORY
+        )
+
+    def _decide(self, release, reason, now):
+        if reason in self.stats:
+            self.stats[reason] += 1
+        held_ms = (now - self._started_at) * 1000 if self._started_at is not None else 0.0
+        if release:
+            self._released_text = self._text
+        return StabilizerDecision(release, reason, held_ms)
+
+    def observe(self, text, ink=None):
+        """
+        Args:
+            text: ข้อความ OCR (normalize แล้ว) ของรอบนี้
+            ink: ปริมาณหมึกในพื้นที่ (เช่น edge density) - None ถ้าไม่มี
+
+        Returns:
+            StabilizerDecision(release, reason, held_ms)
+        """
+        now = self._clock()
+        tokens = tokenize(text)
+        if not tokens:
+            self.reset()
+            return StabilizerDecision(True, REASON_INSTANT, 0.0)
+
+        if text == self._released_text:
+            return StabilizerDecision(True, REASON_RELEASED, 0.0)
+
+        previous_text, previous_ink, previous_seen = self._text, self._ink, self._last_seen_at
+        growing = is_extension(self._tokens, tokens)
+        self._tokens, self._text, self._ink, self._last_seen_at = tokens, text, ink, now
+
+        if text == previous_text:
+            # อ่านได้เหมือนรอบก่อน - การพิมพ์หยุดแล้ว
+            return self._decide(True, REASON_STALLED, now)
+
+        terminated = bool(_TERMINAL_RE.search(text))
+
+        if not growing:
+            # บรรทัดใหม่
+            self._started_at, self._rate = now, None
+            if terminated or not self.typing_detected:
+                return self._decide(True, REASON_INSTANT, now)
+            return self._decide(False, REASON_HOLD, now)
+
+        self._typing_seen_at = now
+        if self._started_at is None:
+            self._started_at = now
+        if now - self._started_at >= self.max_hold:
+            return self._decide(True, REASON_TIMEOUT, now)
+
+        interval = max(1e-3, now - previous_seen) if previous_seen is not None else None
+        chars_grown = len(text) - len(previous_text)
+        ink_grown = ink - previous_ink if ink is not None and previous_ink is not None else None
+        finished = False
+        if interval is not None and self._rate is not None:
+            char_rate, ink_rate = self._rate
+            finished = chars_grown < char_rate * interval - FINISH_SLACK_CHARS
+            if ink_grown is not None and ink_rate:
+                finished = finished or ink_grown < FINISH_INK_RATIO * ink_rate * interval
+        if interval is not None and not finished:
+            self._rate = (
+                chars_grown / interval,
+                ink_grown / interval if ink_grown is not None else None,
+            )
+
+        if terminated and finished:
+            return self._decide(True, REASON_COMPLETE, now)
+        return self._decide(False, REASON_HOLD, now)
+
+
+def simulate(line="The aether here is thick with something foul, and we must act quickly.", cps=30.0):
+    """
+    จำลอง OCR ทุก 0.35 วินาทีระหว่างที่เกมพิมพ์ข้อความ cps ตัวอักษร/วินาที แล้วค้างไว้ 2 วินาที
+    นับจำนวนครั้งที่ส่งแปล: แบบเดิม (ทุกครั้งที่ข้อความเปลี่ยน) เทียบกับ TextStabilizer
+    """
+    clock = [0.0]
+    stabilizer = TextStabilizer(clock=lambda: clock[0])
+    interval = 0.35
+    reveal_time = len(line) / cps
+
+    def run(instant):
+        old_calls, new_calls, last_sent, latency = 0, 0, None, None
+        t = 0.0
+        stabilizer.reset()
+        while t < reveal_time + 2.0:
+            clock[0] = t
+            shown = line if instant else line[: int(min(len(line), t * cps))]
+            if shown:
+                if shown != last_sent:
+                    old_calls += 1
+                    last_sent = shown
+                decision = stabilizer.observe(shown, ink=len(shown) / 400)
+                if decision.release and decision.reason != REASON_RELEASED:
+                    new_calls += 1
+                    if shown == line and latency is None:
+                        latency = t - (0.0 if instant else reveal_time)
+            t += interval
+        return old_calls, new_calls, latency
+
+    first = run(instant=False)  # บรรทัดแรก: ยังไม่รู้ว่าเกมมี typing animation
+    typed = run(instant=False)
+    instant = run(instant=True)
+    print(f"first line:   old {first[0]} API calls, stabilized {first[1]}, release latency {first[2]:.2f}s")
+    print(f"typed line:   old {typed[0]} API calls, stabilized {typed[1]}, release latency {typed[2]:.2f}s")
+    print(f"instant line: old {instant[0]} API calls, stabilized {instant[1]}, release latency {instant[2]:.2f}s")
+    print(f"decisions: {stabilizer.stats}")
+    return typed, instant
+
+
+if __name__ == "__main__":
+    simulate()
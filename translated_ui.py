@@ -1,4 +1,5 @@
 import re
+import bisect
 import threading
 import time
 import tkinter as tk
@@ -17,6 +18,7 @@ import win32con
 import win32api
 from ctypes import windll, byref, sizeof, c_int
 from font_manager import FontObserver
+from name_matcher import NameMatcher, NameSpanIndex
 
 logging.basicConfig(level=logging.INFO)
 
@@ -296,6 +298,96 @@ class ResizeThrottler:
         callback(*args)
 
 
+class AnimationClock:
+    """
+    นาฬิกาเฟรมเดียวสำหรับทุก animation ใน TUI (typewriter และ fade)
+    tick ตาม refresh rate ของจอ และหยุดเองเมื่อไม่มี animation ทำงานอยู่
+    """
+
+    DEFAULT_REFRESH_RATE = 60
+
+    def __init__(self, root, refresh_rate=None):
+        self.root = root
+        self.refresh_rate = refresh_rate or self.detect_refresh_rate()
+        self.frame_ms = max(4, int(round(1000 / self.refresh_rate)))
+        self._animations = {}  # name -> callback(now) คืน True ถ้ายังทำงานต่อ
+        self._after_id = None
+        self.tick_count = 0
+
+    @classmethod
+    def detect_refresh_rate(cls):
+        """อ่าน refresh rate ของจอหลัก (Hz) ถ้าอ่านไม่ได้ใช้ 60Hz"""
+        try:
+            device_mode = win32api.EnumDisplaySettings(
+                None, win32con.ENUM_CURRENT_SETTINGS
+            )
+            frequency = int(device_mode.DisplayFrequency)
+            if 30 <= frequency <= 360:
+                return frequency
+        except Exception:
+            pass
+        return cls.DEFAULT_REFRESH_RATE
+
+    def start(self, name, callback):
+        """ลงทะเบียน animation (แทนที่ของเดิมที่ชื่อเดียวกัน) และเริ่ม tick ถ้ายังไม่ทำงาน"""
+        self._animations[name] = callback
+        if self._after_id is None:
+            self._after_id = self.root.after(0, self._tick)
+
+    def stop(self, name):
+        self._animations.pop(name, None)
+
+    def is_running(self, name):
+        return name in self._animations
+
+    def stop_all(self):
+        self._animations.clear()
+        if self._after_id is not None:
+            try:
+                self.root.after_cancel(self._after_id)
+            except Exception:
+                pass
+            self._after_id = None
+
+    def _tick(self):
+        self._after_id = None
+        self.tick_count += 1
+        now = time.perf_counter()
+        for name, callback in list(self._animations.items()):
+            try:
+                keep_running = callback(now)
+            except Exception as e:
+                logging.error(f"AnimationClock: animation '{name}' failed: {e}")
+                keep_running = False
+            # callback อาจแทนที่ตัวเองด้วย animation ใหม่ชื่อเดียวกัน
+            if not keep_running and self._animations.get(name) is callback:
+                del self._animations[name]
+
+        if self._animations:
+            self._after_id = self.root.after(self.frame_ms, self._tick)
+
+    @staticmethod
+    def build_reveal_schedule(text, char_ms, pause_ms=None):
+        """
+        คำนวณเวลาสะสม (วินาที) ที่ตัวอักษรแต่ละตัวควรปรากฏ
+        ใช้กับ bisect เพื่อหาจำนวนตัวอักษรที่ควรแสดงจากเวลาที่ผ่านไป
+
+        Args:
+            text: ข้อความที่จะแสดง
+            char_ms: เวลาต่อตัวอักษร (ms)
+            pause_ms: dict ของเวลาหยุดเพิ่มหลังตัวอักษรพิเศษ เช่น {".": 30}
+        """
+        pause_ms = pause_ms or {}
+        schedule = []
+        elapsed_ms = 0.0
+        for char in text:
+            if char != "\u200b":  # ZWSP ไม่ใช้เวลา
+                elapsed_ms += char_ms
+            schedule.append(elapsed_ms / 1000.0)
+            elapsed_ms += pause_ms.get(char, 0)
+        return schedule
+
+
 class TextRenderCache:
     """Intelligent caching system for text rendering"""
 
@@ -661,6 +753,11 @@ class Translated_UI(FontObserver):
         self.switch_area = switch_area
         self.logging_manager = logging_manager
         self.names = character_names or set()
+        # ตัวค้นหาชื่อเฉพาะแบบ compiled และดัชนีตำแหน่งชื่อในข้อความที่แสดงอยู่
+        self.name_matcher = NameMatcher(self.names)
+        self.name_span_index = NameSpanIndex()
+        # ParsedLine ของต้นฉบับข้อความที่แสดงอยู่ (ส่งมาจาก MBB ผ่าน update_text)
+        self.source_line = None
         self.lock_mode = 0
         self.main_app = main_app
 
@@ -677,6 +774,7 @@ class Translated_UI(FontObserver):
         # *** PHASE 1-2: TUI PERFORMANCE OPTIMIZATION ***
         # Initialize performance optimization components
         self.resize_throttler = ResizeThrottler(delay_ms=16)  # 60fps throttling
+        self.animation_clock = AnimationClock(root)
         self.text_render_cache = TextRenderCache(max_cache_size=50)
 
         # *** BLUR SHADOW ENGINE ***
@@ -1973,14 +2071,19 @@ class Translated_UI(FontObserver):
                 )
 
     def update_text(
-        self, text: str, is_lore_text: bool = False
+        self, text: str, is_lore_text: bool = False, source_line=None
     ) -> None:  # <<-- แก้ไขบรรทัดนี้
         """
         *** EMERGENCY FIX: USE ORIGINAL METHOD FOR STABILITY ***
         Update the displayed text with reliable original method
         Args:
             text: Text to display
+            source_line: ParsedLine ของต้นฉบับ (ถ้ามี) - บอกว่าต้นฉบับมีชื่อผู้พูดหรือไม่
+                แทนการเดาจาก ":" ในคำแปล
         """
+        # ตำแหน่งชื่อจากข้อความก่อนหน้าใช้ไม่ได้แล้ว - highlight_special_names จะสร้างใหม่
+        self.name_span_index.clear()
+        self.source_line = source_line
         try:
             # EMERGENCY FIX: Skip optimization and use original method
             self._original_update_text(
@@ -2481,6 +2584,7 @@ class Translated_UI(FontObserver):
     def update_character_names(self, new_names):
         """อัพเดตรายชื่อตัวละครและรีเฟรช UI"""
         self.names = new_names
+        self.name_matcher.update_names(new_names)
 
         # รีเฟรชการแสดงผลข้อความปัจจุบัน
         if hasattr(self, "state") and self.state.full_text:
@@ -2878,7 +2982,13 @@ class Translated_UI(FontObserver):
         """
         try:
             # Check if text contains speaker name
-            if not is_lore_text and ":" in text:
+            # ถ้ารู้ว่าต้นฉบับไม่มีชื่อผู้พูด ":" ในคำแปลเป็นส่วนหนึ่งของประโยค ไม่ใช่ชื่อ
+            source_line = self.source_line
+            if (
+                not is_lore_text
+                and ":" in text
+                and (source_line is None or source_line.speaker)
+            ):
                 name, dialogue = text.split(":", 1)
                 name = name.strip()
                 dialogue = dialogue.strip()
@@ -3181,8 +3291,7 @@ class Translated_UI(FontObserver):
 
             # Start typewriter effect with dialogue text
             self.dialogue_text = dialogue
-            if hasattr(self, "type_writer_timer"):
-                self.root.after_cancel(self.type_writer_timer)
+            self._cancel_text_reveal()
             self.state.typing = True
             self.type_writer_effect(dialogue)
 
@@ -3191,105 +3300,99 @@ class Translated_UI(FontObserver):
 
     def type_writer_effect(self, text: str, index: int = 0, delay: int = 15) -> None:
         """
-        Create typewriter effect with adaptive speed for better performance
+        Create typewriter effect driven by the shared AnimationClock.
+        Each frame reveals as many characters as the elapsed time allows
+        and reconfigures the canvas items once.
         Args:
             text: Text to display
-            index: Current character index
-            delay: Delay between characters in milliseconds
+            index: Character index to start revealing from
+            delay: Delay per character batch in milliseconds
         """
         try:
             if not self.state.typing:
                 return
 
-            if index < len(text):
-                # เพิ่ม batch size เริ่มต้นสำหรับภาษาไทย
-                batch_size = 3  # เพิ่มจาก 2 เป็น 3
-
-                # ตรวจสอบว่าเป็นข้อความภาษาไทยแบบเร็ว
-                is_thai = bool(
-                    re.search(
-                        r"[\u0E00-\u0E7F]", text[index : min(index + 20, len(text))]
-                    )
-                )
-
-                if is_thai:
-                    # ใช้ batch size ที่ใหญ่ขึ้นสำหรับข้อความไทย
-                    batch_size = 5
-                elif len(text) > 100:
-                    batch_size = 4
-
-                # ปรับ delay ตามอักขระ
-                current_char = text[index : index + 1] if index < len(text) else ""
-                if current_char in ".!?":
-                    adjusted_delay = delay * 3
-                elif current_char in ", ":
-                    adjusted_delay = delay * 2
-                else:
-                    adjusted_delay = delay
-
-                # คำนวณตำแหน่งถัดไปแบบง่าย
-                next_index = min(index + batch_size, len(text))
+            # batch size เดิม: ไทย 5 ตัว, ข้อความยาว 4 ตัว, ปกติ 3 ตัว ต่อ delay
+            if re.search(r"[\u0E00-\u0E7F]", text[:20]):
+                batch_size = 5
+            elif len(text) > 100:
+                batch_size = 4
+            else:
+                batch_size = 3
 
-                # ตรวจสอบ ZWSP แบบเร็ว
-                if next_index < len(text) and text[next_index] == "\u200b":
-                    # ข้าม ZWSP ไปเลย
-                    next_index += 1
+            schedule = AnimationClock.build_reveal_schedule(
+                text,
+                delay / batch_size,
+                {".": delay * 2, "!": delay * 2, "?": delay * 2, ",": delay},
+            )
+            start_time = time.perf_counter()
+            start_offset = schedule[index - 1] if 0 < index <= len(schedule) else 0
+            shown = {"count": index}
+
+            # outline ที่อัพเดตตามข้อความ (ข้าม shadow images)
+            outlines = [
+                outline
+                for outline in self.components.outline_container[::3]
+                if self.components.canvas.type(outline) == "text"
+            ]
+            if self.components.outline_container:
+                self.components.canvas.tag_lower(self.components.outline_container[0])
 
-                # แสดงข้อความถึงตำแหน่งที่คำนวณได้
-                next_text = text[:next_index]
+            def reveal_frame(now):
+                if not self.state.typing:
+                    return False
 
-                # อัพเดต UI - ลดการเรียกใช้ itemconfig
-                if self.components.outline_container:
-                    # อัพเดต outline แบบ batch (ข้าม shadow images)
-                    for i in range(0, len(self.components.outline_container), 3):
-                        outline = self.components.outline_container[i]
-                        # เช็คว่าเป็น text item หรือ image item
-                        item_type = self.components.canvas.type(outline)
-                        if item_type == "text":
-                            self.components.canvas.itemconfig(outline, text=next_text)
-                        if i == 0:  # tag_lower เฉพาะครั้งแรก
-                            self.components.canvas.tag_lower(outline)
+                # รอระหว่าง resize ไม่ต้องวาด - เวลาที่ผ่านไปจะถูกชดเชยในเฟรมถัดไป
+                if self.resize_throttler.pending_resize:
+                    return True
 
-                # อัพเดตข้อความหลัก
-                self.components.canvas.itemconfig(
-                    self.components.text_container, text=next_text
-                )
+                elapsed = now - start_time + start_offset
+                count = bisect.bisect_right(schedule, elapsed)
+                if count != shown["count"]:
+                    shown["count"] = count
+                    next_text = text[:count]
+                    for outline in outlines:
+                        self.components.canvas.itemconfig(outline, text=next_text)
+                    self.components.canvas.itemconfig(
+                        self.components.text_container, text=next_text
+                    )
 
-                # ลดการเรียก update_idletasks
-                if index % 20 == 0:  # อัพเดททุกๆ 20 ตัวอักษร
-                    self.root.update_idletasks()
+                if count < len(text):
+                    return True
 
-                if self.state.typing:
-                    self.type_writer_timer = self.root.after(
-                        int(adjusted_delay),
-                        lambda: self.type_writer_effect(text, next_index, delay),
-                    )
-            else:
-                # การพิมพ์ข้อความเสร็จสิ้น
-                self.state.typing = False
-                self.check_text_overflow()
+                self._on_type_writer_complete()
+                return False
 
-                # เริ่ม fade timer
-                self.state.last_activity_time = time.time()
-                if self.state.fade_timer_id:
-                    self.root.after_cancel(self.state.fade_timer_id)
-                self.state.fade_timer_id = self.root.after(
-                    10000, self.check_and_start_fade
-                )
+            self.animation_clock.start("reveal", reveal_frame)
 
         except Exception as e:
             logging.error(f"Error in type_writer_effect: {e}")
             self.state.typing = False
 
+    def _on_type_writer_complete(self) -> None:
+        """การพิมพ์ข้อความเสร็จสิ้น - ตรวจสอบ overflow และเริ่ม fade timer"""
+        self.state.typing = False
+        self.check_text_overflow()
+
+        # เริ่ม fade timer
+        self.state.last_activity_time = time.time()
+        if self.state.fade_timer_id:
+            self.root.after_cancel(self.state.fade_timer_id)
+        self.state.fade_timer_id = self.root.after(10000, self.check_and_start_fade)
+
+    def _cancel_text_reveal(self) -> None:
+        """หยุด typewriter ที่กำลังทำงาน (ทั้งแบบปกติและ cutscene)"""
+        self.animation_clock.stop("reveal")
+
     def show_full_text(self, event: Optional[tk.Event] = None) -> None:
         """
         Show complete text immediately without typewriter effect
         Args:
             event: Optional tkinter event
         """
-        # ยกเลิก timer ที่กำลังทำงานอยู่
-        if hasattr(self, "type_writer_timer"):
-            self.root.after_cancel(self.type_writer_timer)
+        # ยกเลิก animation ที่กำลังทำงานอยู่
+        self._cancel_text_reveal()
+        self.animation_clock.stop("fade")
 
         # ยกเลิกสถานะ typing
         self.state.typing = False
@@ -4625,9 +4728,9 @@ class Translated_UI(FontObserver):
     def cleanup(self) -> None:
         """Cleanup resources before closing"""
         try:
-            # Cancel any pending typewriter effects
-            if hasattr(self, "type_writer_timer"):
-                self.root.after_cancel(self.type_writer_timer)
+            # Cancel any running typewriter/fade animations
+            if hasattr(self, "animation_clock"):
+                self.animation_clock.stop_all()
 
             # ยกเลิก fade timer ด้วย
             if hasattr(self, "state") and self.state.fade_timer_id:
@@ -4802,6 +4905,16 @@ class Translated_UI(FontObserver):
         self.components.canvas.tag_bind("name", "<Enter>", self._on_name_hover_enter)
         self.components.canvas.tag_bind("name", "<Leave>", self._on_name_hover_leave)
         self.components.canvas.tag_bind("name", "<Button-1>", self._on_name_click)
+
+        # ชื่อเฉพาะ 『』 ภายในข้อความบทสนทนา - hit-test ผ่าน name_span_index
+        for tag in ("dialogue", "text"):
+            self.components.canvas.tag_bind(tag, "<Motion>", self._on_dialogue_motion)
+            self.components.canvas.tag_bind(
+                tag, "<Leave>", lambda e: self.components.canvas.configure(cursor="")
+            )
+            self.components.canvas.tag_bind(
+                tag, "<Button-1>", self._on_dialogue_name_click
+            )
         logging.info("Character name interaction bindings setup")
 
     def _on_name_hover_enter(self, event):
@@ -4895,6 +5008,8 @@ class Translated_UI(FontObserver):
     def highlight_special_names(self, text, names_set):
         """
         ค้นหาและครอบชื่อเฉพาะในข้อความด้วยเครื่องหมาย 『』
+        ใช้ NameMatcher ค้นหาทุกชื่อในรอบเดียว และเก็บตำแหน่งชื่อไว้ใน name_span_index
+        สำหรับ hit-test ตอน hover/click
 
         Args:
             text: ข้อความที่ต้องการค้นหา
@@ -4905,63 +5020,54 @@ class Translated_UI(FontObserver):
         """
         # ถ้าไม่มีข้อความหรือไม่มีชื่อเฉพาะที่ต้องตรวจสอบ ให้คืนค่าข้อความเดิม
         if not text or not names_set:
+            self.name_span_index.clear()
             return text
 
-        # เรียงลำดับชื่อจากยาวไปสั้น เพื่อให้ชื่อที่ยาวกว่าถูกแทนที่ก่อน
-        names_list = sorted(names_set, key=len, reverse=True)
-
-        # ลูปผ่านแต่ละชื่อเฉพาะ
-        processed_text = text
-        for name in names_list:
-            # หลีกเลี่ยงชื่อที่สั้นเกินไป (น้อยกว่า 2 ตัวอักษร)
-            if len(name) < 2:
-                continue
+        # รายชื่อชุดอื่นที่ไม่ใช่ self.names ใช้ matcher แยกเพื่อไม่ให้กระทบ matcher หลัก
+        if names_set is self.names:
+            matcher = self.name_matcher
+        else:
+            matcher = NameMatcher(names_set)
 
-            # ค้นหาตำแหน่งทั้งหมดของชื่อในข้อความ
-            start_idx = 0
-            while True:
-                # ค้นหาชื่อในข้อความตั้งแต่ตำแหน่ง start_idx
-                idx = processed_text.find(name, start_idx)
-                if idx == -1:
-                    break  # ไม่พบชื่ออีกแล้ว
+        processed_text, spans = matcher.highlight(text)
+        self.name_span_index.set_spans(spans)
+        return processed_text
 
-                # ตรวจสอบว่าเป็นคำเต็มๆ ไม่ใช่ส่วนหนึ่งของคำอื่น
-                is_complete_word = True
+    def _find_highlighted_name_at(self, event):
+        """
+        หาชื่อเฉพาะ (『』) ในข้อความบทสนทนาที่อยู่ใต้ตำแหน่งเมาส์
+        ใช้ตำแหน่งตัวอักษรจาก canvas แล้วค้นหาใน name_span_index แบบ binary search
 
-                # ตรวจสอบอักขระก่อนหน้า (ถ้ามี)
-                if idx > 0:
-                    prev_char = processed_text[idx - 1]
-                    if (
-                        prev_char.isalnum() or prev_char == "'"
-                    ):  # รวม ' เพราะอาจเป็นส่วนของชื่อ
-                        is_complete_word = False
-
-                # ตรวจสอบอักขระถัดไป (ถ้ามี)
-                next_idx = idx + len(name)
-                if next_idx < len(processed_text):
-                    next_char = processed_text[next_idx]
-                    if next_char.isalnum() or next_char == "'":
-                        is_complete_word = False
-
-                # ถ้าเป็นคำเต็มๆ ให้ทำการไฮไลท์
-                if is_complete_word:
-                    # สร้างชื่อที่มีเครื่องหมาย
-                    highlighted_name = f"『{name}』"
-
-                    # แทนที่ชื่อในข้อความ
-                    processed_text = (
-                        processed_text[:idx]
-                        + highlighted_name
-                        + processed_text[idx + len(name) :]
-                    )
+        Returns:
+            str: ชื่อตัวละคร หรือ None ถ้าไม่มีชื่ออยู่ใต้เมาส์
+        """
+        text_item = self.components.text_container
+        if not text_item or not len(self.name_span_index):
+            return None
+        try:
+            x = int(self.components.canvas.canvasx(event.x))
+            y = int(self.components.canvas.canvasy(event.y))
+            char_index = int(self.components.canvas.index(text_item, f"@{x},{y}"))
+        except (tk.TclError, ValueError):
+            return None
+        return self.name_span_index.find(char_index)
 
-                    # อัพเดต start_idx สำหรับการค้นหาครั้งต่อไป
-                    start_idx = idx + len(highlighted_name)
-                else:
-                    # ถ้าไม่ใช่คำเต็มๆ ให้เลื่อน start_idx ไป 1 ตำแหน่ง
-                    start_idx = idx + 1
+    def _on_dialogue_motion(self, event):
+        """เปลี่ยน cursor เป็นรูปมือเมื่อเมาส์อยู่บนชื่อเฉพาะในข้อความบทสนทนา"""
+        try:
+            name = self._find_highlighted_name_at(event)
+            self.components.canvas.configure(cursor="hand2" if name else "")
+        except Exception as e:
+            self.logging_manager.log_error(f"Error in dialogue name hover: {e}")
 
-        return processed_text
+    def _on_dialogue_name_click(self, event):
+        """เปิด NPC Manager เมื่อคลิกที่ชื่อเฉพาะในข้อความบทสนทนา"""
+        try:
+            name = self._find_highlighted_name_at(event)
+            if name:
+                self.root.after(50, lambda: self._handle_character_click(name))
+        except Exception as e:
+            self.logging_manager.log_error(f"Error in dialogue name click: {e}")
 
     def apply_highlights_to_text(self):
         """
@@ -5056,172 +5162,183 @@ class Translated_UI(FontObserver):
     def fade_out_text(self, alpha=1.0, step=0.1):  # เพิ่มขนาด step จาก 0.05 เป็น 0.1
         """
         ทำให้ข้อความและชื่อตัวละครค่อยๆ หายไปแบบ dissolve effect
+        ขับเคลื่อนด้วย AnimationClock ร่วมกับ typewriter - ค่า alpha คำนวณจากเวลาที่ผ่านไป
+        (ลด step ทุก 25ms เหมือนเดิม) ไม่ใช่จำนวน callback
 
         Args:
-            alpha: ค่าความโปร่งใสปัจจุบัน (1.0 = มองเห็นเต็มที่, 0.0 = มองไม่เห็น)
-            step: ขนาดการลดความโปร่งใสในแต่ละขั้นตอน
+            alpha: ค่าความโปร่งใสเริ่มต้น (1.0 = มองเห็นเต็มที่, 0.0 = มองไม่เห็น)
+            step: ขนาดการลดความโปร่งใสในแต่ละช่วง 25ms
         """
-        try:
+        start_time = time.perf_counter()
+        fade_per_second = step / 0.025
+
+        def fade_frame(now):
             # ถ้ามีการอัพเดตข้อความใหม่ระหว่างการ fade out ให้ยกเลิกการ fade
-            current_time = time.time()
-            if current_time - self.state.last_activity_time < 10:
+            if (
+                not self.state.is_fading
+                or time.time() - self.state.last_activity_time < 10
+            ):
                 self.state.is_fading = False
-                return
-
-            if alpha <= 0:
-                # เมื่อหายไปหมดแล้ว ให้ลบองค์ประกอบทั้งหมดจาก canvas แทนการล้างข้อความ
-
-                # 1. บันทึกสถานะว่าเพิ่งมีการ fade out สมบูรณ์
-                self.state.just_faded_out = True
+                return False
 
-                # 2. ล้าง canvas ทั้งหมด แทนที่จะเคลียร์แค่ text
-                self.components.canvas.delete("all")
-                self.components.outline_container = []
-                self.components.text_container = None
+            try:
+                new_alpha = max(0, alpha - (now - start_time) * fade_per_second)
+                if new_alpha <= 0:
+                    self._finish_fade_out()
+                    return False
 
-                # 3. บันทึกสถานะการทำ fade
+                self._apply_fade_alpha(new_alpha)
+                return True
+            except Exception as e:
+                logging.error(f"Error in fade_out_text: {e}")
                 self.state.is_fading = False
+                return False
 
-                # 4. คืนค่าสถานะต่างๆ เกี่ยวกับข้อความ
-                self.dialogue_text = ""
-                self.state.full_text = ""
-
-                return
+        try:
+            self.state.fade_timer_id = None
+            self.animation_clock.start("fade", fade_frame)
+        except Exception as e:
+            logging.error(f"Error in fade_out_text: {e}")
+            self.state.is_fading = False
 
-            # ลดความโปร่งใสทีละน้อย
-            new_alpha = max(0, alpha - step)
+    def _finish_fade_out(self):
+        """เมื่อหายไปหมดแล้ว ให้ลบองค์ประกอบทั้งหมดจาก canvas แทนการล้างข้อความ"""
+        # 1. บันทึกสถานะว่าเพิ่งมีการ fade out สมบูรณ์
+        self.state.just_faded_out = True
 
-            # คำนวณสีตามค่า alpha
-            # ค่า RGB ยังคงเดิม แต่ความเข้มจะลดลงตาม alpha
-            r, g, b = 255, 255, 255  # สีข้อความเดิมคือสีขาว
-            adjusted_r = int(r * new_alpha)
-            adjusted_g = int(g * new_alpha)
-            adjusted_b = int(b * new_alpha)
-            text_color = f"#{adjusted_r:02x}{adjusted_g:02x}{adjusted_b:02x}"
+        # 2. ล้าง canvas ทั้งหมด แทนที่จะเคลียร์แค่ text
+        self.components.canvas.delete("all")
+        self.components.outline_container = []
+        self.components.text_container = None
+
+        # 3. บันทึกสถานะการทำ fade
+        self.state.is_fading = False
+
+        # 4. คืนค่าสถานะต่างๆ เกี่ยวกับข้อความ
+        self.dialogue_text = ""
+        self.state.full_text = ""
+
+    def _apply_fade_alpha(self, new_alpha):
+        """ปรับสีของทุกองค์ประกอบข้อความตามค่า alpha ในเฟรมเดียว"""
+        # คำนวณสีตามค่า alpha
+        # ค่า RGB ยังคงเดิม แต่ความเข้มจะลดลงตาม alpha
+        r, g, b = 255, 255, 255  # สีข้อความเดิมคือสีขาว
+        adjusted_r = int(r * new_alpha)
+        adjusted_g = int(g * new_alpha)
+        adjusted_b = int(b * new_alpha)
+        text_color = f"#{adjusted_r:02x}{adjusted_g:02x}{adjusted_b:02x}"
+
+        # 1. อัพเดตสีของข้อความหลัก
+        if self.components.text_container:
+            self.components.canvas.itemconfig(
+                self.components.text_container, fill=text_color
+            )
 
-            # 1. อัพเดตสีของข้อความหลัก
-            if self.components.text_container:
+        # 2. อัพเดตสีของเงาข้อความหลัก (ปรับให้จางลงเช่นกัน)
+        outline_r, outline_g, outline_b = 0, 0, 0  # สีเงาเดิมคือสีดำ
+        adjusted_outline_opacity = max(
+            0, new_alpha - 0.2
+        )  # เงาหายเร็วกว่าข้อความเล็กน้อย
+        adjusted_outline_color = f"#{outline_r:02x}{outline_g:02x}{outline_b:02x}"
+
+        for outline in self.components.outline_container:
+            # เช็คว่าเป็น text item ก่อนอัพเดตสี (ข้าม shadow images)
+            item_type = self.components.canvas.type(outline)
+            if item_type == "text":
                 self.components.canvas.itemconfig(
-                    self.components.text_container, fill=text_color
+                    outline, fill=adjusted_outline_color
                 )
 
-            # 2. อัพเดตสีของเงาข้อความหลัก (ปรับให้จางลงเช่นกัน)
-            outline_r, outline_g, outline_b = 0, 0, 0  # สีเงาเดิมคือสีดำ
-            adjusted_outline_opacity = max(
-                0, new_alpha - 0.2
-            )  # เงาหายเร็วกว่าข้อความเล็กน้อย
-            adjusted_outline_color = f"#{outline_r:02x}{outline_g:02x}{outline_b:02x}"
-
-            for outline in self.components.outline_container:
-                # เช็คว่าเป็น text item ก่อนอัพเดตสี (ข้าม shadow images)
-                item_type = self.components.canvas.type(outline)
-                if item_type == "text":
-                    self.components.canvas.itemconfig(
-                        outline, fill=adjusted_outline_color
-                    )
-
-            # 3. อัพเดตสีของชื่อตัวละคร
-            for name_item in self.components.canvas.find_withtag("name"):
-                # ดึงสีเดิมของชื่อตัวละคร เพื่อคงความเป็นสีม่วงหรือสีฟ้า
-                original_color = ""
-                for tag in self.components.canvas.gettags(name_item):
-                    if tag.startswith("original_color:"):
-                        original_color = tag.split(":")[1]
-                        break
-
-                if not original_color:
-                    # ถ้าไม่พบ tag ที่เก็บสีเดิม ใช้การตรวจสอบจากข้อความแทน
-                    text = self.components.canvas.itemcget(name_item, "text")
-                    original_color = "#a855f7" if "?" in text else "#38bdf8"
-
-                # แปลงสีเดิมเป็น RGB
-                try:
-                    # แปลงสี hex เป็น RGB
-                    orig_r = int(original_color[1:3], 16)
-                    orig_g = int(original_color[3:5], 16)
-                    orig_b = int(original_color[5:7], 16)
-
-                    # ปรับความโปร่งใสของสีตาม alpha
-                    faded_r = int(orig_r * new_alpha)
-                    faded_g = int(orig_g * new_alpha)
-                    faded_b = int(orig_b * new_alpha)
-
-                    name_color = f"#{faded_r:02x}{faded_g:02x}{faded_b:02x}"
-                    # เช็คว่าเป็น text item ก่อนอัพเดตสี (ข้าม shadow images)
-                    item_type = self.components.canvas.type(name_item)
-                    if item_type == "text":
-                        self.components.canvas.itemconfig(name_item, fill=name_color)
-                except Exception as e:
-                    # ถ้าแปลงสีไม่สำเร็จ ใช้การลดความเข้มแบบเดียวกับข้อความหลัก (เช็คว่าเป็น text item ก่อน)
-                    item_type = self.components.canvas.type(name_item)
-                    if item_type == "text":
-                        self.components.canvas.itemconfig(name_item, fill=text_color)
-
-            # 4. อัพเดตสีของเงาชื่อตัวละคร
-            for name_outline in self.components.canvas.find_withtag("name_outline"):
-                self.components.canvas.itemconfig(
-                    name_outline, fill=adjusted_outline_color
-                )
+        # 3. อัพเดตสีของชื่อตัวละคร
+        for name_item in self.components.canvas.find_withtag("name"):
+            # ดึงสีเดิมของชื่อตัวละคร เพื่อคงความเป็นสีม่วงหรือสีฟ้า
+            original_color = ""
+            for tag in self.components.canvas.gettags(name_item):
+                if tag.startswith("original_color:"):
+                    original_color = tag.split(":")[1]
+                    break
 
-            # 5. ปรับความโปร่งใสของไอคอน confirm
-            for confirm_icon in self.components.canvas.find_withtag("confirm_icon"):
-                # กำหนดความโปร่งใสของไอคอนตาม alpha
-                # เนื่องจาก image ไม่สามารถปรับความโปร่งใสได้โดยตรง จึงต้องใช้การซ่อน/แสดงแทน
-                if new_alpha < 0.5:
-                    # ซ่อนไอคอนเมื่อความโปร่งใสต่ำกว่า 50%
-                    self.components.canvas.itemconfig(confirm_icon, state="hidden")
-                else:
-                    self.components.canvas.itemconfig(confirm_icon, state="normal")
+            if not original_color:
+                # ถ้าไม่พบ tag ที่เก็บสีเดิม ใช้การตรวจสอบจากข้อความแทน
+                text = self.components.canvas.itemcget(name_item, "text")
+                original_color = "#a855f7" if "?" in text else "#38bdf8"
 
-            # 6. เพิ่ม: อัพเดตสีของข้อความส่วนหัวใน choice dialog (header_text)
-            header_gold_color = "#FFD700"  # สีทองเดิมของส่วนหัว
+            # แปลงสีเดิมเป็น RGB
             try:
-                # แปลงสีทองเป็น RGB
-                header_r = int(header_gold_color[1:3], 16)
-                header_g = int(header_gold_color[3:5], 16)
-                header_b = int(header_gold_color[5:7], 16)
+                # แปลงสี hex เป็น RGB
+                orig_r = int(original_color[1:3], 16)
+                orig_g = int(original_color[3:5], 16)
+                orig_b = int(original_color[5:7], 16)
 
                 # ปรับความโปร่งใสของสีตาม alpha
-                faded_header_r = int(header_r * new_alpha)
-                faded_header_g = int(header_g * new_alpha)
-                faded_header_b = int(header_b * new_alpha)
-
-                header_color = (
-                    f"#{faded_header_r:02x}{faded_header_g:02x}{faded_header_b:02x}"
-                )
+                faded_r = int(orig_r * new_alpha)
+                faded_g = int(orig_g * new_alpha)
+                faded_b = int(orig_b * new_alpha)
 
-                for header_item in self.components.canvas.find_withtag("header_text"):
-                    # เช็คว่าเป็น text item ก่อนอัพเดตสี (ข้าม shadow images)
-                    item_type = self.components.canvas.type(header_item)
-                    if item_type == "text":
-                        self.components.canvas.itemconfig(
-                            header_item, fill=header_color
-                        )
+                name_color = f"#{faded_r:02x}{faded_g:02x}{faded_b:02x}"
+                # เช็คว่าเป็น text item ก่อนอัพเดตสี (ข้าม shadow images)
+                item_type = self.components.canvas.type(name_item)
+                if item_type == "text":
+                    self.components.canvas.itemconfig(name_item, fill=name_color)
             except Exception as e:
-                # ถ้าแปลงสีไม่สำเร็จ ใช้การลดความเข้มแบบเดียวกับข้อความหลัก
-                for header_item in self.components.canvas.find_withtag("header_text"):
-                    # เช็คว่าเป็น text item ก่อนอัพเดตสี (ข้าม shadow images)
-                    item_type = self.components.canvas.type(header_item)
-                    if item_type == "text":
-                        self.components.canvas.itemconfig(header_item, fill=text_color)
+                # ถ้าแปลงสีไม่สำเร็จ ใช้การลดความเข้มแบบเดียวกับข้อความหลัก (เช็คว่าเป็น text item ก่อน)
+                item_type = self.components.canvas.type(name_item)
+                if item_type == "text":
+                    self.components.canvas.itemconfig(name_item, fill=text_color)
 
-            # 7. เพิ่ม: อัพเดตสีของเงาส่วนหัวใน choice dialog (header_outline)
-            for header_outline in self.components.canvas.find_withtag("header_outline"):
-                self.components.canvas.itemconfig(
-                    header_outline, fill=adjusted_outline_color
-                )
+        # 4. อัพเดตสีของเงาชื่อตัวละคร
+        for name_outline in self.components.canvas.find_withtag("name_outline"):
+            self.components.canvas.itemconfig(
+                name_outline, fill=adjusted_outline_color
+            )
+
+        # 5. ปรับความโปร่งใสของไอคอน confirm
+        for confirm_icon in self.components.canvas.find_withtag("confirm_icon"):
+            # กำหนดความโปร่งใสของไอคอนตาม alpha
+            # เนื่องจาก image ไม่สามารถปรับความโปร่งใสได้โดยตรง จึงต้องใช้การซ่อน/แสดงแทน
+            if new_alpha < 0.5:
+                # ซ่อนไอคอนเมื่อความโปร่งใสต่ำกว่า 50%
+                self.components.canvas.itemconfig(confirm_icon, state="hidden")
+            else:
+                self.components.canvas.itemconfig(confirm_icon, state="normal")
 
-            # เรียกตัวเองซ้ำด้วย alpha ใหม่
-            self.state.fade_timer_id = self.root.after(
-                25,
-                lambda: self.fade_out_text(
-                    new_alpha, step
-                ),  # ลดเวลาระหว่างขั้นตอนจาก 50ms เป็น 25ms
+        # 6. เพิ่ม: อัพเดตสีของข้อความส่วนหัวใน choice dialog (header_text)
+        header_gold_color = "#FFD700"  # สีทองเดิมของส่วนหัว
+        try:
+            # แปลงสีทองเป็น RGB
+            header_r = int(header_gold_color[1:3], 16)
+            header_g = int(header_gold_color[3:5], 16)
+            header_b = int(header_gold_color[5:7], 16)
+
+            # ปรับความโปร่งใสของสีตาม alpha
+            faded_header_r = int(header_r * new_alpha)
+            faded_header_g = int(header_g * new_alpha)
+            faded_header_b = int(header_b * new_alpha)
+
+            header_color = (
+                f"#{faded_header_r:02x}{faded_header_g:02x}{faded_header_b:02x}"
             )
 
+            for header_item in self.components.canvas.find_withtag("header_text"):
+                # เช็คว่าเป็น text item ก่อนอัพเดตสี (ข้าม shadow images)
+                item_type = self.components.canvas.type(header_item)
+                if item_type == "text":
+                    self.components.canvas.itemconfig(
+                        header_item, fill=header_color
+                    )
         except Exception as e:
-            logging.error(f"Error in fade_out_text: {e}")
-            self.state.is_fading = False
+            # ถ้าแปลงสีไม่สำเร็จ ใช้การลดความเข้มแบบเดียวกับข้อความหลัก
+            for header_item in self.components.canvas.find_withtag("header_text"):
+                # เช็คว่าเป็น text item ก่อนอัพเดตสี (ข้าม shadow images)
+                item_type = self.components.canvas.type(header_item)
+                if item_type == "text":
+                    self.components.canvas.itemconfig(header_item, fill=text_color)
+
+        # 7. เพิ่ม: อัพเดตสีของเงาส่วนหัวใน choice dialog (header_outline)
+        for header_outline in self.components.canvas.find_withtag("header_outline"):
+            self.components.canvas.itemconfig(
+                header_outline, fill=adjusted_outline_color
+            )
 
     def clean_canvas(self) -> None:
         """
@@ -5244,9 +5361,8 @@ class Translated_UI(FontObserver):
             self.state.typing = False
 
             # ยกเลิก timer ต่างๆ
-            if hasattr(self, "type_writer_timer") and self.type_writer_timer:
-                self.root.after_cancel(self.type_writer_timer)
-                self.type_writer_timer = None
+            self._cancel_text_reveal()
+            self.animation_clock.stop("fade")
 
             if self.state.fade_timer_id:
                 self.root.after_cancel(self.state.fade_timer_id)
@@ -5756,64 +5872,67 @@ class Translated_UI(FontObserver):
             self.state.is_typing = False
 
     def _start_cutscene_typing_effect(self, text, char_index):
-        """*** OPTIMIZED TYPING ANIMATION ***
-        เริ่มแสดงข้อความแบบ typewriter effect สำหรับ cutscene
+        """*** FRAME-BUDGETED TYPING ANIMATION ***
+        เริ่มแสดงข้อความแบบ typewriter effect สำหรับ cutscene ผ่าน AnimationClock
+        แต่ละเฟรมแสดงตัวอักษรเท่าที่เวลาผ่านไปอนุญาต (typing_speed ms ต่อตัวอักษร)
 
         Args:
             text: ข้อความที่จะแสดง
-            char_index: ตำแหน่งตัวอักษรปัจจุบัน
+            char_index: ตำแหน่งตัวอักษรเริ่มต้น
         """
         try:
-            # *** OPTIMIZATION: Check for resize in progress ***
-            if (
-                hasattr(self, "resize_throttler")
-                and self.resize_throttler.pending_resize
-            ):
-                # Delay typing during resize for smoother experience
-                self.root.after(
-                    25, lambda: self._start_cutscene_typing_effect(text, char_index)
-                )
-                return
+            # กำหนดความเร็วในการพิมพ์
+            typing_speed = self.settings.get("typing_speed", 50)  # milliseconds
+            schedule = AnimationClock.build_reveal_schedule(text, typing_speed)
+            start_time = time.perf_counter()
+            start_offset = (
+                schedule[char_index - 1] if 0 < char_index <= len(schedule) else 0
+            )
+            shown = {"count": char_index}
+
+            # เงาที่อัพเดตตามข้อความ (ข้าม shadow images)
+            outlines = [
+                outline
+                for outline in self.components.outline_container
+                if "dialogue_outline" in self.components.canvas.gettags(outline)
+                and self.components.canvas.type(outline) == "text"
+            ]
 
-            if char_index < len(text):
-                # แสดงข้อความที่เพิ่มขึ้นทีละตัวอักษร
-                current_text = text[: char_index + 1]
+            def reveal_frame(now):
+                if not self.state.is_typing:
+                    return False
 
-                # อัพเดตข้อความหลัก
-                if self.components.text_container:
-                    self.components.canvas.itemconfig(
-                        self.components.text_container, text=current_text
-                    )
+                # *** OPTIMIZATION: Skip drawing while resize is in progress ***
+                if self.resize_throttler.pending_resize:
+                    return True
 
-                # อัพเดตเงา (ข้าม shadow images)
-                for outline in self.components.outline_container:
-                    if "dialogue_outline" in self.components.canvas.gettags(outline):
-                        item_type = self.components.canvas.type(outline)
-                        if item_type == "text":
-                            self.components.canvas.itemconfig(
-                                outline, text=current_text
-                            )
+                count = bisect.bisect_right(schedule, now - start_time + start_offset)
+                if count != shown["count"]:
+                    shown["count"] = count
+                    current_text = text[:count]
+                    if self.components.text_container:
+                        self.components.canvas.itemconfig(
+                            self.components.text_container, text=current_text
+                        )
+                    for outline in outlines:
+                        self.components.canvas.itemconfig(outline, text=current_text)
 
-                # กำหนดความเร็วในการพิมพ์
-                typing_speed = self.settings.get("typing_speed", 50)  # milliseconds
+                if count < len(text):
+                    return True
 
-                # ตั้งเวลาสำหรับตัวอักษรต่อไป
-                self.state.typing_timer = self.root.after(
-                    typing_speed,
-                    lambda: self._start_cutscene_typing_effect(text, char_index + 1),
-                )
-            else:
                 # พิมพ์เสร็จแล้ว
                 self.state.is_typing = False
-                self.state.typing_timer = None
                 logging.info("Cutscene typing effect completed")
+                return False
+
+            self.state.typing_timer = None
+            self.animation_clock.start("reveal", reveal_frame)
 
         except Exception as e:
             logging.error(f"Error in _start_cutscene_typing_effect: {e}")
             self.state.is_typing = False
             self.state.typing_timer = None
 
-
 if __name__ == "__main__":
     root = tk.Tk()
     settings = Settings()
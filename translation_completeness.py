@@ -0,0 +1,216 @@
+"""
+Translation completeness: หาว่าประโยคไหนของต้นฉบับหายไปจากคำแปลที่ถูกตัด แล้วขอแปลเฉพาะส่วนนั้นต่อ
+แทนการส่ง prompt ทั้งหมดไปแปลใหม่ (ซึ่งเสียเวลาและ token เป็นสองเท่ากับบรรทัดที่ยาวและช้าอยู่แล้ว)
+
+- แยกต้นฉบับเป็นประโยค (ใช้ตัวแยกของ lore_segmenter) และจับคู่กับคำแปลตามลำดับด้วย
+  ความยาวสะสมเทียบกับสัดส่วนความยาว EN->TH - จำนวนวลีของคำแปล (คั่นด้วยช่องว่าง) ใช้ลดจำนวนประโยค
+  ที่ครอบคลุมได้เท่านั้น (วลีไทยหนึ่งประโยคอาจมีหลายวลี) เมื่อจับคู่ไม่ชัดเจนขอแปลใหม่ทั้งหมดแทนการต่อผิดที่
+- คำแปลที่ท้ายค้าง (จบด้วย - หรือ ,) ตัดวลีท้ายที่ค้างทิ้งแล้วแปลประโยคนั้นใหม่
+- CompletenessReport.continuation_text() คือข้อความที่ต้องแปลต่อ, splice() ต่อผลกลับเข้าไปตามลำดับ
+  โดยไม่ต่อวลีที่มีอยู่ในคำแปลแล้วซ้ำ
+
+รัน `python translation_completeness.py` เพื่อดูผลการวิเคราะห์และสัดส่วน token เทียบกับการแปลใหม่ทั้งหมด
+"""
+
+import re
+from collections import namedtuple
+
+from lore_segmenter import split_sentences
+
+# ความยาวคำแปลไทยโดยประมาณต่อความยาวต้นฉบับอังกฤษ (นับเฉพาะตัวอักษรหลัก ไม่นับสระบน/ล่างและวรรณยุกต์)
+EXPECTED_RATIO = 0.6
+# ส่วนเผื่อของความยาว: คำแปลต้องสั้นกว่าที่คาดเกินนี้จึงถือว่าประโยคท้ายยังไม่ถูกแปล
+LENGTH_TOLERANCE = 0.15
+# ขอแปลต่อเฉพาะเมื่อส่วนที่หายไปยาวอย่างน้อยสัดส่วนนี้ของต้นฉบับ
+MIN_MISSING_FRACTION = 0.15
+
+_TERMINATOR_RE = re.compile(r"[.!?…。！？]+[\"'”’)\]]*")
+_DANGLING_RE = re.compile(r"(?:-|–|,|、)\s*$")
+# สระบน/ล่างและวรรณยุกต์ไทย - ไม่นับเป็นความยาว
+_THAI_COMBINING_RE = re.compile("[\u0e31\u0e34-\u0e3a\u0e47-\u0e4e]")
+# ขอบเขตวลีของคำแปลไทย: ช่องว่างหรือเครื่องหมายจบประโยค (คำแปลไทยมักไม่มีจุด)
+_CLAUSE_SPLIT_RE = re.compile(r"[\s.!?…。！？]+")
+
+
+class CompletenessReport(
+    namedtuple(
+        "CompletenessReport", ["complete", "kept", "missing", "previous", "source_sentences"]
+    )
+):
+    """
+    complete: ไม่พบส่วนที่หาย, kept: ส่วนของคำแปลที่เก็บไว้ ("" = แปลใหม่ทั้งหมด),
+    missing: ประโยคต้นฉบับที่ต้องแปลต่อ (ตามลำดับ), previous: ประโยคต้นฉบับก่อนหน้าส่วนที่หาย (บริบท),
+    source_sentences: จำนวนประโยคต้นฉบับ
+    """
+
+    __slots__ = ()
+
+    def continuation_text(self):
+        return " ".join(self.missing)
+
+    def splice(self, continuation):
+        """ต่อคำแปลส่วนที่ขอเพิ่มเข้ากับส่วนที่เก็บไว้ - ตัดวลีที่มีอยู่ในคำแปลแล้วทิ้ง (โมเดลแปลซ้ำ)"""
+        continuation = (continuation or "").strip()
+        if continuation and self.kept:
+            kept_clauses = {clause for clause in _clauses(self.kept) if len(clause) >= 4}
+            parts = continuation.split()
+            while parts and _CLAUSE_SPLIT_RE.sub("", parts[0]) in kept_clauses:
+                parts.pop(0)
+            continuation = " ".join(parts)
+            if _CLAUSE_SPLIT_RE.sub("", continuation) in _CLAUSE_SPLIT_RE.sub("", self.kept):
+                continuation = ""
+        if not continuation:
+            return self.kept
+        if not self.kept:
+            return continuation
+        return f"{self.kept} {continuation}"
+
+
+def _strip_speaker(text):
+    if ":" in text:
+        head, tail = text.split(":", 1)
+        if len(head) <= 30 and tail.strip():
+            return tail.strip()
+    return text.strip()
+
+
+def _visible_length(text):
+    return len(_THAI_COMBINING_RE.sub("", text))
+
+
+def _clauses(text):
+    return [clause for clause in _CLAUSE_SPLIT_RE.split(text) if clause]
+
+
+def analyze(source, translation, expected_ratio=EXPECTED_RATIO):
+    """
+    จับคู่ประโยคต้นฉบับกับคำแปลตามความยาว (ไม่ใช้จำนวน . ? ! เพราะคำแปลไทยมักไม่มี)
+    ถ้าคำแปลไม่ได้จบใกล้ขอบประโยคใด คืนรายงานแบบแปลใหม่ทั้งหมด (kept="", missing=ทุกประโยค)
+    - ต่อผิดที่ทำให้ประโยคหายเงียบๆ แย่กว่าเสีย request แปลใหม่
+
+    Args:
+        source: ข้อความต้นฉบับ (เนื้อหา ไม่รวมชื่อผู้พูด)
+        translation: คำแปลที่ได้ (ชื่อผู้พูดนำหน้าจะถูกตัดออกก่อนวิเคราะห์)
+
+    Returns:
+        CompletenessReport
+    """
+    source = (source or "").strip()
+    translation = _strip_speaker(translation or "")
+    sentences = [sentence.strip() for sentence, _ in split_sentences(source)] or [source]
+    complete = CompletenessReport(True, translation, [], None, len(sentences))
+    if not source or not translation:
+        return complete
+
+    # ท้ายค้าง ("...เหล่าศิษย์-"): ตัดวลีสุดท้ายที่ค้างทิ้ง (ประโยคนั้นจะถูกแปลใหม่)
+    kept = translation
+    dangling = bool(_DANGLING_RE.search(translation))
+    if dangling:
+        terminators = list(_TERMINATOR_RE.finditer(translation))
+        if terminators:
+            kept = translation[: terminators[-1].end()].strip()
+        else:
+            kept = translation.rsplit(None, 1)[0] if " " in translation.strip() else ""
+
+    # จำนวนประโยคที่ความยาวของคำแปลครอบคลุมได้ (boundaries[k] = ความยาวที่คาดของ k ประโยคแรก)
+    length = _visible_length(kept)
+    budget = length * (1 + LENGTH_TOLERANCE)
+    boundaries, total = [0.0], 0.0
+    for sentence in sentences:
+        total += len(sentence) * expected_ratio
+        boundaries.append(total)
+    covered = sum(1 for boundary in boundaries[1:] if boundary <= budget)
+    if not dangling and covered >= len(sentences):
+        return complete
+
+    # ขอบประโยคที่ใกล้ความยาวคำแปลที่สุดต้องตรงกับที่นับได้ ไม่งั้นคำแปลจบกลางประโยค/สัดส่วนเพี้ยน
+    nearest = min(range(len(boundaries)), key=lambda k: abs(boundaries[k] - length))
+    ambiguous = nearest != covered
+    if dangling:
+        covered = min(covered, len(sentences) - 1)
+    # วลีไทยหนึ่งประโยคอาจมีหลายวลี - จำนวนวลีจึงใช้ลดได้อย่างเดียว ไม่ใช้เพิ่ม
+    covered = min(covered, len(_clauses(kept)))
+    if ambiguous or covered == 0:
+        return CompletenessReport(False, "", sentences, None, len(sentences))
+
+    missing = sentences[covered:]
+    missing_chars = sum(len(sentence) for sentence in missing)
+    if not dangling and missing_chars < MIN_MISSING_FRACTION * len(source):
+        return complete
+    return CompletenessReport(False, kept, missing, sentences[covered - 1], len(sentences))
+
+
+def build_continuation_request(report):
+    """
+    ข้อความสำหรับส่งแปลต่อ - แนบประโยคต้นฉบับก่อนหน้าเป็นบริบท (ไม่แนบคำแปลไทยที่ได้แล้ว
+    เพราะใช้ token มากกว่าและไม่จำเป็นต่อการแปลประโยคถัดไป)
+    """
+    if report.previous:
+        return (
+            f"(Previous sentence, already translated - do NOT translate it again: "
+            f"{report.previous})\n{report.continuation_text()}"
+        )
+    return report.continuation_text()
+
+
+def benchmark(prefix_chars=3000, cached_prefix_price=0.25):
+    """
+    prefix_chars: ขนาดโดยประมาณของกฎการแปล + รายชื่อ + คำศัพท์ที่อยู่หน้า prompt
+    การแปลใหม่ทั้งหมดแบบเดิมส่ง prompt ทั้งก้อนโดยไม่ใช้ prefix cache ส่วนการแปลต่อใช้ prefix ที่ cache ไว้
+    """
+    source = (
+        "The Crystal Tower was raised by the Allagan Empire some five thousand years ago. "
+        "Its architect, Amon, sought to harness the power of the sun itself. "
+        "When the tower fell silent, the Students of Baldesion began to study it. "
+        "What they found there would change the fate of Eorzea forever."
+    )
+    cases = {
+        "complete": "หอคริสตัลถูกสร้างโดยจักรวรรดิอัลลัคเมื่อราวห้าพันปีก่อน "
+        "อามอนผู้ออกแบบต้องการควบคุมพลังของดวงอาทิตย์ "
+        "เมื่อหอคอยเงียบลง เหล่าศิษย์แห่งบัลเดเซียนจึงเริ่มศึกษามัน "
+        "สิ่งที่พวกเขาพบที่นั่นจะเปลี่ยนชะตากรรมของเอออร์เซียไปตลอดกาล",
+        "cut mid-sentence": "หอคริสตัลถูกสร้างโดยจักรวรรดิอัลลัคเมื่อราวห้าพันปีก่อน. "
+        "อามอนผู้ออกแบบต้องการควบคุมพลังของดวงอาทิตย์. เมื่อหอคอยเงียบลง เหล่าศิษย์-",
+        "last sentences dropped": "หอคริสตัลถูกสร้างโดยจักรวรรดิอัลลัคเมื่อราวห้าพันปีก่อน",
+    }
+    short_source = "We must go now. The tower is falling. Hurry, everyone!"
+    # ตัวสุดท้าย: แปล 2 จาก 4 ประโยคแต่มี 3 วลี - วลีไม่ถูกนับเป็นประโยคที่แปลแล้ว
+    phrase_source = (
+        "We have finally reached the gates of the ancient tower. "
+        "The guardians have fallen silent at last. "
+        "The Allagan relics await us inside. Let us make haste, friends."
+    )
+    short_cases = {
+        "short, complete (no periods)": (
+            short_source, "เราต้องไปเดี๋ยวนี้ หอคอยกำลังถล่ม รีบเร็วเข้าทุกคน!"
+        ),
+        "short, last sentence dropped": (short_source, "เราต้องไปเดี๋ยวนี้ หอคอยกำลังถล่ม"),
+        "2/4 sentences, 3 phrases": (
+            phrase_source, "ในที่สุดเราก็มาถึงประตูหอคอยโบราณแล้ว เหล่าผู้พิทักษ์ เงียบลงแล้วในที่สุด"
+        ),
+    }
+    for name, (case_source, translation) in short_cases.items():
+        report = analyze(case_source, translation)
+        print(f"{name:32s} complete={report.complete} missing={report.missing}")
+
+    # ค่าใช้จ่ายโดยประมาณ (ตัวอักษร): input ที่ส่ง + output ที่โมเดลต้องสร้าง
+    full_retry = prefix_chars + len(source) + len(source) * EXPECTED_RATIO
+    for name, translation in cases.items():
+        report = analyze(source, translation)
+        cost = 0
+        if not report.complete:
+            cost = (
+                prefix_chars * cached_prefix_price
+                + len(build_continuation_request(report))
+                + len(report.continuation_text()) * EXPECTED_RATIO
+            )
+        print(
+            f"{name:32s} complete={report.complete} missing={len(report.missing)}/"
+            f"{report.source_sentences} recovery cost {cost / full_retry:.0%} of a full retry"
+            + (" (ambiguous: re-translated whole line)" if not report.complete and not report.kept else "")
+        )
+    return cases
+
+
+if __name__ == "__main__":
+    benchmark()
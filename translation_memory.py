@@ -0,0 +1,358 @@
+import functools
+import logging
+import re
+import threading
+from collections import OrderedDict
+
+from lore_segmenter import MEMORY_KIND as LORE_SENTENCE_KIND, split_sentences, translate_lore
+
+# ข้อความที่เป็นผลจากการแปลล้มเหลว - ไม่เก็บลง memory
+_FAILED_PREFIXES = ("[Error", "[ERROR", "[Translation Error", "[ไม่สามารถแปลได้")
+
+_NEGATION_RE = re.compile(r"\b(?:\w+n't|not|never|no|cannot|nothing|nobody|none)\b")
+
+
+def default_correction_patterns():
+    """รูปแบบความผิดพลาดของ OCR ชุดเดียวกับที่ EnhancedNameDetector ใช้"""
+    try:
+        from enhanced_name_detector import EnhancedNameDetector
+
+        # build_correction_patterns ไม่ได้ใช้ state ของ instance จึงไม่ต้องสร้าง detector ทั้งตัว
+        return EnhancedNameDetector.build_correction_patterns(None)
+    except Exception as e:
+        logging.warning(f"TranslationMemory: using built-in OCR patterns ({e})")
+        return {"l": ["I", "1", "|"], "0": ["O", "o"], "rn": ["m"], "'": ["`", "´"]}
+
+
+class OCRNormalizer:
+    """
+    ทำให้ข้อความที่ OCR อ่านต่างกันเล็กน้อยกลายเป็นรูปเดียวกัน:
+    ตัวอักษรที่สับสนกันง่าย (l/I/1/|, 0/O, rn/m, ...), ตัวพิมพ์, ช่องว่าง, apostrophe, และ 22/??? ของผู้พูด
+    """
+
+    def __init__(self, correction_patterns=None):
+        patterns = correction_patterns or default_correction_patterns()
+        self._char_map = {}
+        self._multi_char = []
+        self._build(patterns)
+
+    def _build(self, patterns):
+        # รวมตัวอักษรเดี่ยวที่สับสนกันเป็นกลุ่มเดียว (union-find) แล้วใช้ตัวแทนกลุ่มเดียว
+        parent = {}
+
+        def find(char):
+            parent.setdefault(char, char)
+            while parent[char] != char:
+                parent[char] = parent[parent[char]]
+                char = parent[char]
+            return char
+
+        for source, confusions in patterns.items():
+            for target in confusions:
+                if len(source) == 1 and len(target) == 1:
+                    if source.isspace() or target.isspace() or "'" in (source, target):
+                        continue  # ช่องว่างและ apostrophe จัดการแยกด้านล่าง
+                    root_a, root_b = find(source), find(target)
+                    if root_a != root_b:
+                        parent[max(root_a, root_b)] = min(root_a, root_b)
+                elif len(source) > len(target) and target:
+                    self._multi_char.append((target, source))  # เช่น "m" -> "rn"
+
+        groups = {}
+        for char in list(parent):
+            groups.setdefault(find(char), []).append(char)
+        for members in groups.values():
+            # ใช้ตัวพิมพ์เล็กเป็นตัวแทนกลุ่ม เพื่อให้ตัวเลขที่ OCR อ่านผิด (1, 0, 5) กลายเป็นตัวอักษร
+            lower = sorted(char for char in members if char.isalpha() and char.islower())
+            letters = sorted(char.lower() for char in members if char.isalpha())
+            canonical = (lower or letters or sorted(members))[0]
+            for char in members:
+                self._char_map[char] = canonical
+
+    def normalize(self, text):
+        if not text:
+            return ""
+        text = re.sub(r"^\s*(?:2{2,}\??|\?{2,})\s*:", "???:", text)
+        for short, long in self._multi_char:
+            text = text.replace(short, long)
+        text = "".join(self._char_map.get(char, char) for char in text).lower()
+        text = re.sub(r"['`´’‘]", "", text)
+        text = re.sub(r"[\s_\-]+", " ", text)
+        return text.strip()
+
+
+def meaning_signature(text):
+    """
+    ส่วนของข้อความที่เปลี่ยนความหมายแม้ต่างกันเพียงเล็กน้อย - คำนวณจากข้อความดิบก่อน normalize
+    (OCRNormalizer แปลงตัวเลขเป็นตัวอักษรและตัด apostrophe ออก):
+    ตัวเลข, คำปฏิเสธ (n't / not / never / no) และชนิดของเครื่องหมายจบประโยค (? / ! / .)
+    """
+    text = re.sub(r"['`´’‘]", "'", text or "").strip()
+    digits = tuple(re.findall(r"\d+", text))
+    negations = tuple(_NEGATION_RE.findall(text.lower()))
+    ending = text.rstrip("\"'”’)] ")[-3:]
+    terminal = "?" if "?" in ending else "!" if "!" in ending else "."
+    return digits, negations, terminal
+
+
+def bounded_edit_distance(a, b, max_distance):
+    """Levenshtein distance แบบจำกัดแถบ - คืน max_distance + 1 ทันทีเมื่อเกินขอบเขต"""
+    if abs(len(a) - len(b)) > max_distance:
+        return max_distance + 1
+    if len(a) > len(b):
+        a, b = b, a
+    previous = list(range(len(b) + 1))
+    for i, char_a in enumerate(a, 1):
+        low = max(1, i - max_distance)
+        high = min(len(b), i + max_distance)
+        current = [max_distance + 1] * (len(b) + 1)
+        current[0] = i if i <= max_distance else max_distance + 1
+        row_min = current[0]
+        for j in range(low, high + 1):
+            cost = 0 if char_a == b[j - 1] else 1
+            current[j] = min(previous[j] + 1, current[j - 1] + 1, previous[j - 1] + cost)
+            row_min = min(row_min, current[j])
+        if row_min > max_distance:
+            return max_distance + 1
+        previous = current
+    return min(previous[len(b)], max_distance + 1)
+
+
+class TranslationMemory:
+    """
+    Translation memory ที่ทนต่อ noise ของ OCR
+
+    ค้นหา 2 ขั้น: exact match บนข้อความที่ normalize แล้ว จากนั้นหา candidate ด้วย
+    character trigram index และยืนยันด้วย bounded edit distance
+    ข้อความสั้นต้องตรงกันหลัง normalize เท่านั้น เพราะต่างกัน 1 ตัวอักษรก็อาจเปลี่ยนความหมาย
+    """
+
+    def __init__(
+        self,
+        max_entries=1000,
+        max_distance_ratio=0.08,
+        max_distance=6,
+        min_fuzzy_length=12,
+        normalizer=None,
+    ):
+        self.max_entries = max_entries
+        self.max_distance_ratio = max_distance_ratio
+        self.max_distance = max_distance
+        self.min_fuzzy_length = min_fuzzy_length
+        self.normalizer = normalizer or OCRNormalizer()
+        self._lock = threading.Lock()
+        self._entries = OrderedDict()  # (kind, normalized) -> translation (LRU)
+        self._signatures = {}  # (kind, normalized) -> meaning_signature ของข้อความดิบ
+        self._grams = {}  # trigram -> set of keys
+        self.stats = {"exact_hits": 0, "fuzzy_hits": 0, "misses": 0, "stored": 0}
+
+    @staticmethod
+    def _trigrams(text):
+        padded = f"  {text} "
+        return {padded[i : i + 3] for i in range(len(padded) - 2)}
+
+    def lookup(self, text, kind="translate"):
+        """คืนคำแปลที่เคยเก็บไว้ของข้อความนี้หรือข้อความที่ใกล้เคียงพอ (None ถ้าไม่พบ)"""
+        normalized = self.normalizer.normalize(text)
+        if not normalized:
+            return None
+        key = (kind, normalized)
+        signature = meaning_signature(text)
+        with self._lock:
+            translation = self._entries.get(key)
+            if translation is not None and self._signatures.get(key) == signature:
+                self._entries.move_to_end(key)
+                self.stats["exact_hits"] += 1
+                return translation
+
+            match = self._find_fuzzy(kind, normalized, signature)
+            if match is None:
+                self.stats["misses"] += 1
+                return None
+            self._entries.move_to_end(match)
+            self.stats["fuzzy_hits"] += 1
+            logging.debug(f"TranslationMemory: fuzzy hit {normalized[:40]!r} ~ {match[1][:40]!r}")
+            return self._entries[match]
+
+    def _find_fuzzy(self, kind, normalized, signature):
+        if len(normalized) < self.min_fuzzy_length:
+            return None
+        limit = min(self.max_distance, max(1, int(len(normalized) * self.max_distance_ratio)))
+        grams = self._trigrams(normalized)
+
+        # นับ trigram ที่ตรงกันของแต่ละ candidate
+        overlap = {}
+        for gram in grams:
+            for key in self._grams.get(gram, ()):
+                if key[0] == kind:
+                    overlap[key] = overlap.get(key, 0) + 1
+        if not overlap:
+            return None
+
+        # แต่ละ edit ทำให้ trigram หายไปได้ไม่เกิน 3 ตัว
+        min_overlap = len(grams) - 3 * limit
+        best_key, best_distance = None, limit + 1
+        for key, count in sorted(overlap.items(), key=lambda item: -item[1])[:8]:
+            if count < min_overlap:
+                break
+            # ตัวเลข (เช่น จำนวน gil), คำปฏิเสธ หรือคำถาม/ประโยคบอกเล่าที่ต่างกัน ถือว่าเป็นคนละประโยค
+            if self._signatures.get(key) != signature:
+                continue
+            distance = bounded_edit_distance(normalized, key[1], limit)
+            if distance < best_distance:
+                best_key, best_distance = key, distance
+        return best_key
+
+    def store(self, text, translation, kind="translate"):
+        if not translation or str(translation).startswith(_FAILED_PREFIXES):
+            return
+        normalized = self.normalizer.normalize(text)
+        if not normalized:
+            return
+        key = (kind, normalized)
+        with self._lock:
+            if key not in self._entries:
+                for gram in self._trigrams(normalized):
+                    self._grams.setdefault(gram, set()).add(key)
+            self._entries[key] = translation
+            self._signatures[key] = meaning_signature(text)
+            self._entries.move_to_end(key)
+            self.stats["stored"] += 1
+            while len(self._entries) > self.max_entries:
+                old_key, _ = self._entries.popitem(last=False)
+                self._unindex(old_key)
+
+    def discard(self, text, kind=None):
+        """
+        ลบข้อความนี้ออก (ใช้เมื่อผู้ใช้สั่ง force translate เพื่อให้ได้คำแปลใหม่)
+        ข้อความ lore ลบคำแปลรายประโยคด้วย มิฉะนั้น translate_lore จะประกอบคำแปลเดิมกลับมาโดยไม่เรียก API
+        """
+        normalized = self.normalizer.normalize(text)
+        keys = []
+        with self._lock:
+            kinds = [kind] if kind else list({key[0] for key in self._entries})
+            keys.extend((entry_kind, normalized) for entry_kind in kinds)
+        if kind in (None, "lore"):
+            keys.extend(
+                (LORE_SENTENCE_KIND, self.normalizer.normalize(sentence))
+                for sentence, _ in split_sentences(text or "")
+            )
+        with self._lock:
+            for key in keys:
+                if self._entries.pop(key, None) is not None:
+                    self._unindex(key)
+
+    def _unindex(self, key):
+        self._signatures.pop(key, None)
+        for gram in self._trigrams(key[1]):
+            keys = self._grams.get(gram)
+            if keys:
+                keys.discard(key)
+                if not keys:
+                    del self._grams[gram]
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._grams.clear()
+            self._signatures.clear()
+
+    def get_stats(self):
+        with self._lock:
+            stats = dict(self.stats)
+            stats["entries"] = len(self._entries)
+        lookups = stats["exact_hits"] + stats["fuzzy_hits"] + stats["misses"]
+        stats["hit_ratio"] = (stats["exact_hits"] + stats["fuzzy_hits"]) / lookups if lookups else 0.0
+        return stats
+
+
+_memory = None
+_memory_lock = threading.Lock()
+
+
+def get_translation_memory():
+    """memory ตัวเดียวที่ใช้ร่วมกันทุก translator (คงอยู่เมื่อสลับโมเดล)"""
+    global _memory
+    with _memory_lock:
+        if _memory is None:
+            _memory = TranslationMemory()
+        return _memory
+
+
+def install_translation_memory(translator, memory=None):
+    """
+    ครอบ translate / translate_choice ของ translator ให้ตรวจ TranslationMemory ก่อนเรียก API
+
+    Returns:
+        translator ตัวเดิม (มี attribute translation_memory)
+    """
+    if getattr(translator, "translation_memory", None) is not None:
+        return translator
+
+    memory = memory or get_translation_memory()
+    translator.translation_memory = memory
+
+    original_translate = translator.translate
+
+    @functools.wraps(original_translate)
+    def translate(text, *args, **kwargs):
+        if args or not isinstance(text, str) or set(kwargs) - {"is_lore_text"}:
+            return original_translate(text, *args, **kwargs)
+        kind = "lore" if kwargs.get("is_lore_text") else "translate"
+        translation = memory.lookup(text, kind)
+        if translation is not None:
+            return translation
+        if kind == "lore":
+            # ย่อหน้าที่ยังไม่เคยแปล: แปลเฉพาะประโยคที่ยังไม่อยู่ใน memory
+            translation = translate_lore(
+                translator,
+                text,
+                memory,
+                lambda whole: original_translate(whole, **kwargs),
+            )
+        else:
+            translation = original_translate(text, **kwargs)
+        memory.store(text, translation, kind)
+        return translation
+
+    translator.translate = translate
+
+    if hasattr(translator, "translate_choice"):
+        original_translate_choice = translator.translate_choice
+
+        @functools.wraps(original_translate_choice)
+        def translate_choice(text, *args, **kwargs):
+            if args or kwargs or not isinstance(text, str):
+                return original_translate_choice(text, *args, **kwargs)
+            translation = memory.lookup(text, "choice")
+            if translation is not None:
+                return translation
+            translation = original_translate_choice(text)
+            memory.store(text, translation, "choice")
+            return translation
+
+        translator.translate_choice = translate_choice
+
+    return translator
+
+
+def benchmark():
+    """ข้อความที่ต่างกันเพียงตัวเลข/คำปฏิเสธ/เครื่องหมายคำถาม เทียบกับข้อความที่ OCR อ่านเพี้ยน - แสดงผล hit/miss"""
+    memory = TranslationMemory()
+    pairs = [
+        ("Bring me 10 apples, quickly now.", "Bring me 100 apples, quickly now."),
+        ("I can go there now.", "I can't go there now."),
+        ("We should leave at once.", "We shouldn't leave at once."),
+        ("He is alive.", "He is alive?"),
+        ("The tower is falling, everyone run!", "The tovver is falIing, everyone run!"),
+    ]
+    for stored, query in pairs:
+        memory.store(stored, f"<th:{stored[:12]}>")
+        shown = "hit" if memory.lookup(query) is not None else "miss"
+        print(f"  {query:40s}{shown}")
+    print(f"TranslationMemory: {memory.get_stats()}")
+    return memory.get_stats()
+
+
+if __name__ == "__main__":
+    benchmark()
@@ -11,8 +11,17 @@ import time
 import logging
 import numpy as np
 from enum import Enum
-from text_corrector import TextCorrector, DialogueType
-from dialogue_cache import DialogueCache
+from text_corrector import DialogueType
+from translator_registry import get_shared_context
+from dialogue_classifier import parse_choice
+from line_parser import METHOD_SPECIAL
+from usage_ledger import get_usage_ledger
+from request_scheduler import (
+    PRIORITY_BACKGROUND,
+    PRIORITY_SPECULATIVE,
+    estimate_tokens,
+    get_request_scheduler,
+)
 import requests
 
 load_dotenv()
@@ -50,10 +59,13 @@ class Translator:
                 self.top_p = 0.9
                 logging.warning("Could not load settings.json, using default values")
 
-        self.cache = DialogueCache()
+        self.cache = get_shared_context().dialogue_cache
+        self.scheduler = get_request_scheduler(settings)
+        self.usage_ledger = get_usage_ledger()
+        self.game_name = "unknown"
         self.last_translations = {}
         self.character_names_cache = set()
-        self.text_corrector = TextCorrector()
+        self.text_corrector = get_shared_context().text_corrector
         self.load_npc_data()
         self.load_example_translations()
 
@@ -69,31 +81,31 @@ class Translator:
 
     def load_npc_data(self):
         try:
-            with open("NPC.json", "r", encoding="utf-8") as file:
-                npc_data = json.load(file)
-                self.character_data = npc_data["main_characters"]
-                self.context_data = npc_data["lore"]
-                self.character_styles = npc_data["character_roles"]
-
-                # Update character_names_cache
-                self.character_names_cache = set()
-                self.character_names_cache.add("???")
-
-                # Load main characters
-                for char in self.character_data:
-                    self.character_names_cache.add(char["firstName"])
-                    if char["lastName"]:
-                        self.character_names_cache.add(
-                            f"{char['firstName']} {char['lastName']}"
-                        )
-
-                # Load NPCs
-                for npc in npc_data["npcs"]:
-                    self.character_names_cache.add(npc["name"])
+            npc_data = get_shared_context().get_npc_data("NPC.json")
+            self.game_name = npc_data.get("_game_info", {}).get("name", "unknown")
+            self.character_data = npc_data["main_characters"]
+            self.context_data = npc_data["lore"]
+            self.character_styles = npc_data["character_roles"]
+
+            # Update character_names_cache
+            self.character_names_cache = set()
+            self.character_names_cache.add("???")
+
+            # Load main characters
+            for char in self.character_data:
+                self.character_names_cache.add(char["firstName"])
+                if char["lastName"]:
+                    self.character_names_cache.add(
+                        f"{char['firstName']} {char['lastName']}"
+                    )
 
-                logging.info(
-                    "Translator: Loaded NPC.json successfully"
-                )  # เปลี่ยนเป็น logging แทน print
+            # Load NPCs
+            for npc in npc_data["npcs"]:
+                self.character_names_cache.add(npc["name"])
+
+            logging.info(
+                "Translator: Loaded NPC.json successfully"
+            )  # เปลี่ยนเป็น logging แทน print
 
         except FileNotFoundError:
             raise FileNotFoundError("NPC.json file not found")
@@ -216,8 +228,31 @@ class Translator:
             print(f"[GPT] Parameter update failed: {str(e)}")
             return False, str(e)
 
+    def _create_completion(self, priority=None, character=None, **params):
+        """
+        เรียก chat.completions.create ผ่าน RequestScheduler ที่ใช้ร่วมกันทุก translator
+        และบันทึก token จริงจาก usage ลง UsageLedger
+        """
+        start_time = time.time()
+        response = self.scheduler.call(
+            "gpt",
+            lambda: self.client.chat.completions.create(**params),
+            estimate_tokens(str(params.get("messages", "")), params.get("max_tokens", 0)),
+            priority,
+        )
+        self.usage_ledger.record(
+            "gpt",
+            params.get("model", self.model),
+            response,
+            time.time() - start_time,
+            dialogue_type=self.scheduler.priority_name(priority),
+            character=character,
+            game=self.game_name,
+        )
+        return response
+
     def _call_openai_api(
-        self, model, messages, temperature, max_tokens=None, top_p=None
+        self, model, messages, temperature, max_tokens=None, top_p=None, character=None
     ):
         """เรียกใช้ OpenAI API และวัดประสิทธิภาพ"""
         try:
@@ -239,7 +274,7 @@ class Translator:
 
             # เรียกใช้ API
             if hasattr(self, "client") and self.client:
-                response = self.client.chat.completions.create(**params)
+                response = self._create_completion(character=character, **params)
             else:
                 response = openai.ChatCompletion.create(**params)
 
@@ -300,9 +335,12 @@ class Translator:
             # แสดงข้อความเริ่มการแปลในคอนโซล
             print(f"กำลังแปล: {text[:30]}..." + " " * 20, end="\r")
 
-            # ใช้ text_corrector instance ที่สร้างไว้แล้ว
+            # ใช้ผลแยกชื่อที่ memoize ไว้ใน text_corrector (MBB parse ข้อความเดียวกันไว้แล้ว)
+            parsed = self.text_corrector.parse_line(text)
             speaker, content, dialogue_type = (
-                self.text_corrector.split_speaker_and_content(text)
+                parsed.speaker,
+                parsed.content,
+                parsed.dialogue_type,
             )
 
             # เพิ่มการตรวจสอบพิเศษสำหรับ 22
@@ -310,7 +348,7 @@ class Translator:
                 return "???"
 
             # กรณีพิเศษสำหรับ ??? หรือ 222
-            if text.strip() in ["222", "222?", "???"]:
+            if text.strip() in ["222", "222?", "???"] or parsed.method == METHOD_SPECIAL:
                 return "???"
 
             # ตรวจสอบว่าเป็นข้อความตัวเลือกหรือไม่
@@ -401,6 +439,7 @@ class Translator:
                     self.temperature,
                     self.max_tokens,
                     self.top_p,
+                    character=character_name or None,
                 )
                 translated_dialogue = response.choices[0].message.content.strip()
 
@@ -438,159 +477,14 @@ class Translator:
             logging.error(f"Unexpected error in translation: {str(e)}")
             return f"[Error: {str(e)}]"
 
-    def is_similar_to_choice_prompt(
-        self, text, threshold=0.7
-    ):  # ลดระดับ threshold ลงเพื่อความยืดหยุ่น
-        """
-        ตรวจสอบและแยกส่วนประกอบของ choice dialogue ด้วยความยืดหยุ่นที่มากขึ้น
+    def is_similar_to_choice_prompt(self, text, threshold=0.7):
+        """ตรวจสอบและแยกส่วนประกอบของ choice dialogue (กฎอยู่ใน dialogue_classifier.parse_choice)
+
         Returns:
             tuple: (is_choice, prompt_part, choices)
         """
-        try:
-            # 1. ถ้าไม่มีข้อความหรือสั้นเกินไป ถือว่าไม่ใช่ choice
-            if not text or len(text) < 5:  # ปรับลดขนาดขั้นต่ำลง
-                return False, None, []
-
-            # 2. ตัวอย่างรูปแบบ header ที่ต้องตรวจจับ - เพิ่มรูปแบบที่อาจมี OCR errors
-            choice_headers = [
-                "What will you say?",
-                "What will you say",  # ไม่มี ?
-                "What wiII you say?",  # OCR อาจเข้าใจผิดระหว่าง l กับ I
-                "What wlll you say?",  # OCR อาจเข้าใจผิดระหว่าง i กับ l
-                "VVhat will you say?",  # OCR อาจเข้าใจผิดระหว่าง W กับ VV
-                "What will you do?",
-                "Select an option.",
-                "Choose your response.",
-                "คุณจะพูดว่าอย่างไร?",
-            ]
-
-            # 3. ตรวจสอบโดยใช้ fuzzy matching สำหรับความยืดหยุ่นมากขึ้น
-            for header in choice_headers:
-                # ใช้การตรวจสอบแบบยืดหยุ่นมากขึ้น
-                clean_header = header.lower().replace("?", "").replace(".", "").strip()
-                clean_text = text.lower().replace("?", "").replace(".", "").strip()
-
-                if clean_header in clean_text:
-                    # หาตำแหน่งที่ใกล้เคียงที่สุดในข้อความ
-                    idx = clean_text.find(clean_header)
-                    if idx <= 10:  # ถ้าพบใกล้กับจุดเริ่มต้นของข้อความ
-                        # แยกข้อความส่วนที่เหลือหลังจาก header
-                        text_parts = re.split(
-                            f"{re.escape(clean_header)}",
-                            clean_text,
-                            flags=re.IGNORECASE,
-                            maxsplit=1,
-                        )
-
-                        if len(text_parts) > 1:
-                            remaining_text = text_parts[1].strip()
-
-                            # 4. แยก header และกำหนดให้เป็นรูปแบบมาตรฐาน
-                            header = "What will you say?"
-
-                            # ถ้าพบ header ภาษาไทย
-                            if "คุณจะพูด" in clean_text:
-                                header = "คุณจะพูดว่าอย่างไร?"
-
-                            # 5. แยกตัวเลือก - ปรับปรุงการแยกตัวเลือก
-                            # ลองใช้ newline ก่อน เพราะเป็นตัวแบ่งที่ชัดเจนที่สุด
-                            choices = [
-                                c.strip()
-                                for c in re.split(r"\n+", remaining_text)
-                                if c.strip()
-                            ]
-
-                            # ถ้าแยกด้วย newline ไม่ได้ ลองใช้เครื่องหมายวรรคตอนอื่นๆ
-                            if len(choices) <= 1:
-                                choices = [
-                                    c.strip()
-                                    for c in re.split(r"[.!?]+", remaining_text)
-                                    if c.strip()
-                                ]
-
-                                # ถ้ายังแยกไม่ได้ ลองแยกด้วยคำเริ่มต้นที่พบบ่อย
-                                if len(choices) <= 1:
-                                    common_starts = [
-                                        "I suppose",
-                                        "I think",
-                                        "I will",
-                                        "I'll",
-                                        "I can",
-                                        "We should",
-                                        "We can",
-                                        "We will",
-                                        "We'll",
-                                        "Yes",
-                                        "No",
-                                        "Perhaps",
-                                        "Maybe",
-                                        "The ",
-                                        "But ",
-                                        "So ",
-                                        "You ",
-                                        "Let's",
-                                        "Please",
-                                        "Thank",
-                                        "Very",
-                                        "We won't",
-                                        "We take",  # เพิ่มตามตัวอย่างในภาพ
-                                    ]
-
-                                    temp_choices = self._extract_choices_by_starters(
-                                        remaining_text, common_starts
-                                    )
-                                    if temp_choices:
-                                        choices = temp_choices
-
-                            # 6. ต้องมีอย่างน้อย 1 ตัวเลือก
-                            if choices:
-                                return True, header, choices
-
-                    # หากพบ header แต่ไม่สามารถแยกตัวเลือกได้ ให้ระบุ header อย่างเดียว
-                    return True, header, []
-
-            return False, None, []
-
-        except Exception as e:
-            logging.error(f"Error in is_similar_to_choice_prompt: {str(e)}")
-            return False, None, []
-
-    def _extract_choices_by_starters(self, text, starters):
-        """แยกตัวเลือกจากข้อความโดยใช้คำเริ่มต้นที่กำหนด"""
-        choices = []
-        remaining = text
-
-        # เตรียมคำขึ้นต้นสำหรับการตรวจจับด้วย regex
-        pattern = "|".join(re.escape(start) for start in starters)
-
-        # แยกด้วย regex
-        splits = re.split(f"({pattern})", remaining, flags=re.IGNORECASE)
-
-        # จัดกลุ่มตัวเลือก
-        current_choice = ""
-        for i, part in enumerate(splits):
-            if i == 0 and part.strip():
-                # ถ้าส่วนแรกมีเนื้อหา ให้เริ่มตัวเลือกแรก
-                current_choice = part.strip()
-                if current_choice:
-                    choices.append(current_choice)
-                    current_choice = ""
-            elif part.strip() and any(
-                part.lower().startswith(start.lower()) for start in starters
-            ):
-                # พบคำขึ้นต้นใหม่ เพิ่มตัวเลือกเก่าและเริ่มตัวเลือกใหม่
-                if current_choice:
-                    choices.append(current_choice)
-                current_choice = part.strip()
-            elif part.strip():
-                # ต่อเนื้อหากับตัวเลือกปัจจุบัน
-                current_choice += " " + part.strip()
-
-        # เพิ่มตัวเลือกสุดท้าย
-        if current_choice:
-            choices.append(current_choice)
-
-        return [c.strip() for c in choices if c.strip()]
+        result = parse_choice(text or "")
+        return result.is_choice, result.header, list(result.choices)
 
     def translate_choice(self, text):
         """แปลข้อความตัวเลือกของผู้เล่น
@@ -656,12 +550,13 @@ class Translator:
         return None
 
     def batch_translate(self, texts, batch_size=10):
-        """แปลข้อความเป็นชุด"""
+        """แปลข้อความเป็นชุด (ลำดับความสำคัญต่ำกว่าบรรทัดที่กำลังแสดง)"""
         translated_texts = []
-        for i in range(0, len(texts), batch_size):
-            batch = texts[i : i + batch_size]
-            translated_batch = [self.translate(text) for text in batch]
-            translated_texts.extend(translated_batch)
+        with self.scheduler.priority(PRIORITY_BACKGROUND):
+            for i in range(0, len(texts), batch_size):
+                batch = texts[i : i + batch_size]
+                translated_batch = [self.translate(text) for text in batch]
+                translated_texts.extend(translated_batch)
         return translated_texts
 
     def analyze_translation_quality(self, original_text, translated_text):
@@ -676,7 +571,8 @@ class Translator:
 
         try:
             # เปลี่ยนเป็นการใช้ client ใหม่
-            response = self.client.chat.completions.create(
+            response = self._create_completion(
+                priority=PRIORITY_SPECULATIVE,
                 model=self.model,
                 messages=[
                     {"role": "system", "content": prompt},
@@ -718,7 +614,7 @@ class Translator:
             )
 
             # Send to API
-            response = self.client.chat.completions.create(
+            response = self._create_completion(
                 model=self.model,
                 messages=[
                     {"role": "system", "content": system_message},
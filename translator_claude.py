@@ -8,7 +8,24 @@ import json
 import difflib
 import time
 import logging
-from text_corrector import TextCorrector, DialogueType
+from text_corrector import DialogueType
+from line_parser import METHOD_SPECIAL
+from translator_registry import get_shared_context
+from dialogue_classifier import split_choice_header
+from batch_translation import BatchTranslator
+from translation_completeness import (
+    analyze as analyze_completeness,
+    build_continuation_request,
+)
+from usage_ledger import get_usage_ledger
+from prompt_cache import build_cached_system
+from request_scheduler import (
+    PRIORITY_BACKGROUND,
+    PRIORITY_CHOICE,
+    PRIORITY_SPECULATIVE,
+    estimate_tokens,
+    get_request_scheduler,
+)
 
 # เพิ่มการ import EnhancedNameDetector ถ้ามี
 try:
@@ -48,11 +65,19 @@ class TranslatorClaude:
         self.character_data = []
         self.context_data = {}
         self.character_styles = {}
+        self.game_name = "unknown"
+        self._npc_mtime = None
+        self._npc_checked_at = 0.0
+        self.prompt_caching = settings.get("prompt_caching", True) if settings else True
         self.character_names_cache.add("???")
         self.load_npc_data()
         self.load_example_translations()
-        self.text_corrector = TextCorrector()
+        self.text_corrector = get_shared_context().text_corrector
         self.last_translations = {}
+        self.cache = get_shared_context().dialogue_cache
+        self.batch_translator = BatchTranslator(self._send_batch_prompt, self.cache)
+        self.scheduler = get_request_scheduler(settings)
+        self.usage_ledger = get_usage_ledger()
 
         # ดูว่าสามารถใช้ EnhancedNameDetector ได้หรือไม่
         self.enhanced_detector = None
@@ -68,36 +93,37 @@ class TranslatorClaude:
 
     def load_npc_data(self):
         try:
-            with open("NPC.json", "r", encoding="utf-8") as file:
-                npc_data = json.load(file)
-                self.character_data = npc_data["main_characters"]
-                self.context_data = npc_data["lore"]
-                self.character_styles = npc_data["character_roles"]
-
-                # โหลด word_fixes ถ้ามี
-                if "word_fixes" in npc_data:
-                    self.word_fixes = npc_data["word_fixes"]
-                    logging.info(f"Loaded {len(self.word_fixes)} word fixes from NPC.json")
-                else:
-                    self.word_fixes = {}
-
-                # Update character_names_cache
-                self.character_names_cache = set()
-                self.character_names_cache.add("???")
-
-                # Load main characters
-                for char in self.character_data:
-                    self.character_names_cache.add(char["firstName"])
-                    if char["lastName"]:
-                        self.character_names_cache.add(
-                            f"{char['firstName']} {char['lastName']}"
-                        )
+            self._npc_mtime = os.path.getmtime("NPC.json")
+            npc_data = get_shared_context().get_npc_data("NPC.json")
+            self.game_name = npc_data.get("_game_info", {}).get("name", "unknown")
+            self.character_data = npc_data["main_characters"]
+            self.context_data = npc_data["lore"]
+            self.character_styles = dict(npc_data["character_roles"])
+
+            # โหลด word_fixes ถ้ามี
+            if "word_fixes" in npc_data:
+                self.word_fixes = npc_data["word_fixes"]
+                logging.info(f"Loaded {len(self.word_fixes)} word fixes from NPC.json")
+            else:
+                self.word_fixes = {}
+
+            # Update character_names_cache
+            self.character_names_cache = set()
+            self.character_names_cache.add("???")
+
+            # Load main characters
+            for char in self.character_data:
+                self.character_names_cache.add(char["firstName"])
+                if char["lastName"]:
+                    self.character_names_cache.add(
+                        f"{char['firstName']} {char['lastName']}"
+                    )
 
-                # Add NPCs to character_names_cache
-                for npc in npc_data["npcs"]:
-                    self.character_names_cache.add(npc["name"])
+            # Add NPCs to character_names_cache
+            for npc in npc_data["npcs"]:
+                self.character_names_cache.add(npc["name"])
 
-                print("[Claude API] Successfully loaded NPC data")
+            print("[Claude API] Successfully loaded NPC data")
         except FileNotFoundError:
             raise FileNotFoundError("NPC.json file not found")
         except json.JSONDecodeError:
@@ -275,62 +301,6 @@ class TranslatorClaude:
                 
         return False
 
-    def extract_character_name(self, text):
-        """
-        แยกชื่อผู้พูดและข้อความบทสนทนา
-        
-        Args:
-            text: ข้อความที่ต้องการแยก เช่น "Character: Dialogue"
-            
-        Returns:
-            tuple: (ชื่อผู้พูด, ข้อความบทสนทนา)
-        """
-        # กรณีข้อความว่าง
-        if not text or not text.strip():
-            return "", ""
-            
-        # ตรวจสอบรูปแบบ "Name: Dialogue"
-        match = re.match(r"^([^:]+):\s*(.*)", text)
-        if match:
-            name, dialogue = match.groups()
-            name = name.strip()
-            dialogue = dialogue.strip()
-            
-            # กรณีพิเศษสำหรับ "???" หรือแบบแผนที่เป็นเลข 2
-            if name == "???" or re.match(r"^2+\??$", name):
-                name = "???"
-                
-            # ตรวจสอบว่าเป็นชื่อตัวละครที่รู้จักหรือไม่
-            if name and name != "???" and name not in self.character_names_cache:
-                # ใช้ enhanced_detector ถ้ามี
-                is_character = False
-                try:
-                    if hasattr(self, "enhanced_detector") and self.enhanced_detector is not None:
-                        # ลองหลายเมธอดที่อาจมีในคลาส EnhancedNameDetector
-                        if hasattr(self.enhanced_detector, "is_likely_character_name"):
-                            is_character = self.enhanced_detector.is_likely_character_name(name)
-                        elif hasattr(self.enhanced_detector, "is_name"):
-                            is_character = self.enhanced_detector.is_name(name)
-                        else:
-                            # ถ้าไม่มีเมธอดที่ต้องการ ใช้วิธีตรวจสอบพื้นฐานแทน
-                            is_character = self.is_character_name(name)
-                    else:
-                        # ตรวจสอบด้วยกฎพื้นฐาน
-                        is_character = self.is_character_name(name)
-                except Exception as e:
-                    print(f"[Claude API] Error checking character name: {e}")
-                    # ใช้วิธีตรวจสอบด้วยตัวเอง
-                    is_character = self.is_character_name(name)
-                    
-                if is_character:
-                    print(f"[Claude API] Adding new character name: {name}")
-                    self.character_names_cache.add(name)
-                    
-            return name, dialogue
-            
-        # กรณีไม่พบรูปแบบชื่อ-บทสนทนา
-        return "", text
-
     def get_character_info(self, character_name):
         """
         ดึงข้อมูลตัวละครจากฐานข้อมูล
@@ -497,6 +467,46 @@ class TranslatorClaude:
         # ผ่านเกณฑ์ทั้งหมด น่าจะเป็นชื่อตัวละคร
         return True
 
+    def _get_base_system_prompt(self):
+        """คำแนะนำการแปลพื้นฐานที่ใช้ร่วมกันระหว่าง translate และ batch_translate"""
+        return (
+            "คุณเป็นผู้แปลภาษามืออาชีพ แปลข้อความจากภาษาอังกฤษเป็นภาษาไทย กรุณาแปลข้อความที่ให้มาด้านล่างให้เป็นภาษาไทยที่เป็นธรรมชาติ\n\n"
+            "คำแนะนำ:\n"
+            "1. รักษาความหมายดั้งเดิมของข้อความให้มากที่สุด\n"
+            "2. ใช้ภาษาที่เป็นธรรมชาติและเหมาะสมกับบริบท ไม่แปลตรงตัวจนแข็งกระด้าง\n"
+            "3. คงเอกลักษณ์และสไตล์ของตัวละครในการแปล\n"
+            "4. ข้อความตัวอย่างจะมีรูปแบบ \"English Text: ข้อความภาษาไทย\"\n"
+            "5. คุณต้องตอบเฉพาะคำแปลภาษาไทยเท่านั้น ไม่ต้องมีข้อความอื่นใด\n"
+            "6. ห้ามเปลี่ยนชื่อตัวละคร ให้คงตามข้อความภาษาอังกฤษ\n"
+            "7. ไม่ต้องเพิ่มเครื่องหมายวงเล็บเพื่ออธิบายเพิ่มเติม\n"
+            "8. ไม่ต้องเพิ่มหรือตัดทอนเนื้อหา\n"
+            "9. หากเป็นชื่อสถานที่ อาวุธพิเศษ ชื่อ skill พิเศษ หรือคำเฉพาะในเกม ให้คงรูปแบบเดิมไว้\n"
+        )
+
+    def _get_cached_system_prefix(self):
+        """ส่วนคงที่ของ system prompt - เปลี่ยนเฉพาะเมื่อโหลด NPC.json / ตัวอย่างใหม่"""
+        self._reload_if_npc_changed()
+        prefix = self._get_base_system_prompt()
+        prefix += "\nตัวอย่างการแปล:\n"
+        examples = list(self.example_translations.items())[:5]  # ใช้ 5 ตัวอย่างแรก
+        for eng, thai in examples:
+            prefix += f"{eng}: {thai}\n"
+        return prefix
+
+    def _reload_if_npc_changed(self):
+        """โหลด NPC.json ใหม่ถ้าไฟล์ถูกแก้ไข (ตรวจไม่เกินทุก 2 วินาที)"""
+        now = time.time()
+        if now - self._npc_checked_at < 2.0:
+            return
+        self._npc_checked_at = now
+        try:
+            mtime = os.path.getmtime("NPC.json")
+        except OSError:
+            return
+        if mtime != self._npc_mtime:
+            print("[Claude API] NPC.json changed on disk, reloading data")
+            self.load_npc_data()
+
     def translate(
         self, text, character_name=None, dialogue_type=None, context=None, quality_required=False, retry=0
     ):
@@ -520,13 +530,18 @@ class TranslatorClaude:
 
         # กรณีพิเศษสำหรับชื่อตัวละคร
         if character_name is None:
-            extracted_name, extracted_text = self.extract_character_name(text)
-            if extracted_name:
-                character_name = extracted_name
-                text = extracted_text
+            # ผลแยกชื่อที่ memoize ไว้ใน text_corrector (MBB parse ข้อความเดียวกันไว้แล้ว)
+            parsed = self.text_corrector.parse_line(text)
+            if parsed.method == METHOD_SPECIAL:
+                return "???"
+            if parsed.speaker and parsed.content:
+                character_name = parsed.speaker
+                text = parsed.content
 
         # กรณีผู้พูดเป็น ??? หรือเลข 2
-        if character_name in ["???", "2", "22", "222", "2?"] or re.match(r"^2+\??$", character_name):
+        if character_name and (
+            character_name in ["???", "2", "22", "222", "2?"] or re.match(r"^2+\??$", character_name)
+        ):
             character_name = "???"
             if re.match(r"^2+\??$", text.strip()) or text.strip() == "???":
                 return "???"
@@ -572,20 +587,20 @@ class TranslatorClaude:
                         character_style = style_data
                         break
 
-        # สร้างคำแนะนำสำหรับการแปล
-        system_prompt = (
-            "คุณเป็นผู้แปลภาษามืออาชีพ แปลข้อความจากภาษาอังกฤษเป็นภาษาไทย กรุณาแปลข้อความที่ให้มาด้านล่างให้เป็นภาษาไทยที่เป็นธรรมชาติ\n\n"
-            "คำแนะนำ:\n"
-            "1. รักษาความหมายดั้งเดิมของข้อความให้มากที่สุด\n"
-            "2. ใช้ภาษาที่เป็นธรรมชาติและเหมาะสมกับบริบท ไม่แปลตรงตัวจนแข็งกระด้าง\n"
-            "3. คงเอกลักษณ์และสไตล์ของตัวละครในการแปล\n"
-            "4. ข้อความตัวอย่างจะมีรูปแบบ \"English Text: ข้อความภาษาไทย\"\n"
-            "5. คุณต้องตอบเฉพาะคำแปลภาษาไทยเท่านั้น ไม่ต้องมีข้อความอื่นใด\n"
-            "6. ห้ามเปลี่ยนชื่อตัวละคร ให้คงตามข้อความภาษาอังกฤษ\n"
-            "7. ไม่ต้องเพิ่มเครื่องหมายวงเล็บเพื่ออธิบายเพิ่มเติม\n"
-            "8. ไม่ต้องเพิ่มหรือตัดทอนเนื้อหา\n"
-            "9. หากเป็นชื่อสถานที่ อาวุธพิเศษ ชื่อ skill พิเศษ หรือคำเฉพาะในเกม ให้คงรูปแบบเดิมไว้\n"
+        # ตรวจสอบ cache (รวมถึงผลที่ได้จาก batch_translate)
+        cache_type = "character" if character_name else "normal"
+        cached_translation = self.cache.get_cached_translation(
+            text, character_name, cache_type
         )
+        if cached_translation:
+            if character_name:
+                return f"{character_name}: {cached_translation}"
+            return cached_translation
+
+        # สร้างคำแนะนำสำหรับการแปล: ส่วนคงที่ (กฎ + ตัวอย่าง) ถูก cache ฝั่ง Anthropic
+        # ส่วนเฉพาะตัวละคร/บริบทที่เปลี่ยนทุกบรรทัดวางไว้หลัง cache breakpoint
+        system_prefix = self._get_cached_system_prefix()
+        system_suffix = ""
 
         # ปรับปรุงคำแนะนำเฉพาะตัวละคร
         if character_style:
@@ -593,30 +608,31 @@ class TranslatorClaude:
             personality = character_style.get("personality", "")
             
             if speaking_style:
-                system_prompt += f"10. ตัวละครนี้มีรูปแบบการพูดที่เป็นเอกลักษณ์: {speaking_style}\n"
+                system_suffix += f"10. ตัวละครนี้มีรูปแบบการพูดที่เป็นเอกลักษณ์: {speaking_style}\n"
             
             if personality:
-                system_prompt += f"11. บุคลิกของตัวละครนี้คือ: {personality}\n"
+                system_suffix += f"11. บุคลิกของตัวละครนี้คือ: {personality}\n"
 
         # เพิ่มข้อมูลตัวละคร
         if character_info:
-            system_prompt += f"\nข้อมูลตัวละคร: {character_info}"
+            system_suffix += f"\nข้อมูลตัวละคร: {character_info}"
 
         # เพิ่มบริบทเพิ่มเติม
         if context:
-            system_prompt += f"\nบริบทเพิ่มเติม: {context}"
+            system_suffix += f"\nบริบทเพิ่มเติม: {context}"
 
-        # ตัวอย่างการแปล
-        system_prompt += "\n\nตัวอย่างการแปล:\n"
-        examples = list(self.example_translations.items())[:5]  # ใช้ 5 ตัวอย่างแรก
-        for eng, thai in examples:
-            system_prompt += f"{eng}: {thai}\n"
+        system_prompt = (
+            build_cached_system(system_prefix, system_suffix)
+            if self.prompt_caching
+            else system_prefix + system_suffix
+        )
 
         # ใช้ API Claude แปล
         try:
             start_time = time.time()
             
-            message = self.client.messages.create(
+            message = self._create_message(
+                character=character_name,
                 model=self.model,
                 max_tokens=self.max_tokens,
                 temperature=self.temperature,
@@ -642,17 +658,36 @@ class TranslatorClaude:
                     else:
                         translation = f"{character_name}: {translation}"
             
-            # ตรวจสอบว่าการแปลสมบูรณ์หรือไม่
+            # ตรวจสอบว่าการแปลสมบูรณ์หรือไม่ - แปลต่อเฉพาะประโยคที่หายไปแทนการแปลใหม่ทั้งหมด
             if not self.is_translation_complete(text, translation):
-                if retry < 2:  # ลองแปลใหม่ไม่เกิน 2 ครั้ง
-                    print(f"[Claude API] Translation seems incomplete, retrying: {text[:30]}...")
-                    return self.translate(text, character_name, dialogue_type, context, quality_required, retry + 1)
+                report = analyze_completeness(text, translation)
+                if not report.complete and retry < 2:
+                    print(
+                        f"[Claude API] Translation seems incomplete, continuing "
+                        f"{len(report.missing)}/{report.source_sentences} sentence(s): {text[:30]}..."
+                    )
+                    continuation = self._continue_translation(
+                        report, system_prompt, character_name
+                    )
+                    if continuation:
+                        translation = report.splice(continuation)
+                        if character_name and not translation.startswith(f"{character_name}:"):
+                            translation = f"{character_name}: {translation}"
                 else:
-                    print(f"[Claude API] Translation may be incomplete even after retry: {text[:30]} -> {translation[:30]}...")
+                    print(f"[Claude API] Translation may be incomplete: {text[:30]} -> {translation[:30]}...")
             
             # บันทึกผลการแปลล่าสุด
             translation_key = f"{text}|{character_name}"
             self.last_translations[translation_key] = translation
+
+            # เก็บเฉพาะเนื้อหา (ไม่รวมชื่อผู้พูด) ลง cache ให้ตรงกับรูปแบบของ batch_translate
+            cached_content = translation
+            if character_name and translation.startswith(f"{character_name}:"):
+                cached_content = translation.split(":", 1)[1].strip()
+            if cached_content and not translation.startswith("[Error"):
+                self.cache.cache_translation(
+                    text, cached_content, character_name, cache_type
+                )
             
             time_taken = time.time() - start_time
             
@@ -664,6 +699,24 @@ class TranslatorClaude:
             print(f"[Claude API] {error_msg}")
             return f"[Error] {error_msg}"
 
+    def _continue_translation(self, report, system_prompt, character_name=None):
+        """ขอคำแปลเฉพาะประโยคที่หายไปจาก CompletenessReport (system prompt เดิม ใช้ cache ได้)"""
+        try:
+            message = self._create_message(
+                character=character_name,
+                model=self.model,
+                max_tokens=self.max_tokens,
+                temperature=self.temperature,
+                top_p=self.top_p,
+                system=system_prompt,
+                messages=[{"role": "user", "content": build_continuation_request(report)}],
+            )
+            if message and message.content and hasattr(message.content[0], "text"):
+                return message.content[0].text.strip()
+        except Exception as e:
+            logging.warning(f"[Claude API] Continuation request failed: {e}")
+        return None
+
     def translate_choice(self, original_text, character_name=None):
         """
         แปลข้อความตัวเลือกจากเกม 
@@ -685,42 +738,8 @@ class TranslatorClaude:
 
         # ตรวจจับและตัด "What will you say?" ออก
         text_to_translate = original_text.strip()
-        choices_only = text_to_translate
-        
-        # รูปแบบที่พบบ่อยของ "What will you say?"
-        choice_headers = [
-            "what will you say?",
-            "what will you say",
-            "whatwill you say?", 
-            "what willyou say?",
-            "what will yousay?",
-            "whatwillyou say?",
-            "whatwillyousay?"
-        ]
-        
-        # ตรวจหาและตัดส่วน header ออก
-        text_lower = text_to_translate.lower()
-        header_found = False
-        
-        for header_pattern in choice_headers:
-            if text_lower.startswith(header_pattern):
-                # ตัดส่วน header ออก
-                choices_only = text_to_translate[len(header_pattern):].strip()
-                header_found = True
-                print(f"[Claude API] Detected and removed header pattern: '{header_pattern}'")
-                break
-        
-        # ถ้าไม่พบ header ที่ต้นข้อความ ลองหาในข้อความ
-        if not header_found:
-            for header_pattern in choice_headers:
-                if header_pattern in text_lower:
-                    # แยกข้อความโดยใช้ header เป็นตัวแบ่ง
-                    parts = text_to_translate.split(header_pattern, 1)
-                    if len(parts) > 1:
-                        choices_only = parts[1].strip()
-                        header_found = True
-                        print(f"[Claude API] Found and removed header pattern in text: '{header_pattern}'")
-                        break
+        header, choices_only = split_choice_header(text_to_translate)
+        header_found = header is not None
         
         if not header_found:
             print("[Claude API] No 'What will you say?' header detected, translating full text")
@@ -771,8 +790,12 @@ class TranslatorClaude:
             self.character_names_cache.add(original_text)
             return original_text
 
-        # หากเป็นลิสต์ของตัวเลือก แยกแปลทีละบรรทัด
+        # หากเป็นลิสต์ของตัวเลือก แปลทุกบรรทัดใน request เดียว (ถ้าล้มเหลวค่อยแยกแปลทีละบรรทัด)
         if "\n" in original_text and any(line.strip().startswith(("•", "-", "*", "1.", "2.", "3.")) for line in original_text.split("\n") if line.strip()):
+            batched_result = self._batch_translate_choice_lines(original_text, character_name)
+            if batched_result:
+                return batched_result
+
             try:
                 translated_lines = []
                 for line in original_text.split("\n"):
@@ -822,6 +845,74 @@ class TranslatorClaude:
             print(f"[Claude API] Error in _translate_choices_content: {e}")
             return original_text  # กรณี error ให้คืนข้อความเดิม แทนที่จะคืน error message
 
+    def _batch_translate_choice_lines(self, original_text, character_name=None):
+        """
+        แปลเนื้อหาของตัวเลือกทุกบรรทัดใน request เดียว โดยคงเครื่องหมายหน้าข้อไว้
+
+        Returns:
+            str: ข้อความตัวเลือกที่แปลแล้ว หรือ None ถ้าต้อง fallback เป็นแปลทีละบรรทัด
+        """
+        lines = original_text.split("\n")
+        parsed_lines = []  # (prefix, content) หรือ None สำหรับบรรทัดที่ไม่ต้องแปล
+        segments = []
+        for line in lines:
+            if not line.strip():
+                parsed_lines.append(None)
+                continue
+            prefix_match = re.match(r'^([•\-*\d\.]+\s*)(.*)', line)
+            prefix, content = prefix_match.groups() if prefix_match else ("", line)
+            if not content.strip():
+                parsed_lines.append(None)
+                continue
+            parsed_lines.append((prefix, content))
+            segments.append({"text": content, "dialogue_type": "choice_option"})
+
+        if len(segments) < 2:
+            return None
+
+        try:
+            translations = self.batch_translator.translate_segments(
+                segments,
+                self._get_choice_system_prompt(character_name),
+                priority=PRIORITY_CHOICE,
+            )
+        except Exception as e:
+            logging.warning(f"[Claude API] Batch choice translation failed, falling back: {e}")
+            return None
+
+        translated_lines = []
+        translation_iter = iter(translations)
+        for line, parsed in zip(lines, parsed_lines):
+            if parsed is None:
+                translated_lines.append(line)
+                continue
+            prefix, _ = parsed
+            translated_lines.append(f"{prefix}{next(translation_iter)}")
+
+        print(f"[Claude API] Translated {len(segments)} choices in one batch request")
+        return "\n".join(translated_lines)
+
+    def _get_choice_system_prompt(self, character_name=None):
+        """คำแนะนำการแปลตัวเลือก ใช้ร่วมกันระหว่างการแปลทีละบรรทัดและแบบ batch"""
+        system_prompt = (
+            "คุณเป็นผู้แปลภาษามืออาชีพ แปลตัวเลือกบทสนทนาจากภาษาอังกฤษเป็นภาษาไทย\n\n"
+            "คำแนะนำ:\n"
+            "1. คุณกำลังแปลตัวเลือกในเกม ซึ่งต้องการความกระชับ ตรงประเด็น และเข้าใจง่าย\n"
+            "2. รักษาน้ำเสียงและความหมายของข้อความเดิม\n"
+            "3. หากเป็นชื่อเฉพาะ ให้คงตามต้นฉบับ\n"
+            "4. ตอบเฉพาะคำแปลภาษาไทยเท่านั้น ไม่ต้องมีคำอธิบายเพิ่มเติม\n"
+            "5. อย่าเพิ่มรูปแบบการแสดงผลใดๆ เช่น เครื่องหมายหัวข้อ (•) หรือตัวเลข\n"
+        )
+
+        if character_name:
+            char_data = self.get_character_info(character_name)
+            if char_data:
+                gender = char_data.get("gender", "unknown")
+                subject_pronoun = char_data.get("pronouns", {}).get("subject", "ฉัน")
+                system_prompt += f"\nข้อความนี้เกี่ยวข้องกับตัวละคร {character_name}, เพศ {gender}, สรรพนามแทนตัวเอง '{subject_pronoun}'"
+
+        return system_prompt
+
     def _translate_choice_single_line(self, original_text, character_name=None):
         """
         แปลตัวเลือกบทสนทนาเพียงบรรทัดเดียว (helper method สำหรับ translate_choice)
@@ -850,29 +941,15 @@ class TranslatorClaude:
             return "???"
 
         # สร้างคำแนะนำสำหรับการแปล
-        system_prompt = (
-            "คุณเป็นผู้แปลภาษามืออาชีพ แปลตัวเลือกบทสนทนาจากภาษาอังกฤษเป็นภาษาไทย\n\n"
-            "คำแนะนำ:\n"
-            "1. คุณกำลังแปลตัวเลือกในเกม ซึ่งต้องการความกระชับ ตรงประเด็น และเข้าใจง่าย\n"
-            "2. รักษาน้ำเสียงและความหมายของข้อความเดิม\n"
-            "3. หากเป็นชื่อเฉพาะ ให้คงตามต้นฉบับ\n"
-            "4. ตอบเฉพาะคำแปลภาษาไทยเท่านั้น ไม่ต้องมีคำอธิบายเพิ่มเติม\n"
-            "5. อย่าเพิ่มรูปแบบการแสดงผลใดๆ เช่น เครื่องหมายหัวข้อ (•) หรือตัวเลข\n"
-        )
-
-        if character_name:
-            char_data = self.get_character_info(character_name)
-            if char_data:
-                gender = char_data.get("gender", "unknown")
-                subject_pronoun = char_data.get("pronouns", {}).get("subject", "ฉัน")
-                system_prompt += f"\nข้อความนี้เกี่ยวข้องกับตัวละคร {character_name}, เพศ {gender}, สรรพนามแทนตัวเอง '{subject_pronoun}'"
+        system_prompt = self._get_choice_system_prompt(character_name)
 
         # ใช้ API Claude แปล
         try:
             # เริ่มด้วยการสร้าง response ที่ปลอดภัย คือ ข้อความเดิม (เพื่อกันกรณีเกิด error)
             translation = original_text
             
-            message = self.client.messages.create(
+            message = self._create_message(
+                priority=PRIORITY_CHOICE,
                 model=self.model,
                 max_tokens=self.max_tokens,
                 temperature=self.temperature,
@@ -907,7 +984,7 @@ class TranslatorClaude:
                 # ถ้าข้อความแปลดูไม่สมบูรณ์ ลองแปลอีกครั้งโดยปรับลดอุณหภูมิ
                 print(f"[Claude API] Choice translation seems incomplete, retrying with lower temperature: {original_text}")
                 try:
-                    retry_message = self.client.messages.create(
+                    retry_message = self._create_message(
                         model=self.model,
                         max_tokens=self.max_tokens,
                         temperature=max(0.1, self.temperature - 0.3),  # ลดอุณหภูมิลง
@@ -979,16 +1056,91 @@ class TranslatorClaude:
             return f"[Error] {error_msg}"
 
     def batch_translate(self, texts, batch_size=10, area_type=None):
-        """แปลข้อความเป็นชุด"""
+        """
+        แปลข้อความเป็นชุด - ส่งทั้งชุดใน request เดียวและขอคำตอบเป็น JSON array
+        ถ้าโมเดลตอบผิดรูปแบบจะ fallback เป็นแปลทีละข้อความ
+        """
         translated_texts = []
         for i in range(0, len(texts), batch_size):
             batch = texts[i : i + batch_size]
-            translated_batch = [
-                self.translate(text, character_name=None, dialogue_type=None, context=None) for text in batch
-            ]
-            translated_texts.extend(translated_batch)
+            segments = []
+            for text in batch:
+                parsed = self.text_corrector.parse_line(text)
+                if parsed.speaker and parsed.content:
+                    character_name, content = parsed.speaker, parsed.content
+                else:
+                    character_name, content = None, text
+                segments.append(
+                    {
+                        "text": content,
+                        "speaker": character_name,
+                        "dialogue_type": "character" if character_name else "normal",
+                    }
+                )
+
+            try:
+                translations = self.batch_translator.translate_segments(
+                    segments, self._get_batch_instructions()
+                )
+            except Exception as e:
+                logging.warning(f"[Claude API] Batch translation failed, translating one by one: {e}")
+                translated_texts.extend(
+                    self.translate(text, character_name=None, dialogue_type=None, context=None)
+                    for text in batch
+                )
+                continue
+
+            for segment, translation in zip(segments, translations):
+                if segment["speaker"]:
+                    translation = f"{segment['speaker']}: {translation}"
+                translated_texts.append(translation)
         return translated_texts
 
+    def _create_message(self, priority=None, character=None, **kwargs):
+        """
+        เรียก messages.create ผ่าน RequestScheduler ที่ใช้ร่วมกันทุก translator
+        และบันทึก token จริงจาก usage ลง UsageLedger
+        """
+        prompt_text = str(kwargs.get("system", "")) + str(kwargs.get("messages", ""))
+        start_time = time.time()
+        message = self.scheduler.call(
+            "claude",
+            lambda: self.client.messages.create(**kwargs),
+            estimate_tokens(prompt_text, kwargs.get("max_tokens", 0)),
+            priority,
+        )
+        self.usage_ledger.record(
+            "claude",
+            kwargs.get("model", self.model),
+            message,
+            time.time() - start_time,
+            dialogue_type=self.scheduler.priority_name(priority),
+            character=character,
+            game=self.game_name,
+        )
+        return message
+
+    def _get_batch_instructions(self):
+        """คำแนะนำการแปลสำหรับ batch request (batch_translate และ Lore รายประโยค)"""
+        return self._get_base_system_prompt()
+
+    def _send_batch_prompt(self, prompt, expected_count, priority=PRIORITY_BACKGROUND):
+        """ส่ง prompt แบบ batch ไปยัง Claude (ใช้โดย BatchTranslator)"""
+        message = self._create_message(
+            priority=priority,
+            model=self.model,
+            max_tokens=min(4096, self.max_tokens * expected_count),
+            temperature=self.temperature,
+            top_p=self.top_p,
+            system="Respond only with a JSON array of strings.",
+            messages=[
+                {"role": "user", "content": prompt},
+                # prefill ให้คำตอบเริ่มด้วย JSON array
+                {"role": "assistant", "content": "["},
+            ],
+        )
+        return "[" + message.content[0].text
+
     def adaptive_translation(self, text, max_retries=3, area_type=None):
         """พยายามแปลซ้ำหากเกิดข้อผิดพลาด"""
         for attempt in range(max_retries):
@@ -1039,7 +1191,8 @@ class TranslatorClaude:
         )
 
         try:
-            response = self.client.messages.create(
+            response = self._create_message(
+                priority=PRIORITY_SPECULATIVE,
                 model=self.model,
                 max_tokens=200,
                 temperature=0.7,
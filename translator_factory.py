@@ -1,7 +1,9 @@
 import logging
-from translator import Translator
-from translator_claude import TranslatorClaude
-from translator_gemini import TranslatorGemini
+from translator_registry import get_translator_class
+from request_coalescer import install_single_flight
+from translation_memory import install_translation_memory
+from model_router import create_router
+from fast_path import install_fast_path
 
 
 class TranslatorFactory:
@@ -29,37 +31,41 @@ class TranslatorFactory:
 
             logging.info(f"Validated model type: {model_type} for model: {model}")
 
-            # สร้าง translator ตามประเภท
-            if model_type == "gemini":
-                logging.info(f"Creating Gemini Translator with model: {model}")
-                translator = TranslatorGemini(settings)
-                logging.info(
-                    f"Successfully created TranslatorGemini instance: {type(translator).__name__}"
-                )
-                return translator
-
-            elif model_type == "claude":
-                logging.info(f"Creating Claude Translator with model: {model}")
-                translator = TranslatorClaude(settings)
-                logging.info(
-                    f"Successfully created TranslatorClaude instance: {type(translator).__name__}"
-                )
-                return translator
-
-            else:
-                # ใช้ GPT translator เป็นค่าเริ่มต้น
-                logging.info(f"Creating GPT Translator with model: {model}")
-                translator = Translator(settings)
-                logging.info(
-                    f"Successfully created Translator instance: {type(translator).__name__}"
-                )
-                return translator
+            # สร้าง translator ตามประเภท - SDK ของ provider ถูก import ตอนนี้เป็นครั้งแรก
+            translator_class = get_translator_class(model_type)
+            logging.info(f"Creating {translator_class.__name__} with model: {model}")
+            translator = translator_class(settings)
+            logging.info(
+                f"Successfully created {type(translator).__name__} instance"
+            )
+            # บรรทัดสั้น/choice ไปโมเดลเร็ว บรรทัดยาว/lore ไปโมเดลหลัก (สร้างโมเดลอื่นเมื่อใช้ครั้งแรก)
+            translator = create_router(
+                translator,
+                settings,
+                lambda route_settings: get_translator_class(
+                    TranslatorFactory.validate_model_type(
+                        route_settings.get_api_parameters()["model"]
+                    )
+                )(route_settings),
+                model_type,
+            )
+            return TranslatorFactory._install_layers(translator)
 
         except Exception as e:
             logging.error(f"Error creating translator: {str(e)}")
             # ถ้าเกิดข้อผิดพลาด ให้ให้รู้ว่าเกิดปัญหา
             raise ValueError(f"Failed to create translator: {str(e)}")
 
+    @staticmethod
+    def _install_layers(translator):
+        """
+        ครอบ translator ด้วยชั้นที่ใช้ร่วมกันทุก provider (ชั้นนอกสุดทำงานก่อน):
+        FastPath -> TranslationMemory -> SingleFlight -> ModelRouter (ถ้าเปิด) -> translator จริง
+        """
+        return install_fast_path(
+            install_translation_memory(install_single_flight(translator))
+        )
+
     @staticmethod
     def validate_model_type(model):
         """ตรวจสอบประเภทของ model โดยวิเคราะห์จากชื่อ"""
@@ -7,14 +7,36 @@ from tkinter import messagebox
 import json
 import difflib
 import time
+import datetime
 import logging
 from enum import Enum
 import google.generativeai as genai
 from google.generativeai.types import HarmCategory, HarmBlockThreshold
-from text_corrector import TextCorrector, DialogueType
-from dialogue_cache import DialogueCache
+from text_corrector import DialogueType
+from translator_registry import get_shared_context
+from dialogue_classifier import parse_choice, split_choice_header
+from line_parser import METHOD_SPECIAL
 from npc_file_utils import get_npc_file_path
 from language_restriction import validate_translation_languages, validate_input_text
+from request_scheduler import (
+    PRIORITY_BACKGROUND,
+    PRIORITY_CHOICE,
+    PRIORITY_LORE,
+    PRIORITY_SPECULATIVE,
+    estimate_tokens,
+    get_request_scheduler,
+)
+from usage_ledger import extract_usage_details, get_usage_ledger
+from prompt_cache import PromptCacheManager
+from translation_completeness import (
+    analyze as analyze_completeness,
+    build_continuation_request,
+)
+from batch_translation import (
+    BATCH_RESPONSE_SCHEMA,
+    BatchResponseError,
+    BatchTranslator,
+)
 
 # เพิ่มการ import EnhancedNameDetector ถ้ามี
 try:
@@ -98,12 +120,27 @@ class TranslatorGemini:
         )
         self.model = genai_model
 
-        self.cache = DialogueCache()
+        self.cache = get_shared_context().dialogue_cache
         self.last_translations = {}
         self.character_names_cache = set()
-        self.text_corrector = TextCorrector()
+        self.text_corrector = get_shared_context().text_corrector
+        self.game_name = "unknown"
+        self._npc_file_path = None
+        self._npc_mtime = None
+        self._npc_checked_at = 0.0
         self.load_npc_data()
         self.load_example_translations()
+        self.batch_translator = BatchTranslator(self._send_batch_prompt, self.cache)
+        self.scheduler = get_request_scheduler(settings)
+        self.usage_ledger = get_usage_ledger()
+
+        # cache ส่วน prompt ที่คงที่ (กฎ + รายชื่อ + คำศัพท์ + ตัวอย่าง) ไว้ฝั่ง Gemini
+        self.prompt_cache = PromptCacheManager(
+            self._create_cached_model, self._delete_cached_model
+        )
+        self.prompt_cache.enabled = (
+            settings.get("prompt_caching", True) if settings else True
+        )
 
         # ดูว่าสามารถใช้ EnhancedNameDetector ได้หรือไม่
         self.enhanced_detector = None
@@ -144,37 +181,39 @@ class TranslatorGemini:
             print(f"TranslatorGemini: กำลังโหลดข้อมูล NPC จาก: {file_path}")
             # --- END: โค้ดใหม่ ---
 
-            with open(file_path, "r", encoding="utf-8") as file:
-                npc_data = json.load(file)
-                self.character_data = npc_data.get("main_characters", [])
-                self.context_data = npc_data.get("lore", {})
-                self.character_styles = npc_data.get("character_roles", {})
+            self._npc_file_path = file_path
+            self._npc_mtime = os.path.getmtime(file_path)
+            npc_data = get_shared_context().get_npc_data(file_path)
+            self.game_name = npc_data.get("_game_info", {}).get("name", "unknown")
+            self.character_data = npc_data.get("main_characters", [])
+            self.context_data = npc_data.get("lore", {})
+            self.character_styles = npc_data.get("character_roles", {})
 
-                if "word_fixes" in npc_data:
-                    self.word_fixes = npc_data["word_fixes"]
-                    logging.info(
-                        f"Loaded {len(self.word_fixes)} word fixes from NPC.json"
-                    )
-                else:
-                    self.word_fixes = {}
-
-                # Update character_names_cache
-                self.character_names_cache = set()
-                self.character_names_cache.add("???")
-
-                for char in self.character_data:
-                    if char.get("firstName"):
-                        self.character_names_cache.add(char["firstName"])
-                        if char.get("lastName"):
-                            self.character_names_cache.add(
-                                f"{char['firstName']} {char['lastName']}"
-                            )
+            if "word_fixes" in npc_data:
+                self.word_fixes = npc_data["word_fixes"]
+                logging.info(
+                    f"Loaded {len(self.word_fixes)} word fixes from NPC.json"
+                )
+            else:
+                self.word_fixes = {}
+
+            # Update character_names_cache
+            self.character_names_cache = set()
+            self.character_names_cache.add("???")
+
+            for char in self.character_data:
+                if char.get("firstName"):
+                    self.character_names_cache.add(char["firstName"])
+                    if char.get("lastName"):
+                        self.character_names_cache.add(
+                            f"{char['firstName']} {char['lastName']}"
+                        )
 
-                for npc in npc_data.get("npcs", []):
-                    if npc.get("name"):
-                        self.character_names_cache.add(npc["name"])
+            for npc in npc_data.get("npcs", []):
+                if npc.get("name"):
+                    self.character_names_cache.add(npc["name"])
 
-                logging.info("TranslatorGemini: Loaded NPC.json successfully")
+            logging.info("TranslatorGemini: Loaded NPC.json successfully")
 
         except FileNotFoundError as e:
             logging.error(f"TranslatorGemini: {e}")
@@ -272,6 +311,8 @@ class TranslatorGemini:
                 safety_settings=self.safety_settings,
             )
             logging.info(f"Successfully recreated Gemini model: {self.model}")
+            # cache ฝั่ง provider ผูกกับโมเดลและ generation config เดิม
+            self.prompt_cache.invalidate()
 
             if changes:
                 logging.info("\n=== Gemini Parameters Updated ===")
@@ -366,6 +407,47 @@ class TranslatorGemini:
         # ผ่านทุกเงื่อนไข ถือว่าสมบูรณ์
         return True
 
+    def _get_translation_rules(self):
+        """คำสั่งการแปลหลักที่ใช้ร่วมกันระหว่าง translate และ batch_translate"""
+        return (
+            "You are a professional translator specializing in video game localization for Final Fantasy XIV. "
+            "Your task is to translate English game text to Thai with these requirements:\n"
+            "1. Translate the text COMPLETELY, never cut off or omit any part of the original message\n"
+            "2. Translate the text naturally while preserving the character's tone and style\n"
+            "3. NEVER translate any character names, place names, or special terms that appear in the database\n"
+            "4. For any terms found in 'Special terms' section below, use the Thai explanations provided instead of translating directly\n"
+            "5. **Use modern Thai vocabulary and expressions even when the original English is archaic or old-fashioned.** Only preserve the complexity of sentence structure, but NOT the archaic vocabulary. Always prioritize words that sound natural to modern Thai speakers regardless of how old-fashioned the English text appears.\n"
+            "6. For very short text, treat it as either: phrase, exclamation, or name calling only\n"
+            "8. Maintain character speech patterns and emotional expressions as described in 'Character's style'\n"
+            "9. NEVER use polite particles or sentence-ending particles like 'ครับ/ค่ะ/เจ้าค่ะ/เพคะ/นะคะ/จ้ะ/ฮะ' - Final Fantasy characters don't use these Thai politeness markers\n"
+            "10. **Pronouns and Politeness Levels - STRICTLY follow Character's style:**\n"
+            "   - For characters with 'สุภาพ' (polite) style: Always use 'คุณ' or 'ท่าน' instead of 'แก'\n"
+            "   - For gentle/refined characters (อ่อนโยน, เข้มแข็ง, ฉลาด): Use 'คุณ' or 'เธอ'\n"
+            "   - For aggressive/rough characters (ห้าวหาญ, ดุดัน, โผงผาง, ห้วน): May use 'แก' sparingly\n"
+            "   - Default for most characters: Use 'คุณ' - avoid 'แก' unless character style explicitly indicates roughness\n"
+            "   - **AVOID formal/stiff pronouns**: NEVER use 'ข้าพเจ้า' - it's too formal and unnatural for game dialogue\n"
+            "   - **First person alternatives**: Use 'ฉัน', 'ข้า', or character name instead of 'ข้าพเจ้า'\n"
+            "   - **CRITICAL**: Check the \"Character's style\" field given with the text to translate (below) and strictly adhere to the personality described\n"
+            "11. Focus on natural, conversational Thai that's easy to understand for modern players. Prefer everyday language unless the character style indicates otherwise\n"
+            "12. IMPORTANT: Ensure your translation covers the ENTIRE original text, not just a part of it\n"
+            "13. VERY IMPORTANT: Return ONLY the Thai translation, DO NOT include the original English text in your response\n"
+            "14. DO NOT include any explanations, notes, or formatting - just the pure Thai translation text\n"
+        )
+
+    def _get_reference_block(self):
+        """รายชื่อที่ห้ามแปล คำศัพท์พิเศษ และตัวอย่างการแปล (ส่วนท้ายของ prompt)"""
+        block = (
+            f"Do not translate (use exactly as written): {', '.join(sorted(self.character_names_cache))}\n\n"
+            "Special terms (use these Thai explanations instead of translating directly):\n"
+        )
+        for term, explanation in self.context_data.items():
+            block += f"{term}: {explanation}\n"
+
+        example_prompt = "Here are examples of good translations:\n\n"
+        for eng, thai in self.example_translations.items():
+            example_prompt += f"English: {eng}\nThai: {thai}\n\n"
+        return f"{block}\n{example_prompt}\n"
+
     def translate(
         self,
         text,
@@ -400,28 +482,24 @@ class TranslatorGemini:
                 logging.warning("Empty text received for translation")
                 return ""
 
-            # --- [ โค้ดที่แก้ไขใหม่ทั้งหมดอยู่ตรงนี้ ] ---
-            # ถ้าไม่ใช่โหมด Lore ให้พยายามแยกชื่อผู้พูดตามปกติ
+            # โหลด NPC.json ใหม่ก่อนใช้ชื่อ/สไตล์ตัวละครและสร้าง prompt_prefix (ไม่ใช่หลังสร้างแล้ว)
+            self._reload_if_npc_changed()
+
+            # ถ้าไม่ใช่โหมด Lore ให้แยกชื่อผู้พูด - ผลถูก memoize ใน TextCorrector
+            # (MBB parse ข้อความเดียวกันไว้แล้ว จึงไม่ต้อง split ซ้ำหรือรัน EnhancedNameDetector อีกรอบ)
             if not is_lore_text:
-                try:
-                    # ใช้ text_corrector instance ที่สร้างไว้แล้ว
-                    speaker, content, dialogue_type = (
-                        self.text_corrector.split_speaker_and_content(text)
-                    )
-                except (TypeError, ValueError, AttributeError) as e:
-                    # กรณีที่ split_speaker_and_content มีปัญหา หรือส่งค่า None กลับมา
-                    logging.warning(
-                        f"Error splitting text content: {e}, treating as normal text"
-                    )
-                    speaker = None
-                    content = text
-                    dialogue_type = None
+                parsed = self.text_corrector.parse_line(text)
+                speaker, content, dialogue_type = (
+                    parsed.speaker,
+                    parsed.content,
+                    parsed.dialogue_type,
+                )
             else:
                 # ถ้าเป็นโหมด Lore ให้ข้ามการแยกชื่อไปเลย
+                parsed = None
                 speaker = None
                 content = text
                 dialogue_type = DialogueType.NORMAL
-            # --- [ จบส่วนแก้ไข ] ---
 
             # ตรวจสอบ word_fixes สำหรับข้อความทั้งหมด
             if hasattr(self, "word_fixes") and text.strip() in self.word_fixes:
@@ -429,39 +507,12 @@ class TranslatorGemini:
                 if fixed_text == "???":
                     return "???"
 
-            # ตรวจสอบกรณีพิเศษสำหรับเลข 2 และ ???
-            if text.strip() in ["2", "2?", "22", "22?", "222", "222?", "???"]:
-                return "???"
-
-            # กรณีพิเศษเมื่อข้อความประกอบด้วยเลข 2 ซ้ำกันหลายครั้ง (2, 22, 222, 2222, ฯลฯ)
-            if re.match(r"^2+\??$", text.strip()):
+            # ทั้งบรรทัดคือ ??? (รวม 2, 22, 222 ที่ OCR อ่านผิด)
+            if re.match(r"^(?:\?{2,3}|2+)\??$", text.strip()) or (
+                parsed is not None and parsed.method == METHOD_SPECIAL
+            ):
                 return "???"
 
-            # ใช้ EnhancedNameDetector ถ้ามี เพื่อตรวจสอบเพิ่มเติม
-            if self.enhanced_detector:
-                try:
-                    # ตรวจสอบว่าข้อความอาจเป็นชื่อตัวละครหรือไม่
-                    (
-                        temp_speaker,
-                        temp_content,
-                        detected_type,
-                    ) = self.enhanced_detector.enhanced_split_speaker_and_content(text)
-                    if (
-                        detected_type == DialogueType.CHARACTER
-                        and temp_speaker == "???"
-                    ):
-                        return "???"
-                    # ถ้าตรวจเจอชื่อในโหมดที่ไม่มี speaker ให้ใช้ชื่อที่เจอ
-                    if not speaker and temp_speaker:
-                        speaker, content, dialogue_type = (
-                            temp_speaker,
-                            temp_content,
-                            detected_type,
-                        )
-
-                except Exception as e:
-                    logging.warning(f"Error using EnhancedNameDetector: {e}")
-
             # ตรวจสอบว่าเป็นข้อความตัวเลือกหรือไม่
             if not is_choice_option:
                 try:
@@ -532,43 +583,14 @@ class TranslatorGemini:
 
             # สร้าง prompt และแปล
             special_terms = self.context_data.copy()
-            example_prompt = "Here are examples of good translations:\n\n"
-            for eng, thai in self.example_translations.items():
-                example_prompt += f"English: {eng}\nThai: {thai}\n\n"
-
-            prompt = (
-                "You are a professional translator specializing in video game localization for Final Fantasy XIV. "
-                "Your task is to translate English game text to Thai with these requirements:\n"
-                "1. Translate the text COMPLETELY, never cut off or omit any part of the original message\n"
-                "2. Translate the text naturally while preserving the character's tone and style\n"
-                "3. NEVER translate any character names, place names, or special terms that appear in the database\n"
-                "4. For any terms found in 'Special terms' section below, use the Thai explanations provided instead of translating directly\n"
-                "5. **Use modern Thai vocabulary and expressions even when the original English is archaic or old-fashioned.** Only preserve the complexity of sentence structure, but NOT the archaic vocabulary. Always prioritize words that sound natural to modern Thai speakers regardless of how old-fashioned the English text appears.\n"
-                "6. For very short text, treat it as either: phrase, exclamation, or name calling only\n"
-                "8. Maintain character speech patterns and emotional expressions as described in 'Character's style'\n"
-                "9. NEVER use polite particles or sentence-ending particles like 'ครับ/ค่ะ/เจ้าค่ะ/เพคะ/นะคะ/จ้ะ/ฮะ' - Final Fantasy characters don't use these Thai politeness markers\n"
-                "10. **Pronouns and Politeness Levels - STRICTLY follow Character's style:**\n"
-                "   - For characters with 'สุภาพ' (polite) style: Always use 'คุณ' or 'ท่าน' instead of 'แก'\n"
-                "   - For gentle/refined characters (อ่อนโยน, เข้มแข็ง, ฉลาด): Use 'คุณ' or 'เธอ'\n"
-                "   - For aggressive/rough characters (ห้าวหาญ, ดุดัน, โผงผาง, ห้วน): May use 'แก' sparingly\n"
-                "   - Default for most characters: Use 'คุณ' - avoid 'แก' unless character style explicitly indicates roughness\n"
-                "   - **AVOID formal/stiff pronouns**: NEVER use 'ข้าพเจ้า' - it's too formal and unnatural for game dialogue\n"
-                "   - **First person alternatives**: Use 'ฉัน', 'ข้า', or character name instead of 'ข้าพเจ้า'\n"
-                "   - **CRITICAL**: Check Character's style section above and strictly adhere to the personality described\n"
-                "11. Focus on natural, conversational Thai that's easy to understand for modern players. Prefer everyday language unless the character style indicates otherwise\n"
-                "12. IMPORTANT: Ensure your translation covers the ENTIRE original text, not just a part of it\n"
-                "13. VERY IMPORTANT: Return ONLY the Thai translation, DO NOT include the original English text in your response\n"
-                "14. DO NOT include any explanations, notes, or formatting - just the pure Thai translation text\n"
+            # ส่วนที่คงที่ (cache ได้) อยู่หน้า ส่วนที่เปลี่ยนทุกบรรทัดอยู่ท้าย
+            prompt_prefix = self._get_translation_rules() + self._get_reference_block()
+            prompt_suffix = (
                 f"Context: {context}\n"
-                f"Character's style: {character_style}\n"
-                f"Do not translate (use exactly as written): {', '.join(self.character_names_cache)}\n\n"
-                "Special terms (use these Thai explanations instead of translating directly):\n"
+                + f"Character's style: {character_style}\n"
+                + f"Text to translate: {dialogue}"
             )
-
-            for term, explanation in special_terms.items():
-                prompt += f"{term}: {explanation}\n"
-
-            prompt += f"\n{example_prompt}\nText to translate: {dialogue}"
+            prompt = prompt_prefix + prompt_suffix
 
             try:
                 # สร้าง Content สำหรับ Gemini API
@@ -588,8 +610,11 @@ class TranslatorGemini:
                 start_time = time.time()
 
                 # แก้ไขวิธีการเรียก API - ส่งเฉพาะ prompt (ไม่ส่ง dialogue แยก)
-                response = self.model.generate_content(
-                    prompt,  # ส่งเฉพาะ prompt เต็มๆ ไม่ต้องส่ง dialogue แยก
+                response = self._generate_with_cached_prefix(
+                    prompt_prefix,
+                    prompt_suffix,
+                    priority=PRIORITY_LORE if is_lore_text else None,
+                    character=character_name or None,
                     generation_config=generation_config,
                     safety_settings=self.safety_settings,
                 )
@@ -597,14 +622,18 @@ class TranslatorGemini:
                 # คำนวณเวลาที่ใช้
                 elapsed_time = time.time() - start_time
 
-                # สำหรับ Gemini เราไม่มีจำนวน token ที่แน่นอน ให้ประมาณจากจำนวนคำ
-                input_words = len(prompt.split())
-                output_words = (
-                    len(response.text.split()) if hasattr(response, "text") else 0
-                )
-                # ประมาณ token โดยเฉลี่ย 1 คำ = 1.3 token
-                input_tokens = int(input_words * 1.3)
-                output_tokens = int(output_words * 1.3)
+                # ใช้จำนวน token จริงจาก usage_metadata (ประมาณจากจำนวนคำเฉพาะเมื่อไม่มีข้อมูล)
+                usage = extract_usage_details(response)
+                if usage:
+                    input_tokens = usage["prompt_tokens"]
+                    output_tokens = usage["output_tokens"]
+                else:
+                    input_tokens = int(len(prompt.split()) * 1.3)
+                    output_tokens = (
+                        int(len(response.text.split()) * 1.3)
+                        if hasattr(response, "text")
+                        else 0
+                    )
                 total_tokens = input_tokens + output_tokens
 
                 # แสดงข้อมูลในคอนโซล
@@ -614,10 +643,10 @@ class TranslatorGemini:
                 # แสดงชื่อเต็มของโมเดลให้ชัดเจน
                 print(f"[Gemini API] Translation complete                ", end="\r")
                 print(
-                    f"[{short_model.upper()}] : {dialogue[:30]}... -> ~{total_tokens} tokens ({elapsed_time:.2f}s)"
+                    f"[{short_model.upper()}] : {dialogue[:30]}... -> {total_tokens} tokens ({elapsed_time:.2f}s)"
                 )
                 logging.info(
-                    f"[Gemini API] Estimated tokens: ~{input_tokens} (input) + ~{output_tokens} (output) = ~{total_tokens} tokens in {elapsed_time:.2f}s"
+                    f"[Gemini API] Tokens: {input_tokens} (input) + {output_tokens} (output) = {total_tokens} tokens in {elapsed_time:.2f}s"
                 )
 
                 # ดึงข้อความจาก response และตรวจสอบอย่างปลอดภัย
@@ -679,34 +708,36 @@ class TranslatorGemini:
                         logging.info("Skip retranslation for short dialogue")
 
                     if not skip_retranslation:
-                        logging.warning(
-                            "Translation appears incomplete, retrying with stronger prompt"
-                        )
-
-                        # ลองแปลอีกครั้งด้วย prompt ที่เน้นย้ำความสมบูรณ์มากขึ้น
-                        enhanced_prompt = (
-                            prompt
-                            + "\n\nVERY IMPORTANT: You MUST translate the ENTIRE text completely. Do not cut off or truncate any part of the message."
-                        )
-
-                        retry_response = self.model.generate_content(
-                            enhanced_prompt,
-                            generation_config=generation_config,
-                            safety_settings=self.safety_settings,
-                        )
-
-                        if hasattr(retry_response, "text") and retry_response.text:
-                            retry_translation = retry_response.text.strip()
-
-                            # ทำความสะอาดข้อความแปล
-                            retry_translation = re.sub(
-                                r"\b(ครับ|ค่ะ|ครับ/ค่ะ)\b", "", retry_translation
-                            ).strip()
-
-                            # เปรียบเทียบความยาวและคุณภาพ - ถ้าแปลใหม่ยาวกว่ามากๆ ถึงจะเอามาใช้
-                            if len(retry_translation) > len(translated_dialogue) * 1.3:
-                                translated_dialogue = retry_translation
-
+                        # แปลต่อเฉพาะประโยคที่หายไป แทนการส่ง prompt ทั้งหมดไปแปลใหม่
+                        report = analyze_completeness(dialogue, translated_dialogue)
+                        if not report.complete:
+                            logging.warning(
+                                f"Translation appears incomplete, continuing "
+                                f"{len(report.missing)}/{report.source_sentences} sentence(s)"
+                            )
+                            continuation_suffix = (
+                                f"Context: {context}\n"
+                                + f"Character's style: {character_style}\n"
+                                + f"Text to translate: {build_continuation_request(report)}"
+                            )
+                            continuation_response = self._generate_with_cached_prefix(
+                                prompt_prefix,
+                                continuation_suffix,
+                                priority=PRIORITY_LORE if is_lore_text else None,
+                                character=character_name or None,
+                                generation_config=generation_config,
+                                safety_settings=self.safety_settings,
+                            )
+                            if (
+                                hasattr(continuation_response, "text")
+                                and continuation_response.text
+                            ):
+                                continuation = re.sub(
+                                    r"\b(ครับ|ค่ะ|ครับ/ค่ะ)\b",
+                                    "",
+                                    continuation_response.text.strip(),
+                                ).strip()
+                                translated_dialogue = report.splice(continuation)
                                 if character_name:
                                     final_translation = (
                                         f"{character_name}: {translated_dialogue}"
@@ -734,7 +765,7 @@ class TranslatorGemini:
                 logging.error(f"Gemini API error: {str(api_error)}")
                 # ลองใช้วิธีเรียก API อีกแบบหนึ่ง (กรณี model เก่า)
                 try:
-                    response = self.model.generate_content(
+                    response = self._generate(
                         [{"role": "user", "parts": [prompt]}],
                         generation_config=generation_config,
                         safety_settings=self.safety_settings,
@@ -762,262 +793,13 @@ class TranslatorGemini:
             return f"[Error: {str(e)}]"
 
     def is_similar_to_choice_prompt(self, text, threshold=0.7):
-        """ตรวจสอบและแยกส่วนประกอบของ choice dialogue
-
-        Args:
-            text: ข้อความที่ต้องการตรวจสอบ
-            threshold: ระดับความคล้ายคลึงที่ยอมรับได้
+        """ตรวจสอบและแยกส่วนประกอบของ choice dialogue (กฎอยู่ใน dialogue_classifier.parse_choice)
 
         Returns:
-            tuple: (is_choice, prompt_part, choices) หรือ (False, None, None) ถ้าไม่ใช่ choice
+            tuple: (is_choice, prompt_part, choices)
         """
-        try:
-            # 1. รูปแบบ prompts ที่บ่งบอกว่าเป็น choice dialogue
-            choice_prompts = [
-                "What will you say?",
-                "What would you like to ask?",
-                "Choose your response.",
-                "Select an option.",
-                "How would you like to respond?",
-                "Select a dialogue option.",
-                "คุณจะพูดว่าอะไร?",
-                "คุณจะพูดว่าอย่างไร?",
-                "เลือกตัวเลือกของคุณ",
-            ]
-
-            # 2. ตรวจสอบการมีอยู่ของ prompt ที่แน่นอน
-            clean_text = text.strip()
-
-            # เช็คแบบเข้มงวดตามรูปแบบที่แน่นอน
-            # ตรวจสอบว่าข้อความขึ้นต้นด้วย prompt หรือไม่
-            for prompt in choice_prompts:
-                if clean_text.startswith(prompt) or clean_text.lower().startswith(
-                    prompt.lower()
-                ):
-                    # พบ prompt ที่ตรงกัน
-                    parts = clean_text.split(prompt, 1)
-                    if len(parts) == 2:
-                        prompt_part = prompt
-                        choices_part = parts[1].strip()
-
-                        # ดึงตัวเลือกออกมา
-                        choices = []
-
-                        # วิธีที่ 1: แยกตามบรรทัด (วิธีที่มีประสิทธิภาพที่สุด)
-                        if "\n" in choices_part:
-                            lines = [
-                                line.strip()
-                                for line in choices_part.split("\n")
-                                if line.strip()
-                            ]
-                            if lines:
-                                choices = lines
-
-                        # วิธีที่ 2: แยกตามตัวเลือก
-                        if not choices:
-                            number_starters = self._extract_choices_by_starters(
-                                choices_part, ["1.", "2.", "3.", "4."]
-                            )
-                            if number_starters:
-                                choices = number_starters
-
-                        # วิธีที่ 3: แยกตามอักษร
-                        if not choices:
-                            letter_starters = self._extract_choices_by_starters(
-                                choices_part, ["A.", "B.", "C.", "D."]
-                            )
-                            if letter_starters:
-                                choices = letter_starters
-
-                        # วิธีที่ 4: แยกตามเครื่องหมายวรรคตอน
-                        if not choices and any(
-                            mark in choices_part for mark in [".", "!", "?"]
-                        ):
-                            import re
-
-                            split_by_punct = re.split(r"(?<=[.!?])\s+", choices_part)
-                            if len(split_by_punct) > 1:
-                                choices = [
-                                    choice.strip()
-                                    for choice in split_by_punct
-                                    if choice.strip()
-                                ]
-
-                        # วิธีที่ 5: ถ้าวิธีข้างต้นล้มเหลว แต่มีข้อความหลัง prompt
-                        if not choices and choices_part:
-                            choices = [choices_part]
-
-                        # ถ้าพบตัวเลือก
-                        if choices:
-                            return True, prompt_part, choices
-                    else:
-                        # กรณีพบเฉพาะ prompt โดยไม่มีเนื้อหาตามหลัง
-                        return True, prompt, []
-
-                # 3. ตรวจสอบว่า prompt อยู่ในข้อความหรือไม่ (แม้ไม่ได้อยู่ที่ต้นข้อความ)
-                if prompt in clean_text or prompt.lower() in clean_text.lower():
-                    idx = max(clean_text.lower().find(prompt.lower()), 0)
-                    if idx < 20:  # ถ้าอยู่ในช่วงต้นข้อความ (ในระยะ 20 ตัวอักษรแรก)
-                        # แยกข้อความส่วนก่อนและหลัง prompt
-                        before_prompt = clean_text[:idx].strip()
-                        after_prompt = clean_text[idx + len(prompt) :].strip()
-
-                        # ถ้าส่วนก่อน prompt มีน้อยกว่า 10 ตัวอักษร และหลัง prompt มีเนื้อหา
-                        if len(before_prompt) < 10 and after_prompt:
-                            # แยกตัวเลือกเช่นเดียวกับด้านบน
-                            choices = []
-
-                            # แยกตามบรรทัด
-                            if "\n" in after_prompt:
-                                lines = [
-                                    line.strip()
-                                    for line in after_prompt.split("\n")
-                                    if line.strip()
-                                ]
-                                if lines:
-                                    choices = lines
-
-                            # ถ้าไม่มีตัวเลือก ให้ใช้ข้อความทั้งหมดหลัง prompt
-                            if not choices:
-                                choices = [after_prompt]
-
-                            return True, prompt, choices
-
-            # 4. ตรวจสอบรูปแบบที่อาจเกิดจาก OCR ผิดพลาด
-            ocr_variants = [
-                "Whatwill you say?",
-                "What willyou say?",
-                "WhatwilI you say?",
-                "What wiIl you say?",
-                "Vhat will you say?",
-                "VVhat will you say?",
-            ]
-
-            for variant in ocr_variants:
-                if variant in clean_text or variant.lower() in clean_text.lower():
-                    # พบ variant ที่น่าจะเป็น "What will you say?"
-                    standard_prompt = "What will you say?"
-                    idx = max(clean_text.lower().find(variant.lower()), 0)
-                    after_variant = clean_text[idx + len(variant) :].strip()
-
-                    # แยกตัวเลือกเช่นเดียวกับด้านบน
-                    choices = []
-
-                    # แยกตามบรรทัด
-                    if "\n" in after_variant:
-                        lines = [
-                            line.strip()
-                            for line in after_variant.split("\n")
-                            if line.strip()
-                        ]
-                        if lines:
-                            choices = lines
-
-                    # ถ้าไม่มีตัวเลือก ให้ใช้ข้อความทั้งหมดหลัง variant
-                    if not choices:
-                        choices = [after_variant]
-
-                    return True, standard_prompt, choices
-
-            # ไม่ใช่ choice dialogue
-            return False, None, None
-
-        except Exception as e:
-            logging.warning(f"Error in is_similar_to_choice_prompt: {str(e)}")
-            # กรณีเกิด error ให้ส่งค่าที่ปลอดภัย
-            return False, None, None
-
-    def _extract_choices_by_starters(self, text, starters):
-        """แยกตัวเลือกจากข้อความโดยใช้คำเริ่มต้นที่กำหนด
-
-        Args:
-            text: ข้อความที่ต้องการแยกตัวเลือก
-            starters: list ของคำเริ่มต้น เช่น ["1.", "2."]
-
-        Returns:
-            list: รายการตัวเลือกที่แยกได้
-        """
-        try:
-            choices = []
-
-            # กรณีไม่มีข้อความ
-            if not text:
-                return []
-
-            # ตรวจสอบว่ามีคำเริ่มต้นในข้อความหรือไม่
-            found_starter = False
-            for starter in starters:
-                if starter in text:
-                    found_starter = True
-                    break
-
-            if not found_starter:
-                return []
-
-            # วิธีที่ 1: ใช้ regex ที่มีประสิทธิภาพมากขึ้น
-            import re
-
-            pattern = "|".join(re.escape(starter) for starter in starters)
-            regex = rf"({pattern})\s*(.*?)(?=(?:{pattern})|$)"
-
-            matches = re.findall(regex, text, re.DOTALL)
-            if matches:
-                for match in matches:
-                    starter, choice_text = match
-                    if choice_text.strip():
-                        choices.append(f"{starter} {choice_text.strip()}")
-                return choices
-
-            # วิธีที่ 2: ถ้า regex ล้มเหลว ใช้วิธีแยกแบบดั้งเดิม
-            remaining_text = text
-            current_choice = ""
-            current_starter = None
-
-            for i, starter in enumerate(starters):
-                if starter in remaining_text:
-                    # ถ้ามี starter ปัจจุบันและเจอ starter ใหม่
-                    if current_starter:
-                        # เก็บตัวเลือกปัจจุบัน
-                        if current_choice:
-                            choices.append(
-                                f"{current_starter} {current_choice.strip()}"
-                            )
-
-                    # แยกข้อความที่ starter
-                    parts = remaining_text.split(starter, 1)
-                    remaining_text = parts[1] if len(parts) > 1 else ""
-                    current_starter = starter
-                    current_choice = remaining_text
-
-                    # ตรวจสอบ starter ถัดไป
-                    next_starter_pos = float("inf")
-                    for next_starter in starters[i + 1 :]:
-                        pos = remaining_text.find(next_starter)
-                        if pos != -1 and pos < next_starter_pos:
-                            next_starter_pos = pos
-
-                    # ถ้ามี starter ถัดไป
-                    if next_starter_pos != float("inf"):
-                        current_choice = remaining_text[:next_starter_pos]
-                        remaining_text = remaining_text[next_starter_pos:]
-
-                    # เก็บตัวเลือกปัจจุบัน
-                    if current_choice:
-                        choices.append(f"{current_starter} {current_choice.strip()}")
-
-            # เก็บตัวเลือกสุดท้าย
-            if (
-                current_starter
-                and current_choice
-                and not any(starter in current_choice for starter in starters)
-            ):
-                choices.append(f"{current_starter} {current_choice.strip()}")
-
-            return choices
-
-        except Exception as e:
-            logging.warning(f"Error extracting choices by starters: {str(e)}")
-            return []
+        result = parse_choice(text or "")
+        return result.is_choice, result.header, list(result.choices)
 
     def translate_choice(self, text):
         """
@@ -1044,46 +826,8 @@ class TranslatorGemini:
 
             # ตรวจจับและตัด "What will you say?" ออก
             text_to_translate = text.strip()
-            choices_only = text_to_translate
-
-            # รูปแบบที่พบบ่อยของ "What will you say?"
-            choice_headers = [
-                "what will you say?",
-                "what will you say",
-                "whatwill you say?",
-                "what willyou say?",
-                "what will yousay?",
-                "whatwillyou say?",
-                "whatwillyousay?",
-            ]
-
-            # ตรวจหาและตัดส่วน header ออก
-            text_lower = text_to_translate.lower()
-            header_found = False
-
-            for header_pattern in choice_headers:
-                if text_lower.startswith(header_pattern):
-                    # ตัดส่วน header ออก
-                    choices_only = text_to_translate[len(header_pattern) :].strip()
-                    header_found = True
-                    logging.info(
-                        f"TranslatorGemini: Detected and removed header pattern: '{header_pattern}'"
-                    )
-                    break
-
-            # ถ้าไม่พบ header ที่ต้นข้อความ ลองหาในข้อความ
-            if not header_found:
-                for header_pattern in choice_headers:
-                    if header_pattern in text_lower:
-                        # แยกข้อความโดยใช้ header เป็นตัวแบ่ง
-                        parts = text_to_translate.split(header_pattern, 1)
-                        if len(parts) > 1:
-                            choices_only = parts[1].strip()
-                            header_found = True
-                            logging.info(
-                                f"TranslatorGemini: Found and removed header pattern in text: '{header_pattern}'"
-                            )
-                            break
+            header, choices_only = split_choice_header(text_to_translate)
+            header_found = header is not None
 
             if not header_found:
                 logging.info(
@@ -1141,6 +885,29 @@ class TranslatorGemini:
                 "TRANSLATED CHOICES (Thai only):",
             ]
 
+            # *** BATCH: ตัวเลือกหลายบรรทัด แปลใน request เดียว (JSON array) ***
+            # แต่ละตัวเลือกถูก cache แยก ทำให้ตัวเลือกที่ซ้ำในหน้าจออื่นไม่ต้องแปลใหม่
+            choice_lines = [
+                line.strip() for line in choices_only.split("\n") if line.strip()
+            ]
+            if len(choice_lines) > 1:
+                try:
+                    translated_lines = self.batch_translator.translate_segments(
+                        choice_lines,
+                        "\n".join(prompt_parts[:-3]),
+                        dialogue_type="choice_option",
+                        priority=PRIORITY_CHOICE,
+                    )
+                    final_result = "คุณจะพูดว่าอย่างไร?\n" + "\n".join(
+                        translated_lines
+                    )
+                    self.cache.cache_translation(text, final_result, None, "choice")
+                    return final_result
+                except Exception as batch_error:
+                    logging.warning(
+                        f"TranslatorGemini: batch choice translation failed ({batch_error}), using block prompt"
+                    )
+
             prompt = "\n".join(prompt_parts)
 
             generation_config = {
@@ -1160,8 +927,9 @@ class TranslatorGemini:
                 f"TranslatorGemini: Sending to Gemini (choice). Input head: '{text_head_preview}' Temp: {generation_config['temperature']:.2f}"
             )
 
-            response = self.model.generate_content(
+            response = self._generate(
                 prompt,
+                priority=PRIORITY_CHOICE,
                 generation_config=generation_config,
                 safety_settings=self.safety_settings,
             )
@@ -1280,13 +1048,162 @@ class TranslatorGemini:
         return None
 
     def batch_translate(self, texts, batch_size=10):
-        """แปลข้อความเป็นชุด"""
-        translated_texts = []
-        for i in range(0, len(texts), batch_size):
-            batch = texts[i : i + batch_size]
-            translated_batch = [self.translate(text) for text in batch]
-            translated_texts.extend(translated_batch)
-        return translated_texts
+        """
+        แปลข้อความเป็นชุดใน request เดียวต่อ batch (ตอบกลับเป็น JSON array)
+        แต่ละบรรทัดถูกเก็บลง cache แยกกันด้วย key เดียวกับ translate()
+
+        Args:
+            texts: list ของข้อความ (อาจมีรูปแบบ "Name: dialogue")
+            batch_size: จำนวนบรรทัดสูงสุดต่อ request
+
+        Returns:
+            list: ข้อความที่แปลแล้วตามลำดับเดิม
+        """
+        segments = []
+        for text in texts:
+            speaker = None
+            content = (text or "").strip()
+            parsed = self.text_corrector.parse_line(content)
+            if parsed.dialogue_type == DialogueType.CHARACTER and parsed.speaker and parsed.content:
+                speaker = parsed.speaker
+                content = parsed.content
+            segments.append(
+                {
+                    "text": content,
+                    "speaker": speaker,
+                    "dialogue_type": "character" if speaker else "normal",
+                }
+            )
+
+        try:
+            translations = self.batch_translator.translate_segments(
+                segments, self._get_batch_instructions(), max_segments=batch_size
+            )
+        except Exception as e:
+            logging.warning(
+                f"TranslatorGemini: batch request failed ({e}), translating one by one"
+            )
+            return [self.translate(text) for text in texts]
+
+        results = []
+        for segment, translation in zip(segments, translations):
+            translation = re.sub(r"\b(ครับ|ค่ะ|ครับ/ค่ะ)\b", "", translation).strip()
+            if re.match(r"^2+\??$", segment["text"]) or segment["text"] == "???":
+                translation = "???"
+            if segment["speaker"]:
+                self.cache.add_speaker(segment["speaker"])
+                results.append(f"{segment['speaker']}: {translation}")
+            else:
+                results.append(translation)
+        return results
+
+    def _generate(self, contents, priority=None, character=None, model=None, **kwargs):
+        """
+        เรียก generate_content ผ่าน RequestScheduler ที่ใช้ร่วมกันทุก translator
+        และบันทึก token จริงจาก usage_metadata ลง UsageLedger
+        """
+        target_model = model or self.model
+        max_output_tokens = (kwargs.get("generation_config") or {}).get(
+            "max_output_tokens", 0
+        )
+        start_time = time.time()
+        response = self.scheduler.call(
+            "gemini",
+            lambda: target_model.generate_content(contents, **kwargs),
+            estimate_tokens(str(contents), max_output_tokens),
+            priority,
+        )
+        self.usage_ledger.record(
+            "gemini",
+            self.model_name,
+            response,
+            time.time() - start_time,
+            dialogue_type=self.scheduler.priority_name(priority),
+            character=character,
+            game=self.game_name,
+        )
+        return response
+
+    def _generate_with_cached_prefix(self, prefix, suffix, **kwargs):
+        """
+        ส่งเฉพาะ suffix ไปกับโมเดลที่ผูก CachedContent ของ prefix ไว้
+        ถ้าสร้าง cache ไม่ได้ (เช่น prefix สั้นกว่าขั้นต่ำของ Gemini) จะส่ง prompt เต็มตามเดิม
+        """
+        handle = self.prompt_cache.get(prefix)
+        if handle is not None:
+            _, cached_model = handle
+            try:
+                return self._generate(suffix, model=cached_model, **kwargs)
+            except Exception as e:
+                # cache อาจหมดอายุหรือถูกลบฝั่ง server - สร้างใหม่ในครั้งถัดไป
+                logging.warning(f"[Gemini API] Cached prompt failed, resending full prompt: {e}")
+                self.prompt_cache.invalidate()
+        return self._generate(prefix + suffix, **kwargs)
+
+    def _create_cached_model(self, prefix, ttl_seconds):
+        """สร้าง CachedContent สำหรับ prefix และ GenerativeModel ที่ใช้ cache นั้น"""
+        cached_content = genai.caching.CachedContent.create(
+            model=f"models/{self.model_name}",
+            display_name=f"mbb-{self.game_name}"[:60],
+            system_instruction=prefix,
+            ttl=datetime.timedelta(seconds=ttl_seconds),
+        )
+        cached_model = genai.GenerativeModel.from_cached_content(
+            cached_content=cached_content,
+            generation_config={
+                "max_output_tokens": self.max_tokens,
+                "temperature": self.temperature,
+                "top_p": self.top_p,
+            },
+            safety_settings=self.safety_settings,
+        )
+        return cached_content, cached_model
+
+    def _delete_cached_model(self, handle):
+        cached_content, _ = handle
+        cached_content.delete()
+
+    def _reload_if_npc_changed(self):
+        """โหลด NPC.json ใหม่ถ้าไฟล์ถูกแก้ไข (ตรวจไม่เกินทุก 2 วินาที) - prefix และ cache จะถูกสร้างใหม่ตาม"""
+        now = time.time()
+        if not self._npc_file_path or now - self._npc_checked_at < 2.0:
+            return
+        self._npc_checked_at = now
+        try:
+            mtime = os.path.getmtime(self._npc_file_path)
+        except OSError:
+            return
+        if mtime != self._npc_mtime:
+            logging.info("TranslatorGemini: NPC file changed on disk, reloading data")
+            self.load_npc_data()
+
+    def _get_batch_instructions(self):
+        """คำสั่งการแปลสำหรับ batch request (batch_translate และ Lore รายประโยค)"""
+        self._reload_if_npc_changed()
+        return self._get_translation_rules() + self._get_reference_block()
+
+    def _send_batch_prompt(self, prompt, expected_count, priority=PRIORITY_BACKGROUND):
+        """ส่ง prompt แบบ batch ไปยัง Gemini โดยบังคับให้ตอบเป็น JSON array of string"""
+        generation_config = {
+            "max_output_tokens": min(8192, self.max_tokens * max(1, expected_count)),
+            "temperature": self.temperature,
+            "top_p": self.top_p,
+            "response_mime_type": "application/json",
+            "response_schema": BATCH_RESPONSE_SCHEMA,
+        }
+        start_time = time.time()
+        response = self._generate(
+            prompt,
+            priority=priority,
+            generation_config=generation_config,
+            safety_settings=self.safety_settings,
+        )
+        logging.info(
+            f"[Gemini API - Batch] {expected_count} segments in {time.time() - start_time:.2f}s"
+        )
+        if not (hasattr(response, "text") and response.text):
+            raise BatchResponseError("No response text from Gemini batch request")
+        return response.text
 
     def analyze_translation_quality(self, original_text, translated_text):
         """วิเคราะห์คุณภาพการแปล"""
@@ -1301,8 +1218,8 @@ class TranslatorGemini:
 
         try:
             # ส่งคำขอไปยัง Gemini API
-            response = self.model.generate_content(
-                [{"role": "user", "parts": [prompt]}]
+            response = self._generate(
+                [{"role": "user", "parts": [prompt]}], priority=PRIORITY_SPECULATIVE
             )
             return response.text.strip()
         except Exception as e:
@@ -1322,7 +1239,7 @@ class TranslatorGemini:
         """Process a custom prompt with AI"""
         try:
             # มีการเปลี่ยนแปลงในส่วนที่เรียกใช้ API
-            response = self.model.generate_content(
+            response = self._generate(
                 [{"role": "user", "parts": [prompt_with_text]}],
                 generation_config={
                     "max_output_tokens": self.max_tokens * 2,
@@ -1425,7 +1342,7 @@ class TranslatorGemini:
                         "top_p": self.top_p,
                     }
 
-                    retry_response = self.model.generate_content(
+                    retry_response = self._generate(
                         enhanced_prompt,
                         generation_config=generation_config,
                         safety_settings=self.safety_settings,
@@ -1470,12 +1387,9 @@ class TranslatorGemini:
                             )
 
                             # อัพเดตการแปลล่าสุดในแคช
-                            speaker, content, dialogue_type = (
-                                self.text_corrector.split_speaker_and_content(
-                                    original_text
-                                )
-                            )
-                            if dialogue_type == DialogueType.CHARACTER and speaker:
+                            parsed = self.text_corrector.parse_line(original_text)
+                            speaker, content = parsed.speaker, parsed.content
+                            if parsed.dialogue_type == DialogueType.CHARACTER and speaker:
                                 # ถ้ามีชื่อตัวละคร แยกออกจากการแปล
                                 if ":" in improved_translation:
                                     parts = improved_translation.split(":", 1)
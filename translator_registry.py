@@ -0,0 +1,182 @@
+"""
+Provider registry: import SDK ของ provider เฉพาะเมื่อมีการเลือกใช้โมเดลนั้นจริง
+และเก็บ state ที่ใช้ร่วมกัน (NPC data, TextCorrector, DialogueCache) ให้คงอยู่ข้ามการสลับโมเดล
+"""
+
+import importlib
+import json
+import logging
+import os
+import subprocess
+import sys
+import threading
+import time
+
+# provider -> (module, class) - module จะถูก import ครั้งแรกที่ต้องสร้าง translator ของ provider นั้น
+PROVIDERS = {
+    "gemini": ("translator_gemini", "TranslatorGemini"),
+    "claude": ("translator_claude", "TranslatorClaude"),
+    "gpt": ("translator", "Translator"),
+}
+
+_class_cache = {}
+_class_lock = threading.Lock()
+
+
+def get_translator_class(provider):
+    """import module ของ provider (ครั้งแรกเท่านั้น) แล้วคืนคลาส translator"""
+    with _class_lock:
+        translator_class = _class_cache.get(provider)
+        if translator_class is None:
+            if provider not in PROVIDERS:
+                raise ValueError(f"Unknown translator provider: {provider}")
+            module_name, class_name = PROVIDERS[provider]
+            start_time = time.perf_counter()
+            module = importlib.import_module(module_name)
+            translator_class = getattr(module, class_name)
+            _class_cache[provider] = translator_class
+            logging.info(
+                f"Loaded {provider} translator module in {(time.perf_counter() - start_time) * 1000:.0f}ms"
+            )
+        return translator_class
+
+
+def get_provider_type(translator):
+    """
+    คืนชนิด provider ("gemini", "claude", "gpt") ของ translator instance โดยไม่ต้อง import
+    module ของ provider อื่น (ใช้แทน isinstance กับคลาส translator)
+    """
+    if translator is None:
+        return None
+    # ModelRouter: provider ของโมเดลหลัก
+    translator = getattr(translator, "routed_translator", translator)
+    module_name = type(translator).__module__
+    for provider, (provider_module, _) in PROVIDERS.items():
+        if module_name == provider_module:
+            return provider
+    return None
+
+
+class SharedTranslationContext:
+    """
+    state ที่ translator ทุกตัวใช้ร่วมกันและไม่ควรถูกสร้างใหม่ทุกครั้งที่สลับโมเดล:
+    ข้อมูล NPC ที่ parse แล้ว (โหลดใหม่เมื่อไฟล์เปลี่ยน), TextCorrector และ DialogueCache
+    """
+
+    def __init__(self):
+        self._lock = threading.RLock()
+        self._npc_data = {}  # path -> (mtime, data)
+        self._text_corrector = None
+        self._dialogue_cache = None
+
+    def get_npc_data(self, file_path):
+        """
+        คืนข้อมูล NPC ที่ parse แล้ว - อ่านไฟล์ใหม่เฉพาะเมื่อ mtime เปลี่ยน
+
+        Raises:
+            FileNotFoundError / json.JSONDecodeError เหมือนการเปิดไฟล์ตรงๆ
+        """
+        mtime = os.path.getmtime(file_path)
+        with self._lock:
+            cached = self._npc_data.get(file_path)
+            if cached and cached[0] == mtime:
+                return cached[1]
+            with open(file_path, "r", encoding="utf-8") as file:
+                data = json.load(file)
+            self._npc_data[file_path] = (mtime, data)
+            return data
+
+    @property
+    def text_corrector(self):
+        with self._lock:
+            if self._text_corrector is None:
+                from text_corrector import TextCorrector
+
+                self._text_corrector = TextCorrector()
+            return self._text_corrector
+
+    @property
+    def dialogue_cache(self):
+        with self._lock:
+            if self._dialogue_cache is None:
+                from dialogue_cache import DialogueCache
+
+                self._dialogue_cache = DialogueCache()
+            return self._dialogue_cache
+
+    def reload(self):
+        """บังคับให้อ่าน NPC data ใหม่ทั้งหมด (เช่น หลัง swap_data) โดยคง instance เดิมไว้"""
+        with self._lock:
+            self._npc_data.clear()
+            if self._text_corrector is not None:
+                self._text_corrector.load_npc_data()
+
+
+_shared_context = SharedTranslationContext()
+
+
+def get_shared_context():
+    return _shared_context
+
+
+def _measure_in_subprocess(statement):
+    """วัดเวลาของ statement ใน interpreter ใหม่ (cold start จริง) - คืนมิลลิวินาที หรือ None ถ้าล้มเหลว"""
+    code = (
+        "import time; _t = time.perf_counter()\n"
+        f"{statement}\n"
+        "print((time.perf_counter() - _t) * 1000)"
+    )
+    result = subprocess.run(
+        [sys.executable, "-c", code],
+        cwd=os.path.dirname(os.path.abspath(__file__)),
+        capture_output=True,
+        text=True,
+    )
+    if result.returncode != 0:
+        last_line = (result.stderr.strip().splitlines() or ["unknown error"])[-1]
+        logging.warning(f"Benchmark failed for {statement!r}: {last_line}")
+        return None
+    return float(result.stdout.strip().splitlines()[-1])
+
+
+def benchmark_imports():
+    """
+    เปรียบเทียบเวลา import ตอนเริ่มโปรแกรม: แบบเดิม (import translator ทุก provider)
+    กับแบบ registry (import factory แล้วโหลดเฉพาะ provider ที่เลือก)
+    """
+    cases = [
+        ("eager: all provider modules", "import translator, translator_claude, translator_gemini"),
+        ("lazy: translator_factory only", "import translator_factory"),
+    ]
+    for provider in PROVIDERS:
+        cases.append(
+            (
+                f"lazy: factory + {provider}",
+                f"import translator_registry; translator_registry.get_translator_class({provider!r})",
+            )
+        )
+
+    results = {}
+    for label, statement in cases:
+        elapsed = _measure_in_subprocess(statement)
+        results[label] = elapsed
+        shown = f"{elapsed:8.1f} ms" if elapsed is not None else "  failed (SDK not installed?)"
+        print(f"{label:<36}{shown}")
+
+    # เวลาสลับโมเดล: ส่วนที่ translator ทุกตัวเคยสร้างใหม่ (TextCorrector) เทียบกับการใช้ shared context
+    context = SharedTranslationContext()
+    for label in ("model switch: cold shared state", "model switch: warm shared state"):
+        start_time = time.perf_counter()
+        try:
+            context.text_corrector
+            context.dialogue_cache
+        except Exception as e:
+            print(f"{label:<36}  failed ({e})")
+            continue
+        results[label] = (time.perf_counter() - start_time) * 1000
+        print(f"{label:<36}{results[label]:8.1f} ms")
+    return results
+
+
+if __name__ == "__main__":
+    benchmark_imports()
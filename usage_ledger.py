@@ -0,0 +1,288 @@
+import atexit
+import json
+import logging
+import os
+import threading
+import uuid
+from datetime import datetime
+
+# ราคาต่อ 1M tokens (input, output, ส่วนลดของ cached input เทียบกับ input ปกติ)
+# เป็นค่าประมาณสำหรับเปรียบเทียบโมเดล - จับคู่ด้วย prefix ที่ยาวที่สุดของชื่อโมเดล
+DEFAULT_PRICES = {
+    "gemini-2.0-flash": (0.10, 0.40, 0.25),
+    "gemini-1.5-flash": (0.075, 0.30, 0.25),
+    "gemini-1.5-pro": (1.25, 5.00, 0.25),
+    "claude-3-5-haiku": (0.80, 4.00, 0.10),
+    "claude-3-5-sonnet": (3.00, 15.00, 0.10),
+    "claude-3-haiku": (0.25, 1.25, 0.10),
+    "gpt-4o-mini": (0.15, 0.60, 0.50),
+    "gpt-4o": (2.50, 10.00, 0.50),
+}
+
+MAX_SESSIONS = 50
+
+
+def extract_usage_details(response):
+    """
+    ดึงจำนวน token จริงจาก response ของ Gemini / Claude / OpenAI
+
+    Returns:
+        dict: {"prompt_tokens", "cached_tokens", "output_tokens"} หรือ None ถ้า response ไม่มี usage
+    """
+    try:
+        # Gemini: usage_metadata
+        usage = getattr(response, "usage_metadata", None)
+        if usage is not None:
+            return {
+                "prompt_tokens": int(getattr(usage, "prompt_token_count", 0) or 0),
+                "cached_tokens": int(getattr(usage, "cached_content_token_count", 0) or 0),
+                "output_tokens": int(getattr(usage, "candidates_token_count", 0) or 0),
+            }
+
+        usage = getattr(response, "usage", None)
+        if usage is None:
+            return None
+
+        # OpenAI: prompt_tokens / completion_tokens (+ prompt_tokens_details.cached_tokens)
+        if getattr(usage, "prompt_tokens", None) is not None:
+            details = getattr(usage, "prompt_tokens_details", None)
+            return {
+                "prompt_tokens": int(usage.prompt_tokens or 0),
+                "cached_tokens": int(getattr(details, "cached_tokens", 0) or 0),
+                "output_tokens": int(getattr(usage, "completion_tokens", 0) or 0),
+            }
+
+        # Claude: input_tokens ไม่รวมส่วนที่อ่านจาก cache จึงต้องบวกกลับเข้าไป
+        cache_read = int(getattr(usage, "cache_read_input_tokens", 0) or 0)
+        cache_write = int(getattr(usage, "cache_creation_input_tokens", 0) or 0)
+        return {
+            "prompt_tokens": int(usage.input_tokens or 0) + cache_read + cache_write,
+            "cached_tokens": cache_read,
+            "output_tokens": int(usage.output_tokens or 0),
+        }
+    except (AttributeError, TypeError, ValueError):
+        return None
+
+
+def _empty_bucket():
+    return {
+        "calls": 0,
+        "prompt_tokens": 0,
+        "cached_tokens": 0,
+        "output_tokens": 0,
+        "cost": 0.0,
+        "latency_total": 0.0,
+        "latency_max": 0.0,
+        "by_type": {},
+    }
+
+
+def _add_to_bucket(bucket, entry):
+    bucket["calls"] += 1
+    bucket["prompt_tokens"] += entry["prompt_tokens"]
+    bucket["cached_tokens"] += entry["cached_tokens"]
+    bucket["output_tokens"] += entry["output_tokens"]
+    bucket["cost"] += entry["cost"]
+    bucket["latency_total"] += entry["latency"]
+    bucket["latency_max"] = max(bucket["latency_max"], entry["latency"])
+    by_type = bucket["by_type"]
+    by_type[entry["dialogue_type"]] = by_type.get(entry["dialogue_type"], 0) + 1
+
+
+def summarize_bucket(bucket):
+    """เพิ่มค่าที่คำนวณได้ (latency เฉลี่ย, สัดส่วน cache) ให้ bucket สำหรับแสดงผล"""
+    summary = dict(bucket or _empty_bucket())
+    calls = summary["calls"]
+    summary["avg_latency"] = summary["latency_total"] / calls if calls else 0.0
+    summary["avg_prompt_tokens"] = summary["prompt_tokens"] / calls if calls else 0.0
+    summary["avg_output_tokens"] = summary["output_tokens"] / calls if calls else 0.0
+    summary["cache_ratio"] = (
+        summary["cached_tokens"] / summary["prompt_tokens"] if summary["prompt_tokens"] else 0.0
+    )
+    return summary
+
+
+class UsageLedger:
+    """
+    บัญชีการใช้ token / ค่าใช้จ่าย / latency ของทุกการเรียก API
+    รวมยอดต่อ session, ต่อเกม, ต่อตัวละคร และต่อโมเดล แล้วบันทึกลงไฟล์ JSON
+    """
+
+    def __init__(self, file_path="usage_ledger.json", prices=None, save_every=20):
+        self.file_path = file_path
+        self.prices = dict(DEFAULT_PRICES)
+        self.prices.update(prices or {})
+        self.save_every = save_every
+        self.session_id = f"{datetime.now().strftime('%Y%m%d-%H%M%S')}-{uuid.uuid4().hex[:6]}"
+        self._lock = threading.Lock()
+        # flush จากหลาย thread (fan-out, ModelRouter, scheduler) ต้องเขียนไฟล์ทีละครั้งตามลำดับ snapshot
+        self._write_lock = threading.Lock()
+        self._pending = 0
+        self.data = self._load()
+        self.data["sessions"][self.session_id] = {
+            "started": datetime.now().isoformat(timespec="seconds"),
+            "totals": _empty_bucket(),
+        }
+        self._trim_sessions()
+
+    def _load(self):
+        data = {}
+        if os.path.exists(self.file_path):
+            try:
+                with open(self.file_path, "r", encoding="utf-8") as f:
+                    data = json.load(f)
+            except (OSError, json.JSONDecodeError) as e:
+                logging.warning(f"UsageLedger: could not read {self.file_path}: {e}")
+        for key in ("sessions", "games", "characters", "models"):
+            data.setdefault(key, {})
+        data.setdefault("totals", _empty_bucket())
+        return data
+
+    def _trim_sessions(self):
+        sessions = self.data["sessions"]
+        while len(sessions) > MAX_SESSIONS:
+            oldest = min(sessions, key=lambda sid: sessions[sid].get("started", ""))
+            del sessions[oldest]
+
+    def estimate_cost(self, model, prompt_tokens, cached_tokens, output_tokens):
+        """ประมาณค่าใช้จ่าย (USD) จากตารางราคา - คืน 0 ถ้าไม่รู้จักโมเดล"""
+        model = (model or "").lower()
+        matches = [name for name in self.prices if model.startswith(name)]
+        if not matches:
+            return 0.0
+        input_price, output_price, cached_discount = self.prices[max(matches, key=len)]
+        uncached = max(0, prompt_tokens - cached_tokens)
+        return (
+            uncached * input_price
+            + cached_tokens * input_price * cached_discount
+            + output_tokens * output_price
+        ) / 1_000_000
+
+    def record(
+        self,
+        provider,
+        model,
+        response,
+        latency,
+        dialogue_type=None,
+        character=None,
+        game=None,
+    ):
+        """บันทึกการเรียก API หนึ่งครั้ง (ข้ามถ้า response ไม่มีข้อมูล usage)"""
+        usage = extract_usage_details(response)
+        if usage is None:
+            return None
+
+        entry = dict(usage)
+        entry["latency"] = float(latency)
+        entry["dialogue_type"] = dialogue_type or "unknown"
+        entry["cost"] = self.estimate_cost(
+            model, usage["prompt_tokens"], usage["cached_tokens"], usage["output_tokens"]
+        )
+        game = game or "unknown"
+
+        with self._lock:
+            data = self.data
+            _add_to_bucket(data["totals"], entry)
+            _add_to_bucket(data["sessions"][self.session_id]["totals"], entry)
+            _add_to_bucket(data["games"].setdefault(game, _empty_bucket()), entry)
+            _add_to_bucket(
+                data["models"].setdefault(f"{provider}:{model}", _empty_bucket()), entry
+            )
+            if character:
+                characters = data["characters"].setdefault(game, {})
+                _add_to_bucket(characters.setdefault(character, _empty_bucket()), entry)
+
+            self._pending += 1
+            should_save = self._pending >= self.save_every
+
+        logging.debug(
+            f"UsageLedger: {provider}:{model} {entry['dialogue_type']} "
+            f"in={usage['prompt_tokens']} (cached {usage['cached_tokens']}) "
+            f"out={usage['output_tokens']} {latency:.2f}s ${entry['cost']:.5f}"
+        )
+        if should_save:
+            self.flush()
+        return entry
+
+    def flush(self):
+        """
+        เขียนไฟล์แบบ atomic (เขียนไฟล์ชั่วคราว + fsync แล้ว os.replace)
+        ถือ _write_lock ตลอดตั้งแต่ snapshot จนถึง replace - flush สองครั้งจึงไม่เขียนไฟล์ชั่วคราวเดียวกันพร้อมกัน
+        และ snapshot ที่เก่ากว่าไม่มีทางทับ snapshot ที่ใหม่กว่า (ไฟล์เสียจะทำให้ _load ทิ้งประวัติทั้งหมด)
+        """
+        with self._write_lock:
+            with self._lock:
+                if not self._pending:
+                    return
+                snapshot = json.dumps(self.data, ensure_ascii=False, indent=2)
+                pending, self._pending = self._pending, 0
+            temp_path = f"{self.file_path}.tmp"
+            try:
+                with open(temp_path, "w", encoding="utf-8") as f:
+                    f.write(snapshot)
+                    f.flush()
+                    os.fsync(f.fileno())
+                os.replace(temp_path, self.file_path)
+            except OSError as e:
+                logging.warning(f"UsageLedger: could not save {self.file_path}: {e}")
+                with self._lock:
+                    self._pending += pending
+
+    # ---- query helpers ----
+
+    def session_summary(self, session_id=None):
+        with self._lock:
+            session = self.data["sessions"].get(session_id or self.session_id, {})
+            return summarize_bucket(session.get("totals"))
+
+    def game_summary(self, game):
+        with self._lock:
+            return summarize_bucket(self.data["games"].get(game))
+
+    def character_summary(self, character, game=None):
+        """ยอดของตัวละคร - ถ้าไม่ระบุเกมจะรวมทุกเกม"""
+        with self._lock:
+            if game is not None:
+                return summarize_bucket(self.data["characters"].get(game, {}).get(character))
+            combined = _empty_bucket()
+            for characters in self.data["characters"].values():
+                bucket = characters.get(character)
+                if bucket:
+                    for key in ("calls", "prompt_tokens", "cached_tokens", "output_tokens",
+                                "cost", "latency_total"):
+                        combined[key] += bucket[key]
+                    combined["latency_max"] = max(combined["latency_max"], bucket["latency_max"])
+                    for dialogue_type, count in bucket["by_type"].items():
+                        combined["by_type"][dialogue_type] = combined["by_type"].get(dialogue_type, 0) + count
+            return summarize_bucket(combined)
+
+    def model_summaries(self):
+        with self._lock:
+            return {name: summarize_bucket(bucket) for name, bucket in self.data["models"].items()}
+
+    def top_characters(self, game=None, metric="cost", limit=10):
+        """ตัวละครที่ใช้ทรัพยากรมากที่สุดตาม metric (cost, output_tokens, calls, ...)"""
+        with self._lock:
+            games = [game] if game is not None else list(self.data["characters"])
+            rows = []
+            for game_name in games:
+                for character, bucket in self.data["characters"].get(game_name, {}).items():
+                    rows.append((game_name, character, summarize_bucket(bucket)))
+        rows.sort(key=lambda row: row[2].get(metric, 0), reverse=True)
+        return rows[:limit]
+
+
+_ledger = None
+_ledger_lock = threading.Lock()
+
+
+def get_usage_ledger():
+    """คืน ledger ตัวเดียวที่ใช้ร่วมกันทั้งแอป (บันทึกไฟล์อัตโนมัติเมื่อปิดโปรแกรม)"""
+    global _ledger
+    with _ledger_lock:
+        if _ledger is None:
+            _ledger = UsageLedger()
+            atexit.register(_ledger.flush)
+        return _ledger
+
@@ -0,0 +1,383 @@
+"""
+Visual pre-classifier สำหรับ auto area switching: ดูจาก "หน้าตา" ของพื้นที่บนจอว่าเป็นกรอบบทสนทนา
+หน้าตัวเลือก หรือ cutscene/lore โดยไม่ต้อง OCR
+
+- แต่ละพื้นที่ถูกย่อเป็น feature เล็กๆ: ภาพขาวดำ 64x16, histogram ความสว่าง และความหนาแน่นของขอบ
+  (ใช้เวลาไม่กี่มิลลิวินาทีต่อเฟรม)
+- template เรียนรู้จาก preset ที่ผู้ใช้เลือกเอง (dialog / choice / lore) บนพิกัดของ preset นั้น
+  เก็บแยกตามความละเอียดหน้าจอใน visual_templates.json
+- ถ้า feature ไม่เปลี่ยนจากรอบก่อน ผู้เรียกใช้ผลเดิมได้เลย ไม่ต้อง OCR
+- ถ้าเปลี่ยนและตรงกับ template ชัดเจน ผู้เรียกใช้ label จาก template ได้ มิฉะนั้นค่อย OCR ตามเดิม
+
+รัน `python visual_classifier.py` เพื่อวัดเวลาและความแม่นยำบนเฟรมสังเคราะห์
+"""
+
+import json
+import logging
+import os
+import threading
+import time
+from collections import namedtuple
+
+import numpy as np
+
+TEMPLATE_FILE = "visual_templates.json"
+
+THUMB_SIZE = (64, 16)  # (กว้าง, สูง)
+HIST_BINS = 16
+
+# ค่าเฉลี่ยความต่างของ thumbnail (ระดับสี 0-255) ที่ถือว่าพื้นที่เปลี่ยน
+CHANGE_THRESHOLD = 4.0
+EDGE_CHANGE_THRESHOLD = 0.02
+
+# คะแนนขั้นต่ำที่ถือว่าตรงกับ template และระยะห่างจาก label อันดับสอง
+MATCH_THRESHOLD = 0.88
+MATCH_MARGIN = 0.04
+
+# role ของ preset -> ประเภทข้อความแบบเดียวกับ detect_dialogue_type_improved
+ROLE_LABELS = {"dialog": "normal", "choice": "choice", "lore": "narrator"}
+
+AreaFeatures = namedtuple("AreaFeatures", ["thumb", "hist", "edges"])
+VisualMatch = namedtuple("VisualMatch", ["changed", "label", "preset", "score", "elapsed_ms"])
+
+
+def _to_grey_thumb(image):
+    """ย่อภาพ (PIL.Image หรือ numpy array) เป็น thumbnail ขาวดำ float32 ขนาด THUMB_SIZE"""
+    if hasattr(image, "convert"):
+        # PIL: ย่อแบบ reduce ก่อนจึงเร็วแม้พื้นที่ใหญ่
+        thumb = image.convert("L").resize(THUMB_SIZE, reducing_gap=2.0)
+        return np.asarray(thumb, dtype=np.float32)
+
+    array = np.asarray(image, dtype=np.float32)
+    if array.ndim == 3:
+        array = array[..., :3].mean(axis=2)
+    width, height = THUMB_SIZE
+    rows = np.linspace(0, array.shape[0], height + 1).astype(int)
+    cols = np.linspace(0, array.shape[1], width + 1).astype(int)
+    # block mean ด้วย reduceat (ไม่ต้องพึ่ง PIL)
+    array = np.add.reduceat(array, rows[:-1], axis=0) / np.maximum(np.diff(rows), 1)[:, None]
+    array = np.add.reduceat(array, cols[:-1], axis=1) / np.maximum(np.diff(cols), 1)[None, :]
+    return array.astype(np.float32)
+
+
+def extract_features(image):
+    thumb = _to_grey_thumb(image)
+    hist = np.histogram(thumb, bins=HIST_BINS, range=(0, 256))[0].astype(np.float32)
+    hist /= max(1.0, hist.sum())
+    # ตัวอักษรทำให้เกิดขอบแนวนอนถี่ - ใช้แยกพื้นที่ที่มีข้อความออกจากพื้นหลังเรียบ
+    edges = float((np.abs(np.diff(thumb, axis=1)) > 24).mean())
+    return AreaFeatures(thumb, hist, edges)
+
+
+def has_changed(old, new):
+    if old is None or new is None:
+        return True
+    if old.thumb.shape != new.thumb.shape:
+        return True
+    return (
+        float(np.abs(old.thumb - new.thumb).mean()) > CHANGE_THRESHOLD
+        or abs(old.edges - new.edges) > EDGE_CHANGE_THRESHOLD
+    )
+
+
+def similarity(template, features):
+    """คะแนน 0-1: normalized cross-correlation ของ thumbnail + histogram intersection + ความหนาแน่นของขอบ"""
+    a = template.thumb - template.thumb.mean()
+    b = features.thumb - features.thumb.mean()
+    norm = float(np.linalg.norm(a) * np.linalg.norm(b))
+    if norm < 1e-3:
+        # พื้นที่เรียบทั้งคู่ - เทียบแค่ความสว่างเฉลี่ย
+        ncc = 1.0 - min(1.0, abs(float(template.thumb.mean() - features.thumb.mean())) / 32.0)
+    else:
+        ncc = max(0.0, float((a * b).sum()) / norm)
+    hist = float(np.minimum(template.hist, features.hist).sum())
+    edges = 1.0 - min(1.0, abs(template.edges - features.edges) * 4.0)
+    return 0.5 * ncc + 0.3 * hist + 0.2 * edges
+
+
+def _crop(full_screen, rect):
+    rect = rect.clamp(*_image_size(full_screen))
+    if rect.is_empty:
+        return None
+    if hasattr(full_screen, "crop"):
+        return full_screen.crop(rect)
+    return full_screen[rect.y1 : rect.y2, rect.x1 : rect.x2]
+
+
+def _image_size(image):
+    if hasattr(image, "size") and not isinstance(image, np.ndarray):
+        return image.size
+    return image.shape[1], image.shape[0]
+
+
+class VisualPreClassifier:
+    """
+    Args:
+        area_geometry: AreaGeometry (พิกัดพื้นที่ปัจจุบันและของแต่ละ preset ในพิกเซลจริง)
+        settings: Settings (อ่าน role ของ preset)
+        file_path: ไฟล์เก็บ template
+    """
+
+    def __init__(self, area_geometry, settings, file_path=TEMPLATE_FILE):
+        self.area_geometry = area_geometry
+        self.settings = settings
+        self.file_path = file_path
+        self._lock = threading.Lock()
+        self._templates = self._load()  # screen key -> preset (str) -> {"role", "areas"}
+        self._last = {}  # channel -> {rect: AreaFeatures}
+        self.stats = {"frames": 0, "unchanged": 0, "matched": 0, "learned": 0}
+
+    # ---- storage ----
+
+    def _load(self):
+        try:
+            with open(self.file_path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+        except (OSError, json.JSONDecodeError):
+            return {}
+        templates = {}
+        for screen_key, presets in data.items():
+            for preset, entry in presets.items():
+                areas = {}
+                for area, stored in entry.get("areas", {}).items():
+                    areas[area] = {
+                        "rect": tuple(stored["rect"]),
+                        "samples": stored.get("samples", 1),
+                        "features": AreaFeatures(
+                            np.asarray(stored["thumb"], dtype=np.float32).reshape(
+                                THUMB_SIZE[1], THUMB_SIZE[0]
+                            ),
+                            np.asarray(stored["hist"], dtype=np.float32),
+                            float(stored["edges"]),
+                        ),
+                    }
+                templates.setdefault(screen_key, {})[preset] = {
+                    "role": entry.get("role"),
+                    "areas": areas,
+                }
+        return templates
+
+    def _save(self):
+        data = {}
+        for screen_key, presets in self._templates.items():
+            for preset, entry in presets.items():
+                data.setdefault(screen_key, {})[preset] = {
+                    "role": entry["role"],
+                    "areas": {
+                        area: {
+                            "rect": list(stored["rect"]),
+                            "samples": stored["samples"],
+                            "thumb": np.round(stored["features"].thumb, 1).ravel().tolist(),
+                            "hist": np.round(stored["features"].hist, 4).tolist(),
+                            "edges": round(stored["features"].edges, 4),
+                        }
+                        for area, stored in entry["areas"].items()
+                    },
+                }
+        temp_path = f"{self.file_path}.tmp"
+        try:
+            with open(temp_path, "w", encoding="utf-8") as f:
+                json.dump(data, f)
+            os.replace(temp_path, self.file_path)
+        except OSError as e:
+            logging.error(f"VisualPreClassifier: cannot save templates: {e}")
+
+    @staticmethod
+    def _screen_key(full_screen):
+        width, height = _image_size(full_screen)
+        return f"{width}x{height}"
+
+    # ---- learning ----
+
+    def learn(self, full_screen, preset_num):
+        """
+        เรียนรู้ template ของ preset ที่ผู้ใช้ยืนยัน (เลือกเอง) จากภาพหน้าจอปัจจุบัน
+        คืน False ถ้า role ของ preset ไม่ใช่ dialog/choice/lore หรือไม่มีพื้นที่ให้เรียนรู้
+        """
+        role = self.settings.get_preset_role(preset_num)
+        if role not in ROLE_LABELS or full_screen is None:
+            return False
+        rects = self.area_geometry.preset_rects(preset_num)
+        if not rects:
+            return False
+
+        with self._lock:
+            presets = self._templates.setdefault(self._screen_key(full_screen), {})
+            entry = presets.get(str(preset_num))
+            if entry is None or entry["role"] != role:
+                entry = presets[str(preset_num)] = {"role": role, "areas": {}}
+            for area, rect in rects.items():
+                image = _crop(full_screen, rect)
+                if image is None:
+                    continue
+                features = extract_features(image)
+                stored = entry["areas"].get(area)
+                if stored is None or stored["rect"] != tuple(rect):
+                    # preset ถูกย้ายพิกัด - เริ่มเรียนรู้ใหม่
+                    entry["areas"][area] = {"rect": tuple(rect), "samples": 1, "features": features}
+                    continue
+                # เฉลี่ยแบบ running mean (น้ำหนักขั้นต่ำ 0.2 ให้ตามการเปลี่ยน theme ของเกมได้)
+                weight = max(0.2, 1.0 / (stored["samples"] + 1))
+                old = stored["features"]
+                stored["features"] = AreaFeatures(
+                    old.thumb * (1 - weight) + features.thumb * weight,
+                    old.hist * (1 - weight) + features.hist * weight,
+                    old.edges * (1 - weight) + features.edges * weight,
+                )
+                stored["samples"] += 1
+            self.stats["learned"] += 1
+            self._save()
+        logging.info(f"VisualPreClassifier: learned template for P{preset_num} ({role})")
+        return True
+
+    # ---- detection ----
+
+    def observe(self, full_screen, channel, areas=("A", "B", "C")):
+        """
+        ตรวจพื้นที่ปัจจุบัน (areas) และพื้นที่ของทุก preset ที่มี template
+
+        Args:
+            channel: ชื่อผู้เรียก (เช่น "switch", "background") - แต่ละ channel จำเฟรมล่าสุดของตัวเอง
+
+        Returns:
+            VisualMatch(changed, label, preset, score, elapsed_ms) - label เป็น None ถ้าไม่ตรงกับ template ใดชัดเจน
+        """
+        start_time = time.perf_counter()
+        if full_screen is None:
+            return VisualMatch(True, None, None, 0.0, 0.0)
+
+        features_by_rect = {}
+
+        def features_for(rect):
+            if rect not in features_by_rect:
+                image = _crop(full_screen, rect)
+                features_by_rect[rect] = extract_features(image) if image is not None else None
+            return features_by_rect[rect]
+
+        with self._lock:
+            templates = dict(self._templates.get(self._screen_key(full_screen), {}))
+
+        # 1. จับคู่กับ template ของแต่ละ preset (เฉพาะ preset ที่พิกัดยังตรงกับตอนเรียนรู้)
+        best_by_label = {}
+        for preset, entry in templates.items():
+            label = ROLE_LABELS.get(entry["role"])
+            current_rects = self.area_geometry.preset_rects(int(preset))
+            scores = []
+            for area, stored in entry["areas"].items():
+                rect = current_rects.get(area)
+                if rect is None or tuple(rect) != stored["rect"]:
+                    scores = []
+                    break
+                features = features_for(rect)
+                if features is None:
+                    scores = []
+                    break
+                scores.append(similarity(stored["features"], features))
+            if label and scores:
+                score = sum(scores) / len(scores)
+                if score > best_by_label.get(label, (0.0, None))[0]:
+                    best_by_label[label] = (score, int(preset))
+
+        # 2. ตรวจว่าพื้นที่เปลี่ยนจากรอบก่อนของ channel นี้หรือไม่
+        for area in areas:
+            rect = self.area_geometry.area_rect(area)
+            if rect is not None and not rect.is_empty:
+                features_for(rect)
+        current = {rect: features for rect, features in features_by_rect.items() if features is not None}
+        previous = self._last.get(channel)
+        changed = previous is None or set(previous) != set(current) or any(
+            has_changed(previous[rect], features) for rect, features in current.items()
+        )
+        self._last[channel] = current
+
+        label, preset, score = None, None, 0.0
+        if best_by_label:
+            ranked = sorted(best_by_label.items(), key=lambda item: item[1][0], reverse=True)
+            top_label, (top_score, top_preset) = ranked[0]
+            runner_up = ranked[1][1][0] if len(ranked) > 1 else 0.0
+            score = top_score
+            if top_score >= MATCH_THRESHOLD and top_score - runner_up >= MATCH_MARGIN:
+                label, preset = top_label, top_preset
+
+        self.stats["frames"] += 1
+        if not changed:
+            self.stats["unchanged"] += 1
+        if label:
+            self.stats["matched"] += 1
+        return VisualMatch(changed, label, preset, score, (time.perf_counter() - start_time) * 1000)
+
+    def reset(self, channel=None):
+        """ลืมเฟรมล่าสุด (เช่น หลังสลับพื้นที่) ให้รอบถัดไปถือว่าเปลี่ยน"""
+        if channel is None:
+            self._last.clear()
+        else:
+            self._last.pop(channel, None)
+
+
+def benchmark(frames=200):
+    """
+    เฟรมสังเคราะห์ 1920x1080: กรอบบทสนทนา (ล่าง), กล่องตัวเลือก (ขวา) และ letterbox ของ cutscene
+    เรียนรู้จาก preset ละหนึ่งเฟรม แล้ววัดความแม่นยำ/เวลาต่อเฟรมบนเฟรมที่ข้อความเปลี่ยน
+    """
+    from area_geometry import AreaGeometry
+
+    rng = np.random.default_rng(7)
+
+    def frame(kind):
+        screen = rng.integers(40, 200, size=(1080, 1920), dtype=np.uint8)  # ฉากเกม
+        if kind == "normal":
+            screen[820:1040, 360:1560] = 20
+            screen[790:830, 380:700] = 30
+            for row in range(860, 1010, 40):
+                screen[row : row + 18, 400 : int(rng.integers(900, 1500))] = 235
+        elif kind == "choice":
+            screen[380:700, 1200:1700] = 25
+            for row in range(400, 680, 56):
+                screen[row : row + 20, 1240 : int(rng.integers(1400, 1650))] = 230
+        else:  # narrator / cutscene letterbox
+            screen[:140] = 0
+            screen[940:] = 0
+            screen[960:990, 500 : int(rng.integers(1100, 1400))] = 240
+        return screen
+
+    def coords(x1, y1, x2, y2):
+        return {"start_x": x1, "start_y": y1, "end_x": x2, "end_y": y2}
+
+    class _Settings(dict):
+        def get_preset_role(self, preset_num):
+            return self["area_presets"][preset_num - 1]["role"]
+
+    settings = _Settings(
+        screen_size="1920x1080",
+        translate_areas={"A": coords(380, 790, 700, 830), "B": coords(360, 820, 1560, 1040)},
+        area_presets=[
+            {"role": "dialog", "coordinates": {"A": coords(380, 790, 700, 830), "B": coords(360, 820, 1560, 1040)}},
+            {"role": "lore", "coordinates": {"C": coords(0, 940, 1920, 1080)}},
+            {"role": "choice", "coordinates": {"B": coords(1200, 380, 1700, 700)}},
+        ],
+    )
+    geometry = AreaGeometry(settings, lambda: (1920, 1080))
+    classifier = VisualPreClassifier(geometry, settings, file_path="visual_templates_benchmark.json")
+    for preset_num, kind in ((1, "normal"), (2, "narrator"), (3, "choice")):
+        for _ in range(3):
+            classifier.learn(frame(kind), preset_num)
+
+    kinds = ("normal", "choice", "narrator")
+    correct, elapsed = 0, 0.0
+    for i in range(frames):
+        kind = kinds[i % 3]
+        result = classifier.observe(frame(kind), "benchmark")
+        correct += result.label == kind
+        elapsed += result.elapsed_ms
+    still = frame("normal")
+    classifier.observe(still, "still")
+    unchanged = not classifier.observe(still, "still").changed
+    os.remove("visual_templates_benchmark.json")
+
+    print(f"visual pre-classifier: {correct}/{frames} correct, {elapsed / frames:.2f} ms/frame")
+    print(f"static screen detected as unchanged: {unchanged}")
+    return correct / frames, elapsed / frames
+
+
+if __name__ == "__main__":
+    benchmark()